@@ -3,11 +3,16 @@ Application Settings
 Global configuration and settings for the DB Manager application
 """
 
+import os
+
 # Application metadata
 APP_NAME = "DB Manager"
 APP_VERSION = "1.0.0"
 APP_SUBTITLE = "Professional"
 
+# Local data directory (caches, history, indexes)
+DATA_DIR = os.path.expanduser(os.environ.get('DB_MANAGER_DATA_DIR', '~/.db_manager'))
+
 # Window settings
 WINDOW_TITLE = f"{APP_NAME} - Modern Dashboard"
 WINDOW_WIDTH = 1400
@@ -15,6 +20,25 @@ WINDOW_HEIGHT = 900
 WINDOW_MIN_WIDTH = 1200
 WINDOW_MIN_HEIGHT = 700
 
+# View cache settings
+VIEW_CACHE = {
+    'max_views': 8,           # Built views kept alive before LRU eviction
+    'max_widgets': 2500,      # Total widget budget across cached views
+    'keep_alive': ['Dashboard'],
+}
+
+# Startup settings
+STARTUP = {
+    'first_paint_budget_ms': 750,  # Reported as a warning when exceeded
+    'section_interval_ms': 10,     # Delay between deferred dashboard sections
+}
+
+# UI update scheduler settings
+SCHEDULER = {
+    'frame_ms': 16,  # Frame budget; pending updates are flushed at most this often
+    'idle_ms': 50,   # Tick interval while nothing is pending
+}
+
 # Navigation structure
 NAVIGATION = {
     'main': {
@@ -57,6 +81,7 @@ NAVIGATION = {
 # Dashboard statistics
 DASHBOARD_STATS = [
     {
+        'key': 'connections',
         'title': 'Database Connections',
         'value': '127',
         'style': 'success',
@@ -64,6 +89,7 @@ DASHBOARD_STATS = [
         'subtitle': '+12% from last week'
     },
     {
+        'key': 'services',
         'title': 'Active Services',
         'value': '8/10',
         'style': 'info',
@@ -71,6 +97,7 @@ DASHBOARD_STATS = [
         'subtitle': '2 services stopped'
     },
     {
+        'key': 'storage',
         'title': 'Storage Used',
         'value': '234 GB',
         'style': 'warning',
@@ -78,6 +105,7 @@ DASHBOARD_STATS = [
         'subtitle': '67% of total capacity'
     },
     {
+        'key': 'uptime',
         'title': 'System Uptime',
         'value': '15d 7h',
         'style': 'primary',
@@ -86,6 +114,297 @@ DASHBOARD_STATS = [
     }
 ]
 
+# Database connection profiles
+DATABASE_PROFILES = [
+    {
+        'name': 'Local SQLite',
+        'backend': 'sqlite',
+        'database': os.path.join(DATA_DIR, 'local.db'),
+    },
+    {
+        'name': 'Local Postgres',
+        'backend': 'postgres',
+        'dsn': os.environ.get('DB_MANAGER_PG_DSN', 'postgresql://localhost:5432/postgres'),
+    },
+]
+
+# Connection pool settings (a profile may override any of these under 'pool')
+DATABASE_POOL = {
+    'min_size': 1,
+    'max_size': 10,
+    'acquire_timeout': 10.0,     # Seconds to wait for a free connection
+    'idle_timeout': 300.0,       # Idle connections above min_size are closed after this
+    'max_lifetime': 3600.0,      # Connections are recycled after this age
+    'health_interval': 30.0,     # Seconds between idle connection pings
+    'metrics_interval_ms': 2000, # How often pool metrics are published to the UI
+}
+
+# Query Builder settings
+QUERY_BUILDER = {
+    'batch_size': 5000,               # Rows per fetch from the server-side cursor
+    'first_batch_size': 200,          # Small first fetch for fast first-row latency
+    'max_buffered_rows': 10_000_000,  # Fetching stops here to bound client memory
+    'default_sql': 'SELECT 1;',
+}
+
+# Query plan capture and run history for the Query Builder
+QUERY_PLANS = {
+    'path': os.path.join(DATA_DIR, 'query_plans.db'),
+    'capture': False,              # Default of the "Capture plan" toggle
+    'analyze': True,               # EXPLAIN ANALYZE on Postgres; runs the statement a second time
+    'analyze_writes': False,       # Also ANALYZE INSERT/UPDATE/DELETE (always rolled back)
+    'seq_scan_rows': 100_000,      # Full scans of tables at least this big are flagged
+    'misestimate_factor': 10,      # Estimated vs actual rows off by this much are flagged
+    'misestimate_min_rows': 1000,  # ...when either side reaches this many rows
+    'regression_factor': 1.5,      # A run this much slower than the previous one is a regression
+    'regression_min_ms': 50,       # ...when it takes at least this long
+    'runs_per_query': 20,          # Runs (and plans) kept per statement
+    'top_limit': 100,              # Statements in the top-N report
+}
+
+# Query result cache (memory LRU over compressed column files on disk)
+RESULT_CACHE = {
+    'enabled': True,               # Default of the Query Builder's "Use cache" toggle
+    'directory': os.path.join(DATA_DIR, 'result_cache'),
+    'ttl_s': 900,                  # Entries expire after this; covers writes made outside the app
+    'memory_mb': 256,
+    'disk_mb': 2048,
+    'max_entry_mb': 512,           # Larger results are not cached
+    'min_elapsed_ms': 50,          # Faster queries are not worth caching
+    'codec': 'zstd',               # Falls back to zlib when zstandard is not installed
+    'levels': {'zstd': 3, 'zlib': 1},
+    'workers': 2,                  # Threads that load and write cache files
+}
+
+# Bulk imports from the Postgres Manager and Tables & Schemas
+IMPORTS = {
+    'rejects_directory': os.path.join(DATA_DIR, 'import_rejects'),
+    'workers': 0,                # Parsing processes; 0 uses every core
+    'start_method': 'spawn',
+    'chunk_mb': 8,               # Bytes of a CSV/JSONL file per parse task; Parquet parses per row group
+    'max_in_flight': 0,          # Chunks parsing or waiting to be loaded; 0 is twice the workers
+    'sample_rows': 1000,         # Rows that column types are inferred from
+    'sample_bytes': 1024 * 1024,
+    'encoding': 'utf-8',
+    'transaction_rows': 500_000,  # Rows per committed transaction (one COPY each); 0 loads all in one
+    'max_rejects': 10_000,       # The import fails once more records than this are rejected
+    'progress_interval_ms': 200,
+}
+
+# Catalog cache for Tables & Schemas (one SQLite file per profile)
+CATALOG_CACHE = {
+    'directory': os.path.join(DATA_DIR, 'catalog'),
+    'column_batch': 1000,    # Changed relations whose columns are read per round trip
+    'page_size': 500,        # Relations inserted per tree expand
+    'search_limit': 200,
+    'search_delay_ms': 150,  # Debounce while typing in the search box
+}
+
+# Backups engine
+BACKUPS = {
+    'directory': os.path.join(DATA_DIR, 'backups'),
+    'codec': 'zstd',                     # Falls back to gzip when zstandard is not installed
+    'levels': {'zstd': 3, 'gzip': 6, 'none': 0},
+    'workers': 0,                        # Dump processes; 0 uses every core
+    'chunk_rows': 100_000,               # Target rows per chunk file
+    'batch_rows': 5000,                  # Rows per fetch inside a chunk
+    'spool_memory_mb': 32,               # Raw chunk data kept in memory before spilling to disk
+    'progress_interval_ms': 500,
+    'start_method': 'spawn',             # Worker processes never fork the Tk process
+    'restore_workers': 0,                # Concurrent restore steps; 0 uses every core
+    'restore_options': {
+        'postgres': {'maintenance_work_mem': '512MB'},  # Per-session memory for deferred index builds
+    },
+}
+
+# File Explorer directory listings
+FILE_EXPLORER = {
+    'start_path': '~',
+    'first_batch': 200,          # Small first batch so the first screen shows at once
+    'batch_entries': 5000,       # Entries per streamed batch afterwards
+    'batch_interval_ms': 50,     # Publish a partial batch after this long
+    'max_entries': 1_000_000,    # Listing stops here to bound memory
+    'cache_entries': 2_000_000,  # Entries kept across cached listings (LRU)
+    'stat_ttl_s': 5,             # Visible rows are re-stat'ed when older than this
+    'show_hidden': False,
+}
+
+# Search Files index (built once across a process pool, then kept current by watches)
+SEARCH_INDEX = {
+    'enabled': True,
+    'path': os.path.join(DATA_DIR, 'search', 'files.db'),
+    'roots': ['~'],
+    'exclude': ['.git', 'node_modules', '__pycache__', '.cache', '.venv', '.tox'],
+    'one_file_system': True,     # Do not descend into other mounts
+    'workers': 0,                # Build processes; 0 uses every core
+    'start_method': 'spawn',
+    'task_entries': 20_000,      # Entries a worker reads before handing leftover folders back
+    'content': True,             # Index distinct words of small text files
+    'content_extensions': ['txt', 'md', 'rst', 'sql', 'py', 'js', 'ts', 'json', 'yaml', 'yml', 'toml',
+                           'ini', 'cfg', 'conf', 'sh', 'csv', 'log', 'xml', 'html', 'css'],
+    'content_max_kb': 512,
+    'content_max_words': 4000,
+    'max_watches': 200_000,      # inotify watches to use at most; further folders are polled
+    'poll_interval_s': 30,
+    'poll_batch': 2000,          # Polled folders stat'ed per interval
+    'debounce_ms': 500,          # Changes are applied after this long without new events
+    'progress_interval_ms': 500,
+    'result_limit': 1000,
+    'search_delay_ms': 200,
+}
+
+# Cleanup Utilities disk usage analyzer
+DISK_USAGE = {
+    'start_path': '~',
+    'storage_path': '/',         # Filesystem shown on the Storage Used card
+    'exclude': [],
+    'one_file_system': True,
+    'workers': 0,                # Walk processes; 0 uses every core
+    'start_method': 'spawn',
+    'task_entries': 50_000,      # Entries a worker reads before handing leftover folders back
+    'progress_interval_ms': 250,
+    'cache_dir': os.path.join(DATA_DIR, 'cleanup', 'usage'),
+    'cache_trees': 4,            # Analyzed trees kept in memory for drill-down
+    'treemap_items': 60,         # Largest subfolders shown per level
+}
+
+# Cleanup Utilities duplicate finder (size → partial hash → full hash)
+DUPLICATE_FINDER = {
+    'start_path': '~',
+    'exclude': ['.git', 'node_modules', '__pycache__', '.cache', '.venv', '.tox'],
+    'one_file_system': True,
+    'min_size': 1,               # Smaller files are never reported; empty files are all alike
+    'partial_block_kb': 64,      # Read from each end of a file in the partial pass
+    'read_buffer_kb': 1024,      # Per-thread buffer of the full pass
+    'workers': 0,                # Hashing threads; 0 uses twice the cores, at most 8
+    'hash_cache': os.path.join(DATA_DIR, 'cleanup', 'hashes.db'),
+    'cache_days': 90,            # Cached hashes of files not seen for this long are dropped
+    'progress_interval_ms': 250,
+    'max_groups_shown': 2000,
+}
+
+# Organization Tools rules engine; targets are relative to the organized folder
+ORGANIZER = {
+    'root': '~/Downloads',
+    'recursive': False,
+    'exclude': ['.git', 'node_modules', '__pycache__'],
+    'journal_dir': os.path.join(DATA_DIR, 'organizer'),
+    'batch_size': 500,           # Renames per journal fsync
+    'copy_workers': 4,           # Threads for moves across devices and archives
+    'copy_buffer_kb': 1024,
+    'progress_interval_ms': 250,
+    'history': 20,               # Recent runs listed for undo/resume
+}
+
+# First matching rule wins. match keys: glob, regex, ext, min_size, max_size, older_than_days,
+# newer_than_days; targets may use {name} {stem} {ext} {year} {month} {day} {date} {rule}
+# and named regex groups
+ORGANIZATION_RULES = [
+    {
+        'name': 'Old logs',
+        'match': {'glob': '*.log', 'older_than_days': 30},
+        'action': 'archive',
+        'target': 'Archive/logs-{year}-{month}.zip',
+    },
+    {
+        'name': 'Images',
+        'match': {'ext': ['jpg', 'jpeg', 'png', 'gif', 'webp', 'heic']},
+        'action': 'move',
+        'target': 'Images/{year}',
+    },
+    {
+        'name': 'Documents',
+        'match': {'ext': ['pdf', 'docx', 'xlsx', 'pptx', 'odt', 'txt', 'md']},
+        'action': 'move',
+        'target': 'Documents',
+    },
+    {
+        'name': 'Database dumps',
+        'match': {'glob': ['*.sql', '*.dump', '*.backup']},
+        'action': 'move',
+        'target': 'Database Dumps/{year}-{month}',
+    },
+    {
+        'name': 'Large installers',
+        'match': {'ext': ['deb', 'rpm', 'appimage', 'dmg', 'exe', 'msi'], 'min_size': '50MB',
+                  'older_than_days': 14},
+        'action': 'archive',
+        'target': 'Archive/installers.zip',
+    },
+    {
+        'name': 'Screenshot names',
+        'match': {'regex': r'Screenshot[ _-](?P<when>\d{4}-\d{2}-\d{2})'},
+        'action': 'rename',
+        'target': 'screenshot-{when}.{ext}',
+        'enabled': False,
+    },
+]
+
+# Logs Viewer (memory-mapped files with sparse line/time indexes)
+LOGS_VIEWER = {
+    'paths': [
+        '/var/log/syslog',
+        '/var/log/messages',
+        '/var/log/dpkg.log',
+        os.path.join(DATA_DIR, 'logs', 'db_manager.log'),
+    ],
+    'rotated_segments': True,    # Also open app.log.1, app.log.2.gz, app.log-20240131.gz ...
+    'index_every': 256,          # Lines between index checkpoints
+    'index_chunk_mb': 16,        # Bytes scanned per indexing step
+    'gzip_checkpoint_mb': 4,     # Inflated bytes between seek points of .gz segments
+    'gzip_cache_chunks': 8,      # Inflated chunks kept for scrolling
+    'follow_interval_ms': 500,   # Tail poll while following
+    'max_line_chars': 4000,      # Longer lines are cut when shown
+    'progress_interval_ms': 250,
+}
+
+# Logs Viewer search across many files (byte ranges over a process pool)
+LOG_SEARCH = {
+    'scopes': [                  # Paths, folders or glob patterns offered as search scopes
+        '/var/log/*.log',
+        '/var/log/syslog',
+        os.path.join(DATA_DIR, 'logs', '*.log'),
+    ],
+    'rotated_segments': True,    # Also search app.log.1, app.log.2.gz, ...
+    'workers': 0,                # Search processes; 0 uses every core
+    'start_method': 'spawn',
+    'task_mb': 32,               # Bytes of a plain file per task; .gz files are one task each
+    'max_results': 10_000,       # The search stops after this many hits
+    'max_line_chars': 1000,
+    'progress_interval_ms': 200,
+}
+
+# Service Manager polling and actions
+SERVICE_MANAGER = {
+    'enabled': True,
+    'tick_ms': 250,              # How often due services are collected and changes published
+    'min_interval_s': 2.0,       # Check interval after a change and while flapping
+    'max_interval_s': 60.0,      # Stable services stretch up to this (per service: 'max_interval_s')
+    'backoff': 1.5,              # Interval growth per unchanged check
+    'flap_window_s': 300,
+    'flap_changes': 3,           # State changes within the window that count as flapping
+    'max_concurrency': 64,       # Probes and batch checks in flight at once
+    'probe_timeout_s': 2.0,
+    'action_timeout_s': 60,
+    'stop_timeout_s': 10,        # SIGTERM grace period before SIGKILL (process services)
+    'process_cache_ms': 500,     # One process table snapshot serves the checks in this window
+}
+
+# Managed services. kind: process (process / cmdline), tcp (host, port), http (url, expect_status),
+# systemd (unit, user); optional start / stop / restart commands as argument lists
+SERVICES = [
+    {'name': 'PostgreSQL', 'kind': 'tcp', 'host': '127.0.0.1', 'port': 5432},
+    {'name': 'PostgreSQL unit', 'kind': 'systemd', 'unit': 'postgresql.service'},
+    {'name': 'MySQL', 'kind': 'tcp', 'host': '127.0.0.1', 'port': 3306},
+    {'name': 'Redis', 'kind': 'tcp', 'host': '127.0.0.1', 'port': 6379},
+    {'name': 'SSH', 'kind': 'systemd', 'unit': 'ssh.service'},
+    {'name': 'Docker', 'kind': 'systemd', 'unit': 'docker.service'},
+    {'name': 'Cron', 'kind': 'process', 'process': 'cron'},
+    {'name': 'Nginx', 'kind': 'http', 'url': 'http://127.0.0.1/'},
+    {'name': 'pgAdmin', 'kind': 'http', 'url': 'http://127.0.0.1:5050/misc/ping'},
+    {'name': 'Backup agent', 'kind': 'process', 'cmdline': r'db_manager.*backup'},
+]
+
 # Quick actions
 QUICK_ACTIONS = [
     {'label': 'New Database Connection', 'style': 'primary', 'icon': 'connect'},
@@ -96,21 +415,131 @@ QUICK_ACTIONS = [
     {'label': 'System Scan', 'style': 'danger', 'icon': 'scan'},
 ]
 
-# Recent activities (sample data)
+# Recent activities (sample data, seeded into the activity store at startup)
 RECENT_ACTIVITIES = [
-    {'text': 'Database backup completed', 'time': '2 minutes ago', 'status': 'success'},
-    {'text': 'New connection established', 'time': '15 minutes ago', 'status': 'info'},
-    {'text': 'Service \'Redis\' restarted', 'time': '1 hour ago', 'status': 'warning'},
-    {'text': 'File cleanup performed', 'time': '3 hours ago', 'status': 'primary'},
-    {'text': 'System health check passed', 'time': '5 hours ago', 'status': 'success'},
+    {'text': 'Database backup completed', 'seconds_ago': 120, 'status': 'success'},
+    {'text': 'New connection established', 'seconds_ago': 900, 'status': 'info'},
+    {'text': 'Service \'Redis\' restarted', 'seconds_ago': 3600, 'status': 'warning'},
+    {'text': 'File cleanup performed', 'seconds_ago': 10800, 'status': 'primary'},
+    {'text': 'System health check passed', 'seconds_ago': 18000, 'status': 'success'},
 ]
 
-# System metrics (sample data)
+# Activity feed settings
+ACTIVITY_FEED = {
+    'recent_count': 5,     # Rows shown in the dashboard panel
+    'row_height': 52,      # Pixel height of one virtualized feed row
+    'window_size': '640x720',
+}
+
+# System metrics (initial values until the first live sample arrives)
 SYSTEM_METRICS = [
-    {'label': 'CPU Usage', 'value': '42%', 'percent': 42, 'style': 'info'},
-    {'label': 'Memory Usage', 'value': '67%', 'percent': 67, 'style': 'warning'},
-    {'label': 'Disk Usage', 'value': '34%', 'percent': 34, 'style': 'success'},
-    {'label': 'Network I/O', 'value': '23%', 'percent': 23, 'style': 'primary'},
+    {'key': 'cpu', 'label': 'CPU Usage', 'value': '42%', 'percent': 42, 'style': 'info'},
+    {'key': 'memory', 'label': 'Memory Usage', 'value': '67%', 'percent': 67, 'style': 'warning'},
+    {'key': 'disk', 'label': 'Disk Usage', 'value': '34%', 'percent': 34, 'style': 'success'},
+    {'key': 'network', 'label': 'Network I/O', 'value': '23%', 'percent': 23, 'style': 'primary'},
+]
+
+# Live metrics sampler settings
+METRICS_SAMPLER = {
+    'enabled': True,
+    'interval_ms': 1000,            # Sampling period of the /proc reader thread
+    'history': 300,                 # Samples kept in the ring buffer
+    'network_capacity_mbps': 1000,  # Link speed used to scale the Network I/O bar
+}
+
+# Time-series store for Monitoring (memory-mapped, survives restarts)
+TIMESERIES = {
+    'path': os.path.join(DATA_DIR, 'metrics', 'timeseries.dat'),
+    'tiers': [                   # (bucket seconds, buckets kept); later tiers keep min/max/avg
+        (1, 900),                # Raw samples for 15 minutes
+        (60, 1440),              # Minutes for a day
+        (3600, 720),             # Hours for 30 days
+    ],
+    'initial_series': 256,       # Columns of a new file; doubled as series are added
+    'max_series': 10_000,        # About 30 KB per series with the tiers above
+    'flush_interval_s': 60,      # Dirty pages written back at least this often
+}
+
+# Monitoring and Analytics charts
+MONITORING = {
+    'ranges': {                  # Range buttons: label -> seconds
+        '15m': 15 * 60,
+        '1h': 3600,
+        '24h': 86400,
+        '7d': 7 * 86400,
+        '30d': 30 * 86400,
+    },
+    'default_range': '15m',
+    'analytics_range': '24h',
+    'max_points': 2000,          # Buckets loaded from the store per chart
+    'chart_height': 160,
+    'max_gap_s': 5,              # Live samples further apart are drawn as a gap
+}
+
+# Alerts engine
+ALERTS = {
+    'enabled': True,
+    'tick_s': 1.0,               # Clock for absent() rules and grouped notifications
+    'group_wait_s': 10,          # Changes of one rule group within this window are announced together
+    'dedup_s': 600,              # A rule firing again this soon after resolving is counted, not announced
+    'history': 100,              # Resolved alerts kept for the Alerts view
+}
+
+# Alert rules. 'when' and 'clear' are expressions over metrics: system.cpu, system.memory,
+# system.disk, system.disk_bps, system.network_bps, service.<name>.up (1/0), numbers,
+# + - * / %, comparisons, and/or/not, avg/min/max/sum/count/rate/delta(metric, 5m) and
+# absent(metric, 30s). 'clear' (default: 'when' turns false) gives hysteresis; 'for' and
+# 'clear_for' are how long each must hold.
+ALERT_RULES = [
+    {
+        'name': 'High CPU',
+        'when': 'avg(system.cpu, 1m) > 90',
+        'clear': 'avg(system.cpu, 1m) < 75',
+        'for': '2m',
+        'severity': 'warning',
+        'group': 'system',
+    },
+    {
+        'name': 'Memory pressure',
+        'when': 'system.memory > 90 and rate(system.memory, 5m) > 0',
+        'clear': 'system.memory < 85',
+        'for': '1m',
+        'severity': 'warning',
+        'group': 'system',
+    },
+    {
+        'name': 'Disk saturated',
+        'when': 'avg(system.disk, 5m) > 80',
+        'clear': 'avg(system.disk, 5m) < 60',
+        'severity': 'warning',
+        'group': 'system',
+    },
+    {
+        'name': 'System overloaded',
+        'when': 'min(system.cpu, 1m) > 85 and system.memory > 85',
+        'clear_for': '1m',
+        'severity': 'critical',
+        'group': 'system',
+    },
+    {
+        'name': 'Network burst',
+        'when': 'avg(system.network_bps, 1m) > 100e6',
+        'severity': 'info',
+        'group': 'system',
+    },
+    {
+        'name': 'Metrics stalled',
+        'when': 'absent(system.cpu, 30s)',
+        'severity': 'critical',
+        'group': 'system',
+    },
+    {
+        'name': 'PostgreSQL down',
+        'when': 'service.postgresql.up == 0',
+        'for': '30s',
+        'severity': 'critical',
+        'group': 'services',
+    },
 ]
 
 # User information
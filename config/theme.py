@@ -117,6 +117,7 @@ ICONS = {
     'error': '❌',
     'info_icon': 'ℹ️',
     'lightning': '⚡',
+    'import': '📥',
 }
 
 # Style configurations for widgets - Flat design principles
@@ -0,0 +1,97 @@
+"""
+Activity Store
+Append-only, array-backed store of activity events with compact per-event records
+"""
+
+import threading
+import time
+from array import array
+
+
+# Status names are stored as one byte per event
+STATUSES = ('success', 'info', 'warning', 'danger', 'primary', 'secondary')
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+
+
+class ActivityRecord:
+    """A single activity event materialized from the store"""
+
+    __slots__ = ('index', 'text', 'status', 'timestamp')
+
+    def __init__(self, index, text, status, timestamp):
+        self.index = index
+        self.text = text
+        self.status = status
+        self.timestamp = timestamp
+
+
+class ActivityStore:
+    """Append-only event store: one text blob plus parallel typed arrays
+
+    Each event costs its UTF-8 text plus 17 bytes (offset, timestamp, status),
+    so a million events fit in a few tens of megabytes and no per-event Python
+    objects are kept alive.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.blob = bytearray()
+        self.offsets = array('Q', [0])
+        self.timestamps = array('d')
+        self.statuses = array('B')
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, text, status='info', timestamp=None):
+        """Append an event (safe to call from any thread)"""
+        encoded = text.encode('utf-8')
+        code = STATUS_CODES.get(status, STATUS_CODES['info'])
+        with self.lock:
+            self.blob += encoded
+            self.offsets.append(len(self.blob))
+            self.statuses.append(code)
+            # Timestamps are published last; len() only counts complete events
+            self.timestamps.append(time.time() if timestamp is None else timestamp)
+
+    def extend(self, events):
+        """Append many (text, status, timestamp) events at once"""
+        for text, status, timestamp in events:
+            self.append(text, status, timestamp)
+
+    def __getitem__(self, index):
+        """Materialize a single event record"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("activity index out of range")
+        text = self.blob[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+        return ActivityRecord(index, text, STATUSES[self.statuses[index]], self.timestamps[index])
+
+    def newest_first(self):
+        """Return a read-only view that indexes from the newest event"""
+        return NewestFirstView(self)
+
+    def memory_bytes(self):
+        """Approximate bytes held by the store's buffers"""
+        return (
+            len(self.blob)
+            + self.offsets.itemsize * len(self.offsets)
+            + self.timestamps.itemsize * len(self.timestamps)
+            + self.statuses.itemsize * len(self.statuses)
+        )
+
+
+class NewestFirstView:
+    """Reversed view of an ActivityStore (index 0 is the newest event)"""
+
+    __slots__ = ('store',)
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, index):
+        return self.store[len(self.store) - 1 - index]
@@ -0,0 +1,297 @@
+"""
+Alerts Engine
+Incremental evaluation of compiled alert rules over the metrics stream, with hysteresis, dedup and grouping
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from core.alerts.rules import Metrics, Rule
+
+
+STATE_ORDER = {'firing': 0, 'resolving': 1, 'pending': 2, 'resolved': 3, 'ok': 4}
+
+
+class AlertState:
+    """Lifecycle of one rule: ok -> pending -> firing -> resolving -> ok
+
+    pending waits out the rule's for_s and resolving its clear_for_s, so a
+    value bouncing around a threshold does not fire and resolve over and
+    over. fired counts firings within the dedup window; only the first one
+    notifies.
+    """
+
+    __slots__ = ('rule', 'state', 'since', 'fired_at', 'resolved_at', 'fired', 'detail')
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.state = 'ok'
+        self.since = None
+        self.fired_at = None
+        self.resolved_at = None
+        self.fired = 0
+        self.detail = ''
+
+    def snapshot(self):
+        rule = self.rule
+        return {
+            'name': rule.name,
+            'when': rule.text,
+            'severity': rule.severity,
+            'group': rule.group,
+            'state': self.state if self.state != 'ok' else 'resolved',
+            'since': self.since,
+            'fired_at': self.fired_at,
+            'resolved_at': self.resolved_at,
+            'fired': self.fired,
+            'detail': self.detail,
+        }
+
+
+class AlertEngine:
+    """Evaluates alert rules as metric samples arrive
+
+    Rules are compiled once. observe() updates the latest values and the
+    shared windows of the metrics in a sample, then evaluates only the
+    rules that read those metrics, plus the absent() rules, which depend
+    on the clock. Nothing is ever re-read from history, so the cost of a
+    sample follows the rules it touches.
+
+    Notifications go to on_event(text, status) grouped: the state changes
+    of one rule group within group_wait_s become a single message, and a
+    rule that fires again within dedup_s of its last resolution is counted
+    rather than announced again. A clock thread (start()) observes an
+    empty sample every tick_s, so absent() rules fire and grouped messages
+    go out even when no samples arrive; a metric not seen yet counts as
+    seen at start(), so absent() waits out its duration before firing.
+
+    Listeners get callback(snapshot) on the observing thread whenever an
+    alert changes state.
+    """
+
+    def __init__(self, specs, settings, on_event=None):
+        self.settings = settings
+        self.on_event = on_event
+        self.metrics = Metrics()
+        self.rules = []
+        self.errors = []
+        for spec in specs:
+            if not spec.get('enabled', True):
+                continue
+            try:
+                self.rules.append(Rule(len(self.rules), spec, self.metrics))
+            except ValueError as error:
+                self.errors.append(str(error))
+        self.states = [AlertState(rule) for rule in self.rules]
+        for rule in self.rules:
+            for metric in rule.metrics:
+                self.metrics.rules[metric].append(self.states[rule.index])
+        self.clock_states = [self.states[rule.index] for rule in self.rules if rule.clock]
+        self.active = {}
+        self.recent = deque(maxlen=settings['history'])
+        self.pending_events = {}
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.changed = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        # Counters
+        self.samples = 0
+        self.evaluations = 0
+        self.eval_seconds = 0.0
+
+    def add_listener(self, callback):
+        """Add a callback invoked as callback(snapshot) on the observing thread"""
+        self.listeners.append(callback)
+
+    def start(self):
+        """Start the clock thread that runs absent() rules and sends grouped notifications"""
+        if self.thread is not None:
+            return
+        now = time.time()
+        with self.lock:
+            seen = self.metrics.seen
+            for index, when in enumerate(seen):
+                if when is None:
+                    seen[index] = now
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name='alerts-clock', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.settings['tick_s'] * 2)
+            self.thread = None
+
+    def run(self):
+        # Between samples nothing else moves the clock, so a stopped feed still trips absent()
+        while not self.stop_event.wait(self.settings['tick_s']):
+            self.observe({})
+
+    def observe(self, values, when=None):
+        """Feed a {metric: value} sample and evaluate the rules it affects"""
+        when = time.time() if when is None else when
+        started = time.perf_counter()
+        metrics = self.metrics
+        with self.lock:
+            due = {}
+            for name, value in values.items():
+                index = metrics.ids.get(name)
+                if index is None or value is None or value != value:
+                    continue
+                metrics.values[index] = value
+                metrics.seen[index] = when
+                for window in metrics.windows[index]:
+                    window.push(when, value)
+                for state in metrics.rules[index]:
+                    due[state.rule.index] = state
+            for state in self.clock_states:
+                due[state.rule.index] = state
+            # Waiting out for_s or clear_for_s needs no new sample
+            for state in self.active.values():
+                if state.state != 'firing':
+                    due[state.rule.index] = state
+            for state in due.values():
+                self.step(state, when)
+            self.evaluations += len(due)
+            self.samples += 1
+            self.flush_events(when)
+            changed, self.changed = self.changed, False
+            self.eval_seconds += time.perf_counter() - started
+        if changed:
+            self.publish()
+
+    def evaluate(self, function, now):
+        try:
+            return bool(function(now))
+        except (ArithmeticError, TypeError):
+            return False
+
+    def step(self, alert, now):
+        """Advance one rule's state machine"""
+        rule = alert.rule
+        state = alert.state
+        if state == 'ok' or state == 'pending':
+            if not self.evaluate(rule.when, now):
+                if state == 'pending':
+                    alert.state = 'ok'
+                    self.changed = True
+                    self.active.pop(rule.index, None)
+                return
+            if state == 'ok':
+                alert.state = 'pending'
+                alert.since = now
+                self.active[rule.index] = alert
+                self.changed = True
+            if now - alert.since >= rule.for_s:
+                self.fire(alert, now)
+            return
+
+        if rule.clear is not None:
+            cleared = self.evaluate(rule.clear, now)
+        else:
+            cleared = not self.evaluate(rule.when, now)
+        if not cleared:
+            if state == 'resolving':
+                alert.state = 'firing'
+                self.changed = True
+            return
+        if state == 'firing':
+            alert.state = 'resolving'
+            alert.since = now
+            self.changed = True
+        if now - alert.since >= rule.clear_for_s:
+            self.resolve(alert, now)
+
+    def describe(self, rule):
+        """Current values of the metrics a rule reads"""
+        names, values = self.metrics.names, self.metrics.values
+        return ', '.join(f"{names[index]}={values[index]:.4g}" for index in rule.metrics
+                         if not math.isnan(values[index]))
+
+    def fire(self, alert, now):
+        repeat = alert.resolved_at is not None and now - alert.resolved_at < self.settings['dedup_s']
+        alert.fired = alert.fired + 1 if repeat else 1
+        alert.state = 'firing'
+        alert.since = now
+        alert.fired_at = now
+        alert.detail = self.describe(alert.rule)
+        self.active[alert.rule.index] = alert
+        self.changed = True
+        if not repeat:
+            self.queue_event(alert, 'firing', now)
+
+    def resolve(self, alert, now):
+        alert.state = 'ok'
+        alert.since = now
+        alert.resolved_at = now
+        self.active.pop(alert.rule.index, None)
+        # One entry per rule: a repeat replaces the older one
+        for entry in [entry for entry in self.recent if entry['name'] == alert.rule.name]:
+            self.recent.remove(entry)
+        self.recent.appendleft(alert.snapshot())
+        self.changed = True
+        if alert.fired == 1:
+            self.queue_event(alert, 'resolved', now)
+
+    # Notifications
+
+    def queue_event(self, alert, kind, now):
+        key = (alert.rule.group, kind)
+        if key not in self.pending_events:
+            self.pending_events[key] = (now, [])
+        self.pending_events[key][1].append(alert)
+
+    def flush_events(self, now):
+        """Announce the changes of each group once they are group_wait_s old"""
+        wait = self.settings['group_wait_s']
+        for key in [key for key, (first, _) in self.pending_events.items() if now - first >= wait]:
+            group, kind = key
+            alerts = self.pending_events.pop(key)[1]
+            if self.on_event is None:
+                continue
+            if kind == 'firing':
+                status = 'danger' if any(alert.rule.severity == 'critical' for alert in alerts) else 'warning'
+            else:
+                status = 'success'
+            if len(alerts) == 1:
+                alert = alerts[0]
+                detail = f" ({alert.detail})" if kind == 'firing' and alert.detail else ''
+                text = f"Alert {kind}: {alert.rule.name}{detail}"
+            else:
+                names = ', '.join(alert.rule.name for alert in alerts[:3])
+                more = f" and {len(alerts) - 3} more" if len(alerts) > 3 else ''
+                text = f"{len(alerts)} {group} alerts {kind}: {names}{more}"
+            self.on_event(text, status)
+
+    # Snapshots
+
+    def totals(self):
+        counts = {'rules': len(self.rules), 'firing': 0, 'pending': 0, 'critical': 0}
+        for alert in self.active.values():
+            if alert.state in ('firing', 'resolving'):
+                counts['firing'] += 1
+                counts['critical'] += alert.rule.severity == 'critical'
+            else:
+                counts['pending'] += 1
+        return counts
+
+    def snapshot(self):
+        """Active alerts first by state, then recently resolved ones, plus totals"""
+        with self.lock:
+            active = sorted((alert.snapshot() for alert in self.active.values()),
+                            key=lambda alert: (STATE_ORDER[alert['state']], -(alert['since'] or 0)))
+            return {
+                'alerts': active + list(self.recent),
+                'totals': self.totals(),
+                'evaluations': self.evaluations,
+                'eval_ms': 1000 * self.eval_seconds / self.samples if self.samples else 0.0,
+            }
+
+    def publish(self):
+        snapshot = self.snapshot()
+        for callback in self.listeners:
+            callback(snapshot)
@@ -0,0 +1,297 @@
+"""
+Alert Rules
+Rule expressions parsed once into Python functions over shared metric windows
+"""
+
+import ast
+import math
+import re
+from collections import deque
+
+
+class RuleError(ValueError):
+    """Raised when a rule cannot be compiled"""
+
+
+DURATION = re.compile(r'(?<![\w.])(\d+(?:\.\d+)?)(ms|s|m|h|d)\b')
+UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Window aggregates: name(metric, window)
+AGGREGATES = ('avg', 'min', 'max', 'sum', 'count', 'rate', 'delta')
+
+COMPARISONS = (ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq)
+OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod)
+
+
+def parse_duration(value):
+    """Seconds of a duration such as 90, '90s', '5m' or '1.5h'"""
+    if value is None or isinstance(value, (int, float)):
+        return value or 0
+    match = DURATION.fullmatch(str(value).strip())
+    if match is None:
+        raise RuleError(f"bad duration {value!r}")
+    return float(match.group(1)) * UNITS[match.group(2)]
+
+
+def metric_name(text):
+    """A name usable in rule expressions, e.g. 'Backup agent' -> 'backup_agent'"""
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+class Window:
+    """Samples of one metric over the last seconds with O(1) aggregates
+
+    The running sum gives avg/sum/count; monotonic deques give min and max;
+    the oldest and newest samples give delta and rate. Each push evicts
+    what fell out of the window, so nothing is ever rescanned.
+    """
+
+    __slots__ = ('seconds', 'times', 'values', 'total', 'mins', 'maxs', 'pushes')
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.times = deque()
+        self.values = deque()
+        self.total = 0.0
+        self.mins = deque()
+        self.maxs = deque()
+        self.pushes = 0
+
+    def push(self, when, value):
+        self.times.append(when)
+        self.values.append(value)
+        self.total += value
+        while self.mins and self.mins[-1][1] >= value:
+            self.mins.pop()
+        self.mins.append((when, value))
+        while self.maxs and self.maxs[-1][1] <= value:
+            self.maxs.pop()
+        self.maxs.append((when, value))
+
+        cutoff = when - self.seconds
+        times = self.times
+        while times[0] < cutoff:
+            times.popleft()
+            self.total -= self.values.popleft()
+        while self.mins[0][0] < cutoff:
+            self.mins.popleft()
+        while self.maxs[0][0] < cutoff:
+            self.maxs.popleft()
+
+        self.pushes += 1
+        if self.pushes % 4096 == 0:
+            # Keep subtraction error from building up
+            self.total = math.fsum(self.values)
+
+    def avg(self):
+        return self.total / len(self.values) if self.values else math.nan
+
+    def sum(self):
+        return self.total
+
+    def count(self):
+        return len(self.values)
+
+    def min(self):
+        return self.mins[0][1] if self.mins else math.nan
+
+    def max(self):
+        return self.maxs[0][1] if self.maxs else math.nan
+
+    def delta(self):
+        return self.values[-1] - self.values[0] if self.values else math.nan
+
+    def rate(self):
+        """Change per second between the oldest and newest sample"""
+        if len(self.values) < 2 or self.times[-1] <= self.times[0]:
+            return math.nan
+        return (self.values[-1] - self.values[0]) / (self.times[-1] - self.times[0])
+
+
+class Metrics:
+    """Latest value, last-seen time and windows of every metric the rules use
+
+    Rules refer to metrics by index into values/seen, and to aggregates by
+    index into the bound methods of shared windows, so rules that ask for
+    the same window of the same metric share one.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+        self.values = []
+        self.seen = []
+        self.windows = []       # Per metric: list of its windows
+        self.window_ids = {}
+        self.aggregates = []    # Bound window methods, called by compiled rules
+        self.aggregate_ids = {}
+        self.rules = []         # Per metric: rules to evaluate when it changes
+
+    def metric(self, name):
+        index = self.ids.get(name)
+        if index is None:
+            index = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.values.append(math.nan)
+            self.seen.append(None)
+            self.windows.append([])
+            self.rules.append([])
+        return index
+
+    def aggregate(self, name, kind, seconds):
+        key = (name, kind, seconds)
+        index = self.aggregate_ids.get(key)
+        if index is None:
+            metric = self.metric(name)
+            window = self.window_ids.get((name, seconds))
+            if window is None:
+                window = self.window_ids[name, seconds] = Window(seconds)
+                self.windows[metric].append(window)
+            index = self.aggregate_ids[key] = len(self.aggregates)
+            self.aggregates.append(getattr(window, kind))
+        return index
+
+
+class Compiler:
+    """Checks an expression tree and rewrites it to read metrics and windows by index
+
+    Metric names are dotted identifiers (system.cpu) or metric('any name').
+    Allowed: numbers, + - * / %, comparisons, and/or/not, abs(), the window
+    aggregates avg/min/max/sum/count/rate/delta(metric, window) and
+    absent(metric, duration), which is true when the metric has not been
+    seen for that long.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.used = set()
+        self.clock = False
+
+    def compile(self, text):
+        source = DURATION.sub(lambda match: repr(float(match.group(1)) * UNITS[match.group(2)]), text)
+        try:
+            tree = ast.parse(source.strip(), mode='eval')
+        except SyntaxError as error:
+            raise RuleError(f"syntax error in {text!r}: {error.msg}")
+        body = self.rewrite(tree.body)
+        function = ast.Expression(ast.Lambda(
+            args=ast.arguments(posonlyargs=[], args=[ast.arg('now')], kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=body
+        ))
+        ast.fix_missing_locations(function)
+        namespace = {
+            '__builtins__': {},
+            'V': self.metrics.values,
+            'S': self.metrics.seen,
+            'A': self.metrics.aggregates,
+            'abs': abs,
+            'seen_within': seen_within,
+        }
+        return eval(compile(function, '<rule>', 'eval'), namespace)
+
+    def name_of(self, node):
+        """Metric name of a dotted name or metric('...') node, else None"""
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if isinstance(node, ast.Name):
+            parts.append(node.id)
+            return '.'.join(reversed(parts))
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'metric'
+                and len(node.args) == 1 and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)):
+            return node.args[0].value
+        return None
+
+    def index(self, table, position):
+        return ast.Subscript(value=ast.Name(table, ast.Load()), slice=ast.Constant(position), ctx=ast.Load())
+
+    def rewrite(self, node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return node
+        if isinstance(node, ast.BoolOp):
+            return ast.BoolOp(op=node.op, values=[self.rewrite(value) for value in node.values])
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub, ast.UAdd)):
+            return ast.UnaryOp(op=node.op, operand=self.rewrite(node.operand))
+        if isinstance(node, ast.BinOp) and isinstance(node.op, OPERATORS):
+            return ast.BinOp(left=self.rewrite(node.left), op=node.op, right=self.rewrite(node.right))
+        if isinstance(node, ast.Compare) and all(isinstance(op, COMPARISONS) for op in node.ops):
+            return ast.Compare(left=self.rewrite(node.left), ops=node.ops,
+                               comparators=[self.rewrite(value) for value in node.comparators])
+
+        name = self.name_of(node)
+        if name is not None:
+            index = self.metrics.metric(name)
+            self.used.add(index)
+            return self.index('V', index)
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            function = node.func.id
+            if function == 'abs' and len(node.args) == 1:
+                return ast.Call(func=node.func, args=[self.rewrite(node.args[0])], keywords=[])
+            if function in AGGREGATES + ('absent',):
+                if len(node.args) != 2:
+                    raise RuleError(f"{function}() takes a metric and a window, e.g. {function}(system.cpu, 5m)")
+                name = self.name_of(node.args[0])
+                window = node.args[1]
+                if name is None:
+                    raise RuleError(f"the first argument of {function}() must be a metric")
+                if not (isinstance(window, ast.Constant) and isinstance(window.value, (int, float))
+                        and window.value > 0):
+                    raise RuleError(f"the window of {function}() must be a duration such as 30s or 5m")
+                if function == 'absent':
+                    index = self.metrics.metric(name)
+                    self.clock = True
+                    return ast.UnaryOp(op=ast.Not(), operand=ast.Call(
+                        func=ast.Name('seen_within', ast.Load()),
+                        args=[self.index('S', index), ast.Name('now', ast.Load()), ast.Constant(float(window.value))],
+                        keywords=[]
+                    ))
+                index = self.metrics.aggregate(name, function, float(window.value))
+                self.used.add(self.metrics.metric(name))
+                return ast.Call(func=self.index('A', index), args=[], keywords=[])
+            raise RuleError(f"unknown function {function}()")
+        raise RuleError(f"unsupported expression: {ast.unparse(node)}")
+
+
+def seen_within(seen, now, seconds):
+    return seen is not None and now - seen <= seconds
+
+
+class Rule:
+    """One compiled alert rule
+
+    when is the firing condition; clear, when given, is the condition that
+    resolves a firing alert (a lower threshold gives hysteresis), otherwise
+    it resolves once when turns false. The condition must hold for for_s
+    before firing and the clear condition for clear_for_s before resolving.
+    """
+
+    __slots__ = ('index', 'name', 'text', 'clear_text', 'when', 'clear', 'for_s', 'clear_for_s',
+                 'severity', 'group', 'metrics', 'clock')
+
+    SEVERITIES = ('info', 'warning', 'critical')
+
+    def __init__(self, index, spec, metrics):
+        self.index = index
+        self.name = spec.get('name') or f"Rule {index + 1}"
+        self.text = spec.get('when')
+        if not self.text:
+            raise RuleError(f"{self.name}: a 'when' expression is required")
+        self.clear_text = spec.get('clear')
+        self.severity = spec.get('severity', 'warning')
+        if self.severity not in self.SEVERITIES:
+            raise RuleError(f"{self.name}: severity must be one of {', '.join(self.SEVERITIES)}")
+        self.group = spec.get('group', 'default')
+
+        compiler = Compiler(metrics)
+        try:
+            self.when = compiler.compile(self.text)
+            self.clear = compiler.compile(self.clear_text) if self.clear_text else None
+            self.for_s = parse_duration(spec.get('for'))
+            self.clear_for_s = parse_duration(spec.get('clear_for'))
+        except RuleError as error:
+            raise RuleError(f"{self.name}: {error}")
+        self.metrics = tuple(sorted(compiler.used))
+        self.clock = compiler.clock
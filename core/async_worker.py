@@ -0,0 +1,67 @@
+"""
+Async Worker
+An asyncio event loop running on a dedicated thread, bridged to synchronous callers
+"""
+
+import asyncio
+import threading
+
+
+class AsyncWorker:
+    """Runs an asyncio loop on a daemon thread and accepts work from any thread"""
+
+    def __init__(self, name='async-worker'):
+        self.name = name
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+
+    @property
+    def running(self):
+        """Whether the loop thread is alive"""
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """Start the loop thread and wait until the loop is running"""
+        if self.running:
+            return
+        self.ready.clear()
+        self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+
+    def run(self):
+        """Thread body: own the event loop until stop() is called"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self.ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+
+    def submit(self, coro):
+        """Schedule a coroutine and return a concurrent.futures.Future"""
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Run a plain callback on the loop thread"""
+        if not self.running:
+            self.start()
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self, timeout=5):
+        """Stop the loop and wait for the thread to exit"""
+        if not self.running:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=timeout)
+        self.thread = None
@@ -0,0 +1,228 @@
+"""
+Backup Archive
+Compression codecs, the content-addressed chunk store and backup manifests
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+
+
+READ_SIZE = 1024 * 1024
+FRAME_HEADER = struct.Struct('>I')
+
+CODEC_EXTENSIONS = {'zstd': '.zst', 'gzip': '.gz', 'none': '.raw'}
+
+
+def load_zstd():
+    """Import the zstd binding on first use"""
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd compression requires the 'zstandard' package to be installed") from None
+    return zstandard
+
+
+def available_codecs():
+    """Codecs usable in this environment, preferred first"""
+    codecs = ['gzip', 'none']
+    try:
+        load_zstd()
+        codecs.insert(0, 'zstd')
+    except RuntimeError:
+        pass
+    return codecs
+
+
+def compress_file(source, target, codec, level):
+    """Stream-compress an open binary file into another"""
+    if codec == 'zstd':
+        compressor = load_zstd().ZstdCompressor(level=level, threads=0)
+        compressor.copy_stream(source, target, read_size=READ_SIZE)
+    elif codec == 'gzip':
+        with gzip.GzipFile(fileobj=target, mode='wb', compresslevel=level, mtime=0) as stream:
+            shutil.copyfileobj(source, stream, READ_SIZE)
+    elif codec == 'none':
+        shutil.copyfileobj(source, target, READ_SIZE)
+    else:
+        raise ValueError(f"Unknown compression codec '{codec}'")
+
+
+def open_chunk(path, codec):
+    """Open a chunk file for streaming decompressed reads"""
+    raw = open(path, 'rb')
+    if codec == 'zstd':
+        return load_zstd().ZstdDecompressor().stream_reader(raw, read_size=READ_SIZE, closefd=True)
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if codec == 'none':
+        return raw
+    raw.close()
+    raise ValueError(f"Unknown compression codec '{codec}'")
+
+
+def file_checksum(path):
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_frame(handle, payload):
+    """Write one length-prefixed frame"""
+    handle.write(FRAME_HEADER.pack(len(payload)))
+    handle.write(payload)
+
+
+def read_frames(handle):
+    """Yield length-prefixed frames until end of stream"""
+    while True:
+        header = handle.read(FRAME_HEADER.size)
+        if not header:
+            return
+        if len(header) < FRAME_HEADER.size:
+            raise ValueError("Truncated chunk frame header")
+        (size,) = FRAME_HEADER.unpack(header)
+        payload = handle.read(size)
+        while len(payload) < size:
+            more = handle.read(size - len(payload))
+            if not more:
+                raise ValueError("Truncated chunk frame")
+            payload += more
+        yield payload
+
+
+class Spool:
+    """Raw chunk data spooled to memory/disk while its content hash is computed
+
+    Hashing before compressing lets an unchanged chunk be recognized (and its
+    compression skipped) once the data has been read.
+    """
+
+    def __init__(self, max_memory):
+        self.file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.digest.update(data)
+        self.size += len(data)
+        self.file.write(data)
+
+    def hexdigest(self):
+        return self.digest.hexdigest()
+
+    def close(self):
+        self.file.close()
+
+
+class ChunkStore:
+    """Chunk files named by the sha256 of their uncompressed content
+
+    Chunks are shared by every backup under the same root, so a backup only
+    writes chunks whose content is not already stored: unchanged tables cost
+    a read and a hash, not disk space.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.join(os.path.expanduser(root), 'chunks')
+
+    def path(self, content, codec):
+        return os.path.join(self.root, content[:2], content + CODEC_EXTENSIONS[codec])
+
+    def find(self, content):
+        """(path, codec) of a stored chunk with this content, or None"""
+        for codec in CODEC_EXTENSIONS:
+            path = self.path(content, codec)
+            if os.path.exists(path):
+                return path, codec
+        return None
+
+    def store(self, spool, codec, level):
+        """Compress a spool into the store; returns (path, codec, reused)"""
+        content = spool.hexdigest()
+        existing = self.find(content)
+        if existing is not None:
+            return existing[0], existing[1], True
+
+        path = self.path(content, codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write under a temporary name so a crash never leaves a partial chunk behind
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as target:
+                spool.file.seek(0)
+                compress_file(spool.file, target, codec, level)
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return path, codec, False
+
+
+class Manifest:
+    """JSON description of one backup run, rewritten atomically as chunks complete
+
+    The manifest records the schema, the chunk plan of every table and each
+    finished chunk with its content hash and file checksum; a run that stops
+    part way resumes from the chunks already recorded.
+    """
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as handle:
+            return cls(path, json.load(handle))
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w', encoding='utf-8') as target:
+            json.dump(self.data, target, separators=(',', ':'))
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(temp_path, self.path)
+
+    @property
+    def tables(self):
+        return self.data['tables']
+
+    def chunk_key(self, table, index):
+        return f"{table}#{index}"
+
+    def completed(self):
+        """Chunk records keyed by table#index"""
+        return self.data.setdefault('chunks', {})
+
+    def record(self, table, index, record):
+        self.completed()[self.chunk_key(table, index)] = record
+
+
+def list_backups(root):
+    """Manifests under a backup root, newest first"""
+    runs = os.path.join(os.path.expanduser(root), 'runs')
+    if not os.path.isdir(runs):
+        return []
+    manifests = []
+    for entry in os.scandir(runs):
+        path = os.path.join(entry.path, 'manifest.json')
+        if entry.is_dir() and os.path.exists(path):
+            try:
+                manifests.append(Manifest.load(path))
+            except (OSError, ValueError):
+                continue
+    manifests.sort(key=lambda manifest: manifest.data.get('created', 0), reverse=True)
+    return manifests
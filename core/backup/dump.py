@@ -0,0 +1,349 @@
+"""
+Backup Engine
+Parallel table dumps across a process pool into compressed, checksummed, resumable chunks
+"""
+
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from core.backup.archive import ChunkStore, Manifest, Spool, file_checksum
+from core.backup.sources import create_source
+from core.database.backends import create_backend
+
+
+MANIFEST_VERSION = 1
+
+# Per-process state of a pool worker, set up once by init_worker
+worker = {}
+
+
+def init_worker(profile, snapshot):
+    """Open the worker's own database connection (runs in each pool process)"""
+    backend = create_backend(profile)
+    worker['source'] = create_source(profile, backend)
+    worker['connection'] = worker['source'].connect(snapshot)
+    worker['snapshot'] = snapshot
+
+
+def dump_task(task):
+    """Dump one chunk into the chunk store and return its manifest record"""
+    started = time.monotonic()
+    spool = Spool(task['spool_memory'])
+    try:
+        rows = worker['source'].dump_chunk(
+            worker['connection'], task['table'], task['spec'], spool,
+            snapshot=worker['snapshot'], batch_rows=task['batch_rows']
+        )
+        store = ChunkStore(task['root'])
+        path, codec, reused = store.store(spool, task['codec'], task['level'])
+        return {
+            'content': spool.hexdigest(),
+            'codec': codec,
+            'checksum': file_checksum(path),
+            'rows': rows,
+            'raw_bytes': spool.size,
+            'bytes': os.path.getsize(path),
+            'reused': reused,
+            'seconds': round(time.monotonic() - started, 3),
+        }
+    finally:
+        spool.close()
+
+
+def run_id(profile_name):
+    """Directory name of a new backup run"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', profile_name).strip('_').lower() or 'profile'
+    return f"{slug}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+
+class BackupProgress:
+    """Counters of a running backup; ETA is projected from estimated rows"""
+
+    __slots__ = ('run', 'phase', 'chunks_done', 'chunks_total', 'rows', 'rows_total',
+                 'raw_bytes', 'bytes_written', 'reused', 'started', 'finished', 'error')
+
+    def __init__(self, run):
+        self.run = run
+        self.phase = 'planning'
+        self.chunks_done = 0
+        self.chunks_total = 0
+        self.rows = 0
+        self.rows_total = 0
+        self.raw_bytes = 0
+        self.bytes_written = 0
+        self.reused = 0
+        self.started = time.monotonic()
+        self.finished = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def fraction(self):
+        """Share of the work done, by rows when known and by chunks otherwise"""
+        if self.rows_total:
+            return min(1.0, self.rows / self.rows_total)
+        return self.chunks_done / self.chunks_total if self.chunks_total else 0.0
+
+    @property
+    def bytes_per_second(self):
+        elapsed = self.elapsed
+        return self.raw_bytes / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Seconds left, or None before anything is measurable"""
+        fraction = self.fraction
+        if fraction <= 0 or self.finished is not None:
+            return None
+        return self.elapsed * (1 - fraction) / fraction
+
+    def snapshot(self):
+        """A plain dict copy, safe to hand to another thread"""
+        names = [name for cls in type(self).__mro__ for name in getattr(cls, '__slots__', ())]
+        values = {name: getattr(self, name) for name in names}
+        values.update(
+            elapsed=self.elapsed,
+            fraction=self.fraction,
+            bytes_per_second=self.bytes_per_second,
+            eta=self.eta,
+        )
+        return values
+
+
+class BackupJob:
+    """One backup run: plan on a coordinator thread, dump chunks in worker processes
+
+    Every finished chunk is recorded in the run's manifest, which is rewritten
+    atomically at most every save_interval seconds; passing resume= the
+    manifest path of an interrupted run re-dumps only the missing chunks.
+    """
+
+    def __init__(self, profile, root, codec='gzip', level=6, workers=None, chunk_rows=100_000,
+                 batch_rows=5000, spool_memory=32 * 1024 * 1024, resume=None,
+                 on_progress=None, progress_interval=0.5, save_interval=1.0, start_method='spawn'):
+        self.profile = profile
+        self.root = os.path.expanduser(root)
+        self.codec = codec
+        self.level = level
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+        self.batch_rows = batch_rows
+        self.spool_memory = spool_memory
+        self.resume = resume
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.save_interval = save_interval
+        self.start_method = start_method
+
+        self.manifest = None
+        self.progress = None
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Run the backup on a coordinator thread"""
+        self.thread = threading.Thread(target=self.run, name='backup-job', daemon=True)
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Stop after the chunks in flight; the run can be resumed later"""
+        self.cancel_event.set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def notify(self):
+        if self.on_progress:
+            self.on_progress(self.progress.snapshot())
+
+    def run(self):
+        """Plan, dump and record every chunk (coordinator thread)"""
+        backend = create_backend(self.profile)
+        source = create_source(self.profile, backend)
+        self.progress = BackupProgress(None)
+        self.notify()
+
+        connection = None
+        snapshot_open = False
+        status = 'failed'
+        try:
+            connection = backend.connect()
+            snapshot = source.begin_snapshot(connection, self.root)
+            snapshot_open = True
+
+            self.manifest = self.load_or_plan(connection, backend, source)
+            self.progress.run = os.path.basename(os.path.dirname(self.manifest.path))
+            tasks = self.pending_tasks()
+
+            self.progress.phase = 'dumping'
+            self.manifest.data['status'] = 'running'
+            self.manifest.save()
+            self.notify()
+            self.dump(tasks, snapshot)
+
+            status = 'cancelled' if self.cancel_event.is_set() else 'complete'
+            self.progress.phase = status
+        except Exception as error:
+            status = 'failed'
+            self.progress.phase = 'failed'
+            self.progress.error = str(error)
+        finally:
+            if connection is not None:
+                if snapshot_open:
+                    try:
+                        source.end_snapshot(connection)
+                    except Exception:
+                        pass
+                backend.close(connection)
+            self.progress.finished = time.monotonic()
+            if self.manifest is not None:
+                self.manifest.data['status'] = status
+                self.manifest.data['finished'] = time.time()
+                self.manifest.data['error'] = self.progress.error
+                self.manifest.data['totals'] = self.totals()
+                self.manifest.save()
+            self.notify()
+
+    def load_or_plan(self, connection, backend, source):
+        """Load the manifest being resumed, or plan a new run"""
+        if self.resume:
+            manifest = Manifest.load(self.resume)
+            # Chunks of the resumed run keep their codec; new ones use it too
+            self.codec = manifest.data['codec']
+            self.level = manifest.data['level']
+            return manifest
+
+        tables = source.tables(connection)
+        for table in tables:
+            table['chunks'] = source.plan(connection, table, self.chunk_rows)
+
+        run = run_id(self.profile['name'])
+        suffix = 1
+        while os.path.exists(os.path.join(self.root, 'runs', run)):
+            suffix += 1
+            run = f"{run_id(self.profile['name'])}-{suffix}"
+        path = os.path.join(self.root, 'runs', run, 'manifest.json')
+        manifest = Manifest(path, {
+            'version': MANIFEST_VERSION,
+            'profile': self.profile['name'],
+            'backend': self.profile['backend'],
+            'source': backend.describe(),
+            'format': source.format,
+            'codec': self.codec,
+            'level': self.level,
+            'created': time.time(),
+            'status': 'planned',
+            'schema': source.schema(connection),
+            'tables': tables,
+            'chunks': {},
+        })
+        manifest.save()
+        return manifest
+
+    def pending_tasks(self):
+        """Chunks still to dump, largest tables first for better load balance
+
+        A recorded chunk whose file is missing or fails its checksum is
+        dumped again.
+        """
+        store = ChunkStore(self.root)
+        completed = self.manifest.completed()
+        tasks = []
+        progress = self.progress
+        progress.chunks_total = sum(len(table['chunks']) for table in self.manifest.tables)
+        progress.rows_total = sum(table['row_estimate'] for table in self.manifest.tables)
+
+        for table in sorted(self.manifest.tables, key=lambda table: -table['row_estimate']):
+            for index, spec in enumerate(table['chunks']):
+                key = self.manifest.chunk_key(table['name'], index)
+                record = completed.get(key)
+                if record is not None:
+                    found = store.find(record['content'])
+                    if found is not None and file_checksum(found[0]) == record['checksum']:
+                        progress.chunks_done += 1
+                        progress.rows += record['rows']
+                        continue
+                    del completed[key]
+                tasks.append((table, index, spec))
+        return tasks
+
+    def dump(self, tasks, snapshot):
+        """Feed chunk tasks to the process pool, recording results as they land"""
+        if not tasks:
+            return
+        progress = self.progress
+        context = multiprocessing.get_context(self.start_method)
+        last_save = last_notify = time.monotonic()
+        pending = iter(tasks)
+        in_flight = {}
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(tasks)),
+            mp_context=context,
+            initializer=init_worker,
+            initargs=(self.profile, snapshot),
+        ) as pool:
+            def submit_next():
+                for table, index, spec in pending:
+                    task = {
+                        'table': {key: table[key] for key in ('name', 'columns')},
+                        'spec': spec,
+                        'root': self.root,
+                        'codec': self.codec,
+                        'level': self.level,
+                        'batch_rows': self.batch_rows,
+                        'spool_memory': self.spool_memory,
+                    }
+                    in_flight[pool.submit(dump_task, task)] = (table['name'], index)
+                    return True
+                return False
+
+            # Two tasks per worker keep every process busy without queueing the whole plan
+            for _ in range(self.workers * 2):
+                if not submit_next():
+                    break
+
+            while in_flight:
+                done, _ = wait(in_flight, timeout=self.progress_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    table, index = in_flight.pop(future)
+                    record = future.result()
+                    self.manifest.record(table, index, record)
+                    progress.chunks_done += 1
+                    progress.rows += record['rows']
+                    progress.raw_bytes += record['raw_bytes']
+                    if record['reused']:
+                        progress.reused += 1
+                    else:
+                        progress.bytes_written += record['bytes']
+                    if not self.cancel_event.is_set():
+                        submit_next()
+
+                now = time.monotonic()
+                if now - last_save >= self.save_interval:
+                    self.manifest.save()
+                    last_save = now
+                if now - last_notify >= self.progress_interval:
+                    self.notify()
+                    last_notify = now
+
+    def totals(self):
+        """Summary counters stored in the manifest"""
+        records = self.manifest.completed().values() if self.manifest else ()
+        return {
+            'chunks': len(records),
+            'rows': sum(record['rows'] for record in records),
+            'raw_bytes': sum(record['raw_bytes'] for record in records),
+            'bytes': sum(record['bytes'] for record in records),
+            'written': sum(record['bytes'] for record in records if not record['reused']),
+            'reused': sum(1 for record in records if record['reused']),
+            'seconds': self.progress.elapsed if self.progress else 0,
+        }
@@ -0,0 +1,593 @@
+"""
+Restore Engine
+Dependency-graph restore of a backup: tables, then data, then indexes, constraints and foreign keys
+"""
+
+import argparse
+import heapq
+import json
+import marshal
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from core.backup.archive import ChunkStore, Manifest, open_chunk, read_frames, READ_SIZE
+from core.backup.dump import BackupProgress
+from core.database.backends import create_backend, quote_identifier
+
+
+# Objects that must wait for their table's data, so they are built once over the loaded rows
+AFTER_DATA = ('index', 'constraint', 'foreign key', 'trigger')
+
+# Relative cost of building an index or constraint, per row of its table
+BUILD_COST = 0.3
+
+
+class RestoreTarget:
+    """Base class for restore targets
+
+    Methods are called from restore worker threads; a target decides how much
+    of that work can really run concurrently.
+    """
+
+    format = None
+    # Chunk loads that may run at once (None: as many as there are workers)
+    max_loads = None
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def begin(self):
+        """Prepare the target for bulk loading"""
+
+    def existing_tables(self, names):
+        """Which of the given tables already exist"""
+        raise NotImplementedError
+
+    def execute(self, sql):
+        """Run one DDL statement"""
+        raise NotImplementedError
+
+    def load_chunk(self, table, stream):
+        """Bulk-load one decompressed chunk stream; returns the row count"""
+        raise NotImplementedError
+
+    def finish(self, success):
+        """Commit or roll back and release connections"""
+
+
+class SQLiteTarget(RestoreTarget):
+    """One connection and one transaction for the whole restore
+
+    SQLite has a single writer, so workers decompress and decode chunks in
+    parallel and take turns on the connection for executemany batches. DDL
+    is transactional in SQLite, so a failed restore leaves nothing behind.
+    """
+
+    format = 'marshal'
+    # Decoding holds the GIL and inserts hold the write lock, so parallel loads only contend
+    max_loads = 1
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        self.lock = threading.Lock()
+        self.connection = None
+
+    def begin(self):
+        self.connection = self.backend.connect()
+        self.connection.isolation_level = None
+        for pragma in ("journal_mode=MEMORY", "synchronous=OFF", "foreign_keys=OFF", "cache_size=-262144"):
+            self.connection.execute(f"PRAGMA {pragma}")
+        self.connection.execute("BEGIN")
+
+    def existing_tables(self, names):
+        rows = self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        existing = {row[0] for row in rows}
+        return [name for name in names if name in existing]
+
+    def execute(self, sql):
+        with self.lock:
+            self.connection.execute(sql)
+
+    def load_chunk(self, table, stream):
+        insert = (
+            f"INSERT INTO {quote_identifier(table['name'])} "
+            f"({', '.join(quote_identifier(column) for column in table['columns'])}) "
+            f"VALUES ({', '.join('?' * len(table['columns']))})"
+        )
+        rows = 0
+        for frame in read_frames(stream):
+            batch = marshal.loads(frame)
+            with self.lock:
+                self.connection.executemany(insert, batch)
+            rows += len(batch)
+        return rows
+
+    def finish(self, success):
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute("COMMIT" if success else "ROLLBACK")
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        finally:
+            self.backend.close(self.connection)
+            self.connection = None
+
+
+class PostgresTarget(RestoreTarget):
+    """A connection per worker thread; chunks stream in through COPY FROM STDIN
+
+    Each chunk and each DDL statement commits on its own, so independent
+    tables, chunks of one table and index builds all run concurrently.
+    """
+
+    format = 'copy-text'
+
+    def __init__(self, backend, maintenance_work_mem='512MB'):
+        super().__init__(backend)
+        self.maintenance_work_mem = maintenance_work_mem
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def connection(self):
+        """This thread's connection, tuned for bulk loading"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.backend.connect()
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SET synchronous_commit TO off")
+                cursor.execute(f"SET maintenance_work_mem TO '{self.maintenance_work_mem}'")
+            finally:
+                cursor.close()
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def existing_tables(self, names):
+        cursor = self.connection().cursor()
+        try:
+            cursor.execute("""
+                SELECT quote_ident(n.nspname) || '.' || quote_ident(c.relname)
+                FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relkind IN ('r', 'p')
+            """)
+            existing = {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+        return [name for name in names if name in existing]
+
+    def execute(self, sql):
+        cursor = self.connection().cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+
+    def load_chunk(self, table, stream):
+        sql = (
+            f"COPY {table['name']} ({', '.join(quote_identifier(column) for column in table['columns'])}) "
+            "FROM STDIN"
+        )
+        connection = self.connection()
+        cursor = connection.cursor()
+        try:
+            if hasattr(cursor, 'copy'):
+                # psycopg 3
+                with cursor.copy(sql) as copy:
+                    for block in iter(lambda: stream.read(READ_SIZE), b''):
+                        copy.write(block)
+            else:
+                cursor.copy_expert(sql, stream, size=READ_SIZE)
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def finish(self, success):
+        for connection in self.connections:
+            self.backend.close(connection)
+        self.connections = []
+
+
+TARGETS = {
+    'sqlite': SQLiteTarget,
+    'postgres': PostgresTarget,
+}
+
+
+def create_target(profile, **options):
+    """Create the restore target for a connection profile"""
+    target = TARGETS.get(profile['backend'])
+    if target is None:
+        raise ValueError(f"Restores are not supported for backend '{profile['backend']}'")
+    if target is PostgresTarget:
+        return target(create_backend(profile), **options)
+    return target(create_backend(profile))
+
+
+class Node:
+    """One unit of restore work and its place in the dependency graph"""
+
+    __slots__ = ('id', 'kind', 'label', 'table', 'deps', 'dependents', 'weight', 'priority',
+                 'work', 'state', 'rows', 'seconds', 'error', 'waiting', 'chunks', 'chunks_done')
+
+    def __init__(self, node_id, kind, label, table=None, weight=1.0, work=None):
+        self.id = node_id
+        self.kind = kind
+        self.label = label
+        self.table = table
+        self.deps = set()
+        self.dependents = []
+        self.weight = weight
+        self.priority = 0.0
+        self.work = work
+        self.state = 'pending'
+        self.rows = 0
+        self.seconds = 0.0
+        self.error = None
+        self.waiting = 0
+        self.chunks = 0
+        self.chunks_done = 0
+
+
+class RestoreProgress(BackupProgress):
+    """Backup counters plus graph progress; the fraction is by node weight"""
+
+    __slots__ = ('weight_done', 'weight_total', 'nodes_done', 'nodes_total', 'nodes')
+
+    def __init__(self, run):
+        super().__init__(run)
+        self.weight_done = 0.0
+        self.weight_total = 0.0
+        self.nodes_done = 0
+        self.nodes_total = 0
+        self.nodes = []
+
+    @property
+    def fraction(self):
+        return min(1.0, self.weight_done / self.weight_total) if self.weight_total else 0.0
+
+    def snapshot(self):
+        values = super().snapshot()
+        values['nodes'] = [
+            (node.id, node.kind, node.label, node.state, node.rows, node.seconds, node.chunks_done, node.chunks)
+            for node in self.nodes
+        ]
+        return values
+
+
+class RestoreJob:
+    """Restore a backup manifest into a target with a dependency-aware scheduler
+
+    Nodes become ready once their dependencies finish and ready nodes are
+    started in critical-path order (the longest chain of remaining work
+    first), so large tables and their index builds are not left to the end.
+    """
+
+    def __init__(self, manifest_path, profile, root, workers=None, on_progress=None,
+                 progress_interval=0.5, target_options=None):
+        self.manifest = Manifest.load(manifest_path)
+        self.profile = profile
+        self.store = ChunkStore(root)
+        self.workers = workers or os.cpu_count() or 1
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.target_options = target_options or {}
+
+        self.nodes = {}
+        self.progress = None
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.report = None
+
+    def start(self):
+        """Run the restore on a coordinator thread"""
+        self.thread = threading.Thread(target=self.run, name='restore-job', daemon=True)
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Stop starting new nodes; a SQLite restore is rolled back"""
+        self.cancel_event.set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def notify(self):
+        if self.on_progress:
+            self.on_progress(self.progress.snapshot())
+
+    # Graph
+
+    def add(self, node):
+        self.nodes[node.id] = node
+        return node
+
+    def build_graph(self, target):
+        """Nodes for every schema object, chunk and per-table data barrier"""
+        data = self.manifest.data
+        completed = self.manifest.completed()
+        tables = {table['name']: table for table in data['tables']}
+        names = {}
+
+        for item in data['schema']:
+            kind = item['kind']
+            node_id = f"{kind}:{item['name']}"
+            weight = 1.0
+            if kind in AFTER_DATA and item['table'] in tables:
+                weight += tables[item['table']]['row_estimate'] * BUILD_COST
+            self.add(Node(node_id, kind, item['name'], item['table'], weight,
+                          lambda sql=item['sql']: target.execute(sql)))
+            if kind in ('schema', 'sequence', 'table', 'view'):
+                names.setdefault(item['name'], node_id)
+
+        for name, table in tables.items():
+            barrier = self.add(Node(f"data:{name}", 'data', name, name, 0.0))
+            for index, _ in enumerate(table['chunks']):
+                record = completed.get(self.manifest.chunk_key(name, index))
+                if record is None:
+                    raise ValueError(f"Backup is incomplete: chunk {index} of {name} is missing")
+                chunk = self.add(Node(
+                    f"chunk:{name}#{index}", 'chunk', f"{name} #{index}", name, record['rows'] + 1.0,
+                    lambda table=table, record=record: self.load_chunk(target, table, record)
+                ))
+                create = f"table:{name}"
+                if create in self.nodes:
+                    chunk.deps.add(create)
+                barrier.deps.add(chunk.id)
+                barrier.chunks += 1
+
+        for item in data['schema']:
+            node = self.nodes[f"{item['kind']}:{item['name']}"]
+            for dependency in item['depends']:
+                if node.kind in AFTER_DATA and dependency in tables:
+                    node.deps.add(f"data:{dependency}")
+                elif dependency in names and names[dependency] != node.id:
+                    node.deps.add(names[dependency])
+            if node.kind == 'foreign key' and item.get('referenced'):
+                # The referenced key must exist before the foreign key is validated
+                node.deps.update(
+                    other.id for other in self.nodes.values()
+                    if other.kind == 'constraint' and other.table == item['referenced']
+                )
+
+        for node in self.nodes.values():
+            node.deps.intersection_update(self.nodes)
+            node.waiting = len(node.deps)
+            for dependency in node.deps:
+                self.nodes[dependency].dependents.append(node)
+        self.prioritize()
+
+    def prioritize(self):
+        """Critical-path priority: own weight plus the heaviest chain after it"""
+        order = []
+        visited = set()
+        for node in self.nodes.values():
+            if node.id in visited:
+                continue
+            stack = [(node, False)]
+            while stack:
+                current, expanded = stack.pop()
+                if expanded:
+                    order.append(current)
+                    continue
+                if current.id in visited:
+                    continue
+                visited.add(current.id)
+                stack.append((current, True))
+                stack.extend((dependent, False) for dependent in current.dependents if dependent.id not in visited)
+        # order is a post-order over dependents: every node comes after the nodes that depend on it
+        for node in order:
+            node.priority = node.weight + max((dependent.priority for dependent in node.dependents), default=0.0)
+
+    # Execution
+
+    def load_chunk(self, target, table, record):
+        """Decompress one chunk and bulk-load it"""
+        found = self.store.find(record['content'])
+        if found is None:
+            raise FileNotFoundError(f"Chunk {record['content'][:12]} of {table['name']} is missing")
+        stream = open_chunk(*found)
+        try:
+            return target.load_chunk(table, stream)
+        finally:
+            stream.close()
+
+    def run_node(self, node):
+        """Execute one node on a worker thread"""
+        started = time.monotonic()
+        result = node.work() if node.work is not None else None
+        node.seconds = time.monotonic() - started
+        if node.kind == 'chunk':
+            node.rows = result or 0
+        return node
+
+    def run(self):
+        """Build the graph and execute it (coordinator thread)"""
+        self.progress = RestoreProgress(os.path.basename(os.path.dirname(self.manifest.path)))
+        self.notify()
+        target = None
+        success = False
+        try:
+            if self.manifest.data.get('status') != 'complete':
+                raise ValueError("Only complete backups can be restored")
+            target = create_target(self.profile, **self.target_options)
+            if self.manifest.data['format'] != target.format:
+                raise ValueError(
+                    f"A {self.manifest.data['backend']} backup cannot be restored into a {self.profile['backend']} database"
+                )
+            target.begin()
+            existing = target.existing_tables([table['name'] for table in self.manifest.tables])
+            if existing:
+                raise ValueError(f"Target already has {len(existing)} of the backup's tables, e.g. {existing[0]}")
+
+            self.build_graph(target)
+            progress = self.progress
+            progress.weight_total = sum(node.weight for node in self.nodes.values())
+            progress.nodes_total = len(self.nodes)
+            progress.chunks_total = sum(1 for node in self.nodes.values() if node.kind == 'chunk')
+            progress.rows_total = sum(node.weight - 1 for node in self.nodes.values() if node.kind == 'chunk')
+            progress.nodes = [node for node in self.nodes.values() if node.kind != 'chunk']
+            progress.phase = 'restoring'
+            self.notify()
+
+            self.execute(target.max_loads)
+            success = not self.cancel_event.is_set()
+            progress.phase = 'complete' if success else 'cancelled'
+        except Exception as error:
+            self.progress.phase = 'failed'
+            self.progress.error = str(error)
+        finally:
+            if target is not None:
+                try:
+                    target.finish(success)
+                except Exception as error:
+                    self.progress.phase = 'failed'
+                    self.progress.error = self.progress.error or str(error)
+            self.progress.finished = time.monotonic()
+            self.report = self.build_report()
+            self.save_report()
+            self.notify()
+
+    def execute(self, max_loads=None):
+        """Run ready nodes on a thread pool in priority order until the graph drains"""
+        ready = {'chunk': [], 'other': []}
+        for node in self.nodes.values():
+            if node.waiting == 0:
+                self.push(ready, node)
+        running = {}
+        loads = 0
+        last_notify = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='restore') as pool:
+            while ready['chunk'] or ready['other'] or running:
+                while len(running) < self.workers and not self.cancel_event.is_set():
+                    node = self.pop(ready, max_loads is None or loads < max_loads)
+                    if node is None:
+                        break
+                    node.state = 'running'
+                    loads += node.kind == 'chunk'
+                    running[pool.submit(self.run_node, node)] = node
+                if not running:
+                    break
+
+                done, _ = wait(running, timeout=self.progress_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    loads -= node.kind == 'chunk'
+                    error = future.exception()
+                    if error is not None:
+                        node.state = 'failed'
+                        node.error = str(error)
+                        self.cancel_event.set()
+                        raise RuntimeError(f"{node.kind} {node.label}: {error}") from error
+                    self.complete(node, ready)
+
+                now = time.monotonic()
+                if now - last_notify >= self.progress_interval:
+                    self.notify()
+                    last_notify = now
+
+    def push(self, ready, node):
+        """Queue a node whose dependencies are done"""
+        queue = ready['chunk' if node.kind == 'chunk' else 'other']
+        heapq.heappush(queue, (-node.priority, node.id))
+
+    def pop(self, ready, allow_chunk):
+        """Highest-priority ready node, skipping chunks when the load limit is reached"""
+        candidates = [name for name in ('chunk', 'other') if ready[name] and (name == 'other' or allow_chunk)]
+        if not candidates:
+            return None
+        name = min(candidates, key=lambda name: ready[name][0])
+        return self.nodes[heapq.heappop(ready[name])[1]]
+
+    def complete(self, node, ready):
+        """Mark a node done and release the nodes that were waiting on it"""
+        progress = self.progress
+        node.state = 'done'
+        progress.nodes_done += 1
+        progress.weight_done += node.weight
+        if node.kind == 'chunk':
+            progress.rows += node.rows
+            progress.chunks_done += 1
+        for dependent in node.dependents:
+            if node.kind == 'chunk' and dependent.kind == 'data':
+                dependent.chunks_done += 1
+                dependent.rows += node.rows
+                dependent.seconds += node.seconds
+                if dependent.state == 'pending':
+                    dependent.state = 'running'
+            dependent.waiting -= 1
+            if dependent.waiting == 0:
+                self.push(ready, dependent)
+
+    # Reporting
+
+    def build_report(self):
+        """Timing breakdown by node kind plus the slowest nodes"""
+        progress = self.progress
+        by_kind = {}
+        for node in self.nodes.values():
+            if node.kind == 'data':
+                continue
+            entry = by_kind.setdefault(node.kind, {'nodes': 0, 'seconds': 0.0, 'rows': 0})
+            entry['nodes'] += 1
+            entry['seconds'] += node.seconds
+            entry['rows'] += node.rows
+        slowest = sorted(
+            (node for node in self.nodes.values() if node.kind != 'data'),
+            key=lambda node: node.seconds, reverse=True
+        )[:10]
+        return {
+            'manifest': self.manifest.path,
+            'target': self.profile['name'],
+            'workers': self.workers,
+            'status': progress.phase,
+            'error': progress.error,
+            'started': time.time() - progress.elapsed,
+            'seconds': progress.elapsed,
+            'rows': progress.rows,
+            'rows_per_second': progress.rows / progress.elapsed if progress.elapsed > 0 else 0.0,
+            'by_kind': by_kind,
+            'slowest': [(node.kind, node.label, round(node.seconds, 3)) for node in slowest],
+        }
+
+    def save_report(self):
+        """Keep the timing report next to the manifest, one file per restore"""
+        directory = os.path.dirname(self.manifest.path)
+        path = os.path.join(directory, f"restore-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        try:
+            with open(path, 'w', encoding='utf-8') as handle:
+                json.dump(self.report, handle, indent=2)
+        except OSError:
+            pass
+
+
+def main():
+    """Restore a backup from the command line and print the timing report"""
+    parser = argparse.ArgumentParser(description="Restore a DB Manager backup and report its timing")
+    parser.add_argument('manifest', help='path to the manifest.json of a backup run')
+    parser.add_argument('--sqlite', help='restore into this (new) SQLite file')
+    parser.add_argument('--dsn', help='restore into this (empty) Postgres database')
+    parser.add_argument('--workers', type=int, default=None, help='concurrent restore nodes')
+    args = parser.parse_args()
+
+    if bool(args.sqlite) == bool(args.dsn):
+        parser.error("pass exactly one of --sqlite or --dsn")
+    if args.sqlite:
+        profile = {'name': args.sqlite, 'backend': 'sqlite', 'database': args.sqlite}
+    else:
+        profile = {'name': args.dsn, 'backend': 'postgres', 'dsn': args.dsn}
+
+    # Chunks live two levels above the manifest: <root>/runs/<run>/manifest.json
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(args.manifest))))
+    job = RestoreJob(args.manifest, profile, root, workers=args.workers)
+    job.run()
+    print(json.dumps(job.report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
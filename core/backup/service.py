@@ -0,0 +1,106 @@
+"""
+Backup Service
+Runs backup jobs for connection profiles and publishes their progress
+"""
+
+import os
+from core.backup.archive import available_codecs, list_backups
+from core.backup.dump import BackupJob
+from core.backup.restore import RestoreJob
+
+
+class BackupService:
+    """Starts one backup or restore job at a time and fans its progress out to listeners
+
+    Listeners are called as callback(progress) on the job's coordinator
+    thread; progress is a plain dict with 'kind' and 'profile' added.
+    """
+
+    def __init__(self, profiles, settings):
+        self.profiles = {profile['name']: profile for profile in profiles}
+        self.settings = settings
+        self.root = os.path.expanduser(settings['directory'])
+        self.job = None
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """Add a callback invoked as callback(progress)"""
+        self.listeners.append(callback)
+
+    @property
+    def running(self):
+        return self.job is not None and self.job.running
+
+    def default_codec(self):
+        """Configured codec if usable here, else the best available one"""
+        codecs = available_codecs()
+        return self.settings['codec'] if self.settings['codec'] in codecs else codecs[0]
+
+    def start_backup(self, profile_name, codec=None, level=None, workers=None, resume=None):
+        """Start a backup (or resume one from its manifest path); returns the job"""
+        if self.running:
+            raise RuntimeError("A backup or restore is already running")
+        profile = self.profile(profile_name)
+
+        codec = codec or self.default_codec()
+        settings = self.settings
+        self.job = BackupJob(
+            profile,
+            self.root,
+            codec=codec,
+            level=settings['levels'][codec] if level is None else level,
+            workers=workers or settings['workers'] or None,
+            chunk_rows=settings['chunk_rows'],
+            batch_rows=settings['batch_rows'],
+            spool_memory=settings['spool_memory_mb'] * 1024 * 1024,
+            resume=resume,
+            on_progress=lambda progress: self.publish('backup', profile_name, progress),
+            progress_interval=settings['progress_interval_ms'] / 1000,
+            start_method=settings['start_method'],
+        )
+        return self.job.start()
+
+    def start_restore(self, manifest_path, profile_name, workers=None):
+        """Restore a complete backup into an empty target database; returns the job"""
+        if self.running:
+            raise RuntimeError("A backup or restore is already running")
+        profile = self.profile(profile_name)
+
+        settings = self.settings
+        self.job = RestoreJob(
+            manifest_path,
+            profile,
+            self.root,
+            workers=workers or settings['restore_workers'] or None,
+            on_progress=lambda progress: self.publish('restore', profile_name, progress),
+            progress_interval=settings['progress_interval_ms'] / 1000,
+            target_options=settings['restore_options'].get(profile['backend'], {}),
+        )
+        return self.job.start()
+
+    def profile(self, profile_name):
+        profile = self.profiles.get(profile_name)
+        if profile is None:
+            raise KeyError(f"Unknown connection profile '{profile_name}'")
+        return profile
+
+    def publish(self, kind, profile_name, progress):
+        progress['kind'] = kind
+        progress['profile'] = profile_name
+        for callback in self.listeners:
+            callback(progress)
+
+    def cancel(self):
+        """Cancel the running job, if any"""
+        if self.job is not None:
+            self.job.cancel()
+
+    def history(self):
+        """Manifests of previous runs, newest first"""
+        return list_backups(self.root)
+
+    def shutdown(self, timeout=10):
+        """Cancel the running job and wait for its in-flight chunks"""
+        if self.running:
+            self.job.cancel()
+            self.job.thread.join(timeout)
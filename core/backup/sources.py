@@ -0,0 +1,479 @@
+"""
+Backup Sources
+Per-backend schema extraction, chunk planning and chunk dumps for the backup engine
+"""
+
+import marshal
+import math
+import os
+import re
+import sqlite3
+import tempfile
+from urllib.parse import quote
+from core.backup.archive import write_frame
+from core.database.backends import quote_identifier
+
+
+SNAPSHOT_ID = re.compile(r'^[0-9A-Fa-f-]+$')
+
+
+class BackupSource:
+    """Base class for backup sources
+
+    A source reads the schema as a list of objects (tables, indexes,
+    constraints, ...) with the SQL that recreates them, splits every table into
+    chunks that can be dumped independently, and writes one chunk's rows in
+    its own format.
+    """
+
+    format = None
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def begin_snapshot(self, connection, directory=None):
+        """Pin a snapshot that worker connections can share; returns its id or None
+
+        directory is where a source that has to copy its data may write the copy.
+        """
+        return None
+
+    def connect(self, snapshot=None):
+        """Open a worker's connection, reading the snapshot when the source needs to"""
+        return self.backend.connect()
+
+    def end_snapshot(self, connection):
+        """Release the snapshot pinned by begin_snapshot"""
+
+    def schema(self, connection):
+        """Schema objects: dicts with kind, name, table, sql and depends"""
+        raise NotImplementedError
+
+    def tables(self, connection):
+        """Tables to dump: dicts with name, columns and row_estimate"""
+        raise NotImplementedError
+
+    def plan(self, connection, table, chunk_rows):
+        """Chunk specs (JSON-serializable dicts) covering a whole table"""
+        raise NotImplementedError
+
+    def dump_chunk(self, connection, table, spec, write, snapshot=None, batch_rows=5000):
+        """Write one chunk's rows through write(bytes); returns the row count"""
+        raise NotImplementedError
+
+
+class SQLiteSource(BackupSource):
+    """SQLite tables dumped by rowid range as length-prefixed marshal frames
+
+    SQLite cannot share a read transaction across processes, so the
+    coordinator copies the database inside its own read transaction and
+    workers read that copy: every table comes from the same moment, the
+    one the schema and chunk plan were read at. The trade-off is a serial
+    copy of the whole file before any chunk is dumped, and room for it in
+    the backup directory; the worker pool only speeds up encoding and
+    compression of SQLite chunks.
+    """
+
+    format = 'marshal'
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        self.snapshot = None
+
+    def begin_snapshot(self, connection, directory=None):
+        database = self.backend.database
+        if database == ':memory:':
+            return None
+        connection.execute("BEGIN")
+        connection.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        directory = directory or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        handle, path = tempfile.mkstemp(prefix=f"{os.path.basename(database)}.snapshot-", dir=directory)
+        os.close(handle)
+        self.snapshot = path
+        copy = sqlite3.connect(path)
+        try:
+            connection.backup(copy)
+        finally:
+            copy.close()
+        return path
+
+    def end_snapshot(self, connection):
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        finally:
+            if self.snapshot is not None:
+                os.remove(self.snapshot)
+                self.snapshot = None
+
+    def connect(self, snapshot=None):
+        if snapshot is None:
+            return self.backend.connect()
+        return sqlite3.connect(f"file:{quote(snapshot)}?immutable=1", uri=True, check_same_thread=False)
+
+    def schema(self, connection):
+        objects = []
+        rows = connection.execute(
+            "SELECT type, name, tbl_name, sql FROM sqlite_master "
+            "WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\' ORDER BY rowid"
+        )
+        for kind, name, table, sql in rows:
+            depends = [] if kind == 'table' else [table]
+            objects.append({'kind': kind, 'name': name, 'table': table, 'sql': sql, 'depends': depends})
+        return objects
+
+    def tables(self, connection):
+        tables = []
+        names = [row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\' ORDER BY name"
+        )]
+        for name in names:
+            columns = [row[1] for row in connection.execute(f"PRAGMA table_info({quote_identifier(name)})")]
+            count = connection.execute(f"SELECT count(*) FROM {quote_identifier(name)}").fetchone()[0]
+            tables.append({'name': name, 'columns': columns, 'row_estimate': count})
+        return tables
+
+    def plan(self, connection, table, chunk_rows):
+        name = quote_identifier(table['name'])
+        try:
+            low, high = connection.execute(f"SELECT min(rowid), max(rowid) FROM {name}").fetchone()
+        except sqlite3.OperationalError:
+            # WITHOUT ROWID table: page through it in primary key order
+            count = table['row_estimate']
+            return [
+                {'offset': offset, 'limit': chunk_rows}
+                for offset in range(0, max(count, 1), chunk_rows)
+            ]
+
+        if low is None:
+            return [{'lower': None, 'upper': None}]
+        chunks = max(1, math.ceil(table['row_estimate'] / chunk_rows))
+        step = max(1, math.ceil((high - low + 1) / chunks))
+        specs = []
+        for index in range(chunks):
+            lower = low + index * step
+            if lower > high:
+                break
+            specs.append({'lower': lower, 'upper': lower + step})
+        # The last chunk is open-ended so rows appended since planning are not lost
+        specs[-1]['upper'] = None
+        return specs
+
+    def dump_chunk(self, connection, table, spec, write, snapshot=None, batch_rows=5000):
+        name = quote_identifier(table['name'])
+        columns = ', '.join(quote_identifier(column) for column in table['columns'])
+        if 'offset' in spec:
+            keys = [row[1] for row in sorted(
+                (row for row in connection.execute(f"PRAGMA table_info({name})") if row[5]),
+                key=lambda row: row[5]
+            )]
+            order = ', '.join(quote_identifier(key) for key in keys) or '1'
+            sql = f"SELECT {columns} FROM {name} ORDER BY {order} LIMIT ? OFFSET ?"
+            params = (spec['limit'], spec['offset'])
+        else:
+            conditions, params = [], []
+            if spec['lower'] is not None:
+                conditions.append("rowid >= ?")
+                params.append(spec['lower'])
+            if spec['upper'] is not None:
+                conditions.append("rowid < ?")
+                params.append(spec['upper'])
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+            sql = f"SELECT {columns} FROM {name}{where} ORDER BY rowid"
+
+        cursor = connection.execute(sql, params)
+        try:
+            rows = 0
+            while True:
+                batch = cursor.fetchmany(batch_rows)
+                if not batch:
+                    return rows
+                write_frame(write, marshal.dumps(batch))
+                rows += len(batch)
+        finally:
+            cursor.close()
+
+
+class PostgresSource(BackupSource):
+    """Postgres tables dumped by ctid page range in COPY text format
+
+    Workers share the coordinator's exported snapshot, so every chunk sees
+    the same consistent state of the database.
+    """
+
+    format = 'copy-text'
+
+    def query(self, connection, sql, params=None):
+        cursor = connection.cursor()
+        try:
+            if params:
+                cursor.execute(sql, params)
+            else:
+                cursor.execute(sql)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def begin_snapshot(self, connection, directory=None):
+        connection.autocommit = False
+        self.query(connection, "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        return self.query(connection, "SELECT pg_export_snapshot()")[0][0]
+
+    def end_snapshot(self, connection):
+        try:
+            connection.rollback()
+        finally:
+            connection.autocommit = True
+
+    def table_rows(self, connection):
+        """(oid, schema, name, reltuples, pages) of ordinary user tables"""
+        return self.query(connection, """
+            SELECT c.oid, n.nspname, c.relname, c.reltuples,
+                   pg_relation_size(c.oid) / current_setting('block_size')::int
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind = 'r' AND NOT c.relispartition
+              AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+              AND n.nspname NOT LIKE 'pg\\_toast%'
+              AND n.nspname NOT LIKE 'pg\\_temp\\_%'
+            ORDER BY n.nspname, c.relname
+        """)
+
+    def qualified(self, schema, name):
+        return f"{quote_identifier(schema)}.{quote_identifier(name)}"
+
+    def schema(self, connection):
+        tables = self.table_rows(connection)
+        oids = [row[0] for row in tables]
+        names = {oid: self.qualified(schema, name) for oid, schema, name, _, _ in tables}
+        objects = []
+
+        for schema in sorted({row[1] for row in tables}):
+            objects.append({
+                'kind': 'schema', 'name': schema, 'table': None, 'depends': [],
+                'sql': f"CREATE SCHEMA IF NOT EXISTS {quote_identifier(schema)}",
+            })
+
+        for schema, name, data_type, start, increment, minimum, maximum, cycle, last in self.query(connection, """
+            SELECT schemaname, sequencename, data_type::text, start_value, increment_by,
+                   min_value, max_value, cycle, last_value
+            FROM pg_sequences s
+            WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
+              AND NOT EXISTS (
+                  -- Identity sequences are recreated by their column
+                  SELECT 1 FROM pg_depend d
+                  JOIN pg_class c ON c.oid = d.objid
+                  JOIN pg_namespace n ON n.oid = c.relnamespace
+                  WHERE d.classid = 'pg_class'::regclass AND d.deptype = 'i'
+                    AND n.nspname = s.schemaname AND c.relname = s.sequencename
+              )
+        """):
+            sequence = self.qualified(schema, name)
+            sql = (
+                f"CREATE SEQUENCE IF NOT EXISTS {sequence} AS {data_type} INCREMENT BY {increment} "
+                f"MINVALUE {minimum} MAXVALUE {maximum} START WITH {start}{' CYCLE' if cycle else ''}"
+            )
+            if last is not None:
+                sql += f"; SELECT setval('{sequence.replace(chr(39), chr(39) * 2)}', {last}, true)"
+            objects.append({'kind': 'sequence', 'name': sequence, 'table': None, 'sql': sql, 'depends': [schema]})
+        sequences = [item['name'] for item in objects if item['kind'] == 'sequence']
+
+        columns = {}
+        if oids:
+            for oid, column, type_name, not_null, default, identity, generated in self.query(connection, """
+                SELECT a.attrelid, a.attname, format_type(a.atttypid, a.atttypmod), a.attnotnull,
+                       pg_get_expr(d.adbin, d.adrelid), a.attidentity, a.attgenerated
+                FROM pg_attribute a
+                LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+                WHERE a.attrelid = ANY(%s) AND a.attnum > 0 AND NOT a.attisdropped
+                ORDER BY a.attrelid, a.attnum
+            """, (oids,)):
+                definition = f"{quote_identifier(column)} {type_name}"
+                if generated == 's':
+                    definition += f" GENERATED ALWAYS AS ({default}) STORED"
+                elif identity:
+                    definition += f" GENERATED {'ALWAYS' if identity == 'a' else 'BY DEFAULT'} AS IDENTITY"
+                elif default is not None:
+                    definition += f" DEFAULT {default}"
+                if not_null:
+                    definition += " NOT NULL"
+                columns.setdefault(oid, []).append(definition)
+
+        for oid, schema, name, _, _ in tables:
+            table = names[oid]
+            body = ',\n    '.join(columns.get(oid, []))
+            objects.append({
+                'kind': 'table', 'name': table, 'table': table,
+                'sql': f"CREATE TABLE {table} (\n    {body}\n)",
+                # Column defaults may call nextval() on any sequence
+                'depends': [schema] + sequences,
+            })
+
+        if oids:
+            # Identity columns restart after the highest value already handed out
+            for oid, column, last, increment in self.query(connection, """
+                SELECT d.refobjid, a.attname, s.last_value, s.increment_by
+                FROM pg_depend d
+                JOIN pg_class c ON c.oid = d.objid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                JOIN pg_sequences s ON s.schemaname = n.nspname AND s.sequencename = c.relname
+                JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+                WHERE d.classid = 'pg_class'::regclass AND d.refclassid = 'pg_class'::regclass
+                  AND d.deptype = 'i' AND d.refobjid = ANY(%s) AND s.last_value IS NOT NULL
+            """, (oids,)):
+                table = names[oid]
+                objects.append({
+                    'kind': 'identity', 'name': f"{table}.{column}", 'table': table,
+                    'sql': f"ALTER TABLE {table} ALTER COLUMN {quote_identifier(column)} RESTART WITH {last + increment}",
+                    'depends': [table],
+                })
+
+            for oid, name, kind, definition, referenced in self.query(connection, """
+                SELECT conrelid, conname, contype, pg_get_constraintdef(oid), confrelid
+                FROM pg_constraint
+                WHERE conrelid = ANY(%s) AND contype IN ('p', 'u', 'c', 'x', 'f')
+                ORDER BY conrelid, contype, conname
+            """, (oids,)):
+                table = names[oid]
+                depends = [table]
+                if kind == 'f' and referenced in names:
+                    depends.append(names[referenced])
+                objects.append({
+                    'kind': 'foreign key' if kind == 'f' else 'constraint',
+                    'name': f"{table}.{name}",
+                    'table': table,
+                    'referenced': names.get(referenced) if kind == 'f' else None,
+                    'sql': f"ALTER TABLE ONLY {table} ADD CONSTRAINT {quote_identifier(name)} {definition}",
+                    'depends': depends,
+                })
+
+            for oid, name, definition in self.query(connection, """
+                SELECT i.indrelid, ic.relname, pg_get_indexdef(i.indexrelid)
+                FROM pg_index i
+                JOIN pg_class ic ON ic.oid = i.indexrelid
+                WHERE i.indrelid = ANY(%s)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM pg_constraint con
+                      WHERE con.conindid = i.indexrelid AND con.conrelid = i.indrelid
+                        AND con.contype IN ('p', 'u', 'x')
+                  )
+            """, (oids,)):
+                table = names[oid]
+                objects.append({
+                    'kind': 'index', 'name': f"{table}.{name}", 'table': table,
+                    'sql': definition, 'depends': [table],
+                })
+
+        table_names = [names[oid] for oid in oids]
+        for schema, name, definition in self.query(connection, """
+            SELECT n.nspname, c.relname, pg_get_viewdef(c.oid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind = 'v'
+              AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+            ORDER BY c.oid
+        """):
+            view = self.qualified(schema, name)
+            objects.append({
+                'kind': 'view', 'name': view, 'table': None,
+                'sql': f"CREATE VIEW {view} AS {definition}",
+                'depends': [schema] + table_names,
+            })
+        return objects
+
+    def tables(self, connection):
+        tables = []
+        rows = self.table_rows(connection)
+        oids = [row[0] for row in rows]
+        columns = {}
+        if oids:
+            # Generated columns are recomputed on restore and cannot be copied in
+            for oid, name in self.query(connection, """
+                SELECT attrelid, attname FROM pg_attribute
+                WHERE attrelid = ANY(%s) AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+                ORDER BY attrelid, attnum
+            """, (oids,)):
+                columns.setdefault(oid, []).append(name)
+        for oid, schema, name, reltuples, pages in rows:
+            tables.append({
+                'name': self.qualified(schema, name),
+                'columns': columns.get(oid, []),
+                'row_estimate': max(0, int(reltuples)),
+                'pages': int(pages),
+            })
+        return tables
+
+    def plan(self, connection, table, chunk_rows):
+        pages = table['pages']
+        if pages == 0:
+            return [{'lower': None, 'upper': None}]
+        rows_per_page = max(1.0, table['row_estimate'] / pages) if table['row_estimate'] else 100.0
+        step = max(1, int(chunk_rows / rows_per_page))
+        specs = [{'lower': lower, 'upper': lower + step} for lower in range(0, pages, step)]
+        specs[0]['lower'] = None
+        specs[-1]['upper'] = None
+        return specs
+
+    def dump_chunk(self, connection, table, spec, write, snapshot=None, batch_rows=5000):
+        columns = ', '.join(quote_identifier(column) for column in table['columns'])
+        conditions = []
+        if spec['lower'] is not None:
+            conditions.append(f"ctid >= '({int(spec['lower'])},0)'::tid")
+        if spec['upper'] is not None:
+            conditions.append(f"ctid < '({int(spec['upper'])},0)'::tid")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        sql = f"COPY (SELECT {columns} FROM ONLY {table['name']}{where}) TO STDOUT"
+
+        connection.autocommit = False
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            if snapshot is not None:
+                if not SNAPSHOT_ID.match(snapshot):
+                    raise ValueError(f"Invalid snapshot id '{snapshot}'")
+                cursor.execute(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+
+            counter = LineCounter(write)
+            if hasattr(cursor, 'copy'):
+                # psycopg 3
+                with cursor.copy(sql) as copy:
+                    for block in copy:
+                        counter.write(bytes(block))
+            else:
+                cursor.copy_expert(sql, counter)
+            return counter.rows
+        finally:
+            cursor.close()
+            connection.rollback()
+            connection.autocommit = True
+
+
+class LineCounter:
+    """File-like writer that counts COPY text rows as they pass through"""
+
+    def __init__(self, target):
+        self.target = target
+        self.rows = 0
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        self.rows += data.count(b'\n')
+        self.target.write(data)
+        return len(data)
+
+
+SOURCES = {
+    'sqlite': SQLiteSource,
+    'postgres': PostgresSource,
+}
+
+
+def create_source(profile, backend):
+    """Create the backup source for a connection profile's backend"""
+    source = SOURCES.get(profile['backend'])
+    if source is None:
+        raise ValueError(f"Backups are not supported for backend '{profile['backend']}'")
+    return source(backend)
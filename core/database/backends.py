@@ -0,0 +1,441 @@
+"""
+Database Backends
+Pluggable DB-API drivers used by the connection pool (SQLite built in, Postgres optional)
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import re
+import sqlite3
+
+
+# Statements that return rows and can be streamed through a server-side cursor
+READ_QUERY = re.compile(r'^\s*(\(\s*)*(select|with|values|table)\b', re.IGNORECASE)
+
+cursor_names = itertools.count(1)
+
+
+def is_read_query(sql):
+    """Whether a statement is a plain read that can use a server-side cursor"""
+    return READ_QUERY.match(sql) is not None
+
+
+def quote_identifier(name):
+    """Quote an SQL identifier"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_table(name):
+    """Quote a table name, schema-qualified when it contains a dot"""
+    return '.'.join(quote_identifier(part) for part in name.split('.'))
+
+
+def execute(cursor, sql, params=None):
+    """Execute with parameters only when given, so literal % signs survive"""
+    if params:
+        cursor.execute(sql, params)
+    else:
+        cursor.execute(sql)
+
+
+class CopyStream:
+    """File-like reader over an iterator of byte strings, for psycopg2's copy_expert"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b''
+        self.offset = 0
+
+    def read(self, size=-1):
+        while self.offset >= len(self.buffer):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return b''
+            self.buffer, self.offset = chunk, 0
+        end = len(self.buffer) if size < 0 else self.offset + size
+        data = self.buffer[self.offset:end]
+        self.offset += len(data)
+        return data
+
+
+class Backend:
+    """Base class for database backends
+
+    Backends expose blocking DB-API calls; the pool runs them on an executor so
+    the event loop never blocks on the network or the disk.
+    """
+
+    name = 'base'
+    paramstyle = 'qmark'
+    # What bulk_load takes: 'rows' (lists of tuples) or 'copy' (COPY text format bytes)
+    load_format = 'rows'
+
+    def connect(self):
+        """Open a new DB-API connection"""
+        raise NotImplementedError
+
+    def ping(self, connection):
+        """Raise if the connection is no longer usable"""
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def close(self, connection):
+        """Close a connection, ignoring errors from already broken ones"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def open_cursor(self, connection, sql, params=None, batch_size=1000):
+        """Execute a statement and return a cursor positioned before the first row"""
+        cursor = connection.cursor()
+        cursor.arraysize = batch_size
+        execute(cursor, sql, params)
+        return cursor
+
+    def end_query(self, connection, cursor, success):
+        """Release a cursor opened by open_cursor (or None) and settle the transaction"""
+        if cursor is None:
+            return
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    def cancel(self, connection):
+        """Interrupt a statement running on a connection (called from another thread)"""
+
+    def catalog_version(self, connection):
+        """A value that changes whenever any schema changes, or None if unknown
+
+        When the version matches the cached one a catalog refresh is skipped
+        without listing relations.
+        """
+        return None
+
+    def list_relations(self, connection):
+        """Every table and view as (schema, name, kind, marker, row_estimate, ref)
+
+        The marker changes whenever the relation or its columns change; ref is
+        whatever list_columns needs to find the relation again.
+        """
+        raise NotImplementedError
+
+    def list_columns(self, connection, refs):
+        """Columns of the given relations as {ref: [(name, type, nullable), ...]}"""
+        raise NotImplementedError
+
+    def explain(self, connection, sql, params=None, analyze=False):
+        """The raw plan of a statement, in whatever form the database gives it"""
+        raise NotImplementedError
+
+    def relation_rows(self, connection, names):
+        """Estimated row counts of the named tables as {name: rows}; unknown ones are left out"""
+        return {}
+
+    def bulk_load(self, connection, table, columns, batches):
+        """Insert batches of rows with executemany in one transaction"""
+        placeholder = '?' if self.paramstyle == 'qmark' else '%s'
+        sql = (f"INSERT INTO {quote_table(table)} ({', '.join(quote_identifier(column) for column in columns)}) "
+               f"VALUES ({', '.join([placeholder] * len(columns))})")
+        cursor = connection.cursor()
+        try:
+            for rows in batches:
+                if rows:
+                    cursor.executemany(sql, rows)
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def describe(self):
+        """Short description for display"""
+        return self.name
+
+
+class SQLiteBackend(Backend):
+    """SQLite backend, also used as a local stand-in for Postgres"""
+
+    name = 'sqlite'
+    paramstyle = 'qmark'
+
+    def __init__(self, database, timeout=30.0):
+        if database != ':memory:':
+            database = os.path.expanduser(database)
+            directory = os.path.dirname(database)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.database = database
+        self.timeout = timeout
+
+    def connect(self):
+        """Open a connection usable from any executor thread"""
+        connection = sqlite3.connect(self.database, timeout=self.timeout, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def end_query(self, connection, cursor, success):
+        super().end_query(connection, cursor, success)
+        if connection.in_transaction:
+            if success:
+                connection.commit()
+            else:
+                connection.rollback()
+
+    def cancel(self, connection):
+        connection.interrupt()
+
+    def schemas(self, connection):
+        """Attached database names, without the temp schema"""
+        return [row[1] for row in connection.execute("PRAGMA database_list") if row[1] != 'temp']
+
+    def catalog_version(self, connection):
+        """schema_version of every attached database; bumped by any DDL"""
+        return ','.join(
+            f"{schema}:{connection.execute(f'PRAGMA {quote_identifier(schema)}.schema_version').fetchone()[0]}"
+            for schema in self.schemas(connection)
+        )
+
+    def list_relations(self, connection):
+        """Tables and views from sqlite_master; the marker hashes the CREATE statement"""
+        relations = []
+        for schema in self.schemas(connection):
+            rows = connection.execute(
+                f"SELECT type, name, sql FROM {quote_identifier(schema)}.sqlite_master "
+                "WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\'"
+            )
+            for kind, name, sql in rows:
+                marker = hashlib.sha1((sql or '').encode()).hexdigest()[:16]
+                relations.append((schema, name, kind, marker, None, (schema, name)))
+        return relations
+
+    def list_columns(self, connection, refs):
+        columns = {}
+        for schema, name in refs:
+            rows = connection.execute(
+                f"PRAGMA {quote_identifier(schema)}.table_info({quote_identifier(name)})"
+            )
+            columns[(schema, name)] = [(row[1], row[2] or '', not row[3]) for row in rows]
+        return columns
+
+    def explain(self, connection, sql, params=None, analyze=False):
+        """EXPLAIN QUERY PLAN rows; SQLite has no ANALYZE variant"""
+        cursor = connection.cursor()
+        try:
+            execute(cursor, f"EXPLAIN QUERY PLAN {sql.strip().rstrip(';')}", params)
+            return [tuple(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def relation_rows(self, connection, names):
+        """Row counts from sqlite_stat1 when ANALYZE has run, else the highest rowid"""
+        rows = {}
+        try:
+            for table, stat in connection.execute("SELECT tbl, stat FROM sqlite_stat1"):
+                if table in names:
+                    rows[table] = max(rows.get(table, 0), int(stat.split()[0]))
+        except sqlite3.OperationalError:
+            pass
+        for name in names:
+            if name not in rows:
+                try:
+                    row = connection.execute(f"SELECT max(rowid) FROM {quote_identifier(name)}").fetchone()
+                    rows[name] = row[0] or 0
+                except sqlite3.OperationalError:
+                    pass
+        return rows
+
+    def describe(self):
+        return f"sqlite:{self.database}"
+
+
+class PostgresBackend(Backend):
+    """PostgreSQL backend using psycopg (v3) or psycopg2, whichever is installed"""
+
+    name = 'postgres'
+    paramstyle = 'format'
+    load_format = 'copy'
+
+    def __init__(self, dsn, connect_timeout=10):
+        self.dsn = dsn
+        self.connect_timeout = connect_timeout
+        self.driver = None
+
+    def load_driver(self):
+        """Import the Postgres driver on first use"""
+        if self.driver is None:
+            try:
+                import psycopg
+                self.driver = psycopg
+            except ImportError:
+                try:
+                    import psycopg2
+                    self.driver = psycopg2
+                except ImportError:
+                    raise RuntimeError(
+                        "PostgreSQL support requires 'psycopg' or 'psycopg2' to be installed"
+                    ) from None
+        return self.driver
+
+    def connect(self):
+        """Open a connection in autocommit mode"""
+        driver = self.load_driver()
+        connection = driver.connect(self.dsn, connect_timeout=self.connect_timeout)
+        connection.autocommit = True
+        return connection
+
+    def open_cursor(self, connection, sql, params=None, batch_size=1000):
+        """Stream reads through a named (server-side) cursor"""
+        if not is_read_query(sql):
+            return super().open_cursor(connection, sql, params, batch_size)
+
+        # Named cursors live inside a transaction
+        connection.autocommit = False
+        cursor = connection.cursor(name=f"dbm_stream_{next(cursor_names)}")
+        cursor.itersize = batch_size
+        cursor.arraysize = batch_size
+        execute(cursor, sql, params)
+        return cursor
+
+    def end_query(self, connection, cursor, success):
+        super().end_query(connection, cursor, success)
+        if not connection.autocommit:
+            try:
+                if success:
+                    connection.commit()
+                else:
+                    connection.rollback()
+            finally:
+                connection.autocommit = True
+
+    def cancel(self, connection):
+        connection.cancel()
+
+    def list_relations(self, connection):
+        """Relations from pg_class in one scan
+
+        The marker combines the pg_class row's xmin (bumped by ALTER TABLE,
+        ANALYZE and friends), its relfilenode (bumped by rewrites) and the
+        newest pg_attribute xmin (column renames and type changes).
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT n.nspname, c.relname,
+                       CASE c.relkind WHEN 'v' THEN 'view' WHEN 'm' THEN 'materialized view'
+                                      WHEN 'f' THEN 'foreign table' ELSE 'table' END,
+                       c.xmin::text || ':' || c.relfilenode || ':' || coalesce((
+                           SELECT max(a.xmin::text::bigint) FROM pg_attribute a
+                           WHERE a.attrelid = c.oid AND a.attnum > 0
+                       ), 0),
+                       c.reltuples,
+                       c.oid
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+                  AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+                  AND n.nspname NOT LIKE 'pg\\_toast%'
+                  AND n.nspname NOT LIKE 'pg\\_temp\\_%'
+            """)
+            return [
+                (schema, name, kind, marker, rows if rows is not None and rows >= 0 else None, oid)
+                for schema, name, kind, marker, rows, oid in cursor.fetchall()
+            ]
+        finally:
+            cursor.close()
+
+    def list_columns(self, connection, refs):
+        columns = {ref: [] for ref in refs}
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT attrelid, attname, format_type(atttypid, atttypmod), NOT attnotnull
+                FROM pg_attribute
+                WHERE attrelid = ANY(%s) AND attnum > 0 AND NOT attisdropped
+                ORDER BY attrelid, attnum
+            """, (list(refs),))
+            for oid, name, type_name, nullable in cursor.fetchall():
+                columns[oid].append((name, type_name, nullable))
+            return columns
+        finally:
+            cursor.close()
+
+    def explain(self, connection, sql, params=None, analyze=False):
+        """EXPLAIN (FORMAT JSON), with ANALYZE and BUFFERS when asked
+
+        ANALYZE executes the statement, so it runs in a transaction that is
+        always rolled back.
+        """
+        options = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+        connection.autocommit = False
+        cursor = connection.cursor()
+        try:
+            execute(cursor, f"EXPLAIN ({options}) {sql.strip().rstrip(';')}", params)
+            document = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+            try:
+                connection.rollback()
+            finally:
+                connection.autocommit = True
+        return json.loads(document) if isinstance(document, str) else document
+
+    def relation_rows(self, connection, names):
+        """reltuples of the named tables (the largest when a name exists in several schemas)"""
+        if not names:
+            return {}
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT relname, max(reltuples) FROM pg_class
+                WHERE relname = ANY(%s) AND relkind IN ('r', 'p', 'm') AND reltuples >= 0
+                GROUP BY relname
+            """, (list(names),))
+            return {name: rows for name, rows in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def bulk_load(self, connection, table, columns, batches):
+        """COPY FROM STDIN in text format, streamed from the batches in one transaction"""
+        sql = f"COPY {quote_table(table)} ({', '.join(quote_identifier(column) for column in columns)}) FROM STDIN"
+        connection.autocommit = False
+        cursor = connection.cursor()
+        try:
+            if hasattr(cursor, 'copy'):
+                with cursor.copy(sql) as copy:
+                    for data in batches:
+                        copy.write(data)
+            else:
+                cursor.copy_expert(sql, CopyStream(batches), size=1024 * 1024)
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.autocommit = True
+
+    def describe(self):
+        return f"postgres:{self.dsn}"
+
+
+BACKENDS = {
+    'sqlite': lambda profile: SQLiteBackend(profile['database']),
+    'postgres': lambda profile: PostgresBackend(profile['dsn']),
+}
+
+
+def create_backend(profile):
+    """Create the backend described by a connection profile"""
+    factory = BACKENDS.get(profile['backend'])
+    if factory is None:
+        raise ValueError(f"Unknown database backend '{profile['backend']}'")
+    return factory(profile)
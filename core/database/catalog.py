@@ -0,0 +1,309 @@
+"""
+Catalog Cache
+Persistent per-profile cache of schemas, tables and columns with incremental refresh and name search
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS relations (
+    id INTEGER PRIMARY KEY,
+    schema TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    marker TEXT NOT NULL,
+    row_estimate REAL,
+    column_count INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (schema, name)
+);
+CREATE TABLE IF NOT EXISTS columns (
+    relation_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    nullable INTEGER NOT NULL,
+    PRIMARY KEY (relation_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS names (
+    id INTEGER PRIMARY KEY,
+    relation_id INTEGER NOT NULL,
+    position INTEGER,
+    name_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS names_key ON names (name_key);
+CREATE INDEX IF NOT EXISTS names_relation ON names (relation_id);
+"""
+
+# Substring search index; needs SQLite 3.34+ built with FTS5
+TRIGRAM_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS name_grams USING fts5(name, tokenize='trigram', detail='none')"
+
+
+def cache_path(directory, profile_name):
+    """Cache file for a connection profile"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', profile_name).strip('_').lower() or 'profile'
+    return os.path.join(os.path.expanduser(directory), f"{slug}.db")
+
+
+class CatalogCache:
+    """SQLite-file cache of one profile's catalog
+
+    refresh() runs on a pool executor thread with a live database connection
+    and only re-reads columns of relations whose change marker moved. Browsing
+    and search read the local file through a separate connection, so the tree
+    never waits on the database server.
+    """
+
+    def __init__(self, path, column_batch=1000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.column_batch = column_batch
+        self.refresh_lock = threading.Lock()
+        self.reader = self.open()
+        self.trigrams = self.has_trigrams(self.reader)
+
+    def open(self):
+        """Open a connection to the cache file and create the tables"""
+        connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        try:
+            connection.execute(TRIGRAM_SCHEMA)
+        except sqlite3.OperationalError:
+            pass
+        return connection
+
+    def has_trigrams(self, connection):
+        """Whether the trigram search table exists"""
+        return connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'name_grams'"
+        ).fetchone() is not None
+
+    def close(self):
+        self.reader.close()
+
+    def get_meta(self, connection, key):
+        row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, connection, key, value):
+        connection.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, None if value is None else str(value))
+        )
+
+    # Refresh (executor thread)
+
+    def refresh(self, connection, backend, force=False):
+        """Bring the cache up to date with the database; returns refresh counters"""
+        started = time.monotonic()
+        stats = {'relations': 0, 'added': 0, 'changed': 0, 'removed': 0, 'skipped': False}
+
+        with self.refresh_lock:
+            cache = self.open()
+            try:
+                source = backend.describe()
+                if self.get_meta(cache, 'source') != source:
+                    # Same profile name, different database: start over
+                    self.clear(cache)
+                    force = True
+
+                version = backend.catalog_version(connection)
+                if not force and version is not None and self.get_meta(cache, 'version') == str(version):
+                    stats['skipped'] = True
+                    stats['relations'] = cache.execute("SELECT count(*) FROM relations").fetchone()[0]
+                else:
+                    self.apply(cache, connection, backend, stats)
+                    with cache:
+                        self.set_meta(cache, 'source', source)
+                        self.set_meta(cache, 'version', version)
+                        self.set_meta(cache, 'refreshed', time.time())
+            finally:
+                cache.close()
+
+        stats['elapsed'] = time.monotonic() - started
+        return stats
+
+    def apply(self, cache, connection, backend, stats):
+        """Diff relation markers against the cache and re-read what changed"""
+        cached = {
+            (schema, name): (relation_id, marker)
+            for relation_id, schema, name, marker in cache.execute(
+                "SELECT id, schema, name, marker FROM relations"
+            )
+        }
+        relations = backend.list_relations(connection)
+        stats['relations'] = len(relations)
+
+        changed = []
+        seen = set()
+        for relation in relations:
+            key = (relation[0], relation[1])
+            seen.add(key)
+            entry = cached.get(key)
+            if entry is None:
+                stats['added'] += 1
+                changed.append((None, relation))
+            elif entry[1] != relation[3]:
+                stats['changed'] += 1
+                changed.append((entry[0], relation))
+
+        removed = [relation_id for key, (relation_id, _) in cached.items() if key not in seen]
+        stats['removed'] = len(removed)
+
+        with cache:
+            for relation_id in removed:
+                self.drop_relation(cache, relation_id)
+
+        # Columns are fetched and written in batches so a first load of a huge
+        # catalog commits progressively and the connection is not held by one giant query
+        for start in range(0, len(changed), self.column_batch):
+            batch = changed[start:start + self.column_batch]
+            columns = backend.list_columns(connection, [relation[5] for _, relation in batch])
+            with cache:
+                for relation_id, relation in batch:
+                    self.store_relation(cache, relation_id, relation, columns.get(relation[5], []))
+
+    def drop_relation(self, cache, relation_id):
+        """Remove a relation, its columns and its search entries"""
+        if self.trigrams:
+            cache.execute(
+                "DELETE FROM name_grams WHERE rowid IN (SELECT id FROM names WHERE relation_id = ?)",
+                (relation_id,)
+            )
+        cache.execute("DELETE FROM names WHERE relation_id = ?", (relation_id,))
+        cache.execute("DELETE FROM columns WHERE relation_id = ?", (relation_id,))
+        cache.execute("DELETE FROM relations WHERE id = ?", (relation_id,))
+
+    def store_relation(self, cache, relation_id, relation, columns):
+        """Insert or replace one relation with its columns and search entries"""
+        schema, name, kind, marker, row_estimate, _ = relation
+        if relation_id is not None:
+            self.drop_relation(cache, relation_id)
+        relation_id = cache.execute(
+            "INSERT INTO relations (id, schema, name, kind, marker, row_estimate, column_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (relation_id, schema, name, kind, marker, row_estimate, len(columns))
+        ).lastrowid
+
+        cache.executemany(
+            "INSERT INTO columns (relation_id, position, name, type, nullable) VALUES (?, ?, ?, ?, ?)",
+            [(relation_id, position, column, type_name, int(bool(nullable)))
+             for position, (column, type_name, nullable) in enumerate(columns)]
+        )
+
+        entries = [(None, name)] + [(position, column) for position, (column, _, _) in enumerate(columns)]
+        for position, entry in entries:
+            name_id = cache.execute(
+                "INSERT INTO names (relation_id, position, name_key) VALUES (?, ?, ?)",
+                (relation_id, position, entry.lower())
+            ).lastrowid
+            if self.trigrams:
+                cache.execute("INSERT INTO name_grams (rowid, name) VALUES (?, ?)", (name_id, entry))
+
+    def clear(self, cache):
+        """Drop every cached relation"""
+        with cache:
+            for table in ('relations', 'columns', 'names', 'meta'):
+                cache.execute(f"DELETE FROM {table}")
+            if self.trigrams:
+                cache.execute("DELETE FROM name_grams")
+
+    # Browsing and search (Tk thread)
+
+    def refreshed_at(self):
+        """Unix time of the last completed refresh, or None"""
+        value = self.get_meta(self.reader, 'refreshed')
+        return float(value) if value else None
+
+    def schemas(self):
+        """[(schema, relation_count)] in name order"""
+        return self.reader.execute(
+            "SELECT schema, count(*) FROM relations GROUP BY schema ORDER BY schema"
+        ).fetchall()
+
+    def relations(self, schema, offset=0, limit=500):
+        """One page of [(id, name, kind, row_estimate, column_count)] of a schema"""
+        return self.reader.execute(
+            "SELECT id, name, kind, row_estimate, column_count FROM relations "
+            "WHERE schema = ? ORDER BY name LIMIT ? OFFSET ?",
+            (schema, limit, offset)
+        ).fetchall()
+
+    def relation(self, relation_id):
+        """(schema, name, kind, row_estimate, column_count) of one relation"""
+        return self.reader.execute(
+            "SELECT schema, name, kind, row_estimate, column_count FROM relations WHERE id = ?",
+            (relation_id,)
+        ).fetchone()
+
+    def columns(self, relation_id):
+        """[(name, type, nullable)] of a relation in ordinal order"""
+        return self.reader.execute(
+            "SELECT name, type, nullable FROM columns WHERE relation_id = ? ORDER BY position",
+            (relation_id,)
+        ).fetchall()
+
+    def search(self, text, limit=200):
+        """Tables and columns whose name contains text, prefix matches first
+
+        Returns [(relation_id, schema, relation, column or None)].
+        """
+        needle = text.strip().lower()
+        if not needle:
+            return []
+
+        # Prefix matches come straight off the name_key index
+        ids = [row[0] for row in self.reader.execute(
+            "SELECT id FROM names WHERE name_key >= ? AND name_key < ? "
+            "ORDER BY length(name_key), name_key LIMIT ?",
+            (needle, needle + '\U0010ffff', limit)
+        )]
+
+        if len(ids) < limit:
+            ids += self.substring_ids(needle, limit - len(ids), set(ids))
+
+        if not ids:
+            return []
+        rows = self.reader.execute(
+            "SELECT n.id, r.id, r.schema, r.name, c.name FROM names n "
+            "JOIN relations r ON r.id = n.relation_id "
+            "LEFT JOIN columns c ON c.relation_id = n.relation_id AND c.position = n.position "
+            f"WHERE n.id IN ({','.join('?' * len(ids))})",
+            ids
+        ).fetchall()
+        by_id = {row[0]: row[1:] for row in rows}
+        return [by_id[name_id] for name_id in ids if name_id in by_id]
+
+    def substring_ids(self, needle, limit, exclude):
+        """Name ids containing needle (not as a prefix)"""
+        if self.trigrams and len(needle) >= 3:
+            # The trigram index narrows candidates; LIKE wildcards in the needle are re-checked below
+            candidates = self.reader.execute(
+                "SELECT g.rowid, n.name_key FROM name_grams g JOIN names n ON n.id = g.rowid "
+                "WHERE g.name LIKE ? LIMIT ?",
+                (f"%{needle}%", limit * 4 + len(exclude))
+            )
+        else:
+            candidates = self.reader.execute(
+                "SELECT id, name_key FROM names WHERE instr(name_key, ?) > 0 LIMIT ?",
+                (needle, limit * 4 + len(exclude))
+            )
+        matches = [
+            (len(key), key, name_id) for name_id, key in candidates
+            if name_id not in exclude and needle in key
+        ]
+        matches.sort()
+        return [name_id for _, _, name_id in matches[:limit]]
@@ -0,0 +1,396 @@
+"""
+Columnar Results
+Query results held as NumPy column arrays with dictionary-encoded strings and null masks
+"""
+
+import threading
+from decimal import Decimal
+import numpy as np
+
+
+INT, FLOAT, STR = 'int', 'float', 'str'
+
+INT_TYPES = {bool, int, np.int64, np.int32, np.int16, np.int8}
+FLOAT_TYPES = INT_TYPES | {float, Decimal, np.float64, np.float32}
+
+FILTER_OPS = ('=', '!=', '<', '<=', '>', '>=', 'contains', 'is null', 'is not null')
+
+NUMERIC_OPS = {
+    '=': np.equal,
+    '!=': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+
+def distinct_counts(values):
+    """Distinct values and their counts via one sort (faster than np.unique here)"""
+    if not len(values):
+        return values, np.zeros(0, dtype=np.int64)
+    ordered = np.sort(values)
+    starts = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+    counts = np.diff(np.append(starts, len(ordered)))
+    return ordered[starts], counts
+
+
+def infer_kind(value):
+    """Column kind for the first non-null value seen"""
+    if isinstance(value, (bool, int, np.integer)):
+        return INT
+    if isinstance(value, (float, Decimal, np.floating)):
+        return FLOAT
+    return STR
+
+
+class Column:
+    """One result column: a growable value array plus a null mask
+
+    Strings (and any value without a numeric kind, e.g. timestamps) are
+    dictionary-encoded: the array holds int32 codes into self.dictionary.
+    """
+
+    def __init__(self, name, capacity=1024):
+        self.name = name
+        self.kind = None
+        self.length = 0
+        self.data = None
+        self.nulls = np.zeros(capacity, dtype=bool)
+        self.dictionary = []
+        self.lookup = {}
+
+    def reserve(self, needed):
+        """Grow the arrays geometrically so appends stay amortized O(1)"""
+        capacity = len(self.nulls)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.nulls = np.resize(self.nulls, capacity)
+        if self.data is not None:
+            self.data = np.resize(self.data, capacity)
+
+    def dtype(self):
+        return {INT: np.int64, FLOAT: np.float64, STR: np.int32}[self.kind]
+
+    def append(self, values):
+        """Append a batch of Python values"""
+        count = len(values)
+        if self.kind is None:
+            first = next((value for value in values if value is not None), None)
+            if first is None:
+                self.reserve(self.length + count)
+                self.nulls[self.length:self.length + count] = True
+                self.length += count
+                return
+            self.kind = infer_kind(first)
+            self.data = np.zeros(len(self.nulls), dtype=self.dtype())
+
+        self.reserve(self.length + count)
+        start, end = self.length, self.length + count
+        nulls = np.fromiter((value is None for value in values), dtype=bool, count=count)
+
+        if self.kind == STR:
+            encoded = self.encode(values)
+        else:
+            types = set(map(type, values))
+            types.discard(type(None))
+            if self.kind == INT and not types <= INT_TYPES:
+                self.promote(FLOAT if types <= FLOAT_TYPES else STR)
+                return self.append(values)
+            if self.kind == FLOAT and not types <= FLOAT_TYPES:
+                self.promote(STR)
+                return self.append(values)
+            try:
+                encoded = np.fromiter(
+                    (0 if value is None else value for value in values),
+                    dtype=self.dtype(),
+                    count=count
+                )
+            except OverflowError:
+                # Integers beyond 64 bits are kept exactly, as text
+                self.promote(STR)
+                return self.append(values)
+
+        self.data[start:end] = encoded
+        self.nulls[start:end] = nulls
+        self.length = end
+
+    def encode(self, values):
+        """Dictionary-encode a batch of values"""
+        lookup, dictionary = self.lookup, self.dictionary
+        codes = np.empty(len(values), dtype=np.int32)
+        for position, value in enumerate(values):
+            if value is None:
+                codes[position] = 0
+                continue
+            if not isinstance(value, str):
+                value = str(value)
+            code = lookup.get(value)
+            if code is None:
+                code = len(dictionary)
+                lookup[value] = code
+                dictionary.append(value)
+            codes[position] = code
+        return codes
+
+    def promote(self, kind):
+        """Widen the column kind when a batch does not fit (int -> float -> str)"""
+        existing = self.data[:self.length]
+        if kind == FLOAT:
+            self.kind = FLOAT
+            self.data = np.zeros(len(self.nulls), dtype=np.float64)
+            self.data[:self.length] = existing
+            return
+
+        previous = [None if null else value.item() for value, null in zip(existing, self.nulls[:self.length])]
+        self.kind = STR
+        self.data = np.zeros(len(self.nulls), dtype=np.int32)
+        self.data[:self.length] = self.encode(previous)
+
+    def values(self):
+        """The filled part of the value array"""
+        return self.data[:self.length] if self.data is not None else np.zeros(self.length)
+
+    def null_mask(self):
+        """The filled part of the null mask"""
+        return self.nulls[:self.length]
+
+    def value_at(self, index):
+        """Python value of one cell"""
+        if self.kind is None or self.nulls[index]:
+            return None
+        value = self.data[index]
+        if self.kind == STR:
+            return self.dictionary[value]
+        return value.item()
+
+    def dictionary_ranks(self):
+        """Sort rank of every dictionary entry"""
+        ranks = np.empty(len(self.dictionary), dtype=np.int32)
+        ranks[np.argsort(np.array(self.dictionary, dtype=object), kind='stable')] = np.arange(
+            len(self.dictionary), dtype=np.int32
+        )
+        return ranks
+
+    def sort_key(self):
+        """An array whose order matches the column's value order"""
+        return self.sort_key_for(self.values())
+
+    def sort_key_for(self, values):
+        """Sort keys for the given stored values (codes are mapped to ranks)"""
+        if self.kind != STR or not self.dictionary:
+            return values
+        # Rank dictionary entries once, then map codes to ranks vectorized
+        return self.dictionary_ranks()[values]
+
+    def memory_bytes(self):
+        """Bytes held by the arrays and dictionary"""
+        total = self.nulls.nbytes + (self.data.nbytes if self.data is not None else 0)
+        return total + sum(len(value) + 49 for value in self.dictionary)
+
+
+class ColumnarResult:
+    """A query result stored column-wise, with a sorted/filtered view order
+
+    Appends come from a fetch thread while the grid reads the visible window,
+    so both go through a lock. rows(start, stop) materializes tuples for the
+    visible window only.
+    """
+
+    def __init__(self, columns=()):
+        self.lock = threading.Lock()
+        self.set_columns(columns)
+
+    def set_columns(self, columns):
+        """Reset the result with a new column list"""
+        with self.lock:
+            self.columns = list(columns)
+            self.data = [Column(name) for name in self.columns]
+            self.length = 0
+            self.order = None
+
+    @classmethod
+    def from_columns(cls, data, length):
+        """A result over filled Column objects; they must not be appended to afterwards"""
+        result = cls()
+        result.columns = [column.name for column in data]
+        result.data = list(data)
+        result.length = length
+        return result
+
+    def share(self):
+        """A result over the same columns with its own sort and filter"""
+        with self.lock:
+            return ColumnarResult.from_columns(self.data, self.length)
+
+    def __len__(self):
+        return self.length if self.order is None else len(self.order)
+
+    @property
+    def row_count(self):
+        """Rows stored, ignoring any filter"""
+        return self.length
+
+    def append(self, rows):
+        """Append a batch of row tuples (fetch thread)"""
+        if not rows:
+            return
+        with self.lock:
+            if not self.data:
+                self.columns = [f"column{index + 1}" for index in range(len(rows[0]))]
+                self.data = [Column(name) for name in self.columns]
+            for column, values in zip(self.data, zip(*rows)):
+                column.append(values)
+            self.length += len(rows)
+
+    def rows(self, start, stop):
+        """Materialize rows [start, stop) of the current view"""
+        with self.lock:
+            stop = min(stop, len(self))
+            if start >= stop:
+                return []
+            if self.order is None:
+                indexes = range(start, stop)
+            else:
+                indexes = self.order[start:stop].tolist()
+            return [tuple(column.value_at(index) for column in self.data) for index in indexes]
+
+    def view_indexes(self):
+        """Row indexes of the current view"""
+        return np.arange(self.length) if self.order is None else self.order
+
+    def sort(self, column_index, descending=False):
+        """Sort the current view by one column, nulls last
+
+        Re-sorting an already sorted or filtered view uses a stable sort, so
+        ties keep the previous order (click B, then A, to sort by A then B).
+        """
+        with self.lock:
+            column = self.data[column_index]
+            kind = 'stable' if self.order is not None else 'quicksort'
+            key = column.sort_key()
+            if descending:
+                # Negated keys keep ties in their original order
+                key = -key if column.kind != STR else key.max(initial=0) - key
+
+            nulls = column.null_mask()
+            if self.order is None and not nulls.any():
+                # Common case: no view yet and no nulls, sort the column directly
+                self.order = np.argsort(key, kind=kind)
+                return
+
+            indexes = self.view_indexes()
+            view_nulls = nulls[indexes]
+            present = indexes[~view_nulls]
+            perm = np.argsort(key[present], kind=kind)
+            self.order = np.concatenate([present[perm], indexes[view_nulls]])
+
+    def view_column(self, column):
+        """(values, nulls) of a column in view order; no copy when the view is unsorted"""
+        values, nulls = column.values(), column.null_mask()
+        if self.order is None:
+            return values, nulls
+        return values[self.order], nulls[self.order]
+
+    def filter(self, column_index, op, value=None):
+        """Restrict the view to rows where the column matches; returns the match count"""
+        with self.lock:
+            column = self.data[column_index]
+            values, nulls = self.view_column(column)
+
+            if op == 'is null':
+                mask = nulls
+            elif op == 'is not null':
+                mask = ~nulls
+            elif column.kind is None:
+                mask = np.zeros(len(nulls), dtype=bool)
+            elif column.kind == STR:
+                mask = ~nulls & self.match_dictionary(column, op, value)[values]
+            else:
+                if op == 'contains':
+                    raise ValueError("'contains' only applies to text columns")
+                target = float(value)
+                mask = ~nulls & NUMERIC_OPS[op](values, target)
+
+            matches = np.flatnonzero(mask)
+            self.order = matches if self.order is None else self.order[matches]
+            return len(self.order)
+
+    def match_dictionary(self, column, op, value):
+        """Evaluate a filter once per distinct string instead of once per row"""
+        dictionary = column.dictionary
+        if not dictionary:
+            return np.zeros(1, dtype=bool)
+        text = '' if value is None else str(value)
+        if op == 'contains':
+            needle = text.lower()
+            return np.fromiter((needle in entry.lower() for entry in dictionary), dtype=bool, count=len(dictionary))
+        compare = {
+            '=': lambda entry: entry == text,
+            '!=': lambda entry: entry != text,
+            '<': lambda entry: entry < text,
+            '<=': lambda entry: entry <= text,
+            '>': lambda entry: entry > text,
+            '>=': lambda entry: entry >= text,
+        }[op]
+        return np.fromiter((compare(entry) for entry in dictionary), dtype=bool, count=len(dictionary))
+
+    def reset_view(self):
+        """Drop any sort or filter"""
+        with self.lock:
+            self.order = None
+
+    def present_values(self, column):
+        """Non-null values of a column in the current view, plus the null count"""
+        values, nulls = self.view_column(column)
+        null_count = int(np.count_nonzero(nulls))
+        return (values[~nulls] if null_count else values), null_count
+
+    def group_by(self, column_index, limit=20):
+        """Counts per distinct value over the current view, most frequent first"""
+        with self.lock:
+            column = self.data[column_index]
+            present, null_count = self.present_values(column)
+            values, counts = distinct_counts(present)
+            top = np.argsort(-counts, kind='stable')[:limit]
+            if column.kind == STR:
+                groups = [(column.dictionary[values[i]], int(counts[i])) for i in top]
+            else:
+                groups = [(values[i].item(), int(counts[i])) for i in top]
+            if null_count:
+                groups.append((None, null_count))
+            return groups
+
+    def summary(self, column_index):
+        """Min, max, mean, distinct and null counts over the current view"""
+        with self.lock:
+            column = self.data[column_index]
+            values, null_count = self.present_values(column)
+            distinct = distinct_counts(values)[0]
+            result = {
+                'column': column.name,
+                'kind': column.kind,
+                'count': int(len(values)),
+                'nulls': null_count,
+                'distinct': len(distinct),
+                'min': None,
+                'max': None,
+                'mean': None,
+            }
+            if len(values):
+                if column.kind == STR:
+                    # Only the distinct codes need ranking for min/max
+                    ranks = column.sort_key_for(distinct)
+                    result['min'] = column.dictionary[distinct[np.argmin(ranks)]]
+                    result['max'] = column.dictionary[distinct[np.argmax(ranks)]]
+                else:
+                    result['min'] = distinct[0].item()
+                    result['max'] = distinct[-1].item()
+                    result['mean'] = float(values.mean())
+            return result
+
+    def memory_bytes(self):
+        """Approximate bytes held by all columns"""
+        return sum(column.memory_bytes() for column in self.data)
@@ -0,0 +1,873 @@
+"""
+Bulk Import
+CSV, JSONL and Parquet files parsed in parallel chunks and streamed into a table with COPY or batched inserts
+"""
+
+import codecs
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime
+from itertools import repeat
+from core.database.backends import quote_identifier, quote_table
+
+
+FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'csv',
+    '.txt': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.json': 'jsonl',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+
+# Tried in this order on the sampled values of a column; the first that accepts them all wins
+KINDS = ('integer', 'float', 'boolean', 'date', 'timestamp')
+
+COLUMN_TYPES = {
+    'postgres': {
+        'integer': 'bigint',
+        'float': 'double precision',
+        'boolean': 'boolean',
+        'date': 'date',
+        'timestamp': 'timestamp',
+        'timestamptz': 'timestamptz',
+        'json': 'jsonb',
+        'text': 'text',
+    },
+    'sqlite': {
+        'integer': 'INTEGER',
+        'float': 'REAL',
+        'boolean': 'BOOLEAN',
+        'date': 'DATE',
+        'timestamp': 'TIMESTAMP',
+        'timestamptz': 'TIMESTAMP',
+        'json': 'TEXT',
+        'text': 'TEXT',
+    },
+}
+
+TRUE_WORDS = frozenset(('true', 't', 'yes', 'y'))
+FALSE_WORDS = frozenset(('false', 'f', 'no', 'n'))
+BIGINT_MIN, BIGINT_MAX = -2 ** 63, 2 ** 63 - 1
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+COPY_BOOLEANS = {True: 't', False: 'f'}
+BOOLEAN_WORDS = dict.fromkeys(TRUE_WORDS, True) | dict.fromkeys(FALSE_WORDS, False)
+UNSAFE_NAME = re.compile(r'[^\w.-]+')
+
+# Per-process state of a pool worker, set up once by init_worker
+worker = {}
+
+
+def init_worker(cancelled):
+    worker['cancelled'] = cancelled
+
+
+class ImportCancelled(Exception):
+    """Raised inside the load loop when the import is cancelled"""
+
+
+def load_parquet():
+    """Import pyarrow.parquet on first use"""
+    try:
+        import pyarrow.parquet as parquet
+    except ImportError:
+        raise RuntimeError("Parquet import requires 'pyarrow' to be installed") from None
+    return parquet
+
+
+def detect_format(path):
+    """csv, jsonl or parquet from a file's extension (csv when unknown)"""
+    return FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+# Value conversion: each function returns the value to load or raises ValueError/TypeError
+
+def to_integer(value):
+    if isinstance(value, bool):
+        raise ValueError(f"{value!r} is not an integer")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{value!r} is not an integer")
+        value = int(value)
+    number = value if isinstance(value, int) else int(value)
+    if not BIGINT_MIN <= number <= BIGINT_MAX:
+        raise ValueError(f"{value!r} is out of range")
+    return number
+
+
+def to_float(value):
+    if isinstance(value, bool):
+        raise ValueError(f"{value!r} is not a number")
+    return float(value)
+
+
+def to_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        word = value.strip().lower()
+        if word in TRUE_WORDS:
+            return True
+        if word in FALSE_WORDS:
+            return False
+    elif isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    raise ValueError(f"{value!r} is not a boolean")
+
+
+def to_date(value):
+    if isinstance(value, datetime):
+        raise ValueError(f"{value!r} is not a date")
+    if isinstance(value, date):
+        return value.isoformat()
+    return date.fromisoformat(value).isoformat()
+
+
+def parse_timestamp(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(value)
+
+
+def to_timestamp(value):
+    return parse_timestamp(value).isoformat(' ')
+
+
+def to_json(value):
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+def to_text(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return to_json(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+CONVERTERS = {
+    'integer': to_integer,
+    'float': to_float,
+    'boolean': to_boolean,
+    'date': to_date,
+    'timestamp': to_timestamp,
+    'timestamptz': to_timestamp,
+    'json': to_json,
+    'text': to_text,
+}
+
+CONVERSION_ERRORS = (ValueError, TypeError, OverflowError)
+
+
+def copy_converter(kind):
+    """Converter of a column kind to COPY text format"""
+    convert = CONVERTERS[kind]
+    if kind == 'boolean':
+        return lambda value: 't' if convert(value) else 'f'
+    if kind in ('json', 'text'):
+        return lambda value: convert(value).translate(COPY_ESCAPES)
+    return lambda value: str(convert(value))
+
+
+def infer_kind(values):
+    """Narrowest column kind that accepts every sampled value (None and '' are nulls)"""
+    values = [value for value in values if value is not None and value != '']
+    if not values:
+        return 'text'
+    if any(isinstance(value, (dict, list)) for value in values):
+        return 'json'
+    for kind in KINDS:
+        convert = CONVERTERS[kind]
+        try:
+            for value in values:
+                convert(value)
+        except CONVERSION_ERRORS:
+            continue
+        if kind == 'timestamp' and any(parse_timestamp(value).tzinfo is not None for value in values):
+            return 'timestamptz'
+        return kind
+    return 'text'
+
+
+def column_names(names):
+    """Header names made unique, with blanks replaced by column_N"""
+    seen = set()
+    result = []
+    for index, name in enumerate(names, 1):
+        name = str(name).strip() or f"column_{index}"
+        unique = name
+        suffix = 2
+        while unique.lower() in seen:
+            unique = f"{name}_{suffix}"
+            suffix += 1
+        seen.add(unique.lower())
+        result.append(unique)
+    return result
+
+
+# Sampling
+
+def read_sample(path, size):
+    """Leading bytes of a file cut at the last whole line, and whether that is the whole file"""
+    with open(path, 'rb') as handle:
+        data = handle.read(size + 1)
+    if len(data) <= size:
+        return data, True
+    data = data[:size]
+    return data[:data.rfind(b'\n') + 1] or data, False
+
+
+def inspect_csv(path, settings, header):
+    data, whole = read_sample(path, settings['sample_bytes'])
+    text = data.decode(settings['encoding'], errors='replace')
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    if path.lower().endswith('.tsv'):
+        delimiter, quotechar = '\t', '"'
+    else:
+        try:
+            dialect = csv.Sniffer().sniff(text[:64 * 1024], delimiters=',;\t|')
+            delimiter, quotechar = dialect.delimiter, dialect.quotechar or '"'
+        except csv.Error:
+            delimiter, quotechar = ',', '"'
+
+    reader = csv.reader(io.StringIO(text, newline=''), delimiter=delimiter, quotechar=quotechar)
+    records = []
+    multiline = False
+    for read, fields in enumerate(reader, 1):
+        # A quoted field spanning lines cannot be split on newline boundaries
+        multiline = multiline or reader.line_num > read
+        if not fields:
+            continue
+        records.append(fields)
+        if len(records) > settings['sample_rows']:
+            break
+    if not records:
+        raise ValueError(f"{os.path.basename(path)} has no rows")
+    width = max(len(fields) for fields in records)
+    if header:
+        names = column_names(records[0] + [''] * (width - len(records[0])))
+        records = records[1:]
+    else:
+        names = column_names([''] * width)
+    kinds = [infer_kind([fields[index] for fields in records if index < len(fields)]) for index in range(width)]
+    return {
+        'names': names,
+        'kinds': kinds,
+        'sample': records,
+        'delimiter': delimiter,
+        'quotechar': quotechar,
+        'multiline': multiline and not whole,
+    }
+
+
+def inspect_jsonl(path, settings):
+    data, _ = read_sample(path, settings['sample_bytes'])
+    objects = []
+    for line in data.split(b'\n'):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            objects.append(value)
+            if len(objects) >= settings['sample_rows']:
+                break
+    if not objects:
+        raise ValueError(f"{os.path.basename(path)} has no JSON objects")
+    # Keys in order of first appearance
+    names = list(dict.fromkeys(key for value in objects for key in value))
+    records = [[value.get(name) for name in names] for value in objects]
+    return {
+        'names': names,
+        'kinds': [infer_kind([fields[index] for fields in records]) for index in range(len(names))],
+        'sample': records,
+    }
+
+
+def inspect_parquet(path, settings):
+    parquet_file = load_parquet().ParquetFile(path)
+    names = parquet_file.schema_arrow.names
+    records = []
+    for batch in parquet_file.iter_batches(batch_size=settings['sample_rows']):
+        records = [[row[name] for name in names] for row in batch.to_pylist()]
+        break
+    metadata = parquet_file.metadata
+    return {
+        'names': names,
+        'kinds': [infer_kind([fields[index] for fields in records]) for index in range(len(names))],
+        'sample': records,
+        'row_groups': [metadata.row_group(group).total_byte_size for group in range(metadata.num_row_groups)],
+    }
+
+
+def inspect_file(path, settings, header=True):
+    """Format, column names, inferred kinds and sample records of a file to import
+
+    The kinds come from the first sample_rows records; rows further down
+    that do not fit them are rejected at load time, not loaded as text.
+    """
+    file_format = detect_format(path)
+    if file_format == 'parquet':
+        preview = inspect_parquet(path, settings)
+    elif file_format == 'jsonl':
+        preview = inspect_jsonl(path, settings)
+    else:
+        preview = inspect_csv(path, settings, header)
+    preview.update(path=path, format=file_format, size=os.path.getsize(path), header=header)
+    return preview
+
+
+def default_table_name(path):
+    """Table name suggested for a file: its base name without extension"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r'\W+', '_', name).strip('_').lower() or 'imported'
+
+
+# Pool tasks
+
+def read_range(path, start, end):
+    """Bytes of the whole lines that start in [start, end) of a file"""
+    with open(path, 'rb') as handle:
+        if start > 0:
+            # A line starting before the range belongs to the previous chunk
+            handle.seek(start - 1)
+            data = handle.read(end - start + 1)
+            newline = data.find(b'\n')
+            if newline < 0:
+                return b''
+            data = data[newline + 1:]
+        else:
+            data = handle.read(end - start)
+            if data.startswith(codecs.BOM_UTF8):
+                data = data[len(codecs.BOM_UTF8):]
+        if data and not data.endswith(b'\n'):
+            # Finish the last line, which may run past the range
+            tail = []
+            while True:
+                block = handle.read(64 * 1024)
+                if not block:
+                    break
+                newline = block.find(b'\n')
+                if newline >= 0:
+                    tail.append(block[:newline + 1])
+                    break
+                tail.append(block)
+            data += b''.join(tail)
+    return data
+
+
+def csv_records(data, options, skip_header):
+    """(line in chunk, fields) of the CSV records in a chunk"""
+    text = data.decode(options['encoding'], errors='replace')
+    reader = csv.reader(io.StringIO(text, newline=''),
+                        delimiter=options['delimiter'], quotechar=options['quotechar'])
+    if skip_header:
+        next(reader, None)
+    for fields in reader:
+        if fields:
+            yield reader.line_num, fields
+
+
+def jsonl_records(data, names, rejects):
+    """(line in chunk, fields) of the JSON objects in a chunk; other lines are rejected"""
+    for line, text in enumerate(data.split(b'\n'), 1):
+        if not text.strip():
+            continue
+        try:
+            value = json.loads(text)
+        except ValueError as error:
+            rejects.append((line, f"invalid JSON: {error}", text.decode('utf-8', 'replace')))
+            continue
+        if not isinstance(value, dict):
+            rejects.append((line, "not a JSON object", text.decode('utf-8', 'replace')))
+            continue
+        yield line, [value.get(name) for name in names]
+
+
+def parquet_records(path, group, names):
+    """(row in group, fields) of one Parquet row group"""
+    table = load_parquet().ParquetFile(path).read_row_group(group, columns=names)
+    columns = [table.column(name).to_pylist() for name in names]
+    return enumerate(zip(*columns), 1)
+
+
+def conversion_error(names, converters, fields):
+    """Which column of a rejected record failed and why"""
+    for name, convert, value in zip(names, converters, fields):
+        if value is None or value == '':
+            continue
+        try:
+            convert(value)
+        except CONVERSION_ERRORS as error:
+            return f"{name}: {error}"
+    return "conversion failed"
+
+
+def encode_records(records, names, kinds, copy, empty_null, rejects):
+    """Rows of (line, fields) records converted one record at a time
+
+    The slow path: used when a chunk has a record that the column-wise
+    conversion cannot take, and the one that finds out which records those
+    are. Returns COPY text lines when copy is set, else tuples for
+    executemany; records that do not fit are appended to rejects.
+    """
+    converters = [copy_converter(kind) if copy else CONVERTERS[kind] for kind in kinds]
+    width = len(converters)
+    null = '\\N' if copy else None
+    rows = []
+    for line, fields in records:
+        if len(fields) != width:
+            rejects.append((line, f"expected {width} fields, got {len(fields)}", fields))
+            continue
+        try:
+            if empty_null:
+                row = [null if value == '' else convert(value) for convert, value in zip(converters, fields)]
+            else:
+                row = [null if value is None else convert(value) for convert, value in zip(converters, fields)]
+        except CONVERSION_ERRORS:
+            rejects.append((line, conversion_error(names, converters, fields), fields))
+            continue
+        rows.append('\t'.join(row) if copy else tuple(row))
+    return rows
+
+
+def convert_column(kind, values, copy, text_input):
+    """One column of a chunk converted with builtins mapped over it
+
+    Handles the common cases only (CSV text without nulls, whitespace or
+    odd spellings) and raises for anything else, which sends the chunk
+    through encode_records.
+    """
+    if text_input and kind != 'json' and '' not in values:
+        if kind == 'integer':
+            numbers = list(map(int, values))
+            if min(numbers) < BIGINT_MIN or max(numbers) > BIGINT_MAX:
+                raise ValueError("out of range")
+            return list(map(str, numbers)) if copy else numbers
+        if kind == 'float':
+            numbers = list(map(float, values))
+            return list(map(str, numbers)) if copy else numbers
+        if kind == 'boolean':
+            flags = list(map(BOOLEAN_WORDS.__getitem__, map(str.lower, values)))
+            return list(map(COPY_BOOLEANS.__getitem__, flags)) if copy else flags
+        if kind == 'date':
+            return list(map(date.isoformat, map(date.fromisoformat, values)))
+        if kind in ('timestamp', 'timestamptz'):
+            return list(map(datetime.isoformat, map(datetime.fromisoformat, values), repeat(' ')))
+        if not copy:
+            return values
+        joined = ''.join(values)
+        if '\\' in joined or '\t' in joined or '\n' in joined or '\r' in joined:
+            return [value.translate(COPY_ESCAPES) for value in values]
+        return values
+    null = '\\N' if copy else None
+    empty = '' if text_input else None
+    convert = copy_converter(kind) if copy else CONVERTERS[kind]
+    if empty not in values:
+        return list(map(convert, values))
+    return [null if value == empty else convert(value) for value in values]
+
+
+def encode_rows(records, names, kinds, copy, text_input, rejects):
+    """Rows of (line, fields) records converted to their column kinds
+
+    Records are converted a column at a time, which keeps the per-value
+    work in C for the common column kinds; a chunk with any record that
+    does not fit is redone record by record to reject just those.
+    Returns COPY text lines when copy is set, else tuples for executemany.
+    """
+    records = list(records)
+    width = len(kinds)
+    if set(len(fields) for _, fields in records) - {width}:
+        for line, fields in records:
+            if len(fields) != width:
+                rejects.append((line, f"expected {width} fields, got {len(fields)}", fields))
+        records = [record for record in records if len(record[1]) == width]
+    if not records:
+        return []
+    try:
+        columns = [convert_column(kind, values, copy, text_input)
+                   for kind, values in zip(kinds, zip(*(fields for _, fields in records)))]
+    except CONVERSION_ERRORS + (KeyError,):
+        return encode_records(records, names, kinds, copy, text_input, rejects)
+    if copy:
+        return list(map('\t'.join, zip(*columns)))
+    return list(zip(*columns))
+
+
+def parse_task(job_id, path, file_format, start, end, options):
+    """Parse one chunk of a file into loadable rows (pool worker)
+
+    A chunk is a byte range split on newline boundaries, or a row group of
+    a Parquet file. Returns the payload (COPY text bytes or a list of
+    tuples), its row count, the rejected records with their line within
+    the chunk, and the number of lines the chunk covers so the loader can
+    turn those into file line numbers.
+    """
+    result = {'payload': b'' if options['copy'] else [], 'rows': 0, 'rejects': [], 'lines': 0}
+    if worker['cancelled'].value >= job_id:
+        return result
+
+    names = options['names']
+    rejects = result['rejects']
+    if file_format == 'parquet':
+        records = list(parquet_records(path, start, names))
+        result['lines'] = len(records)
+    else:
+        data = read_range(path, start, end)
+        result['lines'] = data.count(b'\n') + (0 if not data or data.endswith(b'\n') else 1)
+        if file_format == 'jsonl':
+            records = jsonl_records(data, names, rejects)
+        else:
+            records = csv_records(data, options, start == 0 and options['header'])
+    rows = encode_rows(records, names, options['kinds'], options['copy'], file_format == 'csv', rejects)
+
+    result['rows'] = len(rows)
+    if options['copy']:
+        result['payload'] = ('\n'.join(rows) + '\n').encode('utf-8') if rows else b''
+    else:
+        result['payload'] = rows
+    return result
+
+
+def create_table_sql(table, names, kinds, backend_name):
+    """CREATE TABLE IF NOT EXISTS for the inferred columns"""
+    types = COLUMN_TYPES.get(backend_name, COLUMN_TYPES['postgres'])
+    columns = ', '.join(f"{quote_identifier(name)} {types[kind]}" for name, kind in zip(names, kinds))
+    return f"CREATE TABLE IF NOT EXISTS {quote_table(table)} ({columns})"
+
+
+class ImportProgress:
+    """Counters of a bulk import"""
+
+    __slots__ = ('profile', 'table', 'path', 'phase', 'bytes', 'parsed', 'chunks', 'chunks_done',
+                 'rows', 'committed', 'rejected', 'rejects_path', 'started', 'finished', 'error')
+
+    def __init__(self, profile, table, path, size):
+        self.profile = profile
+        self.table = table
+        self.path = path
+        self.phase = 'loading'
+        self.bytes = size
+        self.parsed = 0
+        self.chunks = 0
+        self.chunks_done = 0
+        self.rows = 0
+        self.committed = 0
+        self.rejected = 0
+        self.rejects_path = None
+        self.started = time.monotonic()
+        self.finished = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def fraction(self):
+        return self.parsed / self.bytes if self.bytes else 1.0
+
+    def snapshot(self):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(elapsed=self.elapsed, rows_per_second=self.rows_per_second, fraction=self.fraction)
+        return values
+
+
+class ImportJob:
+    """One import: chunks parsed in the pool, loaded in file order on a pooled connection
+
+    load() runs on a connection pool executor thread and is the
+    coordinator: it keeps at most max_in_flight chunks parsing or parsed
+    and waiting, so a slow database holds the parsers back instead of
+    filling memory. Rejected records go to a JSONL file in
+    rejects_directory with their line number in the file, and do not stop
+    the load until more than max_rejects of them pile up.
+    """
+
+    def __init__(self, job_id, profile, table, preview, pool, workers, cancelled, settings, on_progress=None,
+                 on_commit=None):
+        self.job_id = job_id
+        self.profile = profile
+        self.table = table
+        self.preview = preview
+        self.pool = pool
+        self.workers = workers
+        self.cancelled = cancelled
+        self.settings = settings
+        self.on_progress = on_progress
+        self.on_commit = on_commit
+        self.progress = ImportProgress(profile, table, preview['path'], preview['size'])
+        self.cancel_event = threading.Event()
+        self.rejects_file = None
+        self.exhausted = False
+        self.last_notify = time.monotonic()
+        self.future = None
+
+    def cancel(self):
+        self.cancel_event.set()
+        # Queued tasks poll the newest cancelled job id
+        self.cancelled.value = max(self.cancelled.value, self.job_id)
+
+    @property
+    def running(self):
+        return self.progress.finished is None
+
+    def notify(self):
+        if self.on_progress:
+            self.on_progress(self.progress.snapshot())
+
+    def chunks(self):
+        """(start, end, bytes) of every chunk; a CSV with multi-line fields is one chunk"""
+        preview = self.preview
+        if preview['format'] == 'parquet':
+            return [(group, group + 1, size) for group, size in enumerate(preview['row_groups'])]
+        size = preview['size']
+        if preview.get('multiline'):
+            return [(0, size, size)]
+        chunk_bytes = self.settings['chunk_mb'] * 1024 * 1024
+        return [(start, min(size, start + chunk_bytes), min(size, start + chunk_bytes) - start)
+                for start in range(0, max(size, 1), chunk_bytes)]
+
+    def reject(self, line_base, rejects):
+        """Append rejected records to the rejects file, opened on the first one"""
+        if self.rejects_file is None:
+            directory = self.settings['rejects_directory']
+            os.makedirs(directory, exist_ok=True)
+            name = UNSAFE_NAME.sub('_', self.table)
+            path = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.rejects.jsonl")
+            self.rejects_file = open(path, 'w', encoding='utf-8')
+            self.progress.rejects_path = path
+        self.rejects_file.writelines(
+            json.dumps({'line': line_base + line, 'error': error, 'record': record}, default=str) + '\n'
+            for line, error, record in rejects
+        )
+
+    def batches(self, copy):
+        """Parse results in file order, parsing at most max_in_flight chunks ahead"""
+        settings = self.settings
+        progress = self.progress
+        preview = self.preview
+        options = {
+            'names': preview['names'],
+            'kinds': preview['kinds'],
+            'copy': copy,
+            'header': preview['header'],
+            'delimiter': preview.get('delimiter', ','),
+            'quotechar': preview.get('quotechar', '"'),
+            'encoding': settings['encoding'],
+        }
+        pending = deque(self.chunks())
+        progress.chunks = len(pending)
+        window = settings['max_in_flight'] or self.workers * 2
+        in_flight = deque()
+        line_base = 0
+        while pending or in_flight:
+            while pending and len(in_flight) < window:
+                start, end, size = pending.popleft()
+                future = self.pool.submit(parse_task, self.job_id, preview['path'], preview['format'],
+                                          start, end, options)
+                in_flight.append((future, size))
+            future, size = in_flight.popleft()
+            result = future.result()
+            if self.cancel_event.is_set():
+                raise ImportCancelled()
+            if result['rejects']:
+                self.reject(line_base, result['rejects'])
+                progress.rejected += len(result['rejects'])
+                if progress.rejected > settings['max_rejects']:
+                    raise RuntimeError(f"More than {settings['max_rejects']:,} rejected records")
+            line_base += result['lines']
+            result['bytes'] = size
+            yield result
+
+    def transaction(self, results):
+        """Payloads of the next transaction_rows rows; sets exhausted after the last one"""
+        progress = self.progress
+        limit = self.settings['transaction_rows'] or float('inf')
+        interval = self.settings['progress_interval_ms'] / 1000
+        rows = 0
+        for result in results:
+            yield result['payload']
+            rows += result['rows']
+            progress.rows += result['rows']
+            progress.parsed += result['bytes']
+            progress.chunks_done += 1
+            now = time.monotonic()
+            if now - self.last_notify >= interval:
+                self.notify()
+                self.last_notify = now
+            if rows >= limit:
+                return
+        self.exhausted = True
+
+    def load(self, connection, backend):
+        """Create the table if needed and stream every chunk into it (pool executor thread)
+
+        Each transaction_rows rows are one bulk_load call and so one
+        committed transaction: a cancel or failure keeps the committed
+        ones and rolls back the rest.
+        """
+        progress = self.progress
+        preview = self.preview
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(create_table_sql(self.table, preview['names'], preview['kinds'], backend.name))
+            finally:
+                cursor.close()
+            results = self.batches(backend.load_format == 'copy')
+            while not self.exhausted:
+                backend.bulk_load(connection, self.table, preview['names'], self.transaction(results))
+                if progress.rows > progress.committed:
+                    progress.committed = progress.rows
+                    if self.on_commit:
+                        self.on_commit(self.profile, self.table)
+                    self.notify()
+            progress.phase = 'complete'
+        except ImportCancelled:
+            progress.phase = 'cancelled'
+        except Exception as error:
+            progress.phase = 'failed'
+            progress.error = str(error)
+        finally:
+            self.finish()
+        return progress.snapshot()
+
+    def finish(self):
+        # Chunks still queued skip their work
+        self.cancel()
+        if self.rejects_file is not None:
+            self.rejects_file.close()
+        if self.progress.finished is None:
+            self.progress.finished = time.monotonic()
+            self.notify()
+
+    def settle(self, future):
+        """Record a load that never started, e.g. when the connection failed"""
+        error = future.exception()
+        if error is not None and self.progress.finished is None:
+            self.progress.phase = 'failed'
+            self.progress.error = str(error)
+            self.finish()
+
+
+class BulkImporter:
+    """Runs bulk imports on a process pool that lives across imports
+
+    inspect() samples a file off the Tk thread; start() loads it into a
+    table of a connection profile, parsing on the pool and writing on a
+    pooled connection: COPY FROM STDIN for Postgres, executemany batches
+    for SQLite, committed every transaction_rows rows. One import runs at
+    a time. Listeners are called as callback(progress), and commit
+    listeners as callback(profile, table) after every committed
+    transaction, on the loading thread.
+    """
+
+    def __init__(self, manager, settings):
+        self.manager = manager
+        self.settings = settings
+        self.listeners = []
+        self.commit_listeners = []
+        self.pool = None
+        self.cancelled = None
+        self.job_id = 0
+        self.current = None
+        self.lock = threading.Lock()
+        self.inspector = ThreadPoolExecutor(max_workers=1, thread_name_prefix='import-inspect')
+
+    def add_listener(self, callback):
+        """Add a callback invoked as callback(progress)"""
+        self.listeners.append(callback)
+
+    def add_commit_listener(self, callback):
+        """Add a callback invoked as callback(profile, table) once more rows are committed"""
+        self.commit_listeners.append(callback)
+
+    def notify(self, progress):
+        for callback in self.listeners:
+            callback(progress)
+
+    def notify_commit(self, profile, table):
+        for callback in self.commit_listeners:
+            callback(profile, table)
+
+    @property
+    def running(self):
+        return self.current is not None and self.current.running
+
+    @property
+    def workers(self):
+        return self.settings['workers'] or os.cpu_count() or 1
+
+    def ensure_pool(self):
+        if self.current is not None and self.current.progress.phase == 'failed':
+            # A worker may have died; start over with fresh processes
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        if self.pool is None:
+            context = multiprocessing.get_context(self.settings['start_method'])
+            self.cancelled = context.Value('q', 0, lock=False)
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=init_worker,
+                initargs=(self.cancelled,),
+            )
+        return self.pool
+
+    def inspect(self, path, header=True):
+        """Sample a file; the Future resolves to its preview"""
+        return self.inspector.submit(inspect_file, path, self.settings, header)
+
+    def start(self, profile, table, preview):
+        """Start importing a previewed file into a table; raises RuntimeError while one runs"""
+        with self.lock:
+            if self.running:
+                raise RuntimeError("An import is already running")
+            self.job_id += 1
+            pool = self.ensure_pool()
+            job = ImportJob(
+                self.job_id, profile, table, preview, pool, self.workers, self.cancelled, self.settings,
+                on_progress=self.notify, on_commit=self.notify_commit
+            )
+            self.current = job
+            job.future = self.manager.run_with_backend(profile, job.load)
+            job.future.add_done_callback(job.settle)
+            return job
+
+    def cancel(self):
+        """Stop the running import; transactions already committed stay"""
+        if self.current is not None:
+            self.current.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        self.inspector.shutdown(wait=False, cancel_futures=True)
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
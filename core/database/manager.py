@@ -0,0 +1,158 @@
+"""
+Connection Manager
+Owns one connection pool per profile on a background asyncio loop
+"""
+
+import asyncio
+import logging
+from core.async_worker import AsyncWorker
+from core.database.backends import create_backend
+from core.database.pool import ConnectionPool
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """Connection pools per profile, running on an asyncio loop in a worker thread
+
+    Every public method is safe to call from the Tk thread and returns a
+    concurrent.futures.Future; results should be marshalled back to Tk through
+    the frame scheduler.
+    """
+
+    def __init__(self, profiles, pool_settings, worker=None):
+        self.profiles = {profile['name']: profile for profile in profiles}
+        self.pool_settings = pool_settings
+        self.worker = worker or AsyncWorker('db-connections')
+        self.pools = {}
+        self.starting = {}
+        self.listeners = []
+        self.metrics_task = None
+
+    def add_listener(self, callback):
+        """Add a callback invoked as callback(metrics) on the loop thread"""
+        self.listeners.append(callback)
+
+    def start(self):
+        """Start the loop thread and periodic metrics publishing"""
+        self.worker.start()
+        self.worker.call_soon(self.start_metrics_task)
+
+    def start_metrics_task(self):
+        """Create the metrics publishing task (loop thread)"""
+        if self.metrics_task is None:
+            self.metrics_task = asyncio.get_running_loop().create_task(self.publish_metrics())
+
+    async def publish_metrics(self):
+        """Publish pool metrics to listeners at a fixed interval"""
+        interval = self.pool_settings['metrics_interval_ms'] / 1000
+        while True:
+            metrics = self.collect_metrics()
+            for callback in self.listeners:
+                # A failing listener must not end publishing or reach the pools
+                try:
+                    callback(metrics)
+                except Exception:
+                    logger.exception("Pool metrics listener %r failed", callback)
+            await asyncio.sleep(interval)
+
+    async def get_pool(self, profile_name):
+        """Return the pool for a profile, creating it on first use (loop thread)"""
+        pool = self.pools.get(profile_name)
+        if pool is not None:
+            return pool
+
+        # Concurrent first requests share one pool start-up
+        starting = self.starting.get(profile_name)
+        if starting is None:
+            starting = asyncio.get_running_loop().create_task(self.create_pool(profile_name))
+            self.starting[profile_name] = starting
+        try:
+            return await asyncio.shield(starting)
+        finally:
+            if starting.done():
+                self.starting.pop(profile_name, None)
+
+    async def create_pool(self, profile_name):
+        """Create and start a pool for a profile"""
+        profile = self.profiles.get(profile_name)
+        if profile is None:
+            raise KeyError(f"Unknown connection profile '{profile_name}'")
+
+        settings = dict(self.pool_settings)
+        settings.update(profile.get('pool', {}))
+        pool = ConnectionPool(
+            create_backend(profile),
+            min_size=settings['min_size'],
+            max_size=settings['max_size'],
+            acquire_timeout=settings['acquire_timeout'],
+            idle_timeout=settings['idle_timeout'],
+            max_lifetime=settings['max_lifetime'],
+            health_interval=settings['health_interval'],
+        )
+        await pool.start()
+        self.pools[profile_name] = pool
+        return pool
+
+    async def _run(self, profile_name, func, args):
+        pool = await self.get_pool(profile_name)
+        return await pool.run(func, *args)
+
+    async def _run_with_backend(self, profile_name, func, args):
+        pool = await self.get_pool(profile_name)
+        return await pool.run(func, pool.backend, *args)
+
+    async def _ping(self, profile_name):
+        pool = await self.get_pool(profile_name)
+        return await pool.ping()
+
+    async def _close(self, profile_name):
+        pool = self.pools.pop(profile_name, None)
+        if pool is not None:
+            await pool.close()
+
+    async def _close_all(self):
+        for profile_name in list(self.pools):
+            await self._close(profile_name)
+
+    def run(self, profile_name, func, *args):
+        """Run func(connection, *args) with a pooled connection; returns a Future"""
+        return self.worker.submit(self._run(profile_name, func, args))
+
+    def run_with_backend(self, profile_name, func, *args):
+        """Run func(connection, backend, *args) with a pooled connection; returns a Future"""
+        return self.worker.submit(self._run_with_backend(profile_name, func, args))
+
+    def connect(self, profile_name):
+        """Open the pool for a profile; returns a Future"""
+        return self.worker.submit(self.get_pool(profile_name))
+
+    def ping(self, profile_name):
+        """Health-check a profile; the Future resolves to the round trip in ms"""
+        return self.worker.submit(self._ping(profile_name))
+
+    def close_pool(self, profile_name):
+        """Close the pool for a profile; returns a Future"""
+        return self.worker.submit(self._close(profile_name))
+
+    def collect_metrics(self):
+        """Snapshot metrics for every open pool plus totals"""
+        pools = {name: pool.metrics() for name, pool in self.pools.items()}
+        totals = {
+            'connections': sum(metrics['size'] for metrics in pools.values()),
+            'in_use': sum(metrics['in_use'] for metrics in pools.values()),
+            'waiting': sum(metrics['waiting'] for metrics in pools.values()),
+            'checkouts': sum(metrics['checkouts'] for metrics in pools.values()),
+            'wait_p99_ms': max((metrics['wait_p99_ms'] for metrics in pools.values()), default=0.0),
+        }
+        return {'pools': pools, 'totals': totals}
+
+    def shutdown(self, timeout=5):
+        """Close every pool and stop the loop thread"""
+        if self.worker.running:
+            try:
+                self.worker.submit(self._close_all()).result(timeout)
+            except Exception:
+                pass
+            self.worker.stop()
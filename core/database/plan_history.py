@@ -0,0 +1,173 @@
+"""
+Plan History
+Local SQLite history of query runs and their plans, keyed by SQL fingerprint
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from core.database.plans import Plan, diff_plans, fingerprint, normalize_sql
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    profile TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    sql TEXT NOT NULL,
+    example TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    total_ms REAL NOT NULL DEFAULT 0,
+    max_ms REAL NOT NULL DEFAULT 0,
+    rows INTEGER NOT NULL DEFAULT 0,
+    last_run REAL,
+    last_ms REAL,
+    hot INTEGER NOT NULL DEFAULT 0,
+    plan_changes INTEGER NOT NULL DEFAULT 0,
+    regressions INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile, fingerprint)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    profile TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    started REAL NOT NULL,
+    elapsed_ms REAL NOT NULL,
+    rows INTEGER,
+    plan_hash TEXT,
+    plan TEXT,
+    regression TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_query ON runs (profile, fingerprint, id);
+"""
+
+# Sortable report columns
+ORDERS = {
+    'total': 'total_ms',
+    'mean': 'total_ms / calls',
+    'max': 'max_ms',
+    'calls': 'calls',
+    'last': 'last_ms',
+    'rows': 'rows',
+    'hot': 'hot',
+    'changes': 'plan_changes',
+    'regressions': 'regressions',
+    'recent': 'last_run',
+}
+
+
+class PlanHistory:
+    """Every Query Builder run, grouped by the fingerprint of its SQL
+
+    queries keeps running totals per fingerprint for the top-N report; runs
+    keeps the latest runs_per_query runs with their plans, so a new plan is
+    diffed against the previous one of the same statement. Writes come from
+    pool executor threads and reads from the Tk thread, through one
+    connection behind a lock; the file is opened on first use.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.path = settings['path']
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def open(self):
+        if self.connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self.connection = connection
+        return self.connection
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def record(self, profile, sql, elapsed_ms, rows, plan=None):
+        """Store a run and return its plan diff against the previous plan, if any (executor thread)"""
+        key = fingerprint(sql)
+        now = time.time()
+        diff = None
+        with self.lock:
+            connection = self.open()
+            if plan is not None:
+                previous = connection.execute(
+                    "SELECT plan, elapsed_ms FROM runs WHERE profile = ? AND fingerprint = ? AND plan IS NOT NULL "
+                    "ORDER BY id DESC LIMIT 1",
+                    (profile, key)
+                ).fetchone()
+                if previous is not None:
+                    diff = diff_plans(Plan.from_dict(json.loads(previous[0])), plan,
+                                      previous[1], elapsed_ms, self.settings)
+            regression = diff['regression'] if diff else None
+
+            with connection:
+                connection.execute(
+                    "INSERT INTO queries (profile, fingerprint, sql, example) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (profile, fingerprint) DO NOTHING",
+                    (profile, key, normalize_sql(sql), sql)
+                )
+                connection.execute(
+                    "UPDATE queries SET example = ?, calls = calls + 1, total_ms = total_ms + ?, "
+                    "max_ms = max(max_ms, ?), rows = rows + ?, last_run = ?, last_ms = ?, "
+                    "hot = coalesce(?, hot), plan_changes = plan_changes + ?, regressions = regressions + ? "
+                    "WHERE profile = ? AND fingerprint = ?",
+                    (sql, elapsed_ms, elapsed_ms, rows or 0, now, elapsed_ms,
+                     None if plan is None else len(plan.hot_nodes()),
+                     int(bool(diff and diff['changed'])), int(regression is not None), profile, key)
+                )
+                connection.execute(
+                    "INSERT INTO runs (profile, fingerprint, started, elapsed_ms, rows, plan_hash, plan, regression) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (profile, key, now, elapsed_ms, rows,
+                     None if plan is None else plan.shape_hash(),
+                     None if plan is None else json.dumps(plan.to_dict()),
+                     regression)
+                )
+                connection.execute(
+                    "DELETE FROM runs WHERE profile = ? AND fingerprint = ? AND id <= ("
+                    "SELECT id FROM runs WHERE profile = ? AND fingerprint = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (profile, key, profile, key, self.settings['runs_per_query'])
+                )
+        return diff
+
+    def top(self, profile, order='total', descending=True, limit=50):
+        """Statements of a profile ranked by an ORDERS column, as dicts"""
+        column = ORDERS[order]
+        with self.lock:
+            cursor = self.open().execute(
+                "SELECT fingerprint, sql, example, calls, total_ms, max_ms, rows, last_run, last_ms, hot, "
+                "plan_changes, regressions FROM queries WHERE profile = ? "
+                f"ORDER BY {column} {'DESC' if descending else 'ASC'} LIMIT ?",
+                (profile, limit)
+            )
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def latest_plan(self, profile, key):
+        """(plan, regression) of the newest run of a statement that captured one, or (None, None)"""
+        with self.lock:
+            row = self.open().execute(
+                "SELECT plan, regression FROM runs WHERE profile = ? AND fingerprint = ? AND plan IS NOT NULL "
+                "ORDER BY id DESC LIMIT 1",
+                (profile, key)
+            ).fetchone()
+        if row is None:
+            return None, None
+        return Plan.from_dict(json.loads(row[0])), row[1]
+
+    def clear(self, profile):
+        """Forget every statement of a profile"""
+        with self.lock:
+            connection = self.open()
+            with connection:
+                connection.execute("DELETE FROM runs WHERE profile = ?", (profile,))
+                connection.execute("DELETE FROM queries WHERE profile = ?", (profile,))
@@ -0,0 +1,360 @@
+"""
+Query Plans
+SQL fingerprints and table references, EXPLAIN output parsed into plan trees, hot-node flags and plan diffs
+"""
+
+import difflib
+import hashlib
+import re
+from core.database.backends import is_read_query
+
+
+# Literals, parameters and comments; whatever lies between is words and punctuation
+TOKENS = re.compile(r"""
+      (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<string>[eEbBxXnN]?'(?:[^']|'')*'|\$(?P<tag>[A-Za-z_]\w*)?\$.*?\$(?P=tag)?\$)
+    | (?P<ident>"(?:[^"]|"")*"|`[^`]*`)
+    | (?P<number>(?<![\w$.])\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)
+    | (?P<param>%s|%\(\w+\)s|\?\d*|\$\d+|(?<!:):[A-Za-z_]\w*)
+""", re.S | re.X)
+WORDS = re.compile(r'\w+|[^\w\s]')
+
+# Keywords that keep their space before a parenthesis; other words are function calls
+SPACED = {'in', 'values', 'as', 'on', 'and', 'or', 'not', 'exists', 'any', 'all', 'some', 'using',
+          'from', 'join', 'where', 'select', 'when', 'then', 'else', 'over', 'filter', 'table'}
+
+# IN lists and multi-row VALUES of any length share a fingerprint; function arguments keep theirs
+VALUE_LIST = re.compile(r'\b(in|values) \(\?(?:, \?)*\)')
+VALUE_ROW = r'\((?:\?|\.\.\.)(?:, (?:\?|\.\.\.))*\)'
+VALUE_ROWS = re.compile(rf'\bvalues ({VALUE_ROW})(?:, {VALUE_ROW})+')
+
+# Statements EXPLAIN accepts
+EXPLAINABLE = re.compile(r'^\s*(\(\s*)*(select|with|values|table|insert|update|delete|merge)\b', re.IGNORECASE)
+
+# Table and alias after FROM / JOIN, for SQLite plans that name the alias only
+ALIASES = re.compile(
+    r'\b(?:from|join)\s+((?:"[^"]+"|\w+)(?:\.(?:"[^"]+"|\w+))?)'
+    r'(?:\s+(?:as\s+)?(?!(?:on|using|where|join|inner|left|right|full|cross|natural|group|order|limit|set)\b)(\w+))?',
+    re.IGNORECASE
+)
+
+# Targets of statements that change data or tables; SELECT ... FOR UPDATE counts too
+WRITES = re.compile(
+    r'\b(?:insert\s+(?:or\s+\w+\s+)?into|replace\s+into|update|delete\s+from|merge\s+into|truncate(?:\s+table)?'
+    r'|copy|(?:alter|drop)\s+(?:table|view|materialized\s+view)(?:\s+if\s+exists)?)\s+(?:only\s+)?'
+    r'((?:"[^"]+"|\w+)(?:\.(?:"[^"]+"|\w+))?)',
+    re.IGNORECASE
+)
+
+SCAN_NODES = ('Seq Scan', 'Parallel Seq Scan', 'Scan')
+
+
+def split_sql(sql):
+    """(tokens, literals): the statement's words and punctuation with every literal as ?, and the literals"""
+    tokens = []
+    literals = []
+    position = 0
+    for match in TOKENS.finditer(sql):
+        tokens.extend(WORDS.findall(sql[position:match.start()].lower()))
+        position = match.end()
+        kind = match.lastgroup if match.lastgroup != 'tag' else 'string'
+        if kind == 'ident':
+            tokens.append(match.group())
+        elif kind != 'comment':
+            tokens.append('?')
+            literals.append(match.group())
+    tokens.extend(WORDS.findall(sql[position:].lower()))
+    while tokens and tokens[-1] == ';':
+        tokens.pop()
+    return tokens, literals
+
+
+def normalize_sql(sql):
+    """SQL with literals and parameters replaced by ?, comments dropped and keywords lower-cased"""
+    tokens, _ = split_sql(sql)
+    text = ' '.join(tokens)
+    text = re.sub(r'(\w+) \(', lambda match: match.group() if match.group(1) in SPACED else f"{match.group(1)}(", text)
+    text = re.sub(r'\( | (?=[,)])', lambda match: match.group().strip(), text)
+    text = re.sub(r' \. |(?<=\w) \.|\. (?=\w)', '.', text)
+    text = text.replace(' : : ', '::')
+    text = VALUE_LIST.sub(r'\1 (...)', text)
+    return VALUE_ROWS.sub(r'values \1', text)
+
+
+def fingerprint(sql):
+    """Stable id of a statement regardless of its literals, spacing and comments"""
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()[:16]
+
+
+def sql_literals(sql):
+    """The literals and parameter markers of a statement, in order"""
+    return split_sql(sql)[1]
+
+
+def table_name(name):
+    """Bare lower-case table name of a possibly qualified, possibly quoted name"""
+    return unquote(name).lower()
+
+
+def referenced_names(sql):
+    """Every identifier of a statement, so a superset of the tables it reads"""
+    return {table_name(token) for token in split_sql(sql)[0] if token[0].isalpha() or token[0] in '_"`'}
+
+
+def written_tables(sql):
+    """Names of the tables a statement inserts into, changes, or drops"""
+    return {table_name(table) for table in WRITES.findall(normalize_sql(sql))}
+
+
+def is_explainable(sql):
+    return EXPLAINABLE.match(sql) is not None
+
+
+def unquote(name):
+    return name.replace('"', '').replace('`', '').split('.')[-1]
+
+
+class PlanNode:
+    """One node of a query plan
+
+    Row counts are totals over all loops; times are milliseconds over all
+    loops, and self_ms excludes the children. Fields an EXPLAIN variant does
+    not report are None, e.g. every timing of a SQLite query plan.
+    """
+
+    __slots__ = ('kind', 'relation', 'index', 'detail', 'est_rows', 'rows', 'loops', 'removed',
+                 'total_ms', 'self_ms', 'cost', 'hit', 'read', 'children', 'flags')
+
+    FIELDS = ('kind', 'relation', 'index', 'detail', 'est_rows', 'rows', 'loops', 'removed',
+              'total_ms', 'self_ms', 'cost', 'hit', 'read', 'flags')
+
+    def __init__(self, kind, relation=None, index=None, detail=''):
+        self.kind = kind
+        self.relation = relation
+        self.index = index
+        self.detail = detail
+        self.est_rows = None
+        self.rows = None
+        self.loops = None
+        self.removed = None
+        self.total_ms = None
+        self.self_ms = None
+        self.cost = None
+        self.hit = None
+        self.read = None
+        self.children = []
+        self.flags = []
+
+    def label(self):
+        """Node type with the relation and index it works on"""
+        text = self.kind
+        if self.index:
+            text += f" using {self.index}"
+        if self.relation:
+            text += f" on {self.relation}"
+        return text
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data['children'] = [child.to_dict() for child in self.children]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        node = cls(data['kind'])
+        for field in cls.FIELDS:
+            setattr(node, field, data.get(field))
+        node.flags = node.flags or []
+        node.children = [cls.from_dict(child) for child in data.get('children', ())]
+        return node
+
+
+class Plan:
+    """A parsed plan: the node tree plus the statement-level timings"""
+
+    __slots__ = ('backend', 'root', 'analyzed', 'planning_ms', 'execution_ms')
+
+    def __init__(self, backend, root, analyzed=False, planning_ms=None, execution_ms=None):
+        self.backend = backend
+        self.root = root
+        self.analyzed = analyzed
+        self.planning_ms = planning_ms
+        self.execution_ms = execution_ms
+
+    def walk(self):
+        """(depth, node) in pre-order"""
+        stack = [(0, self.root)]
+        while stack:
+            depth, node = stack.pop()
+            yield depth, node
+            stack.extend((depth + 1, child) for child in reversed(node.children))
+
+    def relations(self):
+        return sorted({node.relation for _, node in self.walk() if node.relation})
+
+    def shape(self):
+        """One line per node: indentation and label, without any numbers"""
+        return [f"{'  ' * depth}{node.label()}" for depth, node in self.walk()]
+
+    def shape_hash(self):
+        """Changes only when the plan picks other nodes, relations or indexes"""
+        return hashlib.sha1('\n'.join(self.shape()).encode()).hexdigest()[:16]
+
+    def hot_nodes(self):
+        return [node for _, node in self.walk() if node.flags]
+
+    def to_dict(self):
+        return {
+            'backend': self.backend,
+            'root': self.root.to_dict(),
+            'analyzed': self.analyzed,
+            'planning_ms': self.planning_ms,
+            'execution_ms': self.execution_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['backend'], PlanNode.from_dict(data['root']), data['analyzed'],
+                   data['planning_ms'], data['execution_ms'])
+
+
+# Parsing
+
+def parse_postgres_node(data):
+    """Node of EXPLAIN (FORMAT JSON) output, with its children"""
+    node = PlanNode(data['Node Type'], data.get('Relation Name') or data.get('CTE Name'), data.get('Index Name'))
+    details = [data[key] for key in ('Join Type', 'Strategy') if key in data]
+    details += [f"{key.lower()} {data[key]}" for key in
+                ('Index Cond', 'Hash Cond', 'Merge Cond', 'Join Filter', 'Filter', 'Sort Key') if key in data]
+    node.detail = ' · '.join(str(detail) for detail in details)
+    node.cost = data.get('Total Cost')
+    node.children = [parse_postgres_node(child) for child in data.get('Plans', ())]
+
+    loops = data.get('Actual Loops')
+    if loops is None:
+        node.est_rows = data.get('Plan Rows')
+        return node
+    # Estimates and actuals are per loop; keep totals
+    node.loops = loops
+    node.est_rows = data.get('Plan Rows', 0) * max(loops, 1)
+    node.rows = data.get('Actual Rows', 0) * loops
+    node.removed = (data.get('Rows Removed by Filter', 0) + data.get('Rows Removed by Index Recheck', 0)) * loops
+    node.total_ms = data.get('Actual Total Time', 0.0) * loops
+    node.self_ms = max(node.total_ms - sum(child.total_ms or 0.0 for child in node.children), 0.0)
+    node.hit = data.get('Shared Hit Blocks')
+    node.read = data.get('Shared Read Blocks')
+    return node
+
+
+def parse_postgres_plan(document):
+    """Plan from the JSON document of EXPLAIN (FORMAT JSON)"""
+    entry = document[0] if isinstance(document, list) else document
+    root = parse_postgres_node(entry['Plan'])
+    return Plan('postgres', root, analyzed=root.loops is not None,
+                planning_ms=entry.get('Planning Time'), execution_ms=entry.get('Execution Time'))
+
+
+SQLITE_STEP = re.compile(
+    r'^(?P<kind>SCAN|SEARCH)\s+(?:TABLE\s+)?(?P<name>\S+)(?:\s+AS\s+\S+)?'
+    r'(?:\s+USING\s+(?:(?P<covering>COVERING\s+)?INDEX\s+(?P<index>\S+)|(?P<key>INTEGER PRIMARY KEY)))?'
+    r'\s*(?P<rest>.*)$'
+)
+
+
+def parse_sqlite_plan(rows, sql=''):
+    """Plan from EXPLAIN QUERY PLAN rows of (id, parent, notused, detail)"""
+    aliases = {alias: unquote(table) for table, alias in ALIASES.findall(sql) if alias}
+    root = PlanNode('Query')
+    nodes = {0: root}
+    for node_id, parent, _, detail in rows:
+        match = SQLITE_STEP.match(detail)
+        if match is None:
+            node = PlanNode(detail.capitalize())
+        else:
+            name = match.group('name')
+            index = match.group('index') or ('rowid' if match.group('key') else None)
+            if match.group('covering'):
+                index += ' (covering)'
+            node = PlanNode(match.group('kind').capitalize(), aliases.get(name, name), index, match.group('rest'))
+        nodes[node_id] = node
+        nodes.get(parent, root).children.append(node)
+    if len(root.children) == 1:
+        root = root.children[0]
+    return Plan('sqlite', root)
+
+
+def parse_plan(backend, raw, sql=''):
+    if backend == 'postgres':
+        return parse_postgres_plan(raw)
+    return parse_sqlite_plan(raw, sql)
+
+
+def flag_hot_nodes(plan, table_rows, settings):
+    """Mark full scans of large tables and row estimates that are far off"""
+    for _, node in plan.walk():
+        node.flags = []
+        if node.kind in SCAN_NODES and node.index is None:
+            size = table_rows.get(node.relation)
+            if size is None and node.rows is not None:
+                size = node.rows + (node.removed or 0)
+            if size is not None and size >= settings['seq_scan_rows']:
+                node.flags.append(f"full scan of {size:,.0f} rows")
+        if node.rows is not None and node.est_rows is not None:
+            actual, estimate = node.rows, node.est_rows
+            if max(actual, estimate) >= settings['misestimate_min_rows']:
+                ratio = max(actual, 1) / max(estimate, 1)
+                if ratio >= settings['misestimate_factor']:
+                    node.flags.append(f"rows under-estimated {ratio:,.0f}×")
+                elif 1 / ratio >= settings['misestimate_factor']:
+                    node.flags.append(f"rows over-estimated {1 / ratio:,.0f}×")
+    return plan.hot_nodes()
+
+
+def capture_plan(connection, backend, sql, params, settings):
+    """Flagged plan of a statement that has just run, or None if it cannot be explained (executor thread)"""
+    if not is_explainable(sql):
+        return None
+    # ANALYZE runs the statement again, so writes only when asked (and rolled back by the backend)
+    analyze = settings['analyze'] and (settings['analyze_writes'] or is_read_query(sql))
+    plan = parse_plan(backend.name, backend.explain(connection, sql, params, analyze), sql)
+    flag_hot_nodes(plan, backend.relation_rows(connection, plan.relations()), settings)
+    return plan
+
+
+def diff_plans(old, new, old_ms, new_ms, settings):
+    """What changed between two plans of one statement and whether it got worse
+
+    changed lists the added (+) and removed (-) node lines; new_nodes are the
+    pre-order positions of the nodes in new that old did not have. A run is a
+    regression when it is regression_factor slower than the previous one, or
+    when a changed plan brings new hot nodes.
+    """
+    old_shape, new_shape = old.shape(), new.shape()
+    matcher = difflib.SequenceMatcher(a=[line.strip() for line in old_shape],
+                                      b=[line.strip() for line in new_shape], autojunk=False)
+    changes = []
+    new_nodes = set()
+    for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        changes += [f"- {line.strip()}" for line in old_shape[a_start:a_end]]
+        changes += [f"+ {line.strip()}" for line in new_shape[b_start:b_end]]
+        new_nodes.update(range(b_start, b_end))
+
+    slower = new_ms / old_ms if old_ms and new_ms is not None else None
+    old_flags = {(node.label(), flag.split(' ')[0]) for node in old.hot_nodes() for flag in node.flags}
+    new_hot = [f"{node.label()}: {flag}" for node in new.hot_nodes() for flag in node.flags
+               if (node.label(), flag.split(' ')[0]) not in old_flags]
+
+    reasons = []
+    if slower is not None and slower >= settings['regression_factor'] and new_ms >= settings['regression_min_ms']:
+        reasons.append(f"{slower:.1f}× slower than the previous run")
+    if changes and new_hot:
+        reasons.append("new hot nodes: " + '; '.join(new_hot))
+    return {
+        'changed': bool(changes),
+        'changes': changes,
+        'new_nodes': sorted(new_nodes),
+        'slower': slower,
+        'regression': '; '.join(reasons) or None,
+    }
@@ -0,0 +1,289 @@
+"""
+Connection Pool
+Bounded asyncio connection pool with health checks, idle reaping and lifetime recycling
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from utils.stats import LatencyWindow
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the acquire timeout"""
+
+
+class PoolClosed(Exception):
+    """Raised when acquiring from a pool that has been closed"""
+
+
+class PooledConnection:
+    """A raw DB-API connection plus the bookkeeping the pool needs"""
+
+    __slots__ = ('raw', 'created', 'last_used', 'uses')
+
+    def __init__(self, raw):
+        now = time.monotonic()
+        self.raw = raw
+        self.created = now
+        self.last_used = now
+        self.uses = 0
+
+
+class ConnectionPool:
+    """A bounded pool of connections for one profile, driven by an asyncio loop
+
+    Blocking driver calls (connect, ping, queries) run on the loop's default
+    executor; the pool state itself is only touched from the loop thread.
+    """
+
+    def __init__(self, backend, min_size=1, max_size=10, acquire_timeout=10.0,
+                 idle_timeout=300.0, max_lifetime=3600.0, health_interval=30.0):
+        self.backend = backend
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.health_interval = health_interval
+
+        self.idle = []
+        self.in_use = set()
+        self.opening = 0
+        self.checking = 0
+        self.waiters = 0
+        self.available = None
+        self.maintenance_task = None
+        self.closed = False
+        self.last_error = None
+
+        # Metrics
+        self.checkouts = 0
+        self.timeouts = 0
+        self.opened = 0
+        self.recycled = 0
+        self.reaped = 0
+        self.failed_pings = 0
+        self.wait_ms = LatencyWindow()
+
+    @property
+    def size(self):
+        """Connections that are open, being opened or being health-checked"""
+        return len(self.idle) + len(self.in_use) + self.opening + self.checking
+
+    async def start(self):
+        """Open the minimum number of connections and start maintenance"""
+        self.available = asyncio.Condition()
+        await self.fill()
+        self.maintenance_task = asyncio.get_running_loop().create_task(self.maintain())
+
+    async def open_connection(self):
+        """Open a new connection on the executor"""
+        self.opening += 1
+        try:
+            raw = await asyncio.get_running_loop().run_in_executor(None, self.backend.connect)
+        except Exception as error:
+            self.last_error = str(error)
+            raise
+        finally:
+            self.opening -= 1
+        self.opened += 1
+        self.last_error = None
+        return PooledConnection(raw)
+
+    async def discard(self, connection):
+        """Close a connection on the executor"""
+        await asyncio.get_running_loop().run_in_executor(None, self.backend.close, connection.raw)
+
+    async def fill(self):
+        """Top the pool back up to min_size"""
+        while self.size < self.min_size and not self.closed:
+            connection = await self.open_connection()
+            self.idle.append(connection)
+        await self.notify()
+
+    async def notify(self):
+        """Wake one waiter"""
+        async with self.available:
+            self.available.notify()
+
+    def expired(self, connection, now):
+        """Whether a connection has outlived max_lifetime"""
+        return now - connection.created > self.max_lifetime
+
+    async def acquire(self):
+        """Check a connection out of the pool"""
+        if self.closed:
+            raise PoolClosed("connection pool is closed")
+
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        while True:
+            now = time.monotonic()
+            while self.idle:
+                # LIFO keeps hot connections hot and lets cold ones age out
+                connection = self.idle.pop()
+                if self.expired(connection, now):
+                    self.recycled += 1
+                    await self.discard(connection)
+                    continue
+                return self.checkout(connection, started)
+
+            if self.size < self.max_size:
+                connection = await self.open_connection()
+                return self.checkout(connection, started)
+
+            remaining = deadline - now
+            if remaining <= 0:
+                self.timeouts += 1
+                raise PoolTimeout(f"no connection available within {self.acquire_timeout:.1f}s")
+
+            self.waiters += 1
+            try:
+                async with self.available:
+                    await asyncio.wait_for(self.available.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self.waiters -= 1
+
+            if self.closed:
+                raise PoolClosed("connection pool is closed")
+
+    def checkout(self, connection, started):
+        """Mark a connection as in use and record the wait"""
+        connection.uses += 1
+        self.in_use.add(connection)
+        self.checkouts += 1
+        self.wait_ms.add((time.monotonic() - started) * 1000)
+        return connection
+
+    async def release(self, connection, broken=False):
+        """Return a connection to the pool"""
+        self.in_use.discard(connection)
+        now = time.monotonic()
+        connection.last_used = now
+        if broken or self.closed or self.expired(connection, now):
+            if not broken and not self.closed:
+                self.recycled += 1
+            await self.discard(connection)
+            if not self.closed:
+                # A failed refill must not replace the error that broke the connection
+                try:
+                    await self.fill()
+                except Exception as error:
+                    logger.warning("Could not refill the pool after releasing a connection: %s", error)
+        else:
+            self.idle.append(connection)
+        await self.notify()
+
+    @asynccontextmanager
+    async def connection(self):
+        """Async context manager that checks a connection out and back in"""
+        connection = await self.acquire()
+        broken = False
+        try:
+            yield connection
+        except Exception:
+            # A failed statement may have left the connection unusable; verify it
+            broken = not await self.check(connection)
+            raise
+        finally:
+            await self.release(connection, broken=broken)
+
+    async def run(self, func, *args):
+        """Run func(raw_connection, *args) on the executor with a pooled connection"""
+        async with self.connection() as connection:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, func, connection.raw, *args)
+
+    async def check(self, connection):
+        """Ping a connection, returning False when it is broken"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.backend.ping, connection.raw)
+            return True
+        except Exception as error:
+            self.failed_pings += 1
+            self.last_error = str(error)
+            return False
+
+    async def ping(self):
+        """Round-trip a health check on a pooled connection, returning latency in ms"""
+        started = time.monotonic()
+        async with self.connection() as connection:
+            if not await self.check(connection):
+                raise ConnectionError(self.last_error)
+        return (time.monotonic() - started) * 1000
+
+    async def maintain(self):
+        """Background task: reap idle, recycle old and ping remaining connections"""
+        while not self.closed:
+            await asyncio.sleep(self.health_interval)
+            now = time.monotonic()
+
+            # Take idle connections out while they are being inspected; they still count towards size
+            candidates, self.idle = self.idle, []
+            self.checking = len(candidates)
+            keep = []
+            try:
+                for connection in candidates:
+                    if self.expired(connection, now):
+                        self.recycled += 1
+                        await self.discard(connection)
+                    elif (now - connection.last_used > self.idle_timeout
+                            and len(keep) + len(self.in_use) >= self.min_size):
+                        self.reaped += 1
+                        await self.discard(connection)
+                    elif await self.check(connection):
+                        keep.append(connection)
+                        continue
+                    else:
+                        await self.discard(connection)
+                    self.checking -= 1
+            finally:
+                self.checking = 0
+                self.idle.extend(keep)
+
+            try:
+                await self.fill()
+            except Exception:
+                # last_error is recorded; retry on the next health check
+                pass
+
+    async def close(self):
+        """Close every connection and stop maintenance"""
+        self.closed = True
+        if self.maintenance_task is not None:
+            self.maintenance_task.cancel()
+        idle, self.idle = self.idle, []
+        for connection in idle:
+            await self.discard(connection)
+        if self.available is not None:
+            async with self.available:
+                self.available.notify_all()
+
+    def metrics(self):
+        """Return a snapshot of pool metrics"""
+        waits = self.wait_ms.summary()
+        return {
+            'backend': self.backend.describe(),
+            'size': self.size,
+            'idle': len(self.idle),
+            'in_use': len(self.in_use),
+            'waiting': self.waiters,
+            'max_size': self.max_size,
+            'saturation': len(self.in_use) / self.max_size if self.max_size else 0.0,
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'opened': self.opened,
+            'recycled': self.recycled,
+            'reaped': self.reaped,
+            'failed_pings': self.failed_pings,
+            'wait_p50_ms': waits['p50'],
+            'wait_p99_ms': waits['p99'],
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,231 @@
+"""
+Query Runner
+Streaming, cancellable query execution that delivers rows in fetch batches
+"""
+
+import threading
+import time
+from core.database.backends import is_read_query
+from core.database.plans import written_tables
+
+
+class QueryCancelled(Exception):
+    """Raised inside the fetch loop when a query is cancelled"""
+
+
+def estimate_bytes(rows):
+    """Cheap estimate of the payload size of a batch of rows"""
+    total = 0
+    for row in rows:
+        for value in row:
+            if isinstance(value, (str, bytes, bytearray, memoryview)):
+                total += len(value)
+            elif value is not None:
+                total += 8
+    return total
+
+
+class QueryStats:
+    """Progress counters for one query execution"""
+
+    __slots__ = ('rows', 'bytes', 'batches', 'started', 'first_row_ms', 'finished',
+                 'rowcount', 'truncated', 'cancelled', 'error', 'cached')
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.batches = 0
+        self.started = time.monotonic()
+        self.first_row_ms = None
+        self.finished = None
+        self.rowcount = None
+        self.truncated = False
+        self.cancelled = False
+        self.error = None
+        self.cached = None
+
+    @property
+    def elapsed(self):
+        """Seconds since the query started (or until it finished)"""
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self):
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+
+class QueryExecution:
+    """One streamed query: rows arrive in batches and the run can be cancelled
+
+    on_columns(columns) is called once the statement has been executed,
+    on_batch(rows) after every fetch and on_done(stats) when the run ends;
+    all three are called on a pool executor thread. explain(connection,
+    backend), when given, runs after a successful run on the same pooled
+    connection and its result is kept in plan (errors in plan_error).
+
+    With a cache, a repeated read is answered from it without a connection
+    (cached then holds the result and stats.cached the entry's metadata),
+    and a complete read is stored from result, the ColumnarResult the
+    caller fills in on_batch. Writes drop the entries they make stale even
+    when use_cache is off.
+    """
+
+    def __init__(self, manager, profile_name, sql, params=None, batch_size=5000,
+                 first_batch_size=200, max_rows=None, on_columns=None, on_batch=None, on_done=None,
+                 explain=None, cache=None, use_cache=True, result=None):
+        self.manager = manager
+        self.profile_name = profile_name
+        self.sql = sql
+        self.params = params
+        self.batch_size = batch_size
+        self.first_batch_size = first_batch_size
+        self.max_rows = max_rows
+        self.on_columns = on_columns
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.explain = explain
+        self.plan = None
+        self.plan_error = None
+        self.cache = cache
+        self.use_cache = use_cache
+        self.result = result
+        self.cache_key = None
+        self.cache_epoch = None
+        self.cached = None
+
+        self.stats = QueryStats()
+        self.cancel_event = threading.Event()
+        self.connection = None
+        self.backend = None
+        self.future = None
+
+    def start(self):
+        """Answer from the cache when it has the result, else submit the query to the connection manager"""
+        if self.cache is not None and self.use_cache:
+            self.cache_key = self.cache.key(self.profile_name, self.sql, self.params)
+            self.cache_epoch = self.cache.epoch()
+        if self.cache_key is not None and self.cache.has(self.cache_key):
+            self.future = self.cache.submit(self.read_cache)
+        else:
+            self.future = self.manager.run_with_backend(self.profile_name, self.execute)
+        self.future.add_done_callback(self.finished)
+        return self
+
+    def read_cache(self):
+        """Load the cached result, or run the query after all if the entry just went away (cache thread)"""
+        entry = self.cache.get(self.cache_key)
+        if entry is None:
+            return self.manager.run_with_backend(self.profile_name, self.execute).result()
+        self.cached, meta = entry
+        self.stats.rows = meta['rows']
+        self.stats.bytes = meta['raw_bytes']
+        self.stats.cached = meta
+        return self.stats
+
+    def execute(self, connection, backend):
+        """Stream the statement, update the cache, then explain it if asked (executor thread)"""
+        self.stream(connection, backend)
+        if self.cache is not None:
+            self.update_cache()
+        if self.explain is not None and not self.cancel_event.is_set():
+            try:
+                self.plan = self.explain(connection, backend)
+            except Exception as error:
+                self.plan_error = str(error)
+        return self.stats
+
+    def update_cache(self):
+        """Store a complete read, or drop the entries a write made stale (executor thread)"""
+        written = written_tables(self.sql)
+        if written or not is_read_query(self.sql):
+            # Statements without a known target (DDL, procedures) may have changed anything
+            self.cache.invalidate(self.profile_name, written or None)
+        elif (self.cache_key is not None and self.result is not None
+              and not self.stats.truncated and not self.cancel_event.is_set()):
+            self.cache.put(self.cache_key, self.profile_name, self.sql, self.result,
+                           self.stats.bytes, self.stats.elapsed * 1000, self.cache_epoch)
+
+    def stream(self, connection, backend):
+        """Run the statement and stream its rows (executor thread)"""
+        self.connection = connection
+        self.backend = backend
+        success = False
+        cursor = None
+        try:
+            if self.cancel_event.is_set():
+                raise QueryCancelled()
+            cursor = backend.open_cursor(connection, self.sql, self.params, self.batch_size)
+
+            if cursor.description is None:
+                # Not a row-returning statement
+                self.stats.rowcount = cursor.rowcount
+                if self.on_columns:
+                    self.on_columns([])
+                success = True
+                return self.stats
+
+            if self.on_columns:
+                self.on_columns([column[0] for column in cursor.description])
+
+            # A small first batch keeps first-row latency independent of result size
+            size = self.first_batch_size
+            while True:
+                if self.cancel_event.is_set():
+                    raise QueryCancelled()
+                if self.max_rows is not None:
+                    size = min(size, self.max_rows - self.stats.rows)
+                    if size <= 0:
+                        self.stats.truncated = True
+                        break
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    break
+                if self.stats.first_row_ms is None:
+                    self.stats.first_row_ms = self.stats.elapsed * 1000
+                self.stats.rows += len(rows)
+                self.stats.bytes += estimate_bytes(rows)
+                self.stats.batches += 1
+                if self.on_batch:
+                    self.on_batch(rows)
+                size = self.batch_size
+
+            success = True
+            return self.stats
+        except Exception:
+            if self.cancel_event.is_set():
+                raise QueryCancelled() from None
+            raise
+        finally:
+            self.connection = None
+            backend.end_query(connection, cursor, success)
+
+    def cancel(self):
+        """Cancel the query; safe to call from any thread"""
+        self.cancel_event.set()
+        connection, backend = self.connection, self.backend
+        if connection is not None and backend is not None:
+            try:
+                backend.cancel(connection)
+            except Exception:
+                pass
+
+    def finished(self, future):
+        """Record the outcome and notify on_done"""
+        self.stats.finished = time.monotonic()
+        error = QueryCancelled() if future.cancelled() else future.exception()
+        if isinstance(error, QueryCancelled):
+            self.stats.cancelled = True
+        elif error is not None:
+            self.stats.error = str(error)
+        if self.on_done:
+            self.on_done(self.stats)
@@ -0,0 +1,395 @@
+"""
+Result Cache
+Query results kept by SQL fingerprint, parameters and profile, in memory and as compressed column files
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from core.backup.archive import load_zstd, read_frames, write_frame
+from core.database.backends import is_read_query
+from core.database.columnar import STR, Column, ColumnarResult
+from core.database.plans import fingerprint, normalize_sql, referenced_names, sql_literals, written_tables
+
+
+MAGIC = b'DBMRC1\n'
+EXTENSION = '.rc'
+
+# Results that depend on when, or how, they were read
+VOLATILE = re.compile(
+    r'\b(?:random|now|current_(?:date|time|timestamp)|localtime(?:stamp)?|clock_timestamp|statement_timestamp'
+    r'|transaction_timestamp|timeofday|nextval|currval|txid_current|gen_random_uuid|uuid_generate_v4'
+    r'|pg_sleep)\b|\bfor (?:no key )?(?:update|share)\b',
+)
+
+
+def load_codec(name, levels):
+    """(name, compress, decompress) for a codec; zstd falls back to zlib when not installed"""
+    if name == 'zstd':
+        try:
+            zstd = load_zstd()
+        except RuntimeError:
+            name = 'zlib'
+        else:
+            level = levels['zstd']
+            return 'zstd', lambda data: zstd.ZstdCompressor(level=level).compress(data), \
+                lambda data: zstd.ZstdDecompressor().decompress(data)
+    level = levels['zlib']
+    return 'zlib', lambda data: zlib.compress(data, level), zlib.decompress
+
+
+class ResultCache:
+    """Finished read results, reused until they expire or a write makes them stale
+
+    An entry is keyed by the profile, the fingerprint of the normalized
+    SQL, its literals and its parameters, so spacing, comments and keyword
+    case do not matter but values do. Results live in an LRU in memory and,
+    written by background threads, as compressed column files on disk that
+    survive restarts; each tier has its own byte budget.
+
+    Every entry remembers the identifiers its SQL mentions. A write
+    statement run through the app drops the entries of its profile that
+    mention a table it writes (all of them if the target is unknown), and a
+    query that was already running when a table changed is not stored.
+    Names are matched as written, not resolved through the catalog, so a
+    write to a table does not drop cached reads of a view, or a function,
+    over it. Those, like writes made elsewhere, are covered by ttl_s only.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.directory = os.path.expanduser(settings['directory'])
+        self.codec, self.compress, self.decompress = load_codec(settings['codec'], settings['levels'])
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()   # key -> (result, meta), least recently used first
+        self.memory_bytes = 0
+        self.entries = None           # key -> meta of the files on disk, read on first use
+        self.disk_bytes = 0
+        self.invalidated = {}         # (profile, table or None) -> sequence of its last invalidation
+        self.sequence = 0
+        self.executor = None
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.ms_saved = 0.0
+        self.stored = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def submit(self, function, *args):
+        """Run a function on the cache's own threads"""
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.settings['workers'], thread_name_prefix='result-cache')
+        return self.executor.submit(function, *args)
+
+    def close(self):
+        """Let pending file writes finish"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    # Keys
+
+    def key(self, profile, sql, params=None):
+        """Cache key of a statement, or None when its result must not be cached
+
+        Invalidation only sees the names in sql itself: a read of a view is
+        not dropped when a table under the view is written, only by ttl_s.
+        """
+        if not is_read_query(sql) or written_tables(sql) or VOLATILE.search(normalize_sql(sql)):
+            return None
+        material = json.dumps([profile, fingerprint(sql), sql_literals(sql), params], default=str)
+        return hashlib.sha1(material.encode()).hexdigest()
+
+    def epoch(self):
+        """Invalidation sequence to pass to put() for a query starting now"""
+        return self.sequence
+
+    def stale(self, meta, epoch):
+        """Whether a table the entry mentions was invalidated after epoch"""
+        invalidated = self.invalidated
+        profile = meta['profile']
+        if invalidated.get((profile, None), -1) > epoch:
+            return True
+        return any(invalidated.get((profile, name), -1) > epoch for name in meta['names'])
+
+    # Lookup
+
+    def has(self, key):
+        """Whether a live entry exists; counts a miss otherwise"""
+        now = time.time()
+        with self.lock:
+            self.load_index()
+            entry = self.memory.get(key)
+            meta = entry[1] if entry is not None else self.entries.get(key)
+            if meta is not None and meta['expires'] > now:
+                return True
+            self.misses += 1
+            return False
+
+    def get(self, key):
+        """(result, meta) of a live entry, loading it from disk if needed, or None"""
+        now = time.time()
+        with self.lock:
+            self.load_index()
+            entry = self.memory.get(key)
+            if entry is not None and entry[1]['expires'] <= now:
+                self.drop(key)
+                entry = None
+            if entry is not None:
+                self.memory.move_to_end(key)
+            else:
+                meta = self.entries.get(key)
+                if meta is None or meta['expires'] <= now:
+                    if meta is not None:
+                        self.drop(key)
+                    self.misses += 1
+                    return None
+                meta['used'] = now
+
+        if entry is None:
+            try:
+                result = self.read(meta['path'])
+            except (OSError, ValueError, zlib.error):
+                # Dropped meanwhile, or damaged
+                with self.lock:
+                    self.drop(key)
+                    self.misses += 1
+                return None
+            entry = (result, meta)
+            with self.lock:
+                if key in self.entries:
+                    self.remember(key, entry)
+
+        result, meta = entry
+        with self.lock:
+            self.hits += 1
+            self.bytes_saved += meta['raw_bytes']
+            self.ms_saved += meta['elapsed_ms']
+        return result.share(), meta
+
+    # Storing
+
+    def put(self, key, profile, sql, result, raw_bytes, elapsed_ms, epoch):
+        """Keep a finished result; returns whether it was cached"""
+        settings = self.settings
+        if elapsed_ms < settings['min_elapsed_ms']:
+            return False
+        size = result.memory_bytes()
+        if size > settings['max_entry_mb'] * 1024 * 1024:
+            return False
+        now = time.time()
+        meta = {
+            'key': key,
+            'profile': profile,
+            'sql': sql,
+            'names': sorted(referenced_names(sql)),
+            'created': now,
+            'expires': now + settings['ttl_s'],
+            'used': now,
+            'rows': result.row_count,
+            'raw_bytes': raw_bytes,
+            'elapsed_ms': elapsed_ms,
+            'memory_bytes': size,
+        }
+        result = result.share()
+        with self.lock:
+            if self.stale(meta, epoch):
+                return False
+            self.remember(key, (result, meta))
+            self.stored += 1
+        self.submit(self.write, key, result, meta, epoch)
+        return True
+
+    def remember(self, key, entry):
+        """Put an entry at the front of the memory tier and evict past its budget"""
+        previous = self.memory.pop(key, None)
+        if previous is not None:
+            self.memory_bytes -= previous[1]['memory_bytes']
+        self.memory[key] = entry
+        self.memory_bytes += entry[1]['memory_bytes']
+        budget = self.settings['memory_mb'] * 1024 * 1024
+        while self.memory_bytes > budget and len(self.memory) > 1:
+            _, (_, meta) = self.memory.popitem(last=False)
+            self.memory_bytes -= meta['memory_bytes']
+            self.evictions += 1
+
+    def write(self, key, result, meta, epoch):
+        """Write an entry's column file and index it (cache thread)"""
+        os.makedirs(self.directory, exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False)
+        try:
+            with handle:
+                header = dict(meta, codec=self.codec, columns=[
+                    {'name': column.name, 'kind': column.kind} for column in result.data
+                ])
+                handle.write(MAGIC)
+                write_frame(handle, json.dumps(header).encode())
+                for column in result.data:
+                    write_frame(handle, self.compress(np.packbits(column.null_mask()).tobytes()))
+                    if column.kind is not None:
+                        write_frame(handle, self.compress(column.values().tobytes()))
+                    if column.kind == STR:
+                        write_frame(handle, self.compress(json.dumps(column.dictionary).encode()))
+            path = os.path.join(self.directory, key + EXTENSION)
+            with self.lock:
+                self.load_index()
+                if self.stale(meta, epoch) or meta['expires'] <= time.time():
+                    return
+                os.replace(handle.name, path)
+                previous = self.entries.pop(key, None)
+                if previous is not None:
+                    self.disk_bytes -= previous['size']
+                meta['path'] = path
+                meta['size'] = os.path.getsize(path)
+                self.entries[key] = meta
+                self.disk_bytes += meta['size']
+                self.evict_disk()
+        finally:
+            if os.path.exists(handle.name):
+                os.remove(handle.name)
+
+    def read(self, path):
+        """Decode a column file into a result"""
+        with open(path, 'rb') as handle:
+            if handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a result cache file: {path}")
+            frames = read_frames(handle)
+            header = json.loads(next(frames))
+            decompress = load_codec(header['codec'], self.settings['levels'])[2] \
+                if header['codec'] != self.codec else self.decompress
+            rows = header['rows']
+            data = []
+            for spec in header['columns']:
+                column = Column(spec['name'], capacity=1)
+                column.kind = spec['kind']
+                column.length = rows
+                column.nulls = np.unpackbits(np.frombuffer(decompress(next(frames)), dtype=np.uint8),
+                                             count=rows).view(bool)
+                if column.kind is not None:
+                    column.data = np.frombuffer(decompress(next(frames)), dtype=column.dtype())
+                if column.kind == STR:
+                    column.dictionary = json.loads(decompress(next(frames)))
+                data.append(column)
+        return ColumnarResult.from_columns(data, rows)
+
+    # Disk index
+
+    def load_index(self):
+        """Read the headers of the files on disk once, dropping expired and damaged ones"""
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(EXTENSION):
+                if entry.name.endswith('.tmp'):
+                    os.remove(entry.path)
+                continue
+            try:
+                with open(entry.path, 'rb') as handle:
+                    if handle.read(len(MAGIC)) != MAGIC:
+                        raise ValueError(entry.path)
+                    meta = json.loads(next(read_frames(handle)))
+            except (OSError, ValueError, StopIteration):
+                os.remove(entry.path)
+                continue
+            if meta['expires'] <= now:
+                os.remove(entry.path)
+                continue
+            meta['path'] = entry.path
+            meta['size'] = entry.stat().st_size
+            meta['used'] = entry.stat().st_atime
+            self.entries[meta['key']] = meta
+            self.disk_bytes += meta['size']
+        self.evict_disk()
+
+    def evict_disk(self):
+        """Remove expired files, then the least recently used ones past the disk budget"""
+        now = time.time()
+        for key in [key for key, meta in self.entries.items() if meta['expires'] <= now]:
+            self.drop_file(key)
+        budget = self.settings['disk_mb'] * 1024 * 1024
+        if self.disk_bytes > budget:
+            for key in sorted(self.entries, key=lambda key: self.entries[key]['used']):
+                if self.disk_bytes <= budget:
+                    break
+                self.drop_file(key)
+                self.evictions += 1
+
+    def drop_file(self, key):
+        meta = self.entries.pop(key, None)
+        if meta is not None:
+            self.disk_bytes -= meta['size']
+            try:
+                os.remove(meta['path'])
+            except OSError:
+                pass
+
+    def drop(self, key):
+        """Remove an entry from both tiers"""
+        entry = self.memory.pop(key, None)
+        if entry is not None:
+            self.memory_bytes -= entry[1]['memory_bytes']
+        self.drop_file(key)
+
+    # Invalidation
+
+    def invalidate(self, profile, tables=None):
+        """Drop a profile's entries that mention any of the tables (all of them for None); returns the count"""
+        with self.lock:
+            self.load_index()
+            self.sequence += 1
+            names = None
+            if tables is None:
+                self.invalidated[(profile, None)] = self.sequence
+            else:
+                names = {table.lower() for table in tables}
+                for name in names:
+                    self.invalidated[(profile, name)] = self.sequence
+            metas = [entry[1] for entry in self.memory.values()] + list(self.entries.values())
+            keys = {meta['key'] for meta in metas
+                    if meta['profile'] == profile and (names is None or names.intersection(meta['names']))}
+            for key in keys:
+                self.drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """Drop every entry"""
+        with self.lock:
+            self.load_index()
+            for key in list(self.memory) + list(self.entries):
+                self.drop(key)
+
+    def metrics(self):
+        """Hit/miss counters, savings and the size of both tiers"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'bytes_saved': self.bytes_saved,
+                'ms_saved': self.ms_saved,
+                'stored': self.stored,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'memory_entries': len(self.memory),
+                'memory_bytes': self.memory_bytes,
+                'disk_entries': len(self.entries or ()),
+                'disk_bytes': self.disk_bytes,
+            }
@@ -0,0 +1,514 @@
+"""
+Disk Usage
+du-style analysis: a parallel tree walk aggregated into a compact array-backed directory tree
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+
+
+TREE_VERSION = 1
+
+# Per-process walk options of a pool worker, set up once by init_worker
+worker = {}
+
+
+def init_worker(exclude, one_file_system):
+    worker['exclude'] = frozenset(exclude)
+    worker['one_file_system'] = one_file_system
+
+
+def usage_task(paths, budget, device):
+    """Sum the files of directories depth-first until budget entries are read (pool worker)
+
+    Each scanned directory comes back as (path, files, bytes, disk bytes,
+    subdirectory names, errors); only per-directory totals cross the process
+    boundary, never per-file records. Directories left to walk are handed
+    back so the coordinator can give them to idle workers.
+    """
+    exclude = worker['exclude']
+    same_device = device if worker['one_file_system'] else None
+    stack = list(paths)
+    scanned = []
+    count = 0
+    while stack and count < budget:
+        path = stack.pop()
+        files = size = disk = errors = 0
+        subdirs = []
+        inodes = set()
+        try:
+            with os.scandir(path) as iterator:
+                for entry in iterator:
+                    try:
+                        result = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        errors += 1
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        disk += result.st_blocks * 512
+                        if entry.name not in exclude and (same_device is None or result.st_dev == same_device):
+                            subdirs.append(entry.name)
+                        continue
+                    if result.st_nlink > 1:
+                        # Hard links within a directory count once, like du
+                        if result.st_ino in inodes:
+                            continue
+                        inodes.add(result.st_ino)
+                    files += 1
+                    size += result.st_size
+                    disk += result.st_blocks * 512
+        except OSError:
+            errors += 1
+        scanned.append((path, files, size, disk, subdirs, errors))
+        stack.extend(os.path.join(path, name) for name in subdirs)
+        count += files + len(subdirs) + 1
+    return {'dirs': scanned, 'pending': stack}
+
+
+class DiskUsageTree:
+    """Directories of one analyzed tree as parallel arrays
+
+    Node 0 is the root and every node is added after its parent, so a
+    child's id is always larger than its parent's. Names live in one
+    UTF-8 blob with offsets, so a tree costs roughly 40 bytes per
+    directory and nothing per file. Counters hold a node's own files
+    while walking; finish() rolls them up into subtree totals.
+    """
+
+    COUNTERS = ('files', 'bytes', 'disk', 'dirs')
+
+    def __init__(self, root, capacity=4096):
+        self.root = root
+        self.length = 0
+        self.parent = np.zeros(capacity, dtype=np.int32)
+        self.depth = np.zeros(capacity, dtype=np.uint16)
+        self.files = np.zeros(capacity, dtype=np.int64)
+        self.bytes = np.zeros(capacity, dtype=np.int64)
+        self.disk = np.zeros(capacity, dtype=np.int64)
+        self.dirs = np.zeros(capacity, dtype=np.int64)
+        self.name_offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self.name_blob = bytearray()
+        self.child_order = None
+        self.child_start = None
+        self.built_at = None
+        self.elapsed = None
+        self.complete = False
+
+    def __len__(self):
+        return self.length
+
+    def reserve(self, needed):
+        """Grow the arrays geometrically so appends stay amortized O(1)"""
+        capacity = len(self.parent)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('parent', 'depth') + self.COUNTERS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.length] = old[:self.length]
+            setattr(self, name, new)
+        offsets = np.zeros(capacity + 1, dtype=np.int64)
+        offsets[:self.length + 1] = self.name_offsets[:self.length + 1]
+        self.name_offsets = offsets
+
+    def add(self, parent, name):
+        """Append a directory node and return its id"""
+        node = self.length
+        self.reserve(node + 1)
+        self.name_blob += name.encode('utf-8', 'surrogateescape')
+        self.name_offsets[node + 1] = len(self.name_blob)
+        self.parent[node] = parent
+        self.depth[node] = self.depth[parent] + 1 if node else 0
+        self.dirs[node] = 1
+        self.length = node + 1
+        return node
+
+    def set_own(self, node, files, size, disk):
+        self.files[node] = files
+        self.bytes[node] = size
+        self.disk[node] = disk
+
+    def finish(self):
+        """Roll node counters up into subtree totals and index the children"""
+        length = self.length
+        for name in ('parent', 'depth') + self.COUNTERS:
+            setattr(self, name, getattr(self, name)[:length].copy())
+        self.name_offsets = self.name_offsets[:length + 1].copy()
+        self.name_blob = bytes(self.name_blob)
+
+        # Deepest level first, so every child is final before it is added to its parent
+        by_depth = np.argsort(self.depth, kind='stable')
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(self.depth))))
+        for level in range(len(bounds) - 2, 0, -1):
+            nodes = by_depth[bounds[level]:bounds[level + 1]]
+            parents = self.parent[nodes]
+            for name in self.COUNTERS:
+                counter = getattr(self, name)
+                np.add.at(counter, parents, counter[nodes])
+        self.index_children()
+        self.complete = True
+
+    def index_children(self):
+        children = self.parent[1:]
+        self.child_order = (np.argsort(children, kind='stable') + 1).astype(np.int32)
+        self.child_start = np.concatenate(([0], np.cumsum(np.bincount(children, minlength=self.length))))
+
+    def name(self, node):
+        start, stop = self.name_offsets[node], self.name_offsets[node + 1]
+        return self.name_blob[start:stop].decode('utf-8', 'surrogateescape')
+
+    def path(self, node):
+        parts = []
+        while node:
+            parts.append(self.name(node))
+            node = int(self.parent[node])
+        return os.path.join(self.root, *reversed(parts))
+
+    def children(self, node, key='disk'):
+        """Ids of a node's subdirectories, largest first"""
+        ids = self.child_order[self.child_start[node]:self.child_start[node + 1]]
+        values = getattr(self, key)[ids]
+        return ids[np.argsort(-values, kind='stable')]
+
+    def node_for(self, path):
+        """Node id of a directory inside the tree, or None"""
+        relative = os.path.relpath(os.path.abspath(path), self.root)
+        if relative == os.curdir:
+            return 0
+        if relative.startswith(os.pardir):
+            return None
+        node = 0
+        for part in relative.split(os.sep):
+            for child in self.child_order[self.child_start[node]:self.child_start[node + 1]]:
+                if self.name(child) == part:
+                    node = int(child)
+                    break
+            else:
+                return None
+        return node
+
+    def totals(self, node):
+        """Subtree totals of a node; own_* are the files directly inside it"""
+        ids = self.child_order[self.child_start[node]:self.child_start[node + 1]]
+        values = {name: int(getattr(self, name)[node]) for name in self.COUNTERS}
+        for name in ('files', 'bytes', 'disk'):
+            values['own_' + name] = values[name] - int(getattr(self, name)[ids].sum())
+        return values
+
+    def memory_bytes(self):
+        arrays = (self.parent, self.depth, self.name_offsets, self.child_order, self.child_start)
+        arrays += tuple(getattr(self, name) for name in self.COUNTERS)
+        return sum(array.nbytes for array in arrays if array is not None) + len(self.name_blob)
+
+    def save(self, path):
+        """Write a finished tree to an .npz file (atomically)"""
+        temp = path + '.tmp.npz'
+        np.savez(
+            temp,
+            version=TREE_VERSION,
+            root=self.root,
+            built_at=self.built_at,
+            elapsed=self.elapsed,
+            names=np.frombuffer(self.name_blob, dtype=np.uint8),
+            **{name: getattr(self, name) for name in ('parent', 'depth', 'name_offsets') + self.COUNTERS}
+        )
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path):
+        """A tree saved by save(), or None when the file is missing or stale"""
+        try:
+            with np.load(path) as data:
+                if int(data['version']) != TREE_VERSION:
+                    return None
+                tree = cls(str(data['root']), capacity=1)
+                for name in ('parent', 'depth', 'name_offsets') + cls.COUNTERS:
+                    setattr(tree, name, data[name])
+                tree.name_blob = data['names'].tobytes()
+                tree.built_at = float(data['built_at'])
+                tree.elapsed = float(data['elapsed'])
+        except (OSError, KeyError, ValueError):
+            return None
+        tree.length = len(tree.parent)
+        tree.index_children()
+        tree.complete = True
+        return tree
+
+
+class UsageProgress:
+    """Counters of a disk usage walk; top holds running (name, disk bytes) per top-level folder"""
+
+    __slots__ = ('root', 'phase', 'dirs', 'files', 'bytes', 'disk', 'errors', 'top',
+                 'started', 'finished', 'error')
+
+    def __init__(self, root):
+        self.root = root
+        self.phase = 'walking'
+        self.dirs = 0
+        self.files = 0
+        self.bytes = 0
+        self.disk = 0
+        self.errors = 0
+        self.top = []
+        self.started = time.monotonic()
+        self.finished = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def files_per_second(self):
+        elapsed = self.elapsed
+        return self.files / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(elapsed=self.elapsed, files_per_second=self.files_per_second)
+        return values
+
+
+class DiskUsageScan:
+    """One analysis run: walk in worker processes, build the tree on a coordinator thread
+
+    Workers take a few directories each and walk depth-first up to a budget
+    of entries, then hand the rest back; the coordinator re-splits leftovers
+    across tasks, so one huge subtree ends up spread over every worker.
+    Running totals per top-level folder are published while walking.
+    """
+
+    def __init__(self, root, settings, on_progress=None, on_done=None):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.settings = settings
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.workers = settings['workers'] or os.cpu_count() or 1
+        self.progress = UsageProgress(self.root)
+        self.tree = None
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='disk-usage', daemon=True)
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def notify(self):
+        if self.on_progress:
+            self.on_progress(self.progress.snapshot())
+
+    def run(self):
+        progress = self.progress
+        try:
+            tree = self.walk()
+            if tree is None:
+                progress.phase = 'cancelled'
+            else:
+                progress.phase = 'aggregating'
+                self.notify()
+                # du counts the root folder's own blocks too
+                tree.disk[0] += os.lstat(self.root).st_blocks * 512
+                tree.finish()
+                tree.built_at = time.time()
+                tree.elapsed = progress.elapsed
+                self.tree = tree
+                progress.phase = 'complete'
+        except Exception as error:
+            progress.phase = 'failed'
+            progress.error = str(error)
+        finally:
+            progress.finished = time.monotonic()
+            # The tree is in the cache before listeners hear that the scan finished
+            if self.on_done:
+                self.on_done(self)
+            self.notify()
+
+    def walk(self):
+        """Build the tree of node-own counters; None when cancelled"""
+        settings = self.settings
+        progress = self.progress
+        tree = DiskUsageTree(self.root)
+        root_node = tree.add(0, '')
+        device = os.stat(self.root).st_dev
+        frontier = {self.root: root_node}
+        # Top-level folder of every node, for the running per-folder totals
+        top = np.zeros(len(tree.parent), dtype=np.int32)
+        running = {}
+        pending = [[self.root]]
+        in_flight = set()
+        last_notify = time.monotonic()
+        context = multiprocessing.get_context(settings['start_method'])
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=init_worker,
+            initargs=(settings['exclude'], settings['one_file_system']),
+        ) as pool:
+            try:
+                while pending or in_flight:
+                    if self.cancel_event.is_set():
+                        return None
+                    while pending and len(in_flight) < self.workers * 2:
+                        in_flight.add(pool.submit(usage_task, pending.pop(), settings['task_entries'], device))
+
+                    done, _ = wait(in_flight, timeout=0.25, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        in_flight.discard(future)
+                        result = future.result()
+                        # Parents always precede their children in a result
+                        for path, files, size, disk, subdirs, errors in result['dirs']:
+                            node = frontier.pop(path)
+                            tree.set_own(node, files, size, disk)
+                            for name in subdirs:
+                                child = tree.add(node, name)
+                                frontier[os.path.join(path, name)] = child
+                            if len(top) < tree.length:
+                                top = np.resize(top, len(tree.parent))
+                            added = slice(tree.length - len(subdirs), tree.length)
+                            if node == root_node:
+                                top[added] = np.arange(added.start, added.stop)
+                            else:
+                                top[added] = top[node]
+                                running[int(top[node])] = running.get(int(top[node]), 0) + disk
+                            progress.dirs += 1
+                            progress.files += files
+                            progress.bytes += size
+                            progress.disk += disk
+                            progress.errors += errors
+                        leftover = result['pending']
+                        step = max(1, len(leftover) // self.workers)
+                        for start in range(0, len(leftover), step):
+                            pending.append(leftover[start:start + step])
+
+                    now = time.monotonic()
+                    if now - last_notify >= settings['progress_interval_ms'] / 1000:
+                        largest = sorted(running.items(), key=lambda item: item[1], reverse=True)[:12]
+                        progress.top = [(tree.name(node), disk) for node, disk in largest]
+                        self.notify()
+                        last_notify = now
+            finally:
+                for future in in_flight:
+                    future.cancel()
+        return tree
+
+
+class DiskUsageAnalyzer:
+    """Runs disk usage scans and keeps their trees for instant drill-down
+
+    Finished trees stay in memory (LRU) and are saved under cache_dir, so a
+    folder inside any analyzed tree opens without walking it again, also
+    after a restart. One scan runs at a time. Listeners are called as
+    callback(progress) on the scan's thread.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.cache_dir = os.path.expanduser(settings['cache_dir'])
+        self.trees = OrderedDict()
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.scan = None
+
+    def add_listener(self, callback):
+        """Add a callback invoked as callback(progress)"""
+        self.listeners.append(callback)
+
+    def notify(self, progress):
+        for callback in self.listeners:
+            callback(progress)
+
+    @property
+    def running(self):
+        return self.scan is not None and self.scan.running
+
+    def cache_path(self, root):
+        digest = hashlib.sha1(root.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.npz")
+
+    def analyze(self, path):
+        """Start walking a directory, cancelling a scan of another one"""
+        root = os.path.abspath(os.path.expanduser(path))
+        if not os.path.isdir(root):
+            raise NotADirectoryError(root)
+        if self.scan is not None and self.scan.running:
+            if self.scan.root == root:
+                return self.scan
+            self.scan.cancel()
+        self.scan = DiskUsageScan(root, self.settings, on_progress=self.notify, on_done=self.finished)
+        return self.scan.start()
+
+    def finished(self, scan):
+        if scan.tree is None:
+            return
+        self.remember(scan.tree)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            scan.tree.save(self.cache_path(scan.root))
+        except OSError:
+            pass
+
+    def remember(self, tree):
+        with self.lock:
+            self.trees[tree.root] = tree
+            self.trees.move_to_end(tree.root)
+            while len(self.trees) > self.settings['cache_trees']:
+                self.trees.popitem(last=False)
+
+    def lookup(self, path):
+        """(tree, node) of the newest analyzed tree containing path, or (None, None)"""
+        path = os.path.abspath(os.path.expanduser(path))
+        with self.lock:
+            candidates = list(reversed(self.trees.values()))
+        for tree in candidates:
+            node = tree.node_for(path)
+            if node is not None:
+                with self.lock:
+                    if tree.root in self.trees:
+                        self.trees.move_to_end(tree.root)
+                return tree, node
+
+        # Saved trees of this folder or one of its parents
+        probe = path
+        while True:
+            tree = DiskUsageTree.load(self.cache_path(probe))
+            if tree is not None and tree.root == probe:
+                node = tree.node_for(path)
+                if node is not None:
+                    self.remember(tree)
+                    return tree, node
+            parent = os.path.dirname(probe)
+            if parent == probe:
+                return None, None
+            probe = parent
+
+    @staticmethod
+    def filesystem_usage(path):
+        """(used, total) bytes of the filesystem holding path"""
+        stats = os.statvfs(os.path.expanduser(path))
+        total = stats.f_blocks * stats.f_frsize
+        return total - stats.f_bfree * stats.f_frsize, total
+
+    def cancel(self):
+        """Stop the running scan, keeping the previous tree of its folder"""
+        if self.scan is not None:
+            self.scan.cancel()
+
+    def shutdown(self):
+        self.cancel()
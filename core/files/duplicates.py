@@ -0,0 +1,388 @@
+"""
+Duplicate Finder
+Staged size → partial hash → full hash duplicate detection with a persistent hash cache
+"""
+
+import hashlib
+import os
+import sqlite3
+import stat
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+DIGEST_SIZE = 16
+
+HASH_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    partial BLOB,
+    full BLOB,
+    seen REAL NOT NULL,
+    PRIMARY KEY (dev, ino)
+) WITHOUT ROWID;
+"""
+
+
+class ScanCancelled(Exception):
+    """Raised inside a scan loop when the scan is cancelled"""
+
+
+class HashCache:
+    """Hashes of previously read files, keyed on (device, inode)
+
+    An entry is only used while the file's size and mtime still match, so
+    re-scanning an unchanged tree reads nothing but directory entries.
+    Owned by the scan's coordinator thread.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=30.0)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(HASH_CACHE_SCHEMA)
+        self.pending = {}
+        self.now = time.time()
+
+    def get(self, record):
+        """(partial, full) digests of a (path, dev, ino, mtime_ns, size) record, or None"""
+        _, dev, ino, mtime_ns, size = record
+        row = self.pending.get((dev, ino))
+        if row is None:
+            row = self.connection.execute(
+                "SELECT size, mtime_ns, partial, full FROM hashes WHERE dev = ? AND ino = ?",
+                (dev, ino)
+            ).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns:
+            return None
+        return row[2], row[3]
+
+    def put(self, record, partial=None, full=None):
+        """Remember digests of a record; unknown ones keep their cached value"""
+        _, dev, ino, mtime_ns, size = record
+        cached = self.get(record) or (None, None)
+        self.pending[(dev, ino)] = (size, mtime_ns, partial or cached[0], full or cached[1])
+        if len(self.pending) >= 5000:
+            self.flush()
+
+    def touch(self, records):
+        """Mark cached records as seen, so pruning keeps them"""
+        self.connection.executemany(
+            "UPDATE hashes SET seen = ? WHERE dev = ? AND ino = ?",
+            ((self.now, dev, ino) for _, dev, ino, _, _ in records)
+        )
+
+    def flush(self):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO hashes (dev, ino, size, mtime_ns, partial, full, seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((dev, ino, size, mtime_ns, partial, full, self.now)
+             for (dev, ino), (size, mtime_ns, partial, full) in self.pending.items())
+        )
+        self.connection.commit()
+        self.pending.clear()
+
+    def prune(self, max_age):
+        """Drop entries of files not seen for max_age seconds"""
+        self.connection.execute("DELETE FROM hashes WHERE seen < ?", (self.now - max_age,))
+        self.connection.commit()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+def partial_digest(path, size, block):
+    """Hash of the size and the first and last blocks; the whole file when it is small"""
+    digest = hashlib.blake2b(size.to_bytes(8, 'little'), digest_size=DIGEST_SIZE)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if size <= 2 * block:
+            digest.update(os.pread(fd, size, 0))
+        else:
+            digest.update(os.pread(fd, block, 0))
+            digest.update(os.pread(fd, block, size - block))
+    finally:
+        os.close(fd)
+    return digest.digest()
+
+
+class FullHasher:
+    """Whole-file hashing with one large read buffer per thread
+
+    Reads go into a reused buffer and hashlib releases the GIL on large
+    updates, so several threads keep several disks (or one SSD queue) busy.
+    """
+
+    def __init__(self, buffer_size, cancel_event):
+        self.buffer_size = buffer_size
+        self.cancel_event = cancel_event
+        self.local = threading.local()
+
+    def buffer(self):
+        view = getattr(self.local, 'view', None)
+        if view is None:
+            view = self.local.view = memoryview(bytearray(self.buffer_size))
+        return view
+
+    def __call__(self, path, size):
+        view = self.buffer()
+        digest = hashlib.blake2b(size.to_bytes(8, 'little'), digest_size=DIGEST_SIZE)
+        with open(path, 'rb', buffering=0) as handle:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                if self.cancel_event.is_set():
+                    raise ScanCancelled()
+                count = handle.readinto(view)
+                if not count:
+                    break
+                digest.update(view[:count])
+        return digest.digest()
+
+
+class DuplicateProgress:
+    """Counters of a duplicate scan; phase is walking, partial, full or a final state"""
+
+    __slots__ = ('phase', 'files', 'bytes', 'candidates', 'hashed', 'to_hash', 'hashed_bytes',
+                 'cache_hits', 'errors', 'groups', 'wasted_bytes', 'started', 'finished', 'error')
+
+    def __init__(self):
+        self.phase = 'walking'
+        self.files = 0
+        self.bytes = 0
+        self.candidates = 0
+        self.hashed = 0
+        self.to_hash = 0
+        self.hashed_bytes = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.groups = 0
+        self.wasted_bytes = 0
+        self.started = time.monotonic()
+        self.finished = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def bytes_per_second(self):
+        elapsed = self.elapsed
+        return self.hashed_bytes / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(elapsed=self.elapsed, bytes_per_second=self.bytes_per_second)
+        return values
+
+
+class DuplicateScan:
+    """Finds files with identical content under a set of roots
+
+    Files are grouped by size while walking; only sizes shared by several
+    files are read at all. Those get a partial hash of their first and last
+    blocks, and only files still colliding after that are hashed in full.
+    Hard links to one inode count once. groups holds the result as
+    (size, digest, paths) tuples, largest waste first.
+    """
+
+    def __init__(self, roots, settings, on_progress=None):
+        self.roots = [os.path.abspath(os.path.expanduser(root)) for root in roots]
+        self.settings = settings
+        self.on_progress = on_progress
+        self.exclude = set(settings['exclude'])
+        self.block = settings['partial_block_kb'] * 1024
+        self.workers = settings['workers'] or min(8, 2 * (os.cpu_count() or 1))
+        self.progress = DuplicateProgress()
+        self.groups = []
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.last_notify = 0.0
+
+    def start(self):
+        """Run the scan on a coordinator thread"""
+        self.thread = threading.Thread(target=self.run, name='duplicate-scan', daemon=True)
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def notify(self, force=False):
+        now = time.monotonic()
+        if self.on_progress and (force or now - self.last_notify >= self.settings['progress_interval_ms'] / 1000):
+            self.last_notify = now
+            self.on_progress(self.progress.snapshot())
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise ScanCancelled()
+
+    def run(self):
+        progress = self.progress
+        cache = None
+        try:
+            cache = HashCache(self.settings['hash_cache'])
+            by_size = self.walk()
+
+            progress.phase = 'partial'
+            candidates = [records for records in by_size.values() if len(records) > 1]
+            progress.candidates = sum(len(records) for records in candidates)
+            self.notify(force=True)
+            by_partial = self.hash_stage(cache, candidates, full=False)
+
+            # Small files were hashed whole in the partial pass
+            progress.phase = 'full'
+            candidates = [records for records in by_partial.values()
+                          if len(records) > 1 and records[0][4] > 2 * self.block]
+            groups = [(records[0][4], digest, records) for (_, digest), records in by_partial.items()
+                      if len(records) > 1 and records[0][4] <= 2 * self.block]
+            self.notify(force=True)
+            by_full = self.hash_stage(cache, candidates, full=True)
+            groups.extend((records[0][4], digest, records) for (_, digest), records in by_full.items()
+                          if len(records) > 1)
+
+            groups.sort(key=lambda group: group[0] * (len(group[2]) - 1), reverse=True)
+            self.groups = [(size, digest.hex(), sorted(record[0] for record in records))
+                           for size, digest, records in groups]
+            progress.groups = len(groups)
+            progress.wasted_bytes = sum(size * (len(paths) - 1) for size, _, paths in self.groups)
+            cache.prune(self.settings['cache_days'] * 86400)
+            progress.phase = 'complete'
+        except ScanCancelled:
+            progress.phase = 'cancelled'
+        except Exception as error:
+            progress.phase = 'failed'
+            progress.error = str(error)
+        finally:
+            if cache is not None:
+                try:
+                    cache.close()
+                except sqlite3.Error:
+                    pass
+            progress.finished = time.monotonic()
+            self.notify(force=True)
+
+    def walk(self):
+        """Regular files by size as (path, dev, ino, mtime_ns, size), hard links collapsed"""
+        min_size = max(1, self.settings['min_size'])
+        one_file_system = self.settings['one_file_system']
+        by_size = defaultdict(list)
+        inodes = set()
+        progress = self.progress
+
+        for root in self.roots:
+            device = os.stat(root).st_dev
+            stack = [root]
+            while stack:
+                self.check_cancelled()
+                path = stack.pop()
+                try:
+                    with os.scandir(path) as entries:
+                        for entry in entries:
+                            if entry.name in self.exclude:
+                                continue
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    if not one_file_system or entry.stat(follow_symlinks=False).st_dev == device:
+                                        stack.append(entry.path)
+                                    continue
+                                if not entry.is_file(follow_symlinks=False):
+                                    continue
+                                result = entry.stat(follow_symlinks=False)
+                            except OSError:
+                                progress.errors += 1
+                                continue
+                            if not stat.S_ISREG(result.st_mode) or result.st_size < min_size:
+                                continue
+                            key = (result.st_dev, result.st_ino)
+                            if key in inodes:
+                                continue
+                            inodes.add(key)
+                            by_size[result.st_size].append(
+                                (entry.path, result.st_dev, result.st_ino, result.st_mtime_ns, result.st_size)
+                            )
+                            progress.files += 1
+                            progress.bytes += result.st_size
+                except OSError:
+                    progress.errors += 1
+                self.notify()
+        return by_size
+
+    def hash_stage(self, cache, candidates, full):
+        """Group candidate records by (size, digest), hashing cache misses on the thread pool"""
+        progress = self.progress
+        grouped = defaultdict(list)
+        misses = []
+        seen = []
+        for records in candidates:
+            for record in records:
+                cached = cache.get(record)
+                digest = cached and cached[1 if full else 0]
+                if digest:
+                    grouped[(record[4], digest)].append(record)
+                    seen.append(record)
+                    progress.cache_hits += 1
+                else:
+                    misses.append(record)
+        cache.touch(seen)
+
+        progress.hashed = 0
+        progress.to_hash = len(misses)
+        # Inode order approximates on-disk order, which keeps spinning disks streaming
+        misses.sort(key=lambda record: (record[1], record[2]))
+        hasher = FullHasher(self.settings['read_buffer_kb'] * 1024, self.cancel_event)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='duplicate-hash') as pool:
+            in_flight = {}
+            position = 0
+            try:
+                while position < len(misses) or in_flight:
+                    self.check_cancelled()
+                    while position < len(misses) and len(in_flight) < self.workers * 4:
+                        record = misses[position]
+                        position += 1
+                        if full:
+                            future = pool.submit(hasher, record[0], record[4])
+                        else:
+                            future = pool.submit(partial_digest, record[0], record[4], self.block)
+                        in_flight[future] = record
+                    done, _ = wait(in_flight, timeout=0.25, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record = in_flight.pop(future)
+                        progress.hashed += 1
+                        try:
+                            digest = future.result()
+                        except ScanCancelled:
+                            raise
+                        except OSError:
+                            progress.errors += 1
+                            continue
+                        size = record[4]
+                        progress.hashed_bytes += size if full or size <= 2 * self.block else 2 * self.block
+                        if full:
+                            cache.put(record, full=digest)
+                        elif size <= 2 * self.block:
+                            cache.put(record, partial=digest, full=digest)
+                        else:
+                            cache.put(record, partial=digest)
+                        grouped[(size, digest)].append(record)
+                    self.notify()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+        cache.flush()
+        return grouped
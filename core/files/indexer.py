@@ -0,0 +1,472 @@
+"""
+File Indexer
+Parallel initial build of the search index, then incremental updates from directory watches
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from core.files.search_index import FileIndex, SearchQuery, content_words, file_extension
+from core.files.watcher import InotifyWatcher, PollingWatcher, WatchLimitReached
+
+
+# Per-process scan options of a pool worker, set up once by init_worker
+worker = {}
+
+
+def scan_options(settings):
+    """Picklable scan options from the SEARCH_INDEX settings"""
+    return {
+        'exclude': frozenset(settings['exclude']),
+        'content': settings['content'],
+        'content_extensions': frozenset(settings['content_extensions']),
+        'content_max_bytes': settings['content_max_kb'] * 1024,
+        'content_max_words': settings['content_max_words'],
+        'one_file_system': settings['one_file_system'],
+    }
+
+
+def init_worker(options):
+    worker['options'] = options
+
+
+def read_words(path, options):
+    """Distinct words of a text file, or None for binary or unreadable files"""
+    try:
+        with open(path, 'rb') as handle:
+            data = handle.read(options['content_max_bytes'])
+    except OSError:
+        return None
+    if b'\0' in data[:8192]:
+        return None
+    return content_words(data.decode('utf-8', errors='ignore'), options['content_max_words']) or None
+
+
+def wants_words(name, size, options):
+    return (options['content'] and 0 < size <= options['content_max_bytes']
+            and file_extension(name) in options['content_extensions'])
+
+
+def entry_record(path, name, result, options):
+    """(name, is_dir, size, mtime, words) of one lstat result"""
+    is_dir = (result.st_mode & 0o170000) == 0o040000
+    size = 0 if is_dir else result.st_size
+    words = read_words(os.path.join(path, name), options) if not is_dir and wants_words(name, size, options) else None
+    return name, is_dir, size, result.st_mtime, words
+
+
+def scan_directory(path, options, device=None):
+    """(mtime_ns, entries, subdirectories) of one directory"""
+    mtime_ns = os.stat(path).st_mtime_ns
+    entries, subdirs = [], []
+    exclude = options['exclude']
+    with os.scandir(path) as iterator:
+        for entry in iterator:
+            if entry.name in exclude:
+                continue
+            try:
+                result = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            record = entry_record(path, entry.name, result, options)
+            entries.append(record)
+            if record[1] and (device is None or result.st_dev == device):
+                subdirs.append(entry.path)
+    return mtime_ns, entries, subdirs
+
+
+def stat_entries(path, names, options):
+    """Records of the named entries that still exist"""
+    entries = []
+    for name in names:
+        if name in options['exclude']:
+            continue
+        try:
+            result = os.lstat(os.path.join(path, name))
+        except OSError:
+            continue
+        entries.append(entry_record(path, name, result, options))
+    return entries
+
+
+def scan_task(paths, budget, device):
+    """Walk directories depth-first until budget entries are read (pool worker)
+
+    Returns the scanned directories and the ones left to walk, which the
+    coordinator hands out as new tasks so big subtrees spread over workers.
+    """
+    options = worker['options']
+    stack = list(paths)
+    scanned = []
+    count = 0
+    while stack and count < budget:
+        path = stack.pop()
+        try:
+            mtime_ns, entries, subdirs = scan_directory(path, options, device if options['one_file_system'] else None)
+        except OSError:
+            continue
+        scanned.append((path, mtime_ns, entries))
+        stack.extend(subdirs)
+        count += len(entries) + 1
+    return {'dirs': scanned, 'pending': stack}
+
+
+class IndexProgress:
+    """Counters of the indexer; phase is building, indexing, watching, idle or failed"""
+
+    __slots__ = ('phase', 'dirs', 'entries', 'started', 'finished', 'watched', 'polled',
+                 'updates', 'last_update', 'error')
+
+    def __init__(self, phase='idle'):
+        self.phase = phase
+        self.dirs = 0
+        self.entries = 0
+        self.started = time.monotonic()
+        self.finished = None
+        self.watched = 0
+        self.polled = 0
+        self.updates = 0
+        self.last_update = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def entries_per_second(self):
+        elapsed = self.elapsed
+        return self.entries / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(elapsed=self.elapsed, entries_per_second=self.entries_per_second)
+        return values
+
+
+class FileIndexer:
+    """Builds the search index across a process pool and keeps it current
+
+    The first run walks the configured roots in worker processes into a new
+    index file, which then replaces the old one, so searches keep working
+    during a rebuild. Afterwards directories are watched with inotify (up to
+    the kernel's watch limit) and polled by mtime beyond it; changes are
+    debounced and applied per directory. Listeners are called as
+    callback(progress) on the indexer thread.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.path = os.path.expanduser(settings['path'])
+        self.index = FileIndex(self.path)
+        self.options = scan_options(settings)
+        self.roots = [os.path.abspath(os.path.expanduser(root)) for root in settings['roots']]
+        self.progress = IndexProgress()
+        self.listeners = []
+        self.stop_event = threading.Event()
+        self.rebuild_event = threading.Event()
+        self.thread = None
+        self.searcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='file-search')
+        self.inotify = None
+        self.polling = PollingWatcher()
+
+    def add_listener(self, callback):
+        """Add a callback invoked as callback(progress)"""
+        self.listeners.append(callback)
+
+    def notify(self):
+        snapshot = self.progress.snapshot()
+        for callback in self.listeners:
+            callback(snapshot)
+
+    def start(self):
+        """Build (if needed) and watch on a background thread"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name='file-indexer', daemon=True)
+            self.thread.start()
+        return self
+
+    def rebuild(self):
+        """Rebuild the index from scratch; searches use the old one meanwhile"""
+        self.rebuild_event.set()
+
+    def search(self, text, limit=None):
+        """Run a search off the Tk thread; the Future gives (query, rows, seconds)"""
+        return self.searcher.submit(self.run_search, text, limit or self.settings['result_limit'])
+
+    def run_search(self, text, limit):
+        started = time.perf_counter()
+        query = SearchQuery(text)
+        rows = [] if query.empty else self.index.search(query, limit)
+        return query, rows, time.perf_counter() - started
+
+    def counts(self):
+        """Future of the indexed file and folder counts"""
+        return self.searcher.submit(self.index.counts)
+
+    # Indexer thread
+
+    def run(self):
+        connection = None
+        try:
+            probe = self.index.open()
+            built = FileIndex.get_meta(probe, 'roots') == '\n'.join(self.roots)
+            probe.close()
+            while not self.stop_event.is_set():
+                if not built or self.rebuild_event.is_set():
+                    if connection is not None:
+                        connection.close()
+                        connection = None
+                    self.rebuild_event.clear()
+                    if not self.build():
+                        return
+                    built = True
+                if connection is None:
+                    connection = self.index.open()
+                    self.watch_all(connection)
+                self.watch(connection)
+        except Exception as error:
+            self.progress.phase = 'failed'
+            self.progress.error = str(error)
+            self.notify()
+        finally:
+            if connection is not None:
+                connection.close()
+            if self.inotify is not None:
+                self.inotify.close()
+
+    def build(self):
+        """Walk the roots across the process pool into a new index file; False if stopped"""
+        self.progress = IndexProgress('building')
+        self.notify()
+        temp = self.path + '.build'
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(temp + suffix):
+                os.remove(temp + suffix)
+
+        connection = self.index.open(temp, bulk=True)
+        settings = self.settings
+        workers = settings['workers'] or os.cpu_count() or 1
+        context = multiprocessing.get_context(settings['start_method'])
+        pending = [([root], os.stat(root).st_dev) for root in self.roots if os.path.isdir(root)]
+        in_flight = {}
+        last_commit = last_notify = time.monotonic()
+        progress = self.progress
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=init_worker,
+                initargs=(self.options,),
+            ) as pool:
+                while pending or in_flight:
+                    if self.stop_event.is_set():
+                        for future in in_flight:
+                            future.cancel()
+                        return False
+                    while pending and len(in_flight) < workers * 2:
+                        paths, device = pending.pop()
+                        future = pool.submit(scan_task, paths, settings['task_entries'], device)
+                        in_flight[future] = device
+
+                    done, _ = wait(in_flight, timeout=0.25, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        device = in_flight.pop(future)
+                        result = future.result()
+                        for path, mtime_ns, entries in result['dirs']:
+                            self.index.add_directory(connection, path, mtime_ns, entries)
+                            progress.dirs += 1
+                            progress.entries += len(entries)
+                        # Leftover directories become new tasks, a few each, so idle workers pick them up
+                        leftover = result['pending']
+                        step = max(1, len(leftover) // workers)
+                        for start in range(0, len(leftover), step):
+                            pending.append((leftover[start:start + step], device))
+
+                    now = time.monotonic()
+                    if now - last_commit >= 2.0:
+                        connection.commit()
+                        last_commit = now
+                    if now - last_notify >= settings['progress_interval_ms'] / 1000:
+                        self.notify()
+                        last_notify = now
+
+            progress.phase = 'indexing'
+            self.notify()
+            self.index.finish_bulk(connection)
+            FileIndex.set_meta(connection, 'roots', '\n'.join(self.roots))
+            FileIndex.set_meta(connection, 'built_at', time.time())
+            connection.commit()
+        finally:
+            connection.close()
+
+        # Swap the new file in; the reader reopens on the next search
+        self.index.replace(temp)
+        progress.finished = time.monotonic()
+        return True
+
+    def watch_all(self, connection):
+        """Watch every indexed directory: inotify first, polling beyond its limit"""
+        self.progress.phase = 'watching'
+        if self.inotify is not None:
+            self.inotify.close()
+        self.inotify = None
+        self.polling = PollingWatcher()
+        try:
+            self.inotify = InotifyWatcher(self.settings['max_watches'])
+        except OSError:
+            pass
+
+        changes = set()
+        for path, mtime_ns in connection.execute("SELECT path, mtime_ns FROM dirs").fetchall():
+            self.add_watch(path, mtime_ns, changes)
+        self.apply(connection, self.group(changes))
+        self.progress.entries, self.progress.dirs = connection.execute(
+            "SELECT (SELECT count(*) FROM files), (SELECT count(*) FROM dirs)"
+        ).fetchone()
+        self.count_watches()
+        self.notify()
+
+    def add_watch(self, path, mtime_ns, changes):
+        """Watch one directory; a changed mtime means it moved on since it was scanned"""
+        if self.inotify is not None:
+            try:
+                self.inotify.add(path)
+            except WatchLimitReached:
+                self.polling.add(path, mtime_ns)
+            except OSError:
+                changes.add((os.path.dirname(path), os.path.basename(path)))
+                return
+        else:
+            self.polling.add(path, mtime_ns)
+        try:
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                changes.add((path, None))
+        except OSError:
+            changes.add((os.path.dirname(path), os.path.basename(path)))
+
+    def watch(self, connection):
+        """Collect changes until quiet for the debounce time, then apply them"""
+        settings = self.settings
+        debounce = settings['debounce_ms'] / 1000
+        poll_interval = settings['poll_interval_s']
+        next_poll = time.monotonic() + poll_interval
+        changes = set()
+        first_change = None
+
+        while not self.stop_event.is_set() and not self.rebuild_event.is_set():
+            timeout = debounce if changes else min(1.0, max(0.0, next_poll - time.monotonic()))
+            if self.inotify is not None:
+                new = self.inotify.read(timeout)
+            else:
+                self.stop_event.wait(timeout)
+                new = set()
+            if time.monotonic() >= next_poll:
+                new |= self.polling.poll(settings['poll_batch'])
+                next_poll = time.monotonic() + poll_interval
+            if self.inotify is not None and self.inotify.overflowed:
+                # Events were lost: compare every watched directory's mtime
+                self.inotify.overflowed = False
+                new |= self.resync(connection)
+
+            if new:
+                changes |= new
+                first_change = first_change or time.monotonic()
+                # Keep collecting while events arrive, but not forever
+                if time.monotonic() - first_change < debounce * 10:
+                    continue
+            if changes:
+                self.apply(connection, self.group(changes))
+                changes = set()
+                first_change = None
+                self.notify()
+
+    def resync(self, connection):
+        changes = set()
+        for path, mtime_ns in connection.execute("SELECT path, mtime_ns FROM dirs").fetchall():
+            try:
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    changes.add((path, None))
+            except OSError:
+                changes.add((os.path.dirname(path), os.path.basename(path)))
+        return changes
+
+    @staticmethod
+    def group(changes):
+        """{directory: set of names, or None for a full rescan}"""
+        grouped = {}
+        for path, name in changes:
+            if name is None or grouped.get(path, set()) is None:
+                grouped[path] = None
+            else:
+                grouped.setdefault(path, set()).add(name)
+        return grouped
+
+    def apply(self, connection, grouped):
+        """Rescan changed directories (or just the changed names) in one transaction"""
+        if not grouped:
+            return
+        options = self.options
+        walk = []
+        with connection:
+            for path, names in grouped.items():
+                if not self.indexed(path):
+                    continue
+                try:
+                    if names is None or len(names) > 64:
+                        mtime_ns, entries, _ = scan_directory(path, options)
+                        added, removed = self.index.sync_directory(connection, path, mtime_ns, entries)
+                    else:
+                        mtime_ns = os.stat(path).st_mtime_ns
+                        entries = stat_entries(path, names, options)
+                        added, removed = self.index.sync_directory(connection, path, mtime_ns, entries, only=names)
+                except FileNotFoundError:
+                    self.index.remove_tree(connection, path)
+                    self.unwatch(path)
+                    continue
+                except OSError:
+                    continue
+                for folder in removed:
+                    self.unwatch(folder)
+                walk.extend(added)
+                if path in self.polling.mtimes:
+                    self.polling.mtimes[path] = mtime_ns
+
+            # New folders are walked here; they are usually small
+            changes = set()
+            while walk:
+                path = walk.pop()
+                try:
+                    mtime_ns, entries, subdirs = scan_directory(path, options)
+                except OSError:
+                    continue
+                self.index.sync_directory(connection, path, mtime_ns, entries)
+                self.add_watch(path, mtime_ns, changes)
+                walk.extend(subdirs)
+        self.progress.updates += len(grouped)
+        self.progress.last_update = time.time()
+        self.count_watches()
+
+    def count_watches(self):
+        self.progress.watched = len(self.inotify) if self.inotify is not None else 0
+        self.progress.polled = len(self.polling)
+
+    def indexed(self, path):
+        """Whether a directory lies under one of the roots"""
+        return any(path == root or path.startswith(root + os.sep) for root in self.roots)
+
+    def unwatch(self, path):
+        if self.inotify is not None:
+            self.inotify.remove_tree(path)
+        self.polling.remove_tree(path)
+
+    def shutdown(self, timeout=5):
+        """Stop the indexer thread and the search executor"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        self.searcher.shutdown(wait=False)
+        self.index.close_reader()
@@ -0,0 +1,494 @@
+"""
+Directory Listing
+Streamed os.scandir listings held in compact arrays, with a stat cache validated by directory mtime
+"""
+
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+DIR, FILE, LINK, OTHER = 0, 1, 2, 3
+
+KIND_NAMES = {DIR: 'Folder', FILE: 'File', LINK: 'Link', OTHER: 'Other'}
+
+SORT_KEYS = ('name', 'kind', 'size', 'modified')
+
+# Directory stats with a dir_fd avoid re-resolving the path for every entry
+STAT_DIR_FD = os.stat in os.supports_dir_fd and hasattr(os, 'O_DIRECTORY')
+
+
+class ScanCancelled(Exception):
+    """Raised inside a scan loop when the listing is cancelled"""
+
+
+def entry_kind(entry):
+    """Kind of a DirEntry from its d_type (no stat call on most filesystems)"""
+    try:
+        if entry.is_symlink():
+            return LINK
+        if entry.is_dir(follow_symlinks=False):
+            return DIR
+        if entry.is_file(follow_symlinks=False):
+            return FILE
+    except OSError:
+        pass
+    return OTHER
+
+
+def stat_kind(mode):
+    """Kind of an lstat result"""
+    if stat.S_ISLNK(mode):
+        return LINK
+    if stat.S_ISDIR(mode):
+        return DIR
+    if stat.S_ISREG(mode):
+        return FILE
+    return OTHER
+
+
+class DirectoryListing:
+    """The entries of one directory, column-wise
+
+    Names are a list; kinds, sizes, mtimes and stat times are NumPy arrays
+    grown geometrically, so a listing costs a few dozen bytes per entry and
+    no per-entry objects. Entries are appended by the scan thread while the
+    grid reads its visible window, so both go through a lock. Sizes of -1
+    and mtimes of NaN mean "not stat'ed yet".
+    """
+
+    def __init__(self, path, dir_mtime_ns, capacity=1024):
+        self.path = path
+        self.dir_mtime_ns = dir_mtime_ns
+        self.lock = threading.Lock()
+        self.names = []
+        self.kinds = np.zeros(capacity, dtype=np.uint8)
+        self.sizes = np.full(capacity, -1, dtype=np.int64)
+        self.mtimes = np.full(capacity, np.nan, dtype=np.float64)
+        self.stat_at = np.zeros(capacity, dtype=np.float64)
+        self.length = 0
+        self.stat_count = 0
+        self.name_order = None
+        self.order = None
+        self.sort_key = None
+        self.descending = False
+        self.complete = False
+        self.truncated = False
+
+    def __len__(self):
+        return self.length if self.order is None else len(self.order)
+
+    def reserve(self, needed):
+        """Grow the arrays geometrically so appends stay amortized O(1)"""
+        capacity = len(self.kinds)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        length = self.length
+        for name, fill in (('kinds', 0), ('sizes', -1), ('mtimes', np.nan), ('stat_at', 0.0)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:length] = old[:length]
+            setattr(self, name, new)
+
+    def append(self, names, kinds):
+        """Append a batch of scanned entries (scan thread)"""
+        if not names:
+            return
+        with self.lock:
+            start = self.length
+            self.reserve(start + len(names))
+            self.names.extend(names)
+            self.kinds[start:start + len(names)] = kinds
+            self.length = start + len(names)
+
+    def set_stats(self, start, sizes, mtimes, when):
+        """Record lstat results for entries [start, start + len(sizes))"""
+        with self.lock:
+            stop = start + len(sizes)
+            self.sizes[start:stop] = sizes
+            self.mtimes[start:stop] = mtimes
+            self.stat_at[start:stop] = when
+            self.stat_count = max(self.stat_count, stop)
+
+    def index_at(self, position):
+        """Entry index shown at a view position"""
+        return position if self.order is None else int(self.order[position])
+
+    def entries(self, start, stop, max_age=None):
+        """(index, name, kind, size, mtime) for view positions [start, stop)
+
+        Entries never stat'ed, or stat'ed more than max_age seconds ago,
+        are stat'ed first, so the visible window is always current even
+        while the background stat pass is behind.
+        """
+        with self.lock:
+            stop = min(stop, len(self))
+            if start >= stop:
+                return []
+            indexes = range(start, stop) if self.order is None else self.order[start:stop].tolist()
+            now = time.time()
+            for index in indexes:
+                if self.sizes[index] < 0 or (max_age is not None and now - self.stat_at[index] > max_age):
+                    self.restat(index, now)
+            return [
+                (index, self.names[index], int(self.kinds[index]), int(self.sizes[index]), float(self.mtimes[index]))
+                for index in indexes
+            ]
+
+    def restat(self, index, now):
+        """Refresh one entry's stat (lock held)"""
+        try:
+            result = os.lstat(os.path.join(self.path, self.names[index]))
+        except OSError:
+            self.sizes[index], self.mtimes[index] = 0, np.nan
+        else:
+            self.kinds[index] = stat_kind(result.st_mode)
+            self.sizes[index], self.mtimes[index] = result.st_size, result.st_mtime
+        self.stat_at[index] = now
+
+    def finish(self, name_order):
+        """Mark the scan complete and show entries folders-first by name"""
+        with self.lock:
+            self.name_order = name_order
+            self.complete = True
+            self.apply_sort('name', False)
+
+    def sort(self, key, descending=False):
+        """Sort folders first, then by key; ties keep name order (complete listings only)"""
+        with self.lock:
+            if self.name_order is None:
+                return False
+            self.apply_sort(key, descending)
+            return True
+
+    def apply_sort(self, key, descending):
+        order = self.name_order
+        if key == 'name' and descending:
+            order = order[::-1]
+        if key == 'size':
+            values = self.sizes[order]
+        elif key == 'modified':
+            values = np.nan_to_num(self.mtimes[order], nan=-np.inf)
+        elif key == 'kind':
+            values = self.kinds[order].astype(np.int64)
+        else:
+            values = None
+        if values is not None:
+            order = order[np.argsort(-values if descending else values, kind='stable')]
+        # Folders stay on top whatever the column
+        folders = self.kinds[order] == DIR
+        self.order = np.concatenate([order[folders], order[~folders]])
+        self.sort_key = key
+        self.descending = descending
+
+    def summary(self):
+        """Counts and total size of the entries stat'ed so far"""
+        with self.lock:
+            kinds = self.kinds[:self.length]
+            sizes = self.sizes[:self.length]
+            return {
+                'entries': self.length,
+                'folders': int(np.count_nonzero(kinds == DIR)),
+                'files': int(np.count_nonzero(kinds == FILE)),
+                'bytes': int(sizes[(kinds == FILE) & (sizes > 0)].sum()),
+                'stat': self.stat_count,
+            }
+
+    def memory_bytes(self):
+        """Approximate bytes held by the names and arrays"""
+        arrays = self.kinds.nbytes + self.sizes.nbytes + self.mtimes.nbytes + self.stat_at.nbytes
+        names = sum(len(name) + 57 for name in self.names)
+        order = sum(array.nbytes for array in (self.order, self.name_order) if array is not None)
+        return arrays + names + order
+
+
+class ScanStats:
+    """Progress counters for one directory scan"""
+
+    __slots__ = ('entries', 'stat', 'batches', 'started', 'first_batch_ms', 'scanned',
+                 'finished', 'cached', 'cancelled', 'error')
+
+    def __init__(self):
+        self.entries = 0
+        self.stat = 0
+        self.batches = 0
+        self.started = time.monotonic()
+        self.first_batch_ms = None
+        self.scanned = None
+        self.finished = None
+        self.cached = False
+        self.cancelled = False
+        self.error = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def entries_per_second(self):
+        elapsed = self.elapsed
+        return self.entries / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+
+class DirectoryScan:
+    """One streamed directory listing on a worker thread
+
+    The scandir pass appends names and d_type kinds in batches (the first
+    one small, so the first screen shows at once); a second pass then
+    lstat()s every entry for sizes and mtimes, and the listing is sorted.
+    on_batch(listing) is called after every batch and on_done(stats) when
+    the scan ends, both on the scan thread.
+    """
+
+    def __init__(self, listing, first_batch=200, batch_entries=5000, batch_interval=0.05,
+                 max_entries=None, show_hidden=False, on_batch=None, on_done=None):
+        self.listing = listing
+        self.first_batch = first_batch
+        self.batch_entries = batch_entries
+        self.batch_interval = batch_interval
+        self.max_entries = max_entries
+        self.show_hidden = show_hidden
+        self.on_batch = on_batch
+        self.on_done = on_done
+
+        self.stats = ScanStats()
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Run the scan on its own thread"""
+        self.thread = threading.Thread(target=self.run, name='scandir', daemon=True)
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Stop the scan; safe to call from any thread"""
+        self.cancel_event.set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def run(self):
+        """Scan, stat and sort (scan thread)"""
+        try:
+            self.scan()
+            self.stats.scanned = self.stats.elapsed
+            self.stat_entries()
+            self.listing.finish(self.name_order())
+        except ScanCancelled:
+            self.stats.cancelled = True
+        except OSError as error:
+            self.stats.error = error.strerror or str(error)
+        except Exception as error:
+            self.stats.error = str(error)
+        finally:
+            self.stats.finished = time.monotonic()
+            if self.on_done:
+                self.on_done(self.stats)
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise ScanCancelled()
+
+    def publish(self, names, kinds):
+        """Hand a batch to the listing and the listener"""
+        self.listing.append(names, kinds)
+        stats = self.stats
+        stats.entries += len(names)
+        stats.batches += 1
+        if stats.first_batch_ms is None:
+            stats.first_batch_ms = stats.elapsed * 1000
+        if self.on_batch:
+            self.on_batch(self.listing)
+
+    def scan(self):
+        """Stream directory entries in batches"""
+        names, kinds = [], []
+        size = self.first_batch
+        last_publish = time.monotonic()
+        listing = self.listing
+        with os.scandir(listing.path) as entries:
+            for entry in entries:
+                name = entry.name
+                if not self.show_hidden and name.startswith('.'):
+                    continue
+                names.append(name)
+                kinds.append(entry_kind(entry))
+                if len(names) >= size or time.monotonic() - last_publish >= self.batch_interval:
+                    self.check_cancelled()
+                    self.publish(names, kinds)
+                    names, kinds = [], []
+                    size = self.batch_entries
+                    last_publish = time.monotonic()
+                if self.max_entries is not None and self.stats.entries + len(names) >= self.max_entries:
+                    listing.truncated = True
+                    break
+        self.check_cancelled()
+        self.publish(names, kinds)
+
+    def stat_entries(self):
+        """lstat every entry in batches, publishing sizes as they land"""
+        listing = self.listing
+        with listing.lock:
+            names = list(listing.names)
+        directory = None
+        if STAT_DIR_FD:
+            directory = os.open(listing.path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            for start in range(0, len(names), self.batch_entries):
+                self.check_cancelled()
+                batch = names[start:start + self.batch_entries]
+                sizes = np.zeros(len(batch), dtype=np.int64)
+                mtimes = np.full(len(batch), np.nan, dtype=np.float64)
+                for position, name in enumerate(batch):
+                    try:
+                        if directory is not None:
+                            result = os.stat(name, dir_fd=directory, follow_symlinks=False)
+                        else:
+                            result = os.lstat(os.path.join(listing.path, name))
+                    except OSError:
+                        continue
+                    sizes[position] = result.st_size
+                    mtimes[position] = result.st_mtime
+                listing.set_stats(start, sizes, mtimes, time.time())
+                self.stats.stat = start + len(batch)
+                if self.on_batch:
+                    self.on_batch(listing)
+        finally:
+            if directory is not None:
+                os.close(directory)
+
+    def name_order(self):
+        """Entry indexes in case-insensitive name order"""
+        self.check_cancelled()
+        with self.listing.lock:
+            keys = [name.casefold() for name in self.listing.names]
+        return np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int64)
+
+
+class ListingCache:
+    """Completed listings by path, bounded by their total entry count
+
+    A cached listing is reused while its directory's mtime is unchanged:
+    creating, deleting or renaming an entry bumps the directory mtime, so
+    an unchanged mtime means the entry set is still valid. Per-entry stats
+    are refreshed lazily as rows scroll into view (see entries()).
+    """
+
+    def __init__(self, max_entries=2_000_000):
+        self.max_entries = max_entries
+        self.listings = OrderedDict()
+        self.entries = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, dir_mtime_ns):
+        """The cached listing of path if still valid, else None"""
+        with self.lock:
+            listing = self.listings.get(path)
+            if listing is None or listing.dir_mtime_ns != dir_mtime_ns:
+                if listing is not None:
+                    self.drop(path)
+                self.misses += 1
+                return None
+            self.listings.move_to_end(path)
+            self.hits += 1
+            return listing
+
+    def put(self, listing):
+        """Cache a complete listing, evicting least recently used ones"""
+        if not listing.complete or listing.truncated or len(listing.names) > self.max_entries:
+            return
+        with self.lock:
+            if listing.path in self.listings:
+                self.drop(listing.path)
+            self.listings[listing.path] = listing
+            self.entries += len(listing.names)
+            while self.entries > self.max_entries:
+                self.drop(next(iter(self.listings)))
+
+    def drop(self, path):
+        """Forget a listing (lock held)"""
+        listing = self.listings.pop(path)
+        self.entries -= len(listing.names)
+
+    def clear(self):
+        with self.lock:
+            self.listings.clear()
+            self.entries = 0
+
+
+class DirectoryIndex:
+    """Opens directory listings, from the cache when valid or by a new scan
+
+    Owned by the app rather than the view, so cached listings and running
+    scans survive the view being evicted.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.cache = ListingCache(settings['cache_entries'])
+        self.scans = set()
+        self.lock = threading.Lock()
+
+    def open(self, path, on_batch=None, on_done=None, refresh=False):
+        """Start listing path and return its DirectoryScan
+
+        on_batch(scan) and on_done(scan) are called on the scan thread. On a
+        cache hit the returned scan is already done and neither is called.
+        """
+        path = os.path.abspath(os.path.expanduser(path))
+        dir_mtime_ns = os.stat(path).st_mtime_ns
+        listing = None if refresh else self.cache.get(path, dir_mtime_ns)
+        if listing is not None:
+            scan = DirectoryScan(listing)
+            scan.stats.cached = True
+            scan.stats.entries = scan.stats.stat = len(listing.names)
+            scan.stats.first_batch_ms = 0.0
+            scan.stats.finished = time.monotonic()
+            return scan
+
+        settings = self.settings
+        scan = DirectoryScan(
+            DirectoryListing(path, dir_mtime_ns),
+            first_batch=settings['first_batch'],
+            batch_entries=settings['batch_entries'],
+            batch_interval=settings['batch_interval_ms'] / 1000,
+            max_entries=settings['max_entries'],
+            show_hidden=settings['show_hidden'],
+        )
+        if on_batch:
+            scan.on_batch = lambda listing: on_batch(scan)
+        scan.on_done = lambda stats: self.finished(scan, on_done)
+        with self.lock:
+            self.scans.add(scan)
+        return scan.start()
+
+    def finished(self, scan, on_done):
+        """Cache a complete listing and notify (scan thread)"""
+        with self.lock:
+            self.scans.discard(scan)
+        if not scan.stats.cancelled and scan.stats.error is None:
+            self.cache.put(scan.listing)
+        if on_done:
+            on_done(scan)
+
+    def shutdown(self, timeout=2):
+        """Cancel running scans"""
+        with self.lock:
+            scans = list(self.scans)
+        for scan in scans:
+            scan.cancel()
+        for scan in scans:
+            scan.thread.join(timeout)
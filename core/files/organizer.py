@@ -0,0 +1,720 @@
+"""
+File Organizer
+Rules compiled into a single-pass matcher, dry-run plans, and journaled batch execution
+"""
+
+import datetime
+import fnmatch
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import warnings
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from core.files.search_index import file_extension, parse_size
+
+
+ACTIONS = ('move', 'rename', 'archive')
+
+JOURNAL_VERSION = 1
+
+
+class RuleError(ValueError):
+    """Raised when a rule cannot be compiled"""
+
+
+def glob_extension(pattern):
+    """Extension implied by a '*.ext' glob, or None"""
+    match = re.fullmatch(r'\*\.([^*?\[\].]+)', pattern)
+    return match.group(1).lower() if match else None
+
+
+class Rule:
+    """One compiled rule; matches() checks everything but the extension"""
+
+    __slots__ = ('index', 'name', 'action', 'target', 'extensions', 'pattern',
+                 'min_size', 'max_size', 'older_than', 'newer_than')
+
+    def __init__(self, index, spec):
+        self.index = index
+        self.name = spec.get('name') or f"Rule {index + 1}"
+        self.action = spec.get('action')
+        if self.action not in ACTIONS:
+            raise RuleError(f"{self.name}: action must be one of {', '.join(ACTIONS)}")
+        self.target = spec.get('target')
+        if not self.target:
+            raise RuleError(f"{self.name}: a target is required")
+        if self.action == 'rename' and ('/' in self.target or os.sep in self.target or '..' in self.target):
+            raise RuleError(f"{self.name}: a rename target is a file name, without '/' or '..'")
+
+        match = spec.get('match', {})
+        extensions = {ext.lower().lstrip('.') for ext in match.get('ext', [])}
+        patterns = []
+        globs = match.get('glob', [])
+        for glob in [globs] if isinstance(globs, str) else globs:
+            ext = glob_extension(glob)
+            if ext is not None:
+                extensions.add(ext)
+            else:
+                patterns.append(fnmatch.translate(glob))
+        if match.get('regex'):
+            patterns.append(f"(?:{match['regex']})")
+        self.extensions = frozenset(extensions) or None
+        try:
+            # Globs and regexes of one rule are a single alternation
+            self.pattern = re.compile('|'.join(patterns), re.IGNORECASE) if patterns else None
+        except re.error as error:
+            raise RuleError(f"{self.name}: {error}")
+
+        self.min_size = self.size(match.get('min_size'))
+        self.max_size = self.size(match.get('max_size'))
+        self.older_than = match.get('older_than_days')
+        self.newer_than = match.get('newer_than_days')
+
+    def describe(self):
+        """Short text of the rule's conditions"""
+        parts = []
+        if self.extensions:
+            parts.append(', '.join(f"*.{ext}" for ext in sorted(self.extensions)))
+        if self.pattern is not None:
+            parts.append("name pattern")
+        if self.min_size is not None:
+            parts.append(f"≥ {self.min_size:,} B")
+        if self.max_size is not None:
+            parts.append(f"≤ {self.max_size:,} B")
+        if self.older_than is not None:
+            parts.append(f"older than {self.older_than} days")
+        if self.newer_than is not None:
+            parts.append(f"newer than {self.newer_than} days")
+        return ' · '.join(parts) or "any file"
+
+    def size(self, value):
+        if value is None or isinstance(value, int):
+            return value
+        parsed = parse_size(str(value))
+        if parsed is None:
+            raise RuleError(f"{self.name}: bad size {value!r}")
+        return parsed[1]
+
+    def matches(self, name, size, age_days):
+        """Match object (or True) when the file meets the rule, else None"""
+        if self.min_size is not None and size < self.min_size:
+            return None
+        if self.max_size is not None and size > self.max_size:
+            return None
+        if self.older_than is not None and age_days < self.older_than:
+            return None
+        if self.newer_than is not None and age_days > self.newer_than:
+            return None
+        if self.pattern is None:
+            return True
+        return self.pattern.match(name)
+
+
+class RuleSet:
+    """Rules compiled for one pass over the files
+
+    Rules that only apply to some extensions are bucketed by extension, and
+    each extension gets its candidate list (its own rules merged with the
+    extension-agnostic ones, in rule order) precomputed once. A file then
+    costs one dict lookup plus the cheap numeric checks of its few
+    candidates; the first matching rule wins.
+    """
+
+    def __init__(self, specs):
+        enabled = [spec for spec in specs if spec.get('enabled', True)]
+        self.rules = [Rule(index, spec) for index, spec in enumerate(enabled)]
+        self.any_extension = tuple(rule for rule in self.rules if rule.extensions is None)
+        by_extension = defaultdict(list)
+        for rule in self.rules:
+            for ext in rule.extensions or ():
+                by_extension[ext].append(rule)
+        self.candidates = {
+            ext: tuple(sorted(rules + list(self.any_extension), key=lambda rule: rule.index))
+            for ext, rules in by_extension.items()
+        }
+
+    def __len__(self):
+        return len(self.rules)
+
+    def match(self, name, size, mtime, now):
+        """(rule, match) of the first rule a file meets, or (None, None)"""
+        age_days = (now - mtime) / 86400
+        for rule in self.candidates.get(file_extension(name), self.any_extension):
+            found = rule.matches(name, size, age_days)
+            if found is not None:
+                return rule, found
+        return None, None
+
+
+def template_values(name, mtime, rule, found):
+    """Fields available to target templates"""
+    stem, ext = os.path.splitext(name)
+    when = datetime.datetime.fromtimestamp(mtime)
+    values = {
+        'name': name, 'stem': stem, 'ext': ext[1:].lower(), 'rule': rule.name,
+        'year': f"{when:%Y}", 'month': f"{when:%m}", 'day': f"{when:%d}", 'date': f"{when:%Y-%m-%d}",
+    }
+    if found is not True and found is not None:
+        values.update({key: value for key, value in found.groupdict().items() if value is not None})
+    return values
+
+
+class Plan:
+    """Dry-run result: the operations a run would perform
+
+    operations holds (action, source, destination, size, rule index,
+    same_device) tuples. Destinations are made unique against the
+    filesystem and against each other, so executing the plan never
+    overwrites anything.
+    """
+
+    def __init__(self, root, rules):
+        self.root = root
+        self.rules = [rule.name for rule in rules]
+        self.operations = []
+        self.scanned = 0
+        self.renamed = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def __len__(self):
+        return len(self.operations)
+
+    def summary(self):
+        """{rule name: (files, bytes)}"""
+        totals = {}
+        for _, _, _, size, rule, _ in self.operations:
+            files, total = totals.get(self.rules[rule], (0, 0))
+            totals[self.rules[rule]] = (files + 1, total + size)
+        return totals
+
+    @property
+    def bytes(self):
+        return sum(operation[3] for operation in self.operations)
+
+
+def unique_path(path, taken):
+    """path, or 'stem (n).ext' when it exists or is already planned"""
+    if path not in taken and not os.path.lexists(path):
+        return path
+    stem, ext = os.path.splitext(path)
+    number = 1
+    while True:
+        candidate = f"{stem} ({number}){ext}"
+        if candidate not in taken and not os.path.lexists(candidate):
+            return candidate
+        number += 1
+
+
+def existing_device(path, cache):
+    """st_dev of the nearest existing ancestor of path"""
+    probe = path
+    while probe not in cache:
+        try:
+            cache[probe] = os.stat(probe).st_dev
+        except OSError:
+            parent = os.path.dirname(probe)
+            if parent == probe:
+                return None
+            probe = parent
+            continue
+    return cache[probe]
+
+
+def build_plan(root, ruleset, recursive=True, exclude=(), cancel_event=None):
+    """Walk root once and plan an operation for every file a rule matches"""
+    started = time.monotonic()
+    root = os.path.abspath(os.path.expanduser(root))
+    plan = Plan(root, ruleset.rules)
+    now = time.time()
+    taken = set()
+    devices = {}
+    exclude = set(exclude)
+    # Targets that are inside the tree are not walked, so files never move twice;
+    # for archives that is the folder holding the zip, not the zip itself
+    targets = set()
+    for rule in ruleset.rules:
+        if rule.action == 'rename':
+            continue
+        target = os.path.abspath(os.path.join(root, os.path.expanduser(rule.target.split('{')[0])))
+        targets.add(os.path.dirname(target) if rule.action == 'archive' else target)
+    targets.discard(root)
+    archives = set()
+
+    stack = [root]
+    while stack:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        path = stack.pop()
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            plan.errors += 1
+            continue
+        for entry in entries:
+            if entry.name in exclude:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and entry.path.rstrip(os.sep) not in targets:
+                        stack.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                result = entry.stat(follow_symlinks=False)
+            except OSError:
+                plan.errors += 1
+                continue
+            plan.scanned += 1
+            rule, found = ruleset.match(entry.name, result.st_size, result.st_mtime, now)
+            if rule is None:
+                continue
+            try:
+                target = os.path.expanduser(rule.target.format(**template_values(entry.name, result.st_mtime, rule, found)))
+            except (KeyError, IndexError, ValueError):
+                plan.errors += 1
+                continue
+            if rule.action == 'rename':
+                if os.sep in target or '/' in target or target in ('', '.', '..'):
+                    plan.errors += 1
+                    continue
+                destination = os.path.join(path, target)
+            elif rule.action == 'move':
+                destination = os.path.join(root, target, entry.name)
+            else:
+                destination = os.path.join(root, target)
+            destination = os.path.normpath(destination)
+            if destination == entry.path:
+                continue
+            if rule.action == 'archive':
+                archives.add(destination)
+            else:
+                unique = unique_path(destination, taken)
+                plan.renamed += unique != destination
+                destination = unique
+                taken.add(destination)
+            same_device = existing_device(os.path.dirname(destination), devices) == result.st_dev
+            plan.operations.append((rule.action, entry.path, destination, result.st_size, rule.index, same_device))
+    # Templated archive folders are only known once planned; nothing in them or
+    # named like an archive being written is touched by this run
+    folders = tuple({os.path.dirname(path) + os.sep for path in archives} - {root + os.sep})
+    if archives:
+        plan.operations = [operation for operation in plan.operations
+                           if operation[1] not in archives and not operation[1].startswith(folders)]
+    plan.elapsed = time.monotonic() - started
+    return plan
+
+
+class Journal:
+    """Append-only JSON lines record of a run, for rollback and resume
+
+    The whole plan is written and fsync'ed before anything moves; after
+    that only 'done' markers (one fsync per batch) and the final status are
+    appended. An operation without a marker is resolved by looking at the
+    filesystem, so a crash at any point leaves a recoverable journal.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+        self.folders = []
+
+    @classmethod
+    def create(cls, directory, plan):
+        os.makedirs(directory, exist_ok=True)
+        journal = cls(os.path.join(directory, f"run-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl"))
+        with open(journal.path, 'w', encoding='utf-8') as handle:
+            header = {'type': 'plan', 'version': JOURNAL_VERSION, 'root': plan.root, 'rules': plan.rules,
+                      'created': time.time(), 'operations': len(plan.operations)}
+            handle.write(json.dumps(header) + '\n')
+            for index, operation in enumerate(plan.operations):
+                handle.write(json.dumps({'type': 'op', 'index': index, 'op': list(operation)}) + '\n')
+            handle.flush()
+            os.fsync(handle.fileno())
+        return journal
+
+    def load(self):
+        """(header, operations, done indexes, status); created folders end up in self.folders"""
+        header, operations, done, status = None, [], set(), None
+        self.folders = []
+        with open(self.path, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash
+                    continue
+                kind = record['type']
+                if kind == 'plan':
+                    header = record
+                elif kind == 'op':
+                    operations.append(tuple(record['op']))
+                elif kind == 'done':
+                    done.update(record['indexes'])
+                elif kind == 'undone':
+                    done.difference_update(record['indexes'])
+                elif kind == 'folders':
+                    self.folders.extend(record['paths'])
+                elif kind == 'status':
+                    status = record['status']
+        return header, operations, done, status
+
+    def append(self, record, sync=True):
+        if self.handle is None:
+            self.handle = open(self.path, 'a', encoding='utf-8')
+        self.handle.write(json.dumps(record) + '\n')
+        self.handle.flush()
+        if sync:
+            os.fsync(self.handle.fileno())
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    @staticmethod
+    def history(directory, limit=20):
+        """(journal, header, done count, operation count, status) of recent runs, newest first"""
+        if not os.path.isdir(directory):
+            return []
+        runs = []
+        for name in sorted(os.listdir(directory), reverse=True):
+            if not name.endswith('.jsonl'):
+                continue
+            journal = Journal(os.path.join(directory, name))
+            try:
+                header, operations, done, status = journal.load()
+            except OSError:
+                continue
+            if header is not None:
+                runs.append((journal, header, len(done), len(operations), status))
+            if len(runs) >= limit:
+                break
+        return runs
+
+
+def fsync_directory(path):
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def copy_and_remove(source, destination, buffer_size):
+    """Cross-device move: copy, fsync the copy and its folder, then unlink the source"""
+    partial = destination + '.partial'
+    with open(source, 'rb') as reader, open(partial, 'wb') as writer:
+        shutil.copyfileobj(reader, writer, buffer_size)
+        writer.flush()
+        os.fsync(writer.fileno())
+    shutil.copystat(source, partial)
+    os.rename(partial, destination)
+    fsync_directory(os.path.dirname(destination))
+    os.unlink(source)
+
+
+class OrganizeProgress:
+    """Counters of a run; phase is moving, rolling back or a final state"""
+
+    __slots__ = ('phase', 'total', 'done', 'bytes', 'renamed', 'copied', 'archived', 'errors',
+                 'journal', 'started', 'finished', 'error')
+
+    def __init__(self, phase, total, journal):
+        self.phase = phase
+        self.total = total
+        self.done = 0
+        self.bytes = 0
+        self.renamed = 0
+        self.copied = 0
+        self.archived = 0
+        self.errors = 0
+        self.journal = journal
+        self.started = time.monotonic()
+        self.finished = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def files_per_second(self):
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(elapsed=self.elapsed, files_per_second=self.files_per_second)
+        return values
+
+
+class OrganizeJob:
+    """Executes (mode='run' or 'resume') or undoes (mode='rollback') a journaled plan
+
+    Same-device operations are os.rename calls in batches, each batch
+    followed by one journal fsync. Cross-device moves are copied on a
+    thread pool with fsync before the source is removed, and archives are
+    written one zip per thread. Operations already done are skipped, so a
+    resumed run continues where the crashed one stopped.
+    """
+
+    def __init__(self, journal, settings, mode='run', on_progress=None):
+        self.journal = journal
+        self.settings = settings
+        self.mode = mode
+        self.on_progress = on_progress
+        self.root = None
+        self.folders = []
+        self.progress = None
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.last_notify = 0.0
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='organize-job', daemon=True)
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Stop after the current batch; the run can be resumed or rolled back"""
+        self.cancel_event.set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def notify(self, force=False):
+        now = time.monotonic()
+        if self.on_progress and (force or now - self.last_notify >= self.settings['progress_interval_ms'] / 1000):
+            self.last_notify = now
+            self.on_progress(self.progress.snapshot())
+
+    def run(self):
+        header, operations, done, _ = self.journal.load()
+        self.root = header['root']
+        self.folders = self.journal.folders
+        phase = 'rolling back' if self.mode == 'rollback' else 'moving'
+        self.progress = OrganizeProgress(phase, len(operations), self.journal.path)
+        self.notify(force=True)
+        try:
+            if self.mode == 'rollback':
+                self.rollback(operations, done)
+                status = 'cancelled' if self.cancel_event.is_set() else 'rolled back'
+            else:
+                self.execute(operations, done)
+                status = 'cancelled' if self.cancel_event.is_set() else 'complete'
+            self.progress.phase = status
+            self.journal.append({'type': 'status', 'status': status, 'at': time.time()})
+        except Exception as error:
+            self.progress.phase = 'failed'
+            self.progress.error = str(error)
+            try:
+                self.journal.append({'type': 'status', 'status': 'failed', 'error': str(error), 'at': time.time()})
+            except OSError:
+                pass
+        finally:
+            self.journal.close()
+            self.progress.finished = time.monotonic()
+            self.notify(force=True)
+
+    def settle(self, operations, done):
+        """Mark operations that completed before a crash without reaching the journal"""
+        settled = []
+        for index, (action, source, destination, *_rest) in enumerate(operations):
+            if index in done or os.path.lexists(source):
+                continue
+            if action == 'archive' or os.path.lexists(destination):
+                settled.append(index)
+        if settled:
+            done.update(settled)
+            self.journal.append({'type': 'done', 'indexes': settled})
+
+    def execute(self, operations, done):
+        if self.mode == 'resume':
+            self.settle(operations, done)
+        progress = self.progress
+        progress.done = len(done)
+        renames, copies, archives = [], [], defaultdict(list)
+        for index, operation in enumerate(operations):
+            if index in done:
+                continue
+            action, _, destination, _, _, same_device = operation
+            if action == 'archive':
+                archives[destination].append(index)
+            elif same_device:
+                renames.append(index)
+            else:
+                copies.append(index)
+
+        folders = {os.path.dirname(operations[index][2]) for index in renames + copies}
+        folders.update(os.path.dirname(path) for path in archives)
+        created = []
+        for folder in sorted(folders):
+            missing = []
+            probe = folder
+            while not os.path.isdir(probe):
+                missing.append(probe)
+                probe = os.path.dirname(probe)
+            created.extend(reversed(missing))
+        if created:
+            # Recorded first, so a rollback can remove them again
+            self.journal.append({'type': 'folders', 'paths': created})
+        for folder in folders:
+            os.makedirs(folder, exist_ok=True)
+
+        # Fast path: renames within one device, one journal fsync per batch
+        batch = self.settings['batch_size']
+        for start in range(0, len(renames), batch):
+            if self.cancel_event.is_set():
+                return
+            finished = []
+            for index in renames[start:start + batch]:
+                _, source, destination, size, _, _ = operations[index]
+                try:
+                    if os.path.lexists(destination):
+                        raise FileExistsError(destination)
+                    os.rename(source, destination)
+                except OSError:
+                    progress.errors += 1
+                    continue
+                finished.append(index)
+                progress.renamed += 1
+                progress.bytes += size
+            progress.done += len(finished)
+            if finished:
+                self.journal.append({'type': 'done', 'indexes': finished})
+            self.notify()
+
+        with ThreadPoolExecutor(max_workers=self.settings['copy_workers'], thread_name_prefix='organize-copy') as pool:
+            futures = {}
+            for index in copies:
+                _, source, destination, _, _, _ = operations[index]
+                futures[pool.submit(self.copy, source, destination)] = [index]
+            for path, indexes in archives.items():
+                futures[pool.submit(self.archive, path, [operations[index] for index in indexes])] = indexes
+            finished = []
+            for future in as_completed(futures):
+                indexes = futures[future]
+                try:
+                    completed = future.result()
+                except OSError:
+                    progress.errors += len(indexes)
+                    continue
+                finished.extend(indexes[:completed])
+                progress.errors += len(indexes) - completed
+                progress.done += completed
+                progress.bytes += sum(operations[index][3] for index in indexes[:completed])
+                if len(indexes) == 1 and operations[indexes[0]][0] != 'archive':
+                    progress.copied += completed
+                else:
+                    progress.archived += completed
+                if len(finished) >= batch:
+                    self.journal.append({'type': 'done', 'indexes': finished})
+                    finished = []
+                self.notify()
+            if finished:
+                self.journal.append({'type': 'done', 'indexes': finished})
+
+    def copy(self, source, destination):
+        """1 when the file moved across devices, 0 when skipped (cancelled)"""
+        if self.cancel_event.is_set():
+            return 0
+        if os.path.lexists(destination):
+            raise FileExistsError(destination)
+        copy_and_remove(source, destination, self.settings['copy_buffer_kb'] * 1024)
+        return 1
+
+    def archive(self, path, operations):
+        """Add files to one zip, then remove them; returns how many were archived in order
+
+        An existing archive is appended to through a copy that replaces it
+        once complete, so a crash never leaves it without its directory.
+        Members are named by their path below the plan root.
+        """
+        partial = path + '.partial'
+        if os.path.exists(path):
+            shutil.copyfile(path, partial)
+        archived = []
+        with warnings.catch_warnings():
+            # A file archived again by a later run is added as a newer member of the same name
+            warnings.simplefilter('ignore', UserWarning)
+            with zipfile.ZipFile(partial, 'a', compression=zipfile.ZIP_DEFLATED) as archive:
+                for _, source, *_rest in operations:
+                    if self.cancel_event.is_set():
+                        break
+                    archive.write(source, os.path.relpath(source, self.root))
+                    archived.append(source)
+        with open(partial, 'rb+') as handle:
+            os.fsync(handle.fileno())
+        os.replace(partial, path)
+        fsync_directory(os.path.dirname(path))
+        # Sources are removed only once the archive is durable
+        for source in archived:
+            os.unlink(source)
+        return len(archived)
+
+    def rollback(self, operations, done):
+        """Move finished operations back, newest first"""
+        self.settle(operations, done)
+        progress = self.progress
+        progress.total = len(done)
+        undone = []
+        archives = {}
+        try:
+            for index in sorted(done, reverse=True):
+                if self.cancel_event.is_set():
+                    break
+                action, source, destination, size, _, same_device = operations[index]
+                try:
+                    os.makedirs(os.path.dirname(source), exist_ok=True)
+                    if os.path.lexists(source):
+                        raise FileExistsError(source)
+                    if action == 'archive':
+                        self.restore_member(archives, destination, source)
+                    elif same_device:
+                        os.rename(destination, source)
+                    else:
+                        copy_and_remove(destination, source, self.settings['copy_buffer_kb'] * 1024)
+                except (OSError, KeyError):
+                    progress.errors += 1
+                    continue
+                undone.append(index)
+                progress.done += 1
+                progress.bytes += size
+                if len(undone) >= self.settings['batch_size']:
+                    self.journal.append({'type': 'undone', 'indexes': undone})
+                    undone = []
+                self.notify()
+        finally:
+            for archive in archives.values():
+                archive.close()
+            if undone:
+                self.journal.append({'type': 'undone', 'indexes': undone})
+        # Folders the run created, deepest first, once they are empty again
+        for folder in sorted(self.folders, key=len, reverse=True):
+            try:
+                os.rmdir(folder)
+            except OSError:
+                pass
+
+    def restore_member(self, archives, path, source):
+        """Extract an archived file back to where it came from (the archive keeps its copy)"""
+        archive = archives.get(path)
+        if archive is None:
+            archive = archives[path] = zipfile.ZipFile(path)
+        member = os.path.relpath(source, self.root).replace(os.sep, '/')
+        # The newest member of that name is the one this run added
+        for info in reversed(archive.infolist()):
+            if info.filename == member:
+                with archive.open(info) as reader, open(source, 'wb') as writer:
+                    shutil.copyfileobj(reader, writer)
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                os.utime(source, (mtime, mtime))
+                return
+        raise KeyError(member)
@@ -0,0 +1,522 @@
+"""
+File Search Index
+Persistent SQLite index of file names, extensions, sizes, mtimes and optional content words
+"""
+
+import datetime
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    dir_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT GENERATED ALWAYS AS (lower(name)) VIRTUAL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    is_dir INTEGER NOT NULL
+);
+"""
+
+# Created after the rows on a bulk build, which is much faster than maintaining them per row
+INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS files_dir ON files (dir_id, name);
+CREATE INDEX IF NOT EXISTS files_ext ON files (ext, mtime);
+CREATE INDEX IF NOT EXISTS files_mtime ON files (mtime);
+CREATE INDEX IF NOT EXISTS files_size ON files (size);
+"""
+
+# Lower-cased names are indexed by an external-content trigram table kept in sync by
+# triggers; it is case-sensitive so GLOB (where '_' and '%' are literals) can use it
+TRIGRAM_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5(
+    name_key, content='files', content_rowid='id', tokenize='trigram case_sensitive 1', detail='none'
+);
+"""
+
+TRIGRAM_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS files_insert AFTER INSERT ON files BEGIN
+    INSERT INTO names (rowid, name_key) VALUES (new.id, new.name_key);
+END;
+CREATE TRIGGER IF NOT EXISTS files_delete AFTER DELETE ON files BEGIN
+    INSERT INTO names (names, rowid, name_key) VALUES ('delete', old.id, old.name_key);
+END;
+"""
+
+# Distinct words of text files, keyed by file id
+WORDS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS words USING fts5(
+    word_list, detail='none', tokenize="unicode61 tokenchars '_'"
+);
+"""
+
+WORD_PATTERN = re.compile(r'[a-z0-9_]{3,40}')
+
+SIZE_PATTERN = re.compile(r'^(>=|<=|>|<|=)?(\d+(?:\.\d+)?)\s*([kmgt]i?b?|b)?$', re.IGNORECASE)
+
+SIZE_UNITS = {'': 1, 'b': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+TIME_UNITS = {'minute': 60, 'hour': 3600, 'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400, 'year': 365 * 86400}
+
+FILLER_WORDS = {'files', 'file', 'modified', 'changed', 'updated', 'and', 'with', 'in', 'the', 'named', 'size'}
+
+LARGER = {'larger', 'bigger', 'over', 'above'}
+SMALLER = {'smaller', 'under', 'below', 'less'}
+
+
+def file_extension(name):
+    """Lower-case extension without the dot, '' if none"""
+    _, ext = os.path.splitext(name)
+    return ext[1:].lower()
+
+
+def escape_glob(text):
+    """Text with GLOB wildcards made literal"""
+    return re.sub(r'([*?\[])', r'[\1]', text)
+
+
+def has_trigram(pattern):
+    """Whether a GLOB pattern has a literal run the trigram index can use"""
+    literal = re.sub(r'\[[^\]]*\]', '*', pattern)
+    return any(len(run) >= 3 for run in re.split(r'[*?]', literal))
+
+
+def content_words(text, limit):
+    """Distinct lower-case words of a text, at most limit of them"""
+    words = dict.fromkeys(WORD_PATTERN.findall(text.lower()))
+    return ' '.join(list(words)[:limit])
+
+
+def parse_size(text):
+    """(operator, bytes) of '>100MB', '10k', '<=2GiB'; None if not a size"""
+    match = SIZE_PATTERN.match(text.strip())
+    if not match:
+        return None
+    op, number, unit = match.groups()
+    unit = (unit or '').lower()[:1]
+    return op or '>=', int(float(number) * SIZE_UNITS[unit])
+
+
+def parse_date(text):
+    """Epoch seconds of a YYYY-MM-DD date, or None"""
+    try:
+        return time.mktime(datetime.datetime.strptime(text, '%Y-%m-%d').timetuple())
+    except ValueError:
+        return None
+
+
+def period_start(name, now):
+    """Start of today / yesterday / this week / this month / this year"""
+    today = datetime.datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    if name == 'today':
+        start = today
+    elif name == 'yesterday':
+        start = today - datetime.timedelta(days=1)
+    elif name == 'week':
+        start = today - datetime.timedelta(days=today.weekday())
+    elif name == 'month':
+        start = today.replace(day=1)
+    elif name == 'year':
+        start = today.replace(month=1, day=1)
+    else:
+        return None
+    return time.mktime(start.timetuple())
+
+
+class SearchQuery:
+    """A parsed search: name, extension, size, time, type, folder and content filters
+
+    Understands free text such as "*.sql larger than 100MB modified this
+    week", plus the explicit forms ext:, type:, in:, content:, size:>10M,
+    after:/before:YYYY-MM-DD, "last 3 days" and "older than 1 year".
+    """
+
+    def __init__(self, text, now=None):
+        self.text = text
+        self.names = []
+        self.globs = []
+        self.exts = []
+        self.min_size = None
+        self.max_size = None
+        self.after = None
+        self.before = None
+        self.is_dir = None
+        self.folders = []
+        self.words = []
+        self.parse(text, time.time() if now is None else now)
+
+    @property
+    def empty(self):
+        return not (self.names or self.globs or self.exts or self.words or self.folders
+                    or self.min_size is not None or self.max_size is not None
+                    or self.after is not None or self.before is not None or self.is_dir is not None)
+
+    def set_size(self, op, value):
+        if op in ('>', '>='):
+            self.min_size = value + (op == '>')
+        elif op in ('<', '<='):
+            self.max_size = value - (op == '<')
+        else:
+            self.min_size = self.max_size = value
+
+    def parse(self, text, now):
+        tokens = [token.strip('"') for token in re.findall(r'"[^"]*"|\S+', text)]
+        position = 0
+        while position < len(tokens):
+            token = tokens[position]
+            lower = token.lower()
+            following = [word.lower() for word in tokens[position + 1:position + 4]]
+            position += 1
+
+            key, _, value = token.partition(':')
+            key = key.lower()
+            if value and key in ('ext', 'type', 'in', 'content', 'size', 'after', 'since', 'before'):
+                self.parse_option(key, value)
+            elif lower in LARGER | SMALLER and following:
+                # "larger than 100MB", "under 5k"
+                skip = 1 if following[0] in ('than', 'then') else 0
+                size = parse_size(following[skip]) if len(following) > skip else None
+                if size is not None:
+                    self.set_size('>' if lower in LARGER else '<', size[1])
+                    position += skip + 1
+            elif lower in ('today', 'yesterday'):
+                self.after = period_start(lower, now)
+                if lower == 'yesterday':
+                    self.before = period_start('today', now)
+            elif lower == 'this' and following and following[0].rstrip('s') in ('week', 'month', 'year'):
+                self.after = period_start(following[0].rstrip('s'), now)
+                position += 1
+            elif lower in ('last', 'past') and following:
+                # "last week", "past 3 days"
+                count, unit = (1, following[0]) if not following[0].isdigit() else (
+                    int(following[0]), following[1] if len(following) > 1 else '')
+                unit = unit.rstrip('s')
+                if unit in TIME_UNITS:
+                    self.after = now - count * TIME_UNITS[unit]
+                    position += 1 if count == 1 and not following[0].isdigit() else 2
+            elif lower == 'older' and len(following) >= 3 and following[0] == 'than' and following[1].isdigit():
+                unit = following[2].rstrip('s')
+                if unit in TIME_UNITS:
+                    self.before = now - int(following[1]) * TIME_UNITS[unit]
+                    position += 3
+            elif lower in ('folders', 'folder', 'dirs', 'directories'):
+                self.is_dir = True
+            elif parse_size(token) is not None and token[:1] in '<>=':
+                self.set_size(*parse_size(token))
+            elif re.fullmatch(r'\*\.[^*?\[\]/]+', token):
+                self.exts.append(token[2:].lower())
+            elif any(char in token for char in '*?['):
+                self.globs.append(token)
+            elif lower not in FILLER_WORDS:
+                self.names.append(token)
+
+    def parse_option(self, key, value):
+        if key == 'ext':
+            self.exts.extend(ext.lower().lstrip('.') for ext in value.split(',') if ext)
+        elif key == 'type':
+            self.is_dir = value.lower() in ('dir', 'dirs', 'folder', 'folders', 'd')
+        elif key == 'in':
+            self.folders.append(os.path.abspath(os.path.expanduser(value)))
+        elif key == 'content':
+            self.words.extend(WORD_PATTERN.findall(value.lower()))
+        elif key == 'size':
+            size = parse_size(value)
+            if size is not None:
+                self.set_size(*size)
+        elif key in ('after', 'since'):
+            self.after = parse_date(value)
+        elif key == 'before':
+            self.before = parse_date(value)
+
+    def describe(self):
+        """Short human-readable form of the filters"""
+        parts = [f"name ~ {name}" for name in self.names] + [f"name = {glob}" for glob in self.globs]
+        if self.exts:
+            parts.append(f"ext = {', '.join(self.exts)}")
+        if self.min_size is not None:
+            parts.append(f"size ≥ {self.min_size:,} B")
+        if self.max_size is not None:
+            parts.append(f"size ≤ {self.max_size:,} B")
+        if self.after is not None:
+            parts.append(f"modified ≥ {time.strftime('%Y-%m-%d %H:%M', time.localtime(self.after))}")
+        if self.before is not None:
+            parts.append(f"modified < {time.strftime('%Y-%m-%d %H:%M', time.localtime(self.before))}")
+        if self.is_dir is not None:
+            parts.append('folders' if self.is_dir else 'files')
+        parts += [f"in {folder}" for folder in self.folders] + [f"contains {word}" for word in self.words]
+        return ' · '.join(parts)
+
+
+class FileIndex:
+    """The on-disk search index
+
+    One writer (the indexer thread) applies directory scans while searches
+    read through a separate connection; WAL mode keeps them from blocking
+    each other. Names are matched through an FTS5 trigram table, so a
+    substring query touches only candidate rows.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.reader_lock = threading.RLock()
+        self.reader = None
+        self.trigrams = False
+
+    def open(self, path=None, bulk=False):
+        """Open a connection to an index file and create the tables
+
+        With bulk=True secondary indexes and name triggers are left out until
+        finish_bulk(), for the initial build into a fresh file.
+        """
+        connection = sqlite3.connect(path or self.path, timeout=30.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=OFF" if bulk else "PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        if not bulk:
+            connection.executescript(INDEXES)
+        for script in (TRIGRAM_SCHEMA if bulk else TRIGRAM_SCHEMA + TRIGRAM_TRIGGERS, WORDS_SCHEMA):
+            try:
+                connection.executescript(script)
+            except sqlite3.OperationalError:
+                pass
+        return connection
+
+    def finish_bulk(self, connection):
+        """Create the indexes, fill the name index and add its triggers after a bulk build"""
+        connection.executescript(INDEXES)
+        try:
+            connection.execute("INSERT INTO names (names) VALUES ('rebuild')")
+            connection.executescript(TRIGRAM_TRIGGERS)
+        except sqlite3.OperationalError:
+            pass
+        connection.execute("ANALYZE")
+        connection.commit()
+
+    def open_reader(self):
+        with self.reader_lock:
+            if self.reader is None:
+                self.reader = self.open()
+                self.trigrams = self.reader.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'names'"
+                ).fetchone() is not None
+            return self.reader
+
+    def close_reader(self):
+        """Close the search connection (it is reopened on the next search)"""
+        with self.reader_lock:
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
+
+    def replace(self, path):
+        """Swap a freshly built index file in; searches wait and then reopen the new one"""
+        with self.reader_lock:
+            self.close_reader()
+            os.replace(path, self.path)
+            # The old file's WAL must not be replayed into the new one
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+
+    @staticmethod
+    def get_meta(connection, key):
+        row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def set_meta(connection, key, value):
+        connection.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, None if value is None else str(value))
+        )
+
+    # Writing (indexer thread)
+
+    @staticmethod
+    def dir_id(connection, path, mtime_ns=None):
+        """Id of a directory row, inserting it if needed"""
+        row = connection.execute("SELECT id FROM dirs WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            if mtime_ns is not None:
+                connection.execute("UPDATE dirs SET mtime_ns = ? WHERE id = ?", (mtime_ns, row[0]))
+            return row[0]
+        return connection.execute(
+            "INSERT INTO dirs (path, mtime_ns) VALUES (?, ?)", (path, mtime_ns or 0)
+        ).lastrowid
+
+    def add_directory(self, connection, path, mtime_ns, entries):
+        """Insert a freshly scanned directory (initial build)"""
+        dir_id = self.dir_id(connection, path, mtime_ns)
+        self.insert_entries(connection, dir_id, entries)
+
+    def insert_entries(self, connection, dir_id, entries):
+        """Insert (name, is_dir, size, mtime, words) entries of one directory"""
+        for name, is_dir, size, mtime, words in entries:
+            file_id = connection.execute(
+                "INSERT INTO files (dir_id, name, ext, size, mtime, is_dir) VALUES (?, ?, ?, ?, ?, ?)",
+                (dir_id, name, '' if is_dir else file_extension(name), size, mtime, int(is_dir))
+            ).lastrowid
+            if words:
+                self.insert_words(connection, file_id, words)
+
+    def insert_words(self, connection, file_id, words):
+        try:
+            connection.execute("INSERT INTO words (rowid, word_list) VALUES (?, ?)", (file_id, words))
+        except sqlite3.OperationalError:
+            pass
+
+    def delete_files(self, connection, file_ids):
+        """Delete file rows and their words"""
+        for start in range(0, len(file_ids), 500):
+            batch = file_ids[start:start + 500]
+            marks = ','.join('?' * len(batch))
+            connection.execute(f"DELETE FROM files WHERE id IN ({marks})", batch)
+            try:
+                connection.execute(f"DELETE FROM words WHERE rowid IN ({marks})", batch)
+            except sqlite3.OperationalError:
+                pass
+
+    def sync_directory(self, connection, path, mtime_ns, entries, only=None):
+        """Bring one directory's rows in line with a scan
+
+        entries are (name, is_dir, size, mtime, words); with only= a set of
+        names, just those entries are compared (a missing name is deleted)
+        and the rest of the directory is left alone. Returns (added folder
+        paths, removed folder paths) so the caller can walk or drop subtrees.
+        """
+        dir_id = self.dir_id(connection, path, mtime_ns)
+        existing = {}
+        if only is None:
+            rows = connection.execute(
+                "SELECT id, name, size, mtime, is_dir FROM files WHERE dir_id = ?", (dir_id,)
+            )
+        else:
+            names = list(only)
+            rows = []
+            for start in range(0, len(names), 500):
+                batch = names[start:start + 500]
+                rows += connection.execute(
+                    f"SELECT id, name, size, mtime, is_dir FROM files WHERE dir_id = ? "
+                    f"AND name IN ({','.join('?' * len(batch))})",
+                    [dir_id] + batch
+                ).fetchall()
+        for file_id, name, size, mtime, is_dir in rows:
+            existing[name] = (file_id, size, mtime, is_dir)
+
+        added, removed, stale, fresh = [], [], [], []
+        for entry in entries:
+            name, is_dir, size, mtime, _ = entry
+            current = existing.pop(name, None)
+            if current is None:
+                fresh.append(entry)
+                if is_dir:
+                    added.append(os.path.join(path, name))
+            elif current[3] != int(is_dir) or current[1] != size or current[2] != mtime:
+                stale.append(current[0])
+                fresh.append(entry)
+                if current[3] and not is_dir:
+                    removed.append(os.path.join(path, name))
+                elif is_dir and not current[3]:
+                    added.append(os.path.join(path, name))
+        for name, (file_id, _, _, is_dir) in existing.items():
+            stale.append(file_id)
+            if is_dir:
+                removed.append(os.path.join(path, name))
+
+        self.delete_files(connection, stale)
+        self.insert_entries(connection, dir_id, fresh)
+        for folder in removed:
+            self.remove_tree(connection, folder)
+        return added, removed
+
+    def remove_tree(self, connection, path):
+        """Drop a directory and everything indexed below it"""
+        dir_ids = [row[0] for row in connection.execute(
+            "SELECT id FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+            (path, path + os.sep, path + chr(ord(os.sep) + 1))
+        )]
+        for dir_id in dir_ids:
+            file_ids = [row[0] for row in connection.execute("SELECT id FROM files WHERE dir_id = ?", (dir_id,))]
+            self.delete_files(connection, file_ids)
+        for start in range(0, len(dir_ids), 500):
+            batch = dir_ids[start:start + 500]
+            connection.execute(f"DELETE FROM dirs WHERE id IN ({','.join('?' * len(batch))})", batch)
+
+    # Reading (any thread)
+
+    def search(self, query, limit=1000):
+        """Matches of a SearchQuery, newest first
+
+        Returns [(path, name, size, mtime, is_dir)].
+        """
+        where, params = [], []
+        if query.exts:
+            where.append(f"f.ext IN ({','.join('?' * len(query.exts))})")
+            params += query.exts
+        if query.min_size is not None:
+            where.append("f.size >= ?")
+            params.append(query.min_size)
+        if query.max_size is not None:
+            where.append("f.size <= ?")
+            params.append(query.max_size)
+        if query.after is not None:
+            where.append("f.mtime >= ?")
+            params.append(query.after)
+        if query.before is not None:
+            where.append("f.mtime < ?")
+            params.append(query.before)
+        if query.is_dir is not None:
+            where.append("f.is_dir = ?")
+            params.append(int(query.is_dir))
+        for folder in query.folders:
+            where.append("f.dir_id IN (SELECT id FROM dirs WHERE path = ? OR (path >= ? AND path < ?))")
+            params += [folder, folder + os.sep, folder + chr(ord(os.sep) + 1)]
+        # Names and globs match case-insensitively through the trigram index when the
+        # pattern has a literal run of three characters
+        patterns = [f"*{escape_glob(name.lower())}*" for name in query.names]
+        patterns += [pattern.lower() for pattern in query.globs]
+        for pattern in patterns:
+            if self.trigrams and has_trigram(pattern):
+                where.append("f.id IN (SELECT rowid FROM names WHERE name_key GLOB ?)")
+            else:
+                where.append("f.name_key GLOB ?")
+            params.append(pattern)
+        if query.words:
+            where.append("f.id IN (SELECT rowid FROM words WHERE words MATCH ?)")
+            params.append(' AND '.join(f'"{word}"' for word in query.words))
+
+        sql = (
+            "SELECT d.path, f.name, f.size, f.mtime, f.is_dir FROM files f JOIN dirs d ON d.id = f.dir_id "
+            + (f"WHERE {' AND '.join(where)} " if where else '')
+            + "ORDER BY f.mtime DESC LIMIT ?"
+        )
+        with self.reader_lock:
+            return self.open_reader().execute(sql, params + [limit]).fetchall()
+
+    def counts(self):
+        """Indexed files and folders"""
+        with self.reader_lock:
+            reader = self.open_reader()
+            files = reader.execute("SELECT count(*) FROM files").fetchone()[0]
+            dirs = reader.execute("SELECT count(*) FROM dirs").fetchone()[0]
+            built = self.get_meta(reader, 'built_at')
+        return {'entries': files, 'dirs': dirs, 'built_at': float(built) if built else None}
@@ -0,0 +1,194 @@
+"""
+Directory Watcher
+inotify watches through ctypes, with directory-mtime polling where inotify is unavailable or exhausted
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class WatchLimitReached(Exception):
+    """Raised when the kernel refuses more inotify watches (max_user_watches)"""
+
+
+def load_libc():
+    """libc with inotify, or None off Linux"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class InotifyWatcher:
+    """One inotify instance watching many directories
+
+    read() returns the changes since the last call as (directory, name)
+    pairs: name is None when the directory itself must be rescanned, and
+    overflowed is set when the kernel queue overflowed and events were lost.
+    """
+
+    def __init__(self, max_watches=None):
+        self.libc = load_libc()
+        if self.libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.max_watches = max_watches
+        self.paths = {}
+        self.watches = {}
+        self.overflowed = False
+
+    def __len__(self):
+        return len(self.watches)
+
+    def add(self, path):
+        """Watch a directory; raises WatchLimitReached when no watch is left"""
+        if path in self.watches:
+            return
+        if self.max_watches is not None and len(self.watches) >= self.max_watches:
+            raise WatchLimitReached(path)
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise WatchLimitReached(path)
+            raise OSError(error, os.strerror(error), path)
+        self.paths[wd] = path
+        self.watches[path] = wd
+
+    def remove_tree(self, path):
+        """Stop watching a directory and everything below it"""
+        prefix = path + os.sep
+        for watched in [p for p in self.watches if p == path or p.startswith(prefix)]:
+            wd = self.watches.pop(watched)
+            self.paths.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def fileno(self):
+        return self.fd
+
+    def read(self, timeout):
+        """Changed (directory, name) pairs, waiting up to timeout seconds for the first"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changes = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+                offset += EVENT_HEADER.size + length
+                self.handle(wd, mask, os.fsdecode(name) if name else None, changes)
+        return changes
+
+    def handle(self, wd, mask, name, changes):
+        if mask & IN_Q_OVERFLOW:
+            self.overflowed = True
+            return
+        path = self.paths.get(wd)
+        if path is None:
+            return
+        if mask & IN_IGNORED:
+            # The watch is gone (directory deleted or unmounted)
+            self.paths.pop(wd, None)
+            self.watches.pop(path, None)
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            changes.add((os.path.dirname(path), os.path.basename(path)))
+            return
+        changes.add((path, name))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Detects changed directories by comparing their mtimes, a slice per call
+
+    Creating, deleting or renaming an entry bumps its directory's mtime;
+    in-place file changes do not, so polled directories pick those up only
+    on their next rescan.
+    """
+
+    def __init__(self):
+        self.mtimes = {}
+        self.queue = []
+        self.position = 0
+
+    def __len__(self):
+        return len(self.mtimes)
+
+    def add(self, path, mtime_ns):
+        if path not in self.mtimes:
+            self.queue.append(path)
+        self.mtimes[path] = mtime_ns
+
+    def remove_tree(self, path):
+        prefix = path + os.sep
+        for polled in [p for p in self.mtimes if p == path or p.startswith(prefix)]:
+            del self.mtimes[polled]
+
+    def poll(self, batch):
+        """(directory, None) pairs for changed directories among the next batch"""
+        changes = set()
+        if self.position >= len(self.queue):
+            # Compact paths removed since the last round
+            self.queue = [path for path in dict.fromkeys(self.queue) if path in self.mtimes]
+            self.position = 0
+        for path in self.queue[self.position:self.position + batch]:
+            known = self.mtimes.get(path)
+            if known is None:
+                continue
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                changes.add((os.path.dirname(path), os.path.basename(path)))
+                continue
+            if mtime_ns != known:
+                self.mtimes[path] = mtime_ns
+                changes.add((path, None))
+        self.position += batch
+        return changes
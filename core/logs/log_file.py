@@ -0,0 +1,613 @@
+"""
+Log Files
+Memory-mapped log files with sparse line/time indexes, built in the background, across rotated segments
+"""
+
+import bisect
+import datetime
+import mmap
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+import numpy as np
+
+
+NEWLINE = 0x0A
+
+MONTHS = {name: number for number, name in enumerate(
+    (b'Jan', b'Feb', b'Mar', b'Apr', b'May', b'Jun', b'Jul', b'Aug', b'Sep', b'Oct', b'Nov', b'Dec'), 1)}
+
+ISO_TIME = re.compile(rb'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:[.,](\d{1,6}))?')
+SYSLOG_TIME = re.compile(rb'^([A-Z][a-z]{2}) +(\d{1,2}) (\d{2}):(\d{2}):(\d{2})')
+CLF_TIME = re.compile(rb'\[(\d{2})/([A-Z][a-z]{2})/(\d{4}):(\d{2}):(\d{2}):(\d{2})')
+
+ROTATED_NAME = r'^{base}(?:\.(?P<number>\d+)|-(?P<date>\d{{8}}))(?P<gzip>\.gz)?$'
+
+
+def parse_timestamp(line, year=None):
+    """Epoch seconds of the timestamp near the start of a log line, or NaN
+
+    Understands ISO 8601 (2024-01-31 12:00:00.123), syslog (Jan 31
+    12:00:00, in the given year) and Apache/CLF ([31/Jan/2024:12:00:00]).
+    """
+    head = bytes(line[:120])
+    match = ISO_TIME.search(head)
+    try:
+        if match:
+            year_, month, day, hour, minute, second, fraction = match.groups()
+            when = datetime.datetime(int(year_), int(month), int(day), int(hour), int(minute), int(second))
+            return time.mktime(when.timetuple()) + (float(b'0.' + fraction) if fraction else 0.0)
+        match = SYSLOG_TIME.match(head)
+        if match and match.group(1) in MONTHS:
+            month, day, hour, minute, second = match.groups()
+            when = datetime.datetime(year or time.localtime().tm_year, MONTHS[month], int(day),
+                                     int(hour), int(minute), int(second))
+            return time.mktime(when.timetuple())
+        match = CLF_TIME.search(head)
+        if match and match.group(2) in MONTHS:
+            day, month, year_, hour, minute, second = match.groups()
+            when = datetime.datetime(int(year_), MONTHS[month], int(day), int(hour), int(minute), int(second))
+            return time.mktime(when.timetuple())
+    except (ValueError, OverflowError):
+        pass
+    return float('nan')
+
+
+def parse_time_query(text):
+    """Epoch seconds of '2024-01-31 12:00', '12:00' (today) or '-15m' / '-2h' (ago), or None"""
+    text = text.strip()
+    match = re.fullmatch(r'-(\d+)\s*([smhd])', text)
+    if match:
+        return time.time() - int(match.group(1)) * {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[match.group(2)]
+    for layout in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return time.mktime(datetime.datetime.strptime(text, layout).timetuple())
+        except ValueError:
+            pass
+    for layout in ('%H:%M:%S', '%H:%M'):
+        try:
+            clock = datetime.datetime.strptime(text, layout).time()
+        except ValueError:
+            continue
+        return time.mktime(datetime.datetime.combine(datetime.date.today(), clock).timetuple())
+    return None
+
+
+class LineIndex:
+    """Sparse line index of one segment
+
+    offsets[i] is the byte offset of line i * every and times[i] the
+    timestamp parsed from that line (NaN when it has none), so 200M lines
+    cost a few MB. feed() takes consecutive chunks of the segment and finds
+    their newlines with NumPy.
+    """
+
+    def __init__(self, every, year=None):
+        self.every = every
+        self.year = year
+        self.offsets = np.zeros(1024, dtype=np.int64)
+        self.times = np.full(1024, np.nan)
+        self.checkpoints = 1
+        self.newlines = 0
+        self.indexed = 0
+        self.last_start = 0
+        self.pending_time = None
+        self.lock = threading.Lock()
+
+    @property
+    def lines(self):
+        """Lines so far, counting an unterminated last line"""
+        return self.newlines + (1 if self.indexed > self.last_start else 0)
+
+    def feed(self, data, base):
+        """Index data, the bytes at [base, base + len(data)) of the segment"""
+        view = np.frombuffer(data, dtype=np.uint8)
+        # Offset just after every newline is the start of the next line
+        starts = np.flatnonzero(view == NEWLINE) + 1
+        numbers = self.newlines + 1 + np.arange(len(starts))
+        marked = starts[numbers % self.every == 0]
+
+        with self.lock:
+            if self.pending_time is not None:
+                # The previous chunk ended right after a checkpoint; its line continues here
+                index, head = self.pending_time
+                self.times[index] = parse_timestamp(head + bytes(data[:120]), self.year)
+                self.pending_time = None
+            if self.checkpoints == 1 and base == 0 and len(data):
+                self.times[0] = parse_timestamp(data, self.year)
+
+            needed = self.checkpoints + len(marked)
+            if needed > len(self.offsets):
+                capacity = len(self.offsets)
+                while capacity < needed:
+                    capacity *= 2
+                self.offsets = np.concatenate((self.offsets, np.zeros(capacity - len(self.offsets), dtype=np.int64)))
+                self.times = np.concatenate((self.times, np.full(capacity - len(self.times), np.nan)))
+            for start in marked:
+                index = self.checkpoints
+                self.offsets[index] = base + start
+                head = data[start:start + 120]
+                if len(head) < 120 and start + len(head) == len(data):
+                    self.pending_time = (index, bytes(head))
+                self.times[index] = parse_timestamp(head, self.year)
+                self.checkpoints += 1
+            self.newlines += len(starts)
+            if len(starts):
+                self.last_start = base + int(starts[-1])
+            self.indexed = base + len(data)
+
+    def checkpoint(self, line):
+        """(first line, byte offset) of the checkpoint at or before a line"""
+        with self.lock:
+            index = min(line // self.every, self.checkpoints - 1)
+            return index * self.every, int(self.offsets[index])
+
+    def time_checkpoint(self, when):
+        """Index of the last checkpoint stamped at or before when (timestamps carried forward)"""
+        with self.lock:
+            times = self.times[:self.checkpoints].copy()
+        known = ~np.isnan(times)
+        if not known.any():
+            return 0
+        # Carry the last known time forward over unstamped checkpoints
+        positions = np.where(known, np.arange(len(times)), 0)
+        np.maximum.accumulate(positions, out=positions)
+        filled = times[positions]
+        filled[:np.argmax(known)] = times[np.argmax(known)]
+        return max(0, int(np.searchsorted(filled, when, side='right')) - 1)
+
+    def memory_bytes(self):
+        return self.offsets.nbytes + self.times.nbytes
+
+
+class PlainSegment:
+    """An uncompressed log file read through mmap, remapped as it grows"""
+
+    compressed = False
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = open(path, 'rb')
+        info = os.fstat(self.handle.fileno())
+        self.inode = info.st_ino
+        self.size = 0
+        self.map = None
+        self.lock = threading.RLock()
+        self.complete = False
+        self.remap(info.st_size)
+
+    def remap(self, size):
+        with self.lock:
+            if size == self.size and self.map is not None:
+                return
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            if size:
+                self.map = mmap.mmap(self.handle.fileno(), size, access=mmap.ACCESS_READ)
+                if hasattr(self.map, 'madvise'):
+                    self.map.madvise(mmap.MADV_RANDOM)
+            self.size = size
+
+    def changed(self):
+        """'grown', 'rotated' (replaced or truncated) or None"""
+        try:
+            info = os.stat(self.path)
+        except OSError:
+            return 'rotated'
+        if info.st_ino != self.inode or info.st_size < self.size:
+            return 'rotated'
+        if info.st_size > self.size:
+            self.remap(info.st_size)
+            return 'grown'
+        return None
+
+    def chunks(self, start, chunk_size):
+        """(base, bytes) over [start, size), copied out so no buffer pins the map"""
+        position = start
+        while position < self.size:
+            with self.lock:
+                if self.map is None:
+                    return
+                data = self.map[position:min(self.size, position + chunk_size)]
+            yield position, data
+            position += len(data)
+
+    def read(self, offset, length):
+        with self.lock:
+            if self.map is None:
+                return b''
+            return self.map[offset:min(self.size, offset + length)]
+
+    def find(self, byte, offset, end):
+        with self.lock:
+            return self.map.find(byte, offset, min(end, self.size)) if self.map is not None else -1
+
+    def close(self):
+        with self.lock:
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.handle.close()
+
+
+class GzipSegment:
+    """A gzip-compressed rotated log with seek points for random access
+
+    While the indexer decompresses the file once, a copy of the zlib
+    state is kept every checkpoint_bytes of output. Reading any offset
+    then inflates only from the nearest seek point; recently read chunks
+    are kept in a small LRU.
+    """
+
+    compressed = True
+
+    def __init__(self, path, checkpoint_bytes=4 * 1024 * 1024, cache_chunks=8):
+        self.path = path
+        self.checkpoint_bytes = checkpoint_bytes
+        self.cache_chunks = cache_chunks
+        self.compressed_size = os.path.getsize(path)
+        self.inode = os.stat(path).st_ino
+        # (compressed offset, output offset, inflate state); the first is a fresh stream
+        self.points = [(0, 0, zlib.decompressobj(zlib.MAX_WBITS | 16))]
+        self.outputs = [0]
+        self.size = 0
+        self.consumed = 0
+        self.cache = OrderedDict()
+        self.lock = threading.RLock()
+        self.complete = False
+
+    def changed(self):
+        return None
+
+    def chunks(self, start, chunk_size):
+        """Inflate the whole file once, recording seek points; yields (base, bytes)"""
+        inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        output = 0
+        next_point = self.checkpoint_bytes
+        pending = bytearray()
+        with open(self.path, 'rb') as handle:
+            while True:
+                block = handle.read(256 * 1024)
+                if not block:
+                    break
+                data = inflater.decompress(block)
+                while inflater.eof and inflater.unused_data:
+                    # Concatenated gzip members
+                    rest = inflater.unused_data
+                    inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                    data += inflater.decompress(rest)
+                output += len(data)
+                self.consumed = handle.tell()
+                if output >= next_point and not inflater.eof:
+                    with self.lock:
+                        self.points.append((handle.tell(), output, inflater.copy()))
+                        self.outputs.append(output)
+                    next_point = output + self.checkpoint_bytes
+                with self.lock:
+                    self.size = output
+                pending += data
+                if len(pending) >= chunk_size:
+                    yield output - len(pending), bytes(pending)
+                    pending = bytearray()
+            data = inflater.flush()
+            output += len(data)
+            pending += data
+        with self.lock:
+            self.size = output
+        if pending:
+            yield output - len(pending), bytes(pending)
+
+    def chunk(self, index):
+        """Inflated bytes from seek point index to the next one"""
+        with self.lock:
+            cached = self.cache.get(index)
+            if cached is not None:
+                self.cache.move_to_end(index)
+                return cached
+            position, start, state = self.points[index]
+            stop = self.outputs[index + 1] if index + 1 < len(self.outputs) else self.size
+        inflater = state.copy()
+        parts = []
+        produced = 0
+        with open(self.path, 'rb') as handle:
+            handle.seek(position)
+            while produced < stop - start:
+                block = handle.read(256 * 1024)
+                if not block:
+                    parts.append(inflater.flush())
+                    break
+                data = inflater.decompress(block)
+                while inflater.eof and inflater.unused_data:
+                    rest = inflater.unused_data
+                    inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                    data += inflater.decompress(rest)
+                parts.append(data)
+                produced += len(data)
+        data = b''.join(parts)[:stop - start]
+        with self.lock:
+            if index + 1 == len(self.outputs) and not self.complete:
+                # The last chunk still grows while the indexer inflates
+                return data
+            self.cache[index] = data
+            while len(self.cache) > self.cache_chunks:
+                self.cache.popitem(last=False)
+        return data
+
+    def read(self, offset, length):
+        parts = []
+        end = min(self.size, offset + length)
+        while offset < end:
+            with self.lock:
+                index = bisect.bisect_right(self.outputs, offset) - 1
+                start = self.outputs[index]
+            data = self.chunk(index)
+            piece = data[offset - start:end - start]
+            if not piece:
+                break
+            parts.append(piece)
+            offset += len(piece)
+        return b''.join(parts)
+
+    def find(self, byte, offset, end):
+        position = offset
+        while position < min(end, self.size):
+            data = self.read(position, 64 * 1024)
+            found = data.find(byte)
+            if found >= 0:
+                return position + found if position + found < end else -1
+            position += len(data)
+        return -1
+
+    def close(self):
+        with self.lock:
+            self.cache.clear()
+            del self.points[1:]
+
+
+def rotated_segments(path):
+    """Rotated siblings of a log (app.log.1, app.log.2.gz, app.log-20240131.gz), oldest first"""
+    folder, base = os.path.split(path)
+    pattern = re.compile(ROTATED_NAME.format(base=re.escape(base)))
+    found = []
+    try:
+        names = os.listdir(folder or '.')
+    except OSError:
+        return []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            # Higher numbers are older; earlier dates are older
+            if match.group('number'):
+                key = (0, -int(match.group('number')))
+            else:
+                key = (1, int(match.group('date')))
+            found.append((key, os.path.join(folder, name)))
+    return [path for _, path in sorted(found)]
+
+
+class IndexProgress:
+    """Counters of a log's background indexing"""
+
+    __slots__ = ('segments', 'compressed', 'indexed', 'total', 'lines', 'indexing', 'started',
+                 'finished', 'error')
+
+    def __init__(self):
+        self.segments = 0
+        self.compressed = 0
+        self.indexed = 0
+        self.total = 0
+        self.lines = 0
+        self.indexing = True
+        self.started = time.monotonic()
+        self.finished = None
+        self.error = None
+
+    @property
+    def bytes_per_second(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return self.indexed / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(bytes_per_second=self.bytes_per_second)
+        return values
+
+
+class LogFile:
+    """A log and its rotated segments as one line-addressable document
+
+    Segments are ordered oldest first; the live file is indexed first so
+    its end is usable at once, then older segments newest to oldest. Line
+    numbers span all segments and grow while indexing runs. refresh()
+    picks up appended data of the live file, indexing only the new bytes.
+    """
+
+    def __init__(self, path, settings, on_progress=None):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.settings = settings
+        self.on_progress = on_progress
+        self.segments = []
+        self.indexes = []
+        self.progress = IndexProgress()
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self.last_notify = 0.0
+
+        names = rotated_segments(self.path) if settings['rotated_segments'] else []
+        for name in names + [self.path]:
+            try:
+                if name.endswith('.gz'):
+                    segment = GzipSegment(
+                        name, settings['gzip_checkpoint_mb'] * 1024 * 1024, settings['gzip_cache_chunks']
+                    )
+                    self.progress.compressed += 1
+                    self.progress.total += segment.compressed_size * 4
+                else:
+                    segment = PlainSegment(name)
+                    self.progress.total += segment.size
+            except OSError:
+                if name == self.path:
+                    raise
+                continue
+            year = time.localtime(os.path.getmtime(name)).tm_year
+            self.segments.append(segment)
+            self.indexes.append(LineIndex(settings['index_every'], year))
+        self.progress.segments = len(self.segments)
+
+        self.thread = threading.Thread(target=self.run, name='log-index', daemon=True)
+        self.thread.start()
+
+    @property
+    def live(self):
+        return self.segments[-1]
+
+    def __len__(self):
+        return sum(index.lines for index in self.indexes)
+
+    def notify(self, force=False):
+        now = time.monotonic()
+        if self.on_progress and (force or now - self.last_notify >= self.settings['progress_interval_ms'] / 1000):
+            self.last_notify = now
+            self.progress.lines = len(self)
+            self.on_progress(self.progress.snapshot())
+
+    # Indexer thread
+
+    def run(self):
+        chunk_size = self.settings['index_chunk_mb'] * 1024 * 1024
+        order = [len(self.segments) - 1] + list(range(len(self.segments) - 2, -1, -1))
+        try:
+            for position in order:
+                if self.stop_event.is_set():
+                    return
+                self.index_segment(position, chunk_size)
+            self.progress.indexing = False
+            self.progress.finished = time.monotonic()
+            self.notify(force=True)
+            # Tail: index what refresh() finds appended
+            while not self.stop_event.is_set():
+                self.wake.wait()
+                self.wake.clear()
+                if not self.stop_event.is_set():
+                    self.index_segment(len(self.segments) - 1, chunk_size)
+                    self.notify(force=True)
+        except Exception as error:
+            self.progress.error = str(error)
+            self.progress.indexing = False
+            self.notify(force=True)
+
+    def index_segment(self, position, chunk_size):
+        segment = self.segments[position]
+        index = self.indexes[position]
+        for base, data in segment.chunks(index.indexed, chunk_size):
+            if self.stop_event.is_set():
+                return
+            index.feed(data, base)
+            self.progress.indexed += len(data)
+            self.notify()
+        if segment.compressed:
+            # The estimate of the inflated size gives way to the real one
+            self.progress.total += segment.size - segment.compressed_size * 4
+        segment.complete = True
+
+    # Reading (any thread)
+
+    def refresh(self):
+        """'grown', 'rotated' or None for the live file; growth is indexed in the background"""
+        change = self.live.changed()
+        if change == 'grown':
+            self.progress.total = max(self.progress.total, self.progress.indexed)
+            self.wake.set()
+        return change
+
+    def locate(self, line):
+        """(segment position, line within it)"""
+        for position, index in enumerate(self.indexes):
+            count = index.lines
+            if line < count:
+                return position, line
+            line -= count
+        return len(self.indexes) - 1, self.indexes[-1].lines
+
+    def first_line(self, position):
+        return sum(index.lines for index in self.indexes[:position])
+
+    def segment_line(self, path, line):
+        """Line in this document of a line of one segment file, or None if path is no segment"""
+        path = os.path.realpath(path)
+        for position, segment in enumerate(self.segments):
+            if os.path.realpath(segment.path) == path:
+                return self.first_line(position) + line
+        return None
+
+    def line_offset(self, position, line):
+        """Byte offset of a line within a segment"""
+        first, offset = self.indexes[position].checkpoint(line)
+        segment = self.segments[position]
+        for _ in range(line - first):
+            found = segment.find(b'\n', offset, segment.size)
+            if found < 0:
+                return segment.size
+            offset = found + 1
+        return offset
+
+    def lines(self, start, stop):
+        """Decoded text of lines [start, stop)"""
+        max_chars = self.settings['max_line_chars']
+        result = []
+        position, line = self.locate(start)
+        while len(result) < stop - start and position < len(self.segments):
+            segment = self.segments[position]
+            offset = self.line_offset(position, line)
+            limit = self.indexes[position].indexed
+            while len(result) < stop - start and offset < limit:
+                end = segment.find(b'\n', offset, limit)
+                end = limit if end < 0 else end
+                data = segment.read(offset, min(end - offset, max_chars * 4))
+                result.append(data.decode('utf-8', errors='replace')[:max_chars].rstrip('\r'))
+                offset = end + 1
+            position += 1
+            line = 0
+        return result
+
+    def find_time(self, when):
+        """First line stamped at or after when"""
+        position = 0
+        for candidate, index in enumerate(self.indexes):
+            with index.lock:
+                first = index.times[0]
+            if index.lines and first == first and first <= when:
+                position = candidate
+        index = self.indexes[position]
+        checkpoint = index.time_checkpoint(when)
+        line = checkpoint * index.every
+        segment = self.segments[position]
+        offset = self.line_offset(position, line)
+        limit = index.indexed
+        # Scan at most two checkpoints' worth of lines from the seek point
+        for _ in range(index.every * 2):
+            if offset >= limit:
+                break
+            stamp = parse_timestamp(segment.read(offset, 120), index.year)
+            if stamp == stamp and stamp >= when:
+                break
+            end = segment.find(b'\n', offset, limit)
+            if end < 0:
+                break
+            offset = end + 1
+            line += 1
+        return self.first_line(position) + line
+
+    def memory_bytes(self):
+        return sum(index.memory_bytes() for index in self.indexes)
+
+    def close(self):
+        self.stop_event.set()
+        self.wake.set()
+        self.thread.join(2)
+        for segment in self.segments:
+            segment.close()
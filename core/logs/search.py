@@ -0,0 +1,619 @@
+"""
+Log Search
+Regex and structured (JSON/logfmt field) search across log files, split by byte range over a process pool
+"""
+
+import glob
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from core.logs.log_file import rotated_segments
+
+try:
+    import re._parser as sre_parse
+except ImportError:
+    import sre_parse
+
+
+TOKEN = re.compile(r'"((?:\\.|[^"\\])*)"|/((?:\\.|[^/\\])+)/|(\S+)')
+FIELD_FILTER = re.compile(r'^([A-Za-z_@][\w.@-]*)(!=|>=|<=|=|>|<|~)(.*)$')
+LOGFMT_PAIR = re.compile(rb'([A-Za-z_@][\w.@-]*)=("(?:\\.|[^"\\])*"|\S*)')
+
+# Per-process state of a pool worker, set up once by init_worker
+worker = {}
+
+
+def init_worker(cancelled):
+    worker['cancelled'] = cancelled
+    worker['queries'] = {}
+
+
+class QueryError(ValueError):
+    """Raised for a search query that cannot be compiled"""
+
+
+def required_literal(pattern):
+    """Longest literal every match of a regex must contain, or ''"""
+    try:
+        return literal_run(sre_parse.parse(pattern))
+    except re.error:
+        return ''
+
+
+def literal_run(parsed):
+    best = current = ''
+    for op, value in parsed:
+        if op is sre_parse.LITERAL:
+            current += chr(value)
+            continue
+        best = max(best, current, key=len)
+        current = ''
+        if op is sre_parse.SUBPATTERN:
+            # A group that must match contributes its own literals
+            best = max(best, literal_run(value[-1]), key=len)
+    return max(best, current, key=len)
+
+
+def flatten(value, prefix='', fields=None):
+    """Nested JSON objects as {'a.b': value}"""
+    fields = {} if fields is None else fields
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flatten(item, f"{prefix}{key}.", fields)
+    else:
+        fields[prefix[:-1]] = value
+    return fields
+
+
+def parse_fields(line):
+    """Fields of a JSON line (also after a text prefix) or of logfmt key=value pairs"""
+    brace = line.find(b'{')
+    if brace >= 0 and line.rstrip().endswith(b'}'):
+        try:
+            value = json.loads(line[brace:])
+        except ValueError:
+            value = None
+        if isinstance(value, dict):
+            return flatten(value)
+    fields = {}
+    for key, value in LOGFMT_PAIR.findall(line):
+        if value.startswith(b'"'):
+            value = value[1:-1].replace(b'\\"', b'"')
+        fields[key.decode('utf-8', 'replace')] = value.decode('utf-8', 'replace')
+    return fields
+
+
+def as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FieldFilter:
+    """One key<op>value condition on the parsed fields of a line"""
+
+    __slots__ = ('key', 'op', 'value', 'number', 'pattern')
+
+    def __init__(self, key, op, value):
+        self.key = key
+        self.op = op
+        self.value = value
+        self.number = as_number(value)
+        self.pattern = re.compile(value, re.IGNORECASE) if op == '~' else None
+        if op in ('>', '<', '>=', '<=') and self.number is None:
+            raise QueryError(f"{key}{op}{value}: {op} needs a number")
+
+    def matches(self, fields):
+        if self.key not in fields:
+            return self.op == '!='
+        actual = fields[self.key]
+        if self.op == '~':
+            return self.pattern.search(str(actual)) is not None
+        if self.op in ('=', '!='):
+            number = as_number(actual)
+            if self.number is not None and number is not None:
+                equal = number == self.number
+            else:
+                equal = str(actual).lower() == self.value.lower()
+            return equal if self.op == '=' else not equal
+        number = as_number(actual)
+        if number is None:
+            return False
+        return {
+            '>': number > self.number,
+            '<': number < self.number,
+            '>=': number >= self.number,
+            '<=': number <= self.number,
+        }[self.op]
+
+
+class LogQuery:
+    """A compiled search query
+
+    Words and "quoted phrases" must all occur, /regex/ terms must match and
+    -word excludes lines; words without capitals match any case. key=value,
+    key!=value, key>n, key>=n, key<n, key<=n and key~regex filter on the
+    fields of JSON or logfmt lines, which are only parsed for lines that
+    pass every text term. The longest literal any match must contain is
+    the prefilter: it is searched for with a plain byte scan and only the
+    lines around its hits are looked at further.
+    """
+
+    def __init__(self, text):
+        self.text = text.strip()
+        self.terms = []
+        self.excluded = []
+        self.fields = []
+        self.required = []
+        anchors = []
+
+        # (literal, case-sensitive, selective): field names are on every line of a structured log
+        for quoted, regex, word in TOKEN.findall(self.text):
+            if regex:
+                try:
+                    pattern = re.compile(regex.encode('utf-8'))
+                except re.error as error:
+                    raise QueryError(f"/{regex}/: {error}") from None
+                self.terms.append(pattern)
+                anchors.append((required_literal(regex), not pattern.flags & re.IGNORECASE, True))
+                continue
+            if word:
+                match = FIELD_FILTER.match(word)
+                if match and match.group(3):
+                    key, op, value = match.groups()
+                    try:
+                        self.fields.append(FieldFilter(key, op, value))
+                    except re.error as error:
+                        raise QueryError(f"{word}: {error}") from None
+                    if op == '=':
+                        # The value is on every matching line, whatever the format
+                        self.required.append(self.literal(value.lower()))
+                        anchors.append((value, False, True))
+                    elif op == '~':
+                        anchors.append((required_literal(value), False, True))
+                    if op != '!=':
+                        # JSON keys of nested fields appear by their last part
+                        anchors.append((key.rsplit('.', 1)[-1], False, False))
+                    continue
+                if word.startswith('-') and len(word) > 1:
+                    self.excluded.append(self.literal(word[1:]))
+                    continue
+            literal = quoted.replace('\\"', '"') if quoted else word
+            if literal:
+                self.terms.append(self.literal(literal))
+                anchors.append((literal, literal != literal.lower(), True))
+        if not self.terms and not self.fields:
+            raise QueryError("Nothing to search for")
+
+        literal, exact, _ = max(
+            anchors or [('', True, False)],
+            key=lambda anchor: (anchor[2] and len(anchor[0]) >= 3, len(anchor[0]))
+        )
+        self.anchor = literal.encode('utf-8')
+        # Case-insensitive anchors are found in a lowercased copy: same offsets, still bytes.find
+        self.fold_case = not exact and self.anchor.lower() != self.anchor.upper()
+        if self.fold_case:
+            self.anchor = self.anchor.lower()
+
+    @staticmethod
+    def literal(text):
+        """Compiled pattern of a literal; case-insensitive unless it has capitals"""
+        flags = 0 if text != text.lower() else re.IGNORECASE
+        return re.compile(re.escape(text.encode('utf-8')), flags)
+
+    def matches(self, line):
+        for term in self.terms:
+            if term.search(line) is None:
+                return False
+        for term in self.excluded:
+            if term.search(line) is not None:
+                return False
+        if self.fields:
+            for term in self.required:
+                if term.search(line) is None:
+                    return False
+            fields = parse_fields(line)
+            for condition in self.fields:
+                if not condition.matches(fields):
+                    return False
+        return True
+
+    def candidates(self, data):
+        """Start offsets of lines of data that contain the anchor (all lines without one)"""
+        if not self.anchor:
+            yield 0
+            position = data.find(b'\n')
+            while 0 <= position < len(data) - 1:
+                yield position + 1
+                position = data.find(b'\n', position + 1)
+            return
+        text = data.lower() if self.fold_case else data
+        last = -1
+        position = 0
+        while True:
+            found = text.find(self.anchor, position)
+            if found < 0:
+                return
+            start = data.rfind(b'\n', 0, found) + 1
+            if start != last:
+                yield start
+                last = start
+            end = data.find(b'\n', found)
+            if end < 0:
+                return
+            position = end + 1
+
+
+def scan_buffer(query, data, base, limit, max_chars, cancelled=None):
+    """Hits (offset, line within data, text) in a buffer of whole lines
+
+    Lines are counted lazily between prefilter hits, at memchr speed.
+    """
+    hits = []
+    counted_to = 0
+    line = 0
+    checks = 0
+    for start in query.candidates(data):
+        end = data.find(b'\n', start)
+        end = len(data) if end < 0 else end
+        text = data[start:end]
+        checks += 1
+        if cancelled is not None and checks % 4096 == 0 and cancelled():
+            break
+        if not query.matches(text):
+            continue
+        line += data.count(b'\n', counted_to, start)
+        counted_to = start
+        hits.append((base + start, line, text[:max_chars * 4].decode('utf-8', 'replace')[:max_chars].rstrip('\r')))
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+def search_task(search_id, text, path, start, end, limit, max_chars):
+    """Search the lines of a file that start in [start, end) (pool worker)
+
+    Returns the hits with line numbers relative to the range and the
+    number of lines that start in it, so the coordinator can number lines
+    once the ranges before it are done. A .gz file is always one task.
+    """
+    queries = worker['queries']
+    query = queries.get(search_id)
+    if query is None:
+        queries.clear()
+        query = queries[search_id] = LogQuery(text)
+    cancelled = lambda: worker['cancelled'].value >= search_id
+
+    if path.endswith('.gz'):
+        return search_gzip(query, path, limit, max_chars, cancelled)
+
+    with open(path, 'rb') as handle:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(handle.fileno(), start, end - start, os.POSIX_FADV_SEQUENTIAL)
+        first = start
+        if start > 0:
+            # Lines starting before the range belong to the previous task
+            handle.seek(start - 1)
+            data = handle.read(end - start + 1)
+            newline = data.find(b'\n')
+            if newline < 0:
+                return {'hits': [], 'lines': 0, 'bytes': len(data) - 1}
+            data = data[newline + 1:]
+            first = start + newline
+        else:
+            data = handle.read(end - start)
+        if data and not data.endswith(b'\n'):
+            # Finish the last line, which may run past the range
+            tail = []
+            while True:
+                block = handle.read(64 * 1024)
+                if not block:
+                    break
+                newline = block.find(b'\n')
+                if newline >= 0:
+                    tail.append(block[:newline + 1])
+                    break
+                tail.append(block)
+            data += b''.join(tail)
+    hits = scan_buffer(query, data, first, limit, max_chars, cancelled)
+    lines = data.count(b'\n') + (0 if not data or data.endswith(b'\n') else 1)
+    return {'hits': hits, 'lines': lines, 'bytes': end - start}
+
+
+def search_gzip(query, path, limit, max_chars, cancelled):
+    """Search a gzip file inflated in blocks, carrying partial lines over"""
+    hits = []
+    lines = 0
+    output = 0
+    carry = b''
+    inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    with open(path, 'rb') as handle:
+        while len(hits) < limit and not cancelled():
+            block = handle.read(1024 * 1024)
+            if block:
+                data = inflater.decompress(block)
+                while inflater.eof and inflater.unused_data:
+                    rest = inflater.unused_data
+                    inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                    data += inflater.decompress(rest)
+                data = carry + data
+                cut = data.rfind(b'\n') + 1
+                data, carry = data[:cut], data[cut:]
+            else:
+                data, carry = carry + inflater.flush(), b''
+            if data:
+                for offset, line, text in scan_buffer(query, data, output, limit - len(hits), max_chars):
+                    hits.append((offset, lines + line, text))
+                lines += data.count(b'\n') + (0 if data.endswith(b'\n') else 1)
+                output += len(data)
+            if not block:
+                break
+    return {'hits': hits, 'lines': lines, 'bytes': os.path.getsize(path)}
+
+
+def expand_paths(patterns, rotated=True):
+    """Files matched by paths and glob patterns, with their rotated segments, oldest first per log"""
+    found = []
+    seen = set()
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern.strip())
+        if not pattern:
+            continue
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*')
+        for path in sorted(glob.glob(pattern)) or ([pattern] if os.path.isfile(pattern) else []):
+            if not os.path.isfile(path):
+                continue
+            group = (rotated_segments(path) if rotated else []) + [path]
+            for member in group:
+                real = os.path.realpath(member)
+                if real not in seen:
+                    seen.add(real)
+                    found.append(member)
+    return found
+
+
+class SearchProgress:
+    """Counters of a log search"""
+
+    __slots__ = ('query', 'phase', 'files', 'bytes', 'scanned', 'hits', 'truncated',
+                 'started', 'finished', 'error')
+
+    def __init__(self, query):
+        self.query = query
+        self.phase = 'searching'
+        self.files = 0
+        self.bytes = 0
+        self.scanned = 0
+        self.hits = 0
+        self.truncated = False
+        self.started = time.monotonic()
+        self.finished = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def bytes_per_second(self):
+        elapsed = self.elapsed
+        return self.scanned / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(elapsed=self.elapsed, bytes_per_second=self.bytes_per_second)
+        return values
+
+
+class LogSearch:
+    """One search run: byte-range tasks in the pool, hits gathered on a coordinator thread
+
+    hits holds (file, range, line in range, offset, text) tuples in the
+    order they arrive, so the UI can show them while the search runs;
+    when it finishes they are sorted by file and position. line_number()
+    resolves a hit's line once every earlier range of its file is done.
+    """
+
+    def __init__(self, search_id, query, paths, pool, workers, cancelled, settings, on_progress=None):
+        self.search_id = search_id
+        self.query = query
+        self.paths = paths
+        self.pool = pool
+        self.workers = workers
+        self.cancelled = cancelled
+        self.settings = settings
+        self.on_progress = on_progress
+        self.hits = []
+        self.range_lines = [[] for _ in paths]
+        self.progress = SearchProgress(query.text)
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='log-search', daemon=True)
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+        # Running tasks poll the newest cancelled search id
+        self.cancelled.value = max(self.cancelled.value, self.search_id)
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def notify(self):
+        if self.on_progress:
+            self.on_progress(self.progress.snapshot())
+
+    def line_number(self, hit):
+        """0-based line of a hit within its file, or None while earlier ranges are pending"""
+        file, part, line = hit[0], hit[1], hit[2]
+        counts = self.range_lines[file]
+        total = line
+        for index in range(part):
+            if counts[index] is None:
+                return None
+            total += counts[index]
+        return total
+
+    def tasks(self):
+        """(file, range, start, end) over every file, largest-first splitting of plain files"""
+        task_bytes = self.settings['task_mb'] * 1024 * 1024
+        for file, path in enumerate(self.paths):
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            self.progress.files += 1
+            self.progress.bytes += size
+            if path.endswith('.gz'):
+                self.range_lines[file].append(None)
+                yield file, 0, 0, size
+                continue
+            for part, start in enumerate(range(0, max(size, 1), task_bytes)):
+                self.range_lines[file].append(None)
+                yield file, part, start, min(size, start + task_bytes)
+
+    def run(self):
+        progress = self.progress
+        settings = self.settings
+        limit = settings['max_results']
+        workers = self.workers
+        pending = list(self.tasks())
+        pending.reverse()
+        in_flight = {}
+        last_notify = time.monotonic()
+        try:
+            while pending or in_flight:
+                if self.cancel_event.is_set():
+                    progress.phase = 'cancelled'
+                    break
+                while pending and len(in_flight) < workers * 2:
+                    file, part, start, end = pending.pop()
+                    future = self.pool.submit(
+                        search_task, self.search_id, self.query.text, self.paths[file],
+                        start, end, limit - progress.hits, settings['max_line_chars']
+                    )
+                    in_flight[future] = (file, part)
+                done, _ = wait(in_flight, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file, part = in_flight.pop(future)
+                    result = future.result()
+                    self.range_lines[file][part] = result['lines']
+                    self.hits.extend((file, part, line, offset, text) for offset, line, text in result['hits'])
+                    progress.hits = len(self.hits)
+                    progress.scanned += result['bytes']
+                if progress.hits >= limit:
+                    progress.truncated = True
+                    del self.hits[limit:]
+                    progress.hits = limit
+                    break
+                now = time.monotonic()
+                if done and now - last_notify >= settings['progress_interval_ms'] / 1000:
+                    self.notify()
+                    last_notify = now
+            if progress.phase != 'cancelled':
+                # Rebound, not sorted in place, so readers never see a half-sorted list
+                self.hits = sorted(self.hits, key=lambda hit: (hit[0], hit[3]))
+                progress.phase = 'complete'
+        except Exception as error:
+            progress.phase = 'failed'
+            progress.error = str(error)
+        finally:
+            # Tasks still running (after a cancel or the result limit) stop early
+            self.cancel()
+            for future in in_flight:
+                future.cancel()
+            progress.finished = time.monotonic()
+            self.notify()
+
+
+class LogSearcher:
+    """Runs log searches on a process pool that lives across searches
+
+    Worker processes are started on the first search and reused, so a
+    new query starts scanning at once. One search runs at a time; starting
+    another cancels it. Running tasks notice a cancel through a shared
+    counter of the newest cancelled search. Listeners are called as
+    callback(progress) on the search's coordinator thread.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.listeners = []
+        self.pool = None
+        self.cancelled = None
+        self.search_id = 0
+        self.current = None
+        self.lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Add a callback invoked as callback(progress)"""
+        self.listeners.append(callback)
+
+    def notify(self, progress):
+        for callback in self.listeners:
+            callback(progress)
+
+    @property
+    def running(self):
+        return self.current is not None and self.current.running
+
+    @property
+    def workers(self):
+        return self.settings['workers'] or os.cpu_count() or 1
+
+    def ensure_pool(self):
+        if self.current is not None and self.current.progress.phase == 'failed':
+            # A worker may have died; start over with fresh processes
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        if self.pool is None:
+            context = multiprocessing.get_context(self.settings['start_method'])
+            self.cancelled = context.Value('q', 0, lock=False)
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=init_worker,
+                initargs=(self.cancelled,),
+            )
+        return self.pool
+
+    def search(self, text, patterns):
+        """Start searching the files matched by patterns; raises QueryError for a bad query"""
+        query = LogQuery(text)
+        paths = expand_paths(patterns, self.settings['rotated_segments'])
+        with self.lock:
+            self.cancel()
+            self.search_id += 1
+            pool = self.ensure_pool()
+            self.current = LogSearch(
+                self.search_id, query, paths, pool, self.workers, self.cancelled, self.settings,
+                on_progress=self.notify
+            )
+            return self.current.start()
+
+    def cancel(self):
+        """Stop the running search, keeping the hits found so far"""
+        if self.current is not None:
+            self.current.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        if self.pool is not None:
+            # Cancelled tasks return within one buffer scan
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
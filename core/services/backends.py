@@ -0,0 +1,408 @@
+"""
+Service Backends
+Pluggable status checks and start/stop control: process table, TCP and HTTP probes, systemd units
+"""
+
+import asyncio
+import os
+import re
+import signal
+import ssl
+import time
+from urllib.parse import urlsplit
+
+
+class ServiceError(Exception):
+    """Raised when a service action cannot be carried out"""
+
+
+class Status:
+    """Result of one status check"""
+
+    __slots__ = ('state', 'detail', 'latency_ms')
+
+    def __init__(self, state, detail='', latency_ms=None):
+        self.state = state
+        self.detail = detail
+        self.latency_ms = latency_ms
+
+
+async def run_command(command, timeout):
+    """Run a command without a shell; (exit code, output), raising ServiceError on a timeout"""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+    except OSError as error:
+        raise ServiceError(f"{command[0]}: {error.strerror or error}") from None
+    try:
+        output, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise ServiceError(f"{command[0]} did not finish within {timeout:.0f}s") from None
+    return process.returncode, output.decode('utf-8', 'replace').strip()
+
+
+class ServiceBackend:
+    """Base class for service backends
+
+    Probing backends check one service per call, so a slow probe never
+    holds back the others. Batched backends get every due service at once
+    in check_many() and answer from one snapshot (one process table read,
+    one systemctl call). Actions report their steps through
+    progress(text). Services may give 'start' and 'stop' commands
+    (argument lists), which the default actions run.
+    """
+
+    name = 'base'
+    batched = False
+
+    def __init__(self, settings):
+        self.settings = settings
+
+    async def check(self, service):
+        """Status of one service"""
+        raise NotImplementedError
+
+    async def check_many(self, services):
+        """Statuses of several services, in order (batched backends)"""
+        return [await self.check(service) for service in services]
+
+    async def run_configured(self, service, action, progress):
+        command = service.get(action)
+        if not command:
+            raise ServiceError(f"No {action} command configured for {service['name']}")
+        progress(f"Running {' '.join(command)}")
+        code, output = await run_command(command, self.settings['action_timeout_s'])
+        if code != 0:
+            raise ServiceError(output.splitlines()[-1] if output else f"{command[0]} exited with {code}")
+
+    async def start(self, service, progress):
+        await self.run_configured(service, 'start', progress)
+
+    async def stop(self, service, progress):
+        await self.run_configured(service, 'stop', progress)
+
+    async def restart(self, service, progress):
+        if service.get('restart'):
+            await self.run_configured(service, 'restart', progress)
+            return
+        await self.stop(service, progress)
+        await self.start(service, progress)
+
+    def describe(self, service):
+        """Short description of what is checked, for display"""
+        return self.name
+
+
+def process_table():
+    """{pid: (comm, cmdline)} of every process, read from /proc"""
+    table = {}
+    try:
+        names = os.listdir('/proc')
+    except OSError:
+        return table
+    for name in names:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/comm', 'rb') as handle:
+                comm = handle.read().strip().decode('utf-8', 'replace')
+            with open(f'/proc/{name}/cmdline', 'rb') as handle:
+                cmdline = handle.read().replace(b'\0', b' ').strip().decode('utf-8', 'replace')
+        except OSError:
+            # Exited while listing
+            continue
+        table[int(name)] = (comm, cmdline)
+    return table
+
+
+class ProcessBackend(ServiceBackend):
+    """Running when a matching process exists
+
+    A service names its process by 'process' (the exact process name) or
+    'cmdline' (a regex searched in the command line). One process table
+    snapshot, reused for process_cache_ms, answers every check of a batch.
+    Without a stop command, stop sends SIGTERM to the matching processes
+    and SIGKILL to those still alive after stop_timeout_s.
+    """
+
+    name = 'process'
+    batched = True
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.table = {}
+        self.table_time = 0.0
+        self.patterns = {}
+
+    async def snapshot(self):
+        if time.monotonic() - self.table_time > self.settings['process_cache_ms'] / 1000:
+            self.table = await asyncio.get_running_loop().run_in_executor(None, process_table)
+            self.table_time = time.monotonic()
+        return self.table
+
+    def matching(self, service, table):
+        if 'cmdline' in service:
+            pattern = self.patterns.get(service['cmdline'])
+            if pattern is None:
+                pattern = self.patterns[service['cmdline']] = re.compile(service['cmdline'])
+            return [pid for pid, (_, cmdline) in table.items() if pattern.search(cmdline)]
+        # The kernel keeps the first 15 bytes of a process name
+        name = service.get('process', service['name'])[:15]
+        return [pid for pid, (comm, _) in table.items() if comm == name]
+
+    async def check(self, service):
+        return (await self.check_many([service]))[0]
+
+    async def check_many(self, services):
+        table = await self.snapshot()
+        statuses = []
+        own = os.getpid()
+        for service in services:
+            pids = [pid for pid in self.matching(service, table) if pid != own]
+            if not pids:
+                statuses.append(Status('stopped', 'no process'))
+            elif len(pids) == 1:
+                statuses.append(Status('running', f"pid {pids[0]}"))
+            else:
+                statuses.append(Status('running', f"{len(pids)} processes"))
+        return statuses
+
+    async def stop(self, service, progress):
+        try:
+            await self.terminate(service, progress)
+        finally:
+            # The next check must not see the cached, pre-stop table
+            self.table_time = 0.0
+
+    async def terminate(self, service, progress):
+        if service.get('stop'):
+            await self.run_configured(service, 'stop', progress)
+            return
+        self.table_time = 0.0
+        pids = [pid for pid in self.matching(service, await self.snapshot()) if pid != os.getpid()]
+        if not pids:
+            progress("Not running")
+            return
+        progress(f"Sending SIGTERM to {len(pids)} process{'es' if len(pids) > 1 else ''}")
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            except PermissionError:
+                raise ServiceError(f"Not allowed to stop pid {pid}") from None
+        deadline = time.monotonic() + self.settings['stop_timeout_s']
+        while time.monotonic() < deadline:
+            pids = [pid for pid in pids if os.path.exists(f'/proc/{pid}')]
+            if not pids:
+                return
+            await asyncio.sleep(0.2)
+        progress(f"Sending SIGKILL to {len(pids)} process{'es' if len(pids) > 1 else ''}")
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    async def start(self, service, progress):
+        command = service.get('start')
+        if not command:
+            raise ServiceError(f"No start command configured for {service['name']}")
+        progress(f"Starting {' '.join(command)}")
+        try:
+            # Detached: the service outlives the app
+            await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError as error:
+            raise ServiceError(f"{command[0]}: {error.strerror or error}") from None
+        self.table_time = 0.0
+
+    def describe(self, service):
+        if 'cmdline' in service:
+            return f"process /{service['cmdline']}/"
+        return f"process {service.get('process', service['name'])}"
+
+
+class TcpBackend(ServiceBackend):
+    """Running when host:port accepts a connection within probe_timeout_s"""
+
+    name = 'tcp'
+
+    async def check(self, service):
+        host, port = service.get('host', '127.0.0.1'), service['port']
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), self.settings['probe_timeout_s']
+            )
+        except asyncio.TimeoutError:
+            return Status('degraded', 'connect timed out')
+        except ConnectionRefusedError:
+            return Status('stopped', 'connection refused')
+        except OSError as error:
+            return Status('stopped', error.strerror or str(error))
+        latency = (time.perf_counter() - started) * 1000
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return Status('running', f"{host}:{port} open", latency)
+
+    def describe(self, service):
+        return f"tcp {service.get('host', '127.0.0.1')}:{service['port']}"
+
+
+class HttpBackend(ServiceBackend):
+    """Running when a GET of 'url' answers with an expected status
+
+    2xx and 3xx are healthy unless 'expect_status' lists the codes; other
+    answers mark the service degraded. Only the status line is read.
+    """
+
+    name = 'http'
+
+    async def check(self, service):
+        url = urlsplit(service['url'])
+        secure = url.scheme == 'https'
+        host = url.hostname or '127.0.0.1'
+        port = url.port or (443 if secure else 80)
+        path = (url.path or '/') + (f"?{url.query}" if url.query else '')
+        timeout = self.settings['probe_timeout_s']
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl.create_default_context() if secure else None),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            return Status('degraded', 'connect timed out')
+        except ConnectionRefusedError:
+            return Status('stopped', 'connection refused')
+        except OSError as error:
+            return Status('stopped', error.strerror or str(error))
+        try:
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\nUser-Agent: db-manager\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1')
+            )
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readline(), timeout)
+        except asyncio.TimeoutError:
+            return Status('degraded', 'no response')
+        except OSError as error:
+            return Status('degraded', error.strerror or str(error))
+        finally:
+            writer.close()
+        latency = (time.perf_counter() - started) * 1000
+        parts = line.decode('latin-1').split(None, 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            return Status('degraded', 'not an HTTP response', latency)
+        code = int(parts[1])
+        expected = service.get('expect_status')
+        healthy = code in expected if expected else 200 <= code < 400
+        return Status('running' if healthy else 'degraded', f"HTTP {code}", latency)
+
+    def describe(self, service):
+        return f"http {service['url']}"
+
+
+class SystemdBackend(ServiceBackend):
+    """Units of systemd, read in one 'systemctl show' per batch
+
+    A service names its 'unit'; 'user': True uses the user manager.
+    ActiveState maps to running/stopped/failed, and transitional states
+    (activating, reloading, ...) to degraded. Actions run systemctl
+    start/stop/restart unless the service gives its own commands.
+    """
+
+    name = 'systemd'
+    batched = True
+
+    STATES = {'active': 'running', 'inactive': 'stopped', 'failed': 'failed'}
+
+    def systemctl(self, service):
+        return ['systemctl', '--user'] if service.get('user') else ['systemctl']
+
+    async def check(self, service):
+        return (await self.check_many([service]))[0]
+
+    async def check_many(self, services):
+        statuses = [None] * len(services)
+        scopes = {}
+        for position, service in enumerate(services):
+            scopes.setdefault(bool(service.get('user')), []).append(position)
+        for user, positions in scopes.items():
+            units = [services[position]['unit'] for position in positions]
+            command = self.systemctl(services[positions[0]]) + [
+                'show', '--property=Id,LoadState,ActiveState,SubState', '--'
+            ] + units
+            try:
+                code, output = await run_command(command, self.settings['probe_timeout_s'] * 2)
+            except ServiceError as error:
+                for position in positions:
+                    statuses[position] = Status('unknown', str(error))
+                continue
+            # One block of properties per unit, in the order asked
+            blocks = output.split('\n\n') if code == 0 else []
+            for index, position in enumerate(positions):
+                if index >= len(blocks):
+                    statuses[position] = Status('unknown', output.splitlines()[-1] if output else 'no answer')
+                    continue
+                values = dict(line.split('=', 1) for line in blocks[index].splitlines() if '=' in line)
+                if values.get('LoadState') == 'not-found':
+                    statuses[position] = Status('unknown', 'unit not found')
+                    continue
+                active = values.get('ActiveState', '')
+                state = self.STATES.get(active, 'degraded' if active else 'unknown')
+                statuses[position] = Status(state, f"{active or 'unknown'} ({values.get('SubState', '?')})")
+        return statuses
+
+    async def run_systemctl(self, service, action, progress):
+        if service.get(action):
+            await self.run_configured(service, action, progress)
+            return
+        command = self.systemctl(service) + [action, '--', service['unit']]
+        progress(f"Running {' '.join(command)}")
+        code, output = await run_command(command, self.settings['action_timeout_s'])
+        if code != 0:
+            raise ServiceError(output.splitlines()[-1] if output else f"systemctl {action} failed")
+
+    async def start(self, service, progress):
+        await self.run_systemctl(service, 'start', progress)
+
+    async def stop(self, service, progress):
+        await self.run_systemctl(service, 'stop', progress)
+
+    async def restart(self, service, progress):
+        await self.run_systemctl(service, 'restart', progress)
+
+    def describe(self, service):
+        return f"systemd {service['unit']}" + (" (user)" if service.get('user') else "")
+
+
+BACKENDS = {
+    'process': ProcessBackend,
+    'tcp': TcpBackend,
+    'http': HttpBackend,
+    'systemd': SystemdBackend,
+}
+
+
+def create_backend(kind, settings):
+    """Create the backend for a service kind"""
+    factory = BACKENDS.get(kind)
+    if factory is None:
+        raise ValueError(f"Unknown service kind '{kind}'")
+    return factory(settings)
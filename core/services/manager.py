@@ -0,0 +1,236 @@
+"""
+Service Manager
+Concurrent status polling of many services with adaptive intervals, plus non-blocking actions
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from core.async_worker import AsyncWorker
+from core.services.backends import ServiceError, Status, create_backend
+
+
+class ServiceState:
+    """Last known state of one service and its polling schedule"""
+
+    __slots__ = ('name', 'kind', 'service', 'state', 'detail', 'latency_ms', 'checked', 'next_check',
+                 'interval', 'changes', 'checking', 'action', 'action_step', 'action_error')
+
+    def __init__(self, service, interval):
+        self.name = service['name']
+        self.kind = service['kind']
+        self.service = service
+        self.state = 'unknown'
+        self.detail = 'not checked yet'
+        self.latency_ms = None
+        self.checked = None
+        self.next_check = 0.0
+        self.interval = interval
+        self.changes = deque(maxlen=16)
+        self.checking = False
+        self.action = None
+        self.action_step = ''
+        self.action_error = None
+
+    def flapping(self, window, count):
+        """Whether the state changed count times within the last window seconds"""
+        cutoff = time.monotonic() - window
+        return sum(1 for changed in self.changes if changed >= cutoff) >= count
+
+    def snapshot(self, describe, flapping):
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'target': describe,
+            'state': self.state,
+            'detail': self.detail,
+            'latency_ms': self.latency_ms,
+            'checked': self.checked,
+            'interval': self.interval,
+            'flapping': flapping,
+            'action': self.action,
+            'action_step': self.action_step,
+            'action_error': self.action_error,
+        }
+
+
+class ServiceManager:
+    """Polls the configured services on an asyncio loop in a worker thread
+
+    Every tick the due services are checked concurrently, bounded by one
+    semaphore of max_concurrency: one probe per service, or one call per
+    batched backend covering all of its due services. After a
+    check the service's interval adapts: back to min_interval_s when its
+    state changed or it is flapping, otherwise stretched by backoff up to
+    max_interval_s. Start/stop/restart run as loop tasks and return
+    Futures at once; their steps and the resulting states reach listeners
+    as callback(snapshot) on the loop thread, at most once per tick.
+    """
+
+    def __init__(self, services, settings, worker=None):
+        self.settings = settings
+        self.worker = worker or AsyncWorker('services')
+        self.backends = {}
+        self.states = {}
+        for service in services:
+            if service['kind'] not in self.backends:
+                self.backends[service['kind']] = create_backend(service['kind'], settings)
+            self.states[service['name']] = ServiceState(service, settings['min_interval_s'])
+        self.listeners = []
+        self.limit = None
+        self.poll_task = None
+        self.changed = True
+        self.checks = 0
+
+    def add_listener(self, callback):
+        """Add a callback invoked as callback(snapshot) on the loop thread"""
+        self.listeners.append(callback)
+
+    def start(self):
+        """Start the loop thread and polling"""
+        if self.states:
+            self.worker.start()
+            self.worker.call_soon(self.start_polling)
+
+    def start_polling(self):
+        """Create the polling task (loop thread)"""
+        if self.poll_task is None:
+            self.limit = asyncio.Semaphore(self.settings['max_concurrency'])
+            self.poll_task = asyncio.get_running_loop().create_task(self.poll())
+
+    async def poll(self):
+        """Check due services every tick and publish changes"""
+        tick = self.settings['tick_ms'] / 1000
+        loop = asyncio.get_running_loop()
+        while True:
+            now = time.monotonic()
+            batches = {}
+            for state in self.states.values():
+                if not state.checking and state.action is None and state.next_check <= now:
+                    state.checking = True
+                    batches.setdefault(state.kind, []).append(state)
+            for kind, states in batches.items():
+                backend = self.backends[kind]
+                if backend.batched:
+                    loop.create_task(self.check_batch(backend, states))
+                else:
+                    for state in states:
+                        loop.create_task(self.check_batch(backend, [state]))
+            if self.changed:
+                self.changed = False
+                self.publish()
+            await asyncio.sleep(tick)
+
+    async def check_batch(self, backend, states):
+        try:
+            async with self.limit:
+                if backend.batched:
+                    statuses = await backend.check_many([state.service for state in states])
+                else:
+                    statuses = [await backend.check(states[0].service)]
+        except Exception as error:
+            statuses = [Status('unknown', str(error) or type(error).__name__)] * len(states)
+        for state, status in zip(states, statuses):
+            self.apply(state, status)
+
+    def apply(self, state, status):
+        """Record a check result and schedule the next one"""
+        settings = self.settings
+        now = time.monotonic()
+        self.checks += 1
+        changed = status.state != state.state
+        if changed and state.checked is not None:
+            state.changes.append(now)
+        flapping = state.flapping(settings['flap_window_s'], settings['flap_changes'])
+        if changed or flapping:
+            state.interval = settings['min_interval_s']
+        else:
+            ceiling = state.service.get('max_interval_s', settings['max_interval_s'])
+            state.interval = min(ceiling, state.interval * settings['backoff'])
+        if changed or status.detail != state.detail:
+            self.changed = True
+        state.state = status.state
+        state.detail = status.detail
+        state.latency_ms = status.latency_ms
+        state.checked = time.time()
+        # Jitter keeps services with equal intervals from checking in lockstep
+        state.next_check = now + state.interval * random.uniform(0.9, 1.1)
+        state.checking = False
+
+    def totals(self):
+        counts = {'total': len(self.states), 'running': 0, 'stopped': 0, 'failed': 0, 'degraded': 0,
+                  'unknown': 0, 'flapping': 0, 'busy': 0}
+        window, changes = self.settings['flap_window_s'], self.settings['flap_changes']
+        for state in self.states.values():
+            counts[state.state] = counts.get(state.state, 0) + 1
+            counts['flapping'] += state.flapping(window, changes)
+            counts['busy'] += state.action is not None
+        return counts
+
+    def snapshot(self):
+        """Every service's state plus totals"""
+        window, changes = self.settings['flap_window_s'], self.settings['flap_changes']
+        services = [
+            state.snapshot(self.backends[state.kind].describe(state.service), state.flapping(window, changes))
+            for state in self.states.values()
+        ]
+        return {'services': services, 'totals': self.totals(), 'checks': self.checks}
+
+    def publish(self):
+        snapshot = self.snapshot()
+        for callback in self.listeners:
+            callback(snapshot)
+
+    # Actions
+
+    async def run_action(self, name, action):
+        state = self.states.get(name)
+        if state is None:
+            raise KeyError(f"Unknown service '{name}'")
+        if state.action is not None:
+            raise ServiceError(f"{name} is busy: {state.action}")
+        backend = self.backends[state.kind]
+
+        def progress(text):
+            state.action_step = text
+            self.changed = True
+
+        state.action = action
+        state.action_error = None
+        progress({'start': "Starting...", 'stop': "Stopping...", 'restart': "Restarting..."}[action])
+        try:
+            await getattr(backend, action)(state.service, progress)
+        except Exception as error:
+            state.action_error = str(error) or type(error).__name__
+            raise
+        finally:
+            state.action = None
+            state.action_step = ''
+            # Watch the outcome closely
+            state.interval = self.settings['min_interval_s']
+            state.next_check = 0.0
+            self.changed = True
+
+    def start_service(self, name):
+        """Start a service; returns a Future"""
+        return self.worker.submit(self.run_action(name, 'start'))
+
+    def stop_service(self, name):
+        """Stop a service; returns a Future"""
+        return self.worker.submit(self.run_action(name, 'stop'))
+
+    def restart_service(self, name):
+        """Restart a service; returns a Future"""
+        return self.worker.submit(self.run_action(name, 'restart'))
+
+    def check_now(self, names=None):
+        """Check services (all by default) on the next tick"""
+        def due():
+            for state in self.states.values():
+                if names is None or state.name in names:
+                    state.next_check = 0.0
+        self.worker.call_soon(due)
+
+    def shutdown(self):
+        self.worker.stop()
@@ -0,0 +1,248 @@
+"""
+System Metrics Sampler
+Background thread that samples /proc counters and publishes deltas to a ring buffer
+"""
+
+import logging
+import os
+import threading
+import time
+from utils.ring_buffer import RingBuffer
+
+
+logger = logging.getLogger(__name__)
+
+
+# Sample fields kept as time series
+SERIES = ('cpu', 'memory', 'disk', 'disk_bps', 'network_bps')
+
+# Block devices whose counters are not interesting or would double count
+VIRTUAL_DISK_PREFIXES = ('loop', 'ram', 'zram', 'dm-', 'md', 'sr', 'fd')
+
+
+class ProcFile:
+    """A /proc file kept open and re-read with pread (no reopen, no seek)"""
+
+    def __init__(self, path, bufsize=8192):
+        self.path = path
+        self.bufsize = bufsize
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self):
+        """Read the whole file, growing the buffer when it does not fit"""
+        while True:
+            data = os.pread(self.fd, self.bufsize, 0)
+            if len(data) < self.bufsize:
+                return data
+            self.bufsize *= 2
+
+    def read_head(self, size=256):
+        """Read only the first bytes of the file"""
+        return os.pread(self.fd, size, 0)
+
+    def close(self):
+        """Close the underlying descriptor"""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def whole_disks(sys_block='/sys/block'):
+    """Names of physical whole-disk block devices"""
+    try:
+        names = os.listdir(sys_block)
+    except OSError:
+        return None
+    return {name for name in names if not name.startswith(VIRTUAL_DISK_PREFIXES)}
+
+
+class ProcReader:
+    """Parses /proc counters and turns consecutive reads into rates"""
+
+    def __init__(self, proc_root='/proc', sys_block='/sys/block'):
+        self.stat = ProcFile(os.path.join(proc_root, 'stat'))
+        self.meminfo = ProcFile(os.path.join(proc_root, 'meminfo'))
+        self.diskstats = ProcFile(os.path.join(proc_root, 'diskstats'))
+        self.netdev = ProcFile(os.path.join(proc_root, 'net', 'dev'))
+        self.uptime = ProcFile(os.path.join(proc_root, 'uptime'))
+        self.disks = whole_disks(sys_block)
+        self.previous = None
+
+    def close(self):
+        """Close all open /proc files"""
+        for proc_file in (self.stat, self.meminfo, self.diskstats, self.netdev, self.uptime):
+            proc_file.close()
+
+    def read_cpu(self):
+        """Return (busy, total) jiffies from the aggregate cpu line"""
+        # The aggregate line is first, so the per-core lines are never read
+        line = self.stat.read_head(256).split(b'\n', 1)[0]
+        fields = [int(value) for value in line.split()[1:]]
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        total = sum(fields[:8])
+        return total - idle, total
+
+    def read_memory(self):
+        """Return used memory as a percentage of total"""
+        total = available = None
+        for line in self.meminfo.read_head(1024).split(b'\n'):
+            if line.startswith(b'MemTotal:'):
+                total = int(line.split()[1])
+            elif line.startswith(b'MemAvailable:'):
+                available = int(line.split()[1])
+            if total is not None and available is not None:
+                break
+        if not total or available is None:
+            return 0.0
+        return 100.0 * (total - available) / total
+
+    def read_disks(self):
+        """Return (busy_ms per disk, total sectors transferred)"""
+        busy = {}
+        sectors = 0
+        for line in self.diskstats.read().split(b'\n'):
+            fields = line.split()
+            if len(fields) < 13:
+                continue
+            name = fields[2].decode()
+            if self.disks is not None:
+                if name not in self.disks:
+                    continue
+            elif name.startswith(VIRTUAL_DISK_PREFIXES):
+                continue
+            busy[name] = int(fields[12])
+            sectors += int(fields[5]) + int(fields[9])
+        return busy, sectors
+
+    def read_network(self):
+        """Return total bytes received plus transmitted on non-loopback interfaces"""
+        total = 0
+        for line in self.netdev.read().split(b'\n')[2:]:
+            if b':' not in line:
+                continue
+            name, counters = line.split(b':', 1)
+            if name.strip() == b'lo':
+                continue
+            fields = counters.split()
+            total += int(fields[0]) + int(fields[8])
+        return total
+
+    def read_uptime(self):
+        """Return system uptime in seconds"""
+        return float(self.uptime.read_head(64).split()[0])
+
+    def sample(self):
+        """Read every counter and return rates since the previous call"""
+        now = time.monotonic()
+        cpu_busy, cpu_total = self.read_cpu()
+        disk_busy, disk_sectors = self.read_disks()
+        net_bytes = self.read_network()
+        current = (now, cpu_busy, cpu_total, disk_busy, disk_sectors, net_bytes)
+
+        previous = self.previous
+        self.previous = current
+        if previous is None:
+            return None
+
+        elapsed = now - previous[0]
+        if elapsed <= 0:
+            return None
+
+        cpu_delta = cpu_total - previous[2]
+        cpu = 100.0 * (cpu_busy - previous[1]) / cpu_delta if cpu_delta > 0 else 0.0
+
+        # Busiest disk decides the utilisation figure, like iostat %util
+        disk = 0.0
+        for name, busy_ms in disk_busy.items():
+            before = previous[3].get(name)
+            if before is not None:
+                disk = max(disk, (busy_ms - before) / (elapsed * 10.0))
+
+        return {
+            'time': time.time(),
+            'cpu': min(cpu, 100.0),
+            'memory': self.read_memory(),
+            'disk': min(disk, 100.0),
+            'disk_bps': (disk_sectors - previous[4]) * 512 / elapsed,
+            'network_bps': (net_bytes - previous[5]) / elapsed,
+            'uptime': self.read_uptime(),
+        }
+
+
+class SystemMetricsSampler:
+    """Samples system metrics on a daemon thread into a lock-free ring buffer"""
+
+    def __init__(self, interval=1.0, history=300, reader_factory=ProcReader):
+        self.interval = interval
+        self.buffer = RingBuffer(history)
+        self.reader_factory = reader_factory
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.listeners = []
+
+        # Sampler self-cost, for verifying the CPU budget
+        self.samples = 0
+        self.cpu_seconds = 0.0
+
+    def add_listener(self, callback):
+        """Add a callback invoked as callback(sample) on the sampler thread"""
+        self.listeners.append(callback)
+
+    @property
+    def available(self):
+        """Whether /proc counters can be read on this platform"""
+        return os.path.exists('/proc/stat')
+
+    def start(self):
+        """Start the sampler thread"""
+        if self.thread is not None or not self.available:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name='metrics-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the sampler thread"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval * 2)
+            self.thread = None
+
+    def run(self):
+        """Sampler loop, aligned to the interval so drift does not accumulate"""
+        reader = self.reader_factory()
+        try:
+            next_tick = time.monotonic()
+            while not self.stop_event.is_set():
+                started = time.thread_time()
+                sample = reader.sample()
+                if sample is not None:
+                    self.buffer.push(sample)
+                    for callback in self.listeners:
+                        # One failing listener must not stop sampling for the others
+                        try:
+                            callback(sample)
+                        except Exception:
+                            logger.exception("Metrics listener %r failed", callback)
+                self.samples += 1
+                self.cpu_seconds += time.thread_time() - started
+
+                next_tick += self.interval
+                delay = next_tick - time.monotonic()
+                if delay < 0:
+                    next_tick = time.monotonic()
+                    delay = 0
+                self.stop_event.wait(delay)
+        finally:
+            reader.close()
+
+    def latest(self):
+        """Return (sequence, sample) for the newest sample"""
+        return self.buffer.latest()
+
+    @property
+    def cpu_percent(self):
+        """Sampler CPU time as a percentage of one core"""
+        if not self.samples:
+            return 0.0
+        return 100.0 * self.cpu_seconds / (self.samples * self.interval)
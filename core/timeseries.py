@@ -0,0 +1,360 @@
+"""
+Time-Series Store
+Fixed-size ring buffers per series in a memory-mapped file, rolled up from raw samples to minutes and hours
+"""
+
+import json
+import math
+import os
+import threading
+import time
+import numpy as np
+
+
+MAGIC = 0x31535444424d5354  # 'TSMBDTS1'
+VERSION = 1
+HEADER_WORDS = 512          # int64 header, one 4 KiB page
+PAGE = 4096
+
+
+def roll_up(mins, maxs, avgs):
+    """Column-wise min/max/avg of buckets, ignoring gaps (NaN)"""
+    valid = ~np.isnan(avgs)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg = np.where(valid, avgs, 0).sum(axis=0) / valid.sum(axis=0)
+    return np.fmin.reduce(mins, axis=0), np.fmax.reduce(maxs, axis=0), avg
+
+
+class Tier:
+    """One resolution of every series: slots buckets of step seconds each
+
+    Rows are time buckets and columns are series, so advancing the clock
+    clears whole contiguous rows and a sample of many series is one row
+    write. Bucket b lives in row b % slots while head - slots < b <= head.
+    """
+
+    __slots__ = ('step', 'slots', 'fields', 'index')
+
+    def __init__(self, step, slots, fields, index):
+        self.step = step
+        self.slots = slots
+        self.fields = fields
+        self.index = index
+
+    def oldest(self, head):
+        return head - self.slots + 1
+
+
+class TimeSeriesStore:
+    """In-process store for metric series with tiered ring-buffer retention
+
+    The first tier holds raw values; every further tier holds min/max/avg
+    roll-ups of the tier before it, computed for all series at once when a
+    bucket completes. Everything lives in one memory-mapped file (plus a
+    JSON list of series names next to it), so history survives restarts
+    and only the pages that are touched stay resident. Columns grow by
+    doubling up to max_series. A range query reads from the coarsest tier
+    that still yields max_points buckets, so its cost follows the points
+    drawn rather than the points stored.
+
+    With the default tiers (15 minutes of seconds, a day of minutes and 30
+    days of hours) a series takes 30 KB, so 10,000 series fit in 295 MB.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.path = settings['path']
+        self.names_path = self.path + '.series.json'
+        self.tiers = []
+        for index, (step, slots) in enumerate(settings['tiers']):
+            fields = ('value',) if index == 0 else ('min', 'max', 'avg')
+            self.tiers.append(Tier(step, slots, fields, index))
+        for finer, coarser in zip(self.tiers, self.tiers[1:]):
+            if coarser.step % finer.step or finer.step * finer.slots < coarser.step:
+                raise ValueError("each tier needs a step that is a multiple of the one before, "
+                                 "and the one before must hold at least one of its buckets")
+        self.lock = threading.Lock()
+        self.header = None
+        self.arrays = None
+        self.capacity = 0
+        self.names = []
+        self.ids = {}
+        self.dropped = 0
+        self.last_flush = time.monotonic()
+
+    # File layout
+
+    def layout(self, capacity):
+        """Byte offset of every (tier, field) array and the total file size"""
+        offsets = {}
+        offset = PAGE
+        for tier in self.tiers:
+            for field in tier.fields:
+                offsets[tier.index, field] = offset
+                size = tier.slots * capacity * 4
+                offset += (size + PAGE - 1) // PAGE * PAGE
+        return offsets, offset
+
+    def expected_header(self, capacity):
+        words = [MAGIC, VERSION, capacity, len(self.tiers)]
+        for tier in self.tiers:
+            words += [tier.step, tier.slots]
+        return words
+
+    def head(self, tier):
+        return int(self.header[4 + len(self.tiers) * 2 + tier.index * 2])
+
+    def set_head(self, tier, bucket):
+        self.header[4 + len(self.tiers) * 2 + tier.index * 2] = bucket
+
+    def rolled(self, tier):
+        return int(self.header[5 + len(self.tiers) * 2 + tier.index * 2])
+
+    def set_rolled(self, tier, bucket):
+        self.header[5 + len(self.tiers) * 2 + tier.index * 2] = bucket
+
+    def map(self, path, capacity):
+        """Map the header and every array of a file laid out for capacity series"""
+        header = np.memmap(path, dtype=np.int64, mode='r+', shape=(HEADER_WORDS,))
+        offsets, _ = self.layout(capacity)
+        arrays = {
+            key: np.memmap(path, dtype=np.float32, mode='r+', offset=offset,
+                           shape=(self.tiers[key[0]].slots, capacity))
+            for key, offset in offsets.items()
+        }
+        return header, arrays
+
+    def create(self, path, capacity):
+        """Create an empty file for capacity series and map it"""
+        _, size = self.layout(capacity)
+        with open(path, 'wb') as handle:
+            handle.truncate(size)
+        header, arrays = self.map(path, capacity)
+        words = self.expected_header(capacity)
+        header[:len(words)] = words
+        for tier in self.tiers:
+            position = 4 + len(self.tiers) * 2 + tier.index * 2
+            header[position:position + 2] = -1
+        for array in arrays.values():
+            array.fill(np.nan)
+        return header, arrays
+
+    def open(self):
+        """Map the store file, creating it (or starting over when its layout changed)"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        names = []
+        try:
+            with open(self.names_path) as handle:
+                names = json.load(handle)
+        except (OSError, ValueError):
+            pass
+
+        capacity = 0
+        try:
+            with open(self.path, 'rb') as handle:
+                words = np.frombuffer(handle.read(PAGE), dtype=np.int64)
+            if len(words) == HEADER_WORDS:
+                capacity = int(words[2])
+                if list(words[:4 + len(self.tiers) * 2]) != self.expected_header(capacity) \
+                        or os.path.getsize(self.path) < self.layout(capacity)[1] or len(names) > capacity:
+                    capacity = 0
+        except OSError:
+            pass
+
+        if capacity:
+            self.header, self.arrays = self.map(self.path, capacity)
+        else:
+            names = []
+            capacity = self.settings['initial_series']
+            self.header, self.arrays = self.create(self.path, capacity)
+            self.save_names(names)
+        self.capacity = capacity
+        self.names = names
+        self.ids = {name: index for index, name in enumerate(names)}
+
+    def ensure_open(self):
+        if self.header is None:
+            self.open()
+
+    def save_names(self, names):
+        temp = self.names_path + '.tmp'
+        with open(temp, 'w') as handle:
+            json.dump(names, handle, separators=(',', ':'))
+        os.replace(temp, self.names_path)
+
+    def grow(self, needed):
+        """Move to a file with room for at least needed series"""
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        capacity = min(capacity, self.settings['max_series'])
+        temp = self.path + '.grow'
+        header, arrays = self.create(temp, capacity)
+        header[4 + len(self.tiers) * 2:] = self.header[4 + len(self.tiers) * 2:]
+        for key, array in self.arrays.items():
+            arrays[key][:, :self.capacity] = array
+        header.flush()
+        for array in arrays.values():
+            array.flush()
+        os.replace(temp, self.path)
+        self.header, self.arrays = header, arrays
+        self.capacity = capacity
+
+    # Writing
+
+    def series_ids(self, names):
+        """Column of every name, adding new series; None for names beyond max_series"""
+        new = [name for name in names if name not in self.ids]
+        if new:
+            room = self.settings['max_series'] - len(self.names)
+            self.dropped += max(0, len(new) - room)
+            new = new[:room]
+            if len(self.names) + len(new) > self.capacity:
+                # One move for a whole batch of new series
+                self.grow(len(self.names) + len(new))
+            for name in new:
+                self.ids[name] = len(self.names)
+                self.names.append(name)
+            self.save_names(self.names)
+        return [self.ids.get(name) for name in names]
+
+    def record(self, values, when=None):
+        """Store a {series: value} sample taken at when (seconds since the epoch)"""
+        when = time.time() if when is None else when
+        with self.lock:
+            self.ensure_open()
+            pairs = [(index, value) for index, value in zip(self.series_ids(values), values.values())
+                     if index is not None]
+            second = int(when)
+            raw = self.tiers[0]
+            self.advance(second)
+            if pairs and second > self.head(raw) - raw.slots:
+                ids, numbers = zip(*pairs)
+                self.arrays[0, 'value'][second % raw.slots, list(ids)] = numbers
+            if time.monotonic() - self.last_flush >= self.settings['flush_interval_s']:
+                self.flush()
+
+    def advance(self, second):
+        """Roll up every bucket completed before second, then move the raw head to it"""
+        raw = self.tiers[0]
+        if second <= self.head(raw):
+            return
+        for source, tier in zip(self.tiers, self.tiers[1:]):
+            finished = second // tier.step - 1
+            rolled = self.rolled(tier)
+            if finished <= rolled:
+                continue
+            source_head = self.head(source)
+            if source_head >= 0:
+                ratio = tier.step // source.step
+                first = max(rolled + 1, source.oldest(source_head) // ratio)
+                for bucket in range(first, min(finished, source_head // ratio) + 1):
+                    self.roll_up(source, tier, bucket)
+            self.move_head(tier, finished)
+            self.set_rolled(tier, finished)
+        self.move_head(raw, second)
+
+    def move_head(self, tier, bucket):
+        """Make bucket the newest of a tier, clearing the rows of skipped buckets"""
+        head = self.head(tier)
+        if bucket <= head:
+            return
+        if head < 0 or bucket - head >= tier.slots:
+            rows = slice(None)
+        else:
+            rows = np.arange(head + 1, bucket + 1) % tier.slots
+        for field in tier.fields:
+            self.arrays[tier.index, field][rows] = np.nan
+        self.set_head(tier, bucket)
+
+    def roll_up(self, source, tier, bucket):
+        """Summarize the source buckets of one bucket of a coarser tier, for every series"""
+        ratio = tier.step // source.step
+        head = self.head(source)
+        start = max(bucket * ratio, source.oldest(head))
+        stop = min(bucket * ratio + ratio, head + 1)
+        if start >= stop:
+            return
+        rows = np.arange(start, stop) % source.slots
+        count = len(self.names)
+        if source.index == 0:
+            values = self.arrays[0, 'value'][rows, :count]
+            mins = maxs = avgs = values
+        else:
+            mins, maxs, avgs = (self.arrays[source.index, field][rows, :count] for field in source.fields)
+        self.move_head(tier, bucket)
+        row = bucket % tier.slots
+        for field, column in zip(tier.fields, roll_up(mins, maxs, avgs)):
+            self.arrays[tier.index, field][row, :count] = column
+
+    def flush(self):
+        """Write dirty pages back to the file"""
+        if self.header is not None:
+            self.header.flush()
+            for array in self.arrays.values():
+                array.flush()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            self.flush()
+
+    # Reading
+
+    def series(self, prefix=''):
+        """Names of the stored series that start with prefix"""
+        with self.lock:
+            self.ensure_open()
+            return [name for name in self.names if name.startswith(prefix)]
+
+    def query(self, name, start, end, max_points=1000):
+        """Buckets of a series between two times, at most max_points of them
+
+        Returns a dict of NumPy arrays times/min/max/avg (gaps are NaN) and
+        the bucket width in seconds.
+        """
+        with self.lock:
+            self.ensure_open()
+            index = self.ids.get(name)
+            tier = self.pick_tier(start, end, max_points)
+            head = self.head(tier)
+            first = max(int(start) // tier.step, tier.oldest(head))
+            last = min(int(end) // tier.step, head)
+            if index is None or head < 0 or first > last:
+                empty = np.empty(0)
+                return {'times': empty, 'min': empty, 'max': empty, 'avg': empty, 'step': tier.step}
+            rows = np.arange(first, last + 1) % tier.slots
+            if tier.index == 0:
+                values = self.arrays[0, 'value'][rows, index].astype(np.float64)
+                mins = maxs = avgs = values
+            else:
+                mins, maxs, avgs = (
+                    self.arrays[tier.index, field][rows, index].astype(np.float64) for field in tier.fields
+                )
+        times = np.arange(first, last + 1, dtype=np.float64) * tier.step
+        step = tier.step
+        if len(times) > max_points:
+            # Merge neighbouring buckets so the caller never gets more than it can draw
+            group = math.ceil(len(times) / max_points)
+            pad = -len(times) % group
+            columns = [np.pad(column, (0, pad), constant_values=np.nan).reshape(-1, group).T
+                       for column in (mins, maxs, avgs)]
+            mins, maxs, avgs = roll_up(*columns)
+            times = times[::group]
+            step *= group
+        return {'times': times, 'min': mins, 'max': maxs, 'avg': avgs, 'step': step}
+
+    def pick_tier(self, start, end, max_points):
+        """Coarsest tier that covers start and still yields max_points buckets, else the finest covering one"""
+        covering = [tier for tier in self.tiers
+                    if self.head(tier) < 0 or tier.oldest(self.head(tier)) * tier.step <= start]
+        if not covering:
+            return self.tiers[-1]
+        for tier in reversed(covering):
+            if (end - start) / tier.step >= max_points:
+                return tier
+        return covering[0]
+
+    def size_bytes(self):
+        """Bytes of the store file"""
+        return self.layout(self.capacity)[1] if self.capacity else 0
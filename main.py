@@ -4,22 +4,51 @@ DB Manager - Main Entry Point
 A modern, professional dashboard for database management, file organization, and service management
 """
 
-import ttkbootstrap as ttk
-from config.theme import get_theme_name
-from ui.app import DBManagerApp
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+from utils.profiling import profiler
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="DB Manager - Modern Dashboard")
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='print a per-phase startup timing breakdown'
+    )
+    return parser.parse_args()
 
 
 def main():
     """Main entry point for the application"""
+    args = parse_args()
+    if args.profile_startup:
+        profiler.enable(started=STARTED)
+
+    with profiler.phase('import ttkbootstrap'):
+        import ttkbootstrap as ttk
+        from config.theme import get_theme_name
+
+    with profiler.phase('import ui.app'):
+        from ui.app import DBManagerApp
+
     # Create the root window with the configured theme
-    root = ttk.Window(themename=get_theme_name())
+    with profiler.phase('create window'):
+        root = ttk.Window(themename=get_theme_name())
 
-    # Initialize the application
-    app = DBManagerApp(root)
+    # Initialize the application shell; heavy views load after first paint
+    with profiler.phase('build shell'):
+        app = DBManagerApp(root)
 
-    # Start the event loop
+    # Start the event loop; closing the window stops the scheduler before destroying it
     root.mainloop()
 
+    app.shutdown()
+
 
 if __name__ == "__main__":
     main()
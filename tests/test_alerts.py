@@ -0,0 +1,42 @@
+"""
+Alerts Engine Tests
+absent() rules around startup
+"""
+
+import time
+from config.settings import ALERTS, ALERT_RULES
+from core.alerts.engine import AlertEngine
+
+
+STALLED = [{'name': 'Metrics stalled', 'when': 'absent(system.cpu, 30s)', 'severity': 'critical'}]
+
+
+def started(specs):
+    """An engine whose clock was started and stopped, so tests drive the time"""
+    engine = AlertEngine(specs, ALERTS)
+    engine.start()
+    engine.stop()
+    return engine
+
+
+def test_default_rules_quiet_at_startup():
+    engine = started(ALERT_RULES)
+    engine.observe({}, time.time() + ALERTS['tick_s'])
+    assert engine.snapshot()['totals']['firing'] == 0
+
+
+def test_absent_fires_after_grace_period():
+    engine = started(STALLED)
+    now = time.time()
+    engine.observe({}, now + 10)
+    assert engine.snapshot()['totals']['firing'] == 0
+    engine.observe({}, now + 31)
+    assert engine.snapshot()['totals']['firing'] == 1
+
+
+def test_absent_resolves_when_metric_arrives():
+    engine = started(STALLED)
+    now = time.time()
+    engine.observe({}, now + 31)
+    engine.observe({'system.cpu': 5.0}, now + 32)
+    assert engine.snapshot()['totals']['firing'] == 0
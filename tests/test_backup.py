@@ -0,0 +1,52 @@
+"""
+Backup Tests
+SQLite backup and restore round trip
+"""
+
+import os
+import sqlite3
+from core.backup.dump import BackupJob
+from core.backup.restore import RestoreJob
+
+
+SCHEMA = [
+    "CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT NOT NULL)",
+    "CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER REFERENCES customers(id), total REAL)",
+    "CREATE INDEX orders_customer ON orders (customer_id)",
+    "CREATE VIEW big_orders AS SELECT * FROM orders WHERE total > 100",
+]
+
+
+def schema_of(path):
+    with sqlite3.connect(path) as connection:
+        return sorted(connection.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite\\_%' ESCAPE '\\'"
+        ))
+
+
+def test_sqlite_backup_restore_round_trip(tmp_path):
+    source = str(tmp_path / 'source.db')
+    with sqlite3.connect(source) as connection:
+        for sql in SCHEMA:
+            connection.execute(sql)
+        connection.executemany("INSERT INTO customers VALUES (?, ?)", [(index, f"c{index}") for index in range(50)])
+        connection.executemany("INSERT INTO orders VALUES (?, ?, ?)",
+                               [(index, index % 50, index * 1.5) for index in range(2500)])
+
+    root = str(tmp_path / 'backups')
+    backup = BackupJob({'name': 'source', 'backend': 'sqlite', 'database': source}, root,
+                       workers=2, chunk_rows=400)
+    backup.run()
+    assert backup.progress.phase == 'complete', backup.progress.error
+    assert [name for name in os.listdir(root) if 'snapshot' in name] == []
+
+    target = str(tmp_path / 'target.db')
+    restore = RestoreJob(backup.manifest.path, {'name': 'target', 'backend': 'sqlite', 'database': target},
+                         root, workers=2)
+    restore.run()
+    assert restore.progress.phase == 'complete', restore.progress.error
+
+    assert schema_of(target) == schema_of(source)
+    with sqlite3.connect(target) as connection:
+        assert connection.execute("SELECT count(*) FROM customers").fetchone()[0] == 50
+        assert connection.execute("SELECT count(*), sum(total) FROM orders").fetchone() == (2500, 1.5 * sum(range(2500)))
@@ -0,0 +1,50 @@
+"""
+Bulk Import Tests
+CSV loads into SQLite and the cached reads they make stale
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import IMPORTS, RESULT_CACHE
+from core.database.backends import SQLiteBackend
+from core.database.columnar import ColumnarResult
+from core.database.importer import BulkImporter
+from core.database.result_cache import ResultCache
+
+
+class Manager:
+    """Runs func(connection, backend) on one SQLite connection, like ConnectionManager.run_with_backend"""
+
+    def __init__(self, path):
+        self.backend = SQLiteBackend(path)
+        self.connection = self.backend.connect()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def run_with_backend(self, profile, func, *args):
+        return self.executor.submit(func, self.connection, self.backend, *args)
+
+
+def test_import_commits_invalidate_cached_reads(tmp_path):
+    path = tmp_path / 'orders.csv'
+    path.write_text('id,name\n' + ''.join(f'{index},name {index}\n' for index in range(1000)))
+    manager = Manager(str(tmp_path / 'data.db'))
+    cache = ResultCache(dict(RESULT_CACHE, directory=str(tmp_path / 'cache'), codec='zlib'))
+    importer = BulkImporter(manager, dict(IMPORTS, workers=1, rejects_directory=str(tmp_path / 'rejects')))
+    commits = []
+    importer.add_commit_listener(lambda profile, table: commits.append(cache.invalidate(profile, {table})))
+
+    sql = 'SELECT count(*) FROM orders'
+    key = cache.key('local', sql)
+    result = ColumnarResult(['count'])
+    result.append([(0,)])
+    assert cache.put(key, 'local', sql, result, 8, 100.0, cache.epoch())
+    try:
+        preview = importer.inspect(str(path)).result()
+        progress = importer.start('local', 'orders', preview).future.result()
+    finally:
+        importer.shutdown()
+        cache.close()
+
+    assert progress['phase'] == 'complete' and progress['committed'] == 1000
+    assert manager.connection.execute(sql).fetchone()[0] == 1000
+    assert commits == [1]
+    assert cache.get(key) is None
@@ -0,0 +1,55 @@
+"""
+Organizer Tests
+Plans and runs against a temporary folder
+"""
+
+import zipfile
+import pytest
+from config.settings import ORGANIZER
+from core.files.organizer import RuleSet, RuleError, Journal, OrganizeJob, build_plan
+
+
+ARCHIVE_RULES = [{'name': 'Old logs', 'match': {'ext': ['log', 'zip']}, 'action': 'archive', 'target': 'Archive/old.zip'}]
+
+
+def organize(root, journal_dir, specs):
+    """Plan and run rules recursively over root; returns the plan"""
+    plan = build_plan(str(root), RuleSet(specs), recursive=True)
+    job = OrganizeJob(Journal.create(str(journal_dir), plan), ORGANIZER)
+    job.run()
+    assert job.progress.phase == 'complete'
+    return plan
+
+
+def test_archive_rerun_keeps_archive(tmp_path):
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'a.log').write_text('first')
+    organize(root, tmp_path / 'journal', ARCHIVE_RULES)
+
+    (root / 'b.log').write_text('second')
+    plan = organize(root, tmp_path / 'journal', ARCHIVE_RULES)
+
+    archive = root / 'Archive' / 'old.zip'
+    assert [operation[1] for operation in plan.operations] == [str(root / 'b.log')]
+    with zipfile.ZipFile(archive) as opened:
+        assert sorted(opened.namelist()) == ['a.log', 'b.log']
+
+
+def test_templated_archive_is_not_archived_into_itself(tmp_path):
+    root = tmp_path / 'root'
+    (root / 'logs').mkdir(parents=True)
+    (root / 'logs' / 'all.zip').write_bytes(b'')
+    (root / 'logs' / 'c.log').write_text('third')
+    specs = [{'name': 'By type', 'match': {'ext': ['log', 'zip']}, 'action': 'archive', 'target': '{ext}s/all.zip'}]
+
+    plan = build_plan(str(root), RuleSet(specs), recursive=True)
+
+    assert plan.operations == []
+
+
+def test_rename_target_stays_in_folder():
+    for target in ('../{name}', 'sub/{name}', '..'):
+        with pytest.raises(RuleError):
+            RuleSet([{'name': 'Bad', 'match': {'ext': ['txt']}, 'action': 'rename', 'target': target}])
+
@@ -0,0 +1,22 @@
+"""
+Query Plan Tests
+Statement fingerprints
+"""
+
+from core.database.plans import fingerprint, normalize_sql
+
+
+def test_in_lists_share_fingerprint():
+    single = fingerprint("SELECT * FROM orders WHERE id IN (7)")
+    assert fingerprint("SELECT * FROM orders WHERE id IN (1,2,3)") == single
+    assert fingerprint("select * from orders where id in (%s, %s)") == single
+
+
+def test_values_rows_share_fingerprint():
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (1, 'x')") == normalize_sql("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y')")
+
+
+def test_function_arguments_keep_their_shape():
+    assert fingerprint("SELECT substr(name, 1, 2) FROM t") != fingerprint("SELECT substr(name, 1) FROM t")
+    assert normalize_sql("SELECT lower(?) FROM t") != normalize_sql("SELECT coalesce(?, ?) FROM t")
+    assert normalize_sql("SELECT f(?, ?), (?, ?) FROM t") == "select f(?, ?), (?, ?) from t"
@@ -0,0 +1,82 @@
+"""
+Connection Pool Tests
+Size limits while maintenance health-checks idle connections
+"""
+
+import asyncio
+import threading
+import pytest
+from core.database.pool import ConnectionPool, PoolTimeout
+
+
+class SlowPingBackend:
+    """Counts open connections; ping blocks until released"""
+
+    def __init__(self):
+        self.open = 0
+        self.peak = 0
+        self.pinging = threading.Event()
+        self.release = threading.Event()
+
+    def connect(self):
+        self.open += 1
+        self.peak = max(self.peak, self.open)
+        return object()
+
+    def close(self, raw):
+        self.open -= 1
+
+    def ping(self, raw):
+        self.pinging.set()
+        self.release.wait(5)
+
+    def describe(self):
+        return 'test'
+
+
+def test_acquire_waits_while_idle_connections_are_checked():
+    async def scenario():
+        backend = SlowPingBackend()
+        pool = ConnectionPool(backend, min_size=2, max_size=2, acquire_timeout=0.2, health_interval=0.01)
+        await pool.start()
+        try:
+            while not backend.pinging.is_set():
+                await asyncio.sleep(0.005)
+            assert pool.size == 2
+            with pytest.raises(PoolTimeout):
+                await pool.acquire()
+            backend.release.set()
+            connection = await pool.acquire()
+            await pool.release(connection)
+        finally:
+            backend.release.set()
+            await pool.close()
+        return backend.peak
+
+    assert asyncio.run(scenario()) == 2
+
+
+class FailingBackend(SlowPingBackend):
+    """Opens one connection; later connects fail and pings report it broken"""
+
+    def connect(self):
+        if self.peak:
+            raise ConnectionError("server went away")
+        return super().connect()
+
+    def ping(self, raw):
+        raise ConnectionError("server went away")
+
+
+def test_failed_refill_keeps_the_statement_error():
+    async def scenario():
+        pool = ConnectionPool(FailingBackend(), min_size=1, max_size=2)
+        await pool.start()
+        try:
+            with pytest.raises(ValueError, match="bad statement"):
+                async with pool.connection():
+                    raise ValueError("bad statement")
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,38 @@
+"""
+Result Cache Tests
+Cache hits, and the writes that make them stale
+"""
+
+from config.settings import RESULT_CACHE
+from core.database.columnar import ColumnarResult
+from core.database.result_cache import ResultCache
+
+
+def cached(cache, profile, sql):
+    key = cache.key(profile, sql)
+    result = ColumnarResult(['id', 'name'])
+    result.append([(index, f"name {index}") for index in range(100)])
+    assert cache.put(key, profile, sql, result, 1600, 100.0, cache.epoch())
+    return key
+
+
+def test_hit_until_a_write_invalidates_it(tmp_path):
+    cache = ResultCache(dict(RESULT_CACHE, directory=str(tmp_path), codec='zlib'))
+    try:
+        key = cached(cache, 'local', 'SELECT id, name FROM orders WHERE id < 100')
+        assert cache.key('local', 'select id,name  from orders where id < 100 -- again') == key
+        assert cache.key('local', 'SELECT id, name FROM orders WHERE id < 10') != key
+
+        result, meta = cache.get(key)
+        assert result.row_count == 100 and result.rows(0, 2) == [(0, 'name 0'), (1, 'name 1')]
+        assert cache.hits == 1 and cache.bytes_saved == 1600
+
+        cache.invalidate('remote', {'orders'})
+        cache.invalidate('local', {'customers'})
+        assert cache.get(key) is not None
+
+        written = cache.invalidate('local', {'orders'})
+        assert written == 1
+        assert cache.get(key) is None
+    finally:
+        cache.close()
@@ -0,0 +1,39 @@
+"""
+Frame Scheduler Tests
+Flushing with a stand-in for the Tk root
+"""
+
+from ui.scheduler import FrameScheduler
+
+
+class Root:
+    """Records after() calls instead of running a Tk event loop"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, func):
+        self.scheduled.append(func)
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        pass
+
+
+def fail():
+    raise ValueError("broken view")
+
+
+def test_failing_update_keeps_the_tick_running():
+    root = Root()
+    scheduler = FrameScheduler(root, frame_ms=1000)
+    scheduler.start()
+    applied = []
+    scheduler.submit('broken', fail)
+    scheduler.submit('label', applied.append, 'text')
+
+    root.scheduled[-1]()
+
+    assert applied == ['text']
+    assert scheduler.stats()['failed'] == 1
+    assert len(root.scheduled) == 2
@@ -0,0 +1,37 @@
+"""
+System Metrics Tests
+Sampler thread with a stand-in reader
+"""
+
+import threading
+from core.system_metrics import SystemMetricsSampler
+
+
+class Reader:
+    def sample(self):
+        return {'cpu': 1.0}
+
+    def close(self):
+        pass
+
+
+def test_failing_listener_does_not_stop_sampling():
+    received = []
+    enough = threading.Event()
+
+    def broken(sample):
+        raise RuntimeError("listener bug")
+
+    def record(sample):
+        received.append(sample)
+        if len(received) >= 3:
+            enough.set()
+
+    sampler = SystemMetricsSampler(interval=0.01, reader_factory=Reader)
+    sampler.add_listener(broken)
+    sampler.add_listener(record)
+    sampler.start()
+    try:
+        assert enough.wait(2)
+    finally:
+        sampler.stop()
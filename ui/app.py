@@ -3,13 +3,25 @@ Main Application Class
 Orchestrates all components and manages the application window
 """
 
+import time
+from functools import cached_property
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from config.theme import get_theme_name, get_size
-from config.settings import WINDOW_TITLE, WINDOW_WIDTH, WINDOW_HEIGHT
+from config.settings import (
+    WINDOW_TITLE, WINDOW_WIDTH, WINDOW_HEIGHT, VIEW_CACHE, STARTUP, METRICS_SAMPLER,
+    SCHEDULER, RECENT_ACTIVITIES, DATABASE_PROFILES, DATABASE_POOL, BACKUPS,
+    FILE_EXPLORER, SEARCH_INDEX, DISK_USAGE, LOG_SEARCH, SERVICE_MANAGER, SERVICES,
+    TIMESERIES, ALERTS, ALERT_RULES, QUERY_PLANS, RESULT_CACHE, IMPORTS
+)
+from core.system_metrics import SERIES, SystemMetricsSampler
+from core.activity_store import ActivityStore
 from ui.components.sidebar import Sidebar
 from ui.components.header import Header
-from ui.components.dashboard import DashboardContent
+from ui.view_registry import ViewRegistry
+from ui.scheduler import FrameScheduler
+from utils.profiling import profiler
+from utils.formatting import format_bytes, format_duration, format_rate
 
 
 class DBManagerApp:
@@ -22,12 +34,174 @@ class DBManagerApp:
 
         # Set minimum window size for better UX
         self.root.minsize(1200, 700)
+        self.root.protocol('WM_DELETE_WINDOW', self.close)
 
         # Current active view
         self.active_view = "Dashboard"
 
+        # Batched widget updates from any thread
+        self.scheduler = FrameScheduler(
+            self.root,
+            frame_ms=SCHEDULER['frame_ms'],
+            idle_ms=SCHEDULER['idle_ms']
+        )
+
+        # Activity history shared by the dashboard and the activity feed
+        self.activity_store = ActivityStore()
+        now = time.time()
+        for activity in reversed(RECENT_ACTIVITIES):
+            self.activity_store.append(
+                activity['text'],
+                activity['status'],
+                now - activity['seconds_ago']
+            )
+
+        # Live system metrics, sampled off the Tk thread
+        self.metrics_sampler = SystemMetricsSampler(
+            interval=METRICS_SAMPLER['interval_ms'] / 1000,
+            history=METRICS_SAMPLER['history']
+        )
+        self.metrics_sampler.add_listener(
+            lambda sample: self.scheduler.submit('system_metrics', self.apply_metrics, sample)
+        )
+
+        self.metrics_sampler.add_listener(self.record_metrics)
+
+        # Running disk usage analysis shown on the Storage Used card
+        self.usage_progress = None
         self.setup_ui()
 
+    # Engines, each built on first use; the ones other threads feed are built in load_initial_view
+
+    def built(self, name):
+        """An engine if it has been built, without building it"""
+        return self.__dict__.get(name)
+
+    @cached_property
+    def timeseries(self):
+        """Metric history, written on the sampler thread"""
+        from core.timeseries import TimeSeriesStore
+
+        return TimeSeriesStore(TIMESERIES)
+
+    @cached_property
+    def connections(self):
+        """Database connection pools, run on an asyncio loop in a worker thread"""
+        from core.database.manager import ConnectionManager
+
+        connections = ConnectionManager(DATABASE_PROFILES, DATABASE_POOL)
+        connections.add_listener(
+            lambda metrics: self.scheduler.submit('db_metrics', self.apply_db_metrics, metrics)
+        )
+        return connections
+
+    @cached_property
+    def plan_history(self):
+        """Query Builder runs and plans, kept across visits to the view"""
+        from core.database.plan_history import PlanHistory
+
+        return PlanHistory(QUERY_PLANS)
+
+    @cached_property
+    def result_cache(self):
+        """Repeated reads answered without the database; writes run through the app invalidate it"""
+        from core.database.result_cache import ResultCache
+
+        return ResultCache(RESULT_CACHE)
+
+    @cached_property
+    def imports(self):
+        """Bulk imports: parsing process pool started on the first import and reused"""
+        from core.database.importer import BulkImporter
+
+        # Built here on the Tk thread, so imports drop cached reads even before Query Builder is opened
+        result_cache = self.result_cache
+        imports = BulkImporter(self.connections, IMPORTS)
+        imports.add_listener(
+            lambda progress: self.scheduler.submit('import', self.apply_import_progress, progress)
+        )
+        # Committed rows make cached reads of the table stale (import thread)
+        imports.add_commit_listener(
+            lambda profile, table: result_cache.invalidate(profile, {table, table.rsplit('.', 1)[-1]})
+        )
+        return imports
+
+    @cached_property
+    def backups(self):
+        """Backup jobs, coordinated off the Tk thread"""
+        from core.backup.service import BackupService
+
+        backups = BackupService(DATABASE_PROFILES, BACKUPS)
+        backups.add_listener(
+            lambda progress: self.scheduler.submit(
+                ('job_progress', progress['kind']), self.apply_job_progress, progress
+            )
+        )
+        return backups
+
+    @cached_property
+    def files(self):
+        """Directory listings and their cache, shared by file views"""
+        from core.files.listing import DirectoryIndex
+
+        return DirectoryIndex(FILE_EXPLORER)
+
+    @cached_property
+    def search_index(self):
+        """Persistent file search index, built and kept current off the Tk thread"""
+        from core.files.indexer import FileIndexer
+
+        search_index = FileIndexer(SEARCH_INDEX)
+        search_index.add_listener(
+            lambda progress: self.scheduler.submit('search_index', self.apply_index_progress, progress)
+        )
+        return search_index
+
+    @cached_property
+    def usage(self):
+        """Disk usage trees, kept across Cleanup Utilities visits for drill-down"""
+        from core.files.disk_usage import DiskUsageAnalyzer
+
+        usage = DiskUsageAnalyzer(DISK_USAGE)
+        usage.add_listener(
+            lambda progress: self.scheduler.submit('disk_usage', self.apply_usage_progress, progress)
+        )
+        return usage
+
+    @cached_property
+    def log_search(self):
+        """Log search process pool, started on the first search and reused"""
+        from core.logs.search import LogSearcher
+
+        log_search = LogSearcher(LOG_SEARCH)
+        log_search.add_listener(
+            lambda progress: self.scheduler.submit('log_search', self.apply_log_search_progress, progress)
+        )
+        return log_search
+
+    @cached_property
+    def services(self):
+        """Service states, polled on their own asyncio loop"""
+        from core.services.manager import ServiceManager
+
+        services = ServiceManager(SERVICES, SERVICE_MANAGER)
+        services.add_listener(
+            lambda snapshot: self.scheduler.submit('services', self.apply_services, snapshot)
+        )
+        services.add_listener(self.observe_services)
+        return services
+
+    @cached_property
+    def alerts(self):
+        """Alert rules, evaluated on the threads that deliver metrics"""
+        from core.alerts.engine import AlertEngine
+
+        alerts = AlertEngine(ALERT_RULES, ALERTS, on_event=self.log_activity)
+        alerts.add_listener(
+            lambda snapshot: self.scheduler.submit('alerts', self.apply_alerts, snapshot)
+        )
+        return alerts
+
     def setup_ui(self):
         """Setup the main application UI"""
         # Main container
@@ -35,132 +209,463 @@ class DBManagerApp:
         main_container.pack(fill=BOTH, expand=YES)
 
         # Sidebar
-        self.sidebar = Sidebar(main_container, on_nav_click=self.handle_navigation)
-        self.sidebar.pack(side=LEFT, fill=Y)
+        with profiler.phase('sidebar'):
+            self.sidebar = Sidebar(main_container, on_nav_click=self.handle_navigation)
+            self.sidebar.pack(side=LEFT, fill=Y)
 
         # Right panel (header + content)
         right_panel = ttk.Frame(main_container)
         right_panel.pack(side=LEFT, fill=BOTH, expand=YES)
 
         # Header
-        self.header = Header(right_panel)
-        self.header.pack(fill=X)
+        with profiler.phase('header'):
+            self.header = Header(
+                right_panel,
+                on_search=self.open_search,
+                on_alerts=lambda: self.handle_navigation("Alerts")
+            )
+            self.header.pack(fill=X)
 
         # Content area container
         self.content_container = ttk.Frame(right_panel)
         self.content_container.pack(fill=BOTH, expand=YES, padx=20, pady=20)
 
-        # Load initial view
-        self.load_dashboard()
+        # View cache - built views are hidden and shown, not rebuilt
+        self.views = ViewRegistry(
+            self.content_container,
+            max_views=VIEW_CACHE['max_views'],
+            max_widgets=VIEW_CACHE['max_widgets']
+        )
+        self.register_views()
+
+        # Paint the shell first; the initial view loads once the window is mapped
+        self.first_paint_done = False
+        self.root.bind('<Map>', self.on_first_map, add='+')
+
+    def on_first_map(self, event):
+        """Defer the initial view until the shell has been painted"""
+        if event.widget is not self.root or self.first_paint_done:
+            return
+        self.first_paint_done = True
+        self.root.after_idle(self.load_initial_view)
+
+    def load_initial_view(self):
+        """Load the initial view after the first paint"""
+        profiler.mark('first_paint')
+        with profiler.phase(f'view: {self.active_view}'):
+            self.views.show(self.active_view)
+
+        self.scheduler.start()
+        # The sampler thread feeds these, so they are built here on the Tk thread first
+        for name in ('timeseries', 'alerts'):
+            getattr(self, name)
+        if METRICS_SAMPLER['enabled']:
+            self.metrics_sampler.start()
+        self.connections.start()
+        if SEARCH_INDEX['enabled']:
+            self.search_index.start()
+        if SERVICE_MANAGER['enabled']:
+            self.services.start()
+        if ALERTS['enabled']:
+            self.alerts.start()
+
+    def apply_metrics(self, sample):
+        """Apply the newest metrics sample (runs on the scheduler's frame tick)"""
+        dashboard = self.views.get("Dashboard")
+        if dashboard is not None and dashboard.winfo_ismapped():
+            dashboard.apply_metrics(sample)
+
+        monitoring = self.views.get("Monitoring")
+        if monitoring is not None:
+            monitoring.apply_metrics(sample)
+
+    def record_metrics(self, sample):
+        """Store a metrics sample and check it against the alert rules (sampler thread)"""
+        values = {f"system.{key}": sample[key] for key in SERIES}
+        self.timeseries.record(values, sample['time'])
+        self.alerts.observe(values, sample['time'])
+
+    def observe_services(self, snapshot):
+        """Feed service states to the alert rules as service.<name>.up (services loop thread)"""
+        from core.alerts.rules import metric_name
+
+        self.alerts.observe({
+            f"service.{metric_name(service['name'])}.up": float(service['state'] == 'running')
+            for service in snapshot['services'] if service['state'] != 'unknown'
+        })
+
+    def apply_alerts(self, snapshot):
+        """Show the live alert count in the header and the alerts in the Alerts view"""
+        totals = snapshot['totals']
+        self.header.set_alerts(totals['firing'], totals['critical'])
+
+        alerts = self.views.get("Alerts")
+        if alerts is not None:
+            alerts.apply_snapshot(snapshot)
+
+    def apply_db_metrics(self, metrics):
+        """Apply connection pool metrics to the dashboard and Postgres Manager"""
+        totals = metrics['totals']
+        dashboard = self.views.get("Dashboard")
+        if dashboard is not None:
+            dashboard.update_stat(
+                'connections',
+                str(totals['connections']),
+                f"{totals['in_use']} in use · p99 wait {totals['wait_p99_ms']:.0f} ms"
+            )
+
+        postgres_manager = self.views.get("Postgres Manager")
+        if postgres_manager is not None:
+            postgres_manager.apply_metrics(metrics)
+
+    def apply_services(self, snapshot):
+        """Show aggregated service states on the dashboard and in the Service Manager"""
+        totals = snapshot['totals']
+        dashboard = self.views.get("Dashboard")
+        if dashboard is not None:
+            down = totals['stopped'] + totals['failed']
+            if down:
+                subtitle = f"{down} service{'s' if down > 1 else ''} stopped"
+            elif totals['degraded']:
+                subtitle = f"{totals['degraded']} degraded"
+            elif totals['unknown']:
+                subtitle = f"{totals['unknown']} not checked"
+            else:
+                subtitle = "All services running"
+            if totals['flapping']:
+                subtitle += f" · {totals['flapping']} flapping"
+            dashboard.update_stat('services', f"{totals['running']}/{totals['total']}", subtitle)
+
+        service_manager = self.views.get("Service Manager")
+        if service_manager is not None:
+            service_manager.apply_snapshot(snapshot)
+
+    def apply_job_progress(self, progress):
+        """Show backup/restore progress on the dashboard and the Backups view"""
+        kind = progress['kind']
+        dashboard = self.views.get("Dashboard")
+        if dashboard is not None:
+            if progress['finished'] is None:
+                value = f"{progress['fraction']:.0%} · {format_rate(progress['bytes_per_second'])}"
+                if progress['eta'] is not None:
+                    value += f" · ETA {format_duration(progress['eta'])}"
+                dashboard.show_job(kind, f"{kind.capitalize()}: {progress['profile']}", value, round(progress['fraction'] * 100))
+            else:
+                dashboard.hide_job(kind)
+
+        backups = self.views.get("Backups")
+        if backups is not None:
+            backups.apply_progress(progress)
+
+        if progress['finished'] is not None:
+            status = {'complete': 'success', 'cancelled': 'warning'}.get(progress['phase'], 'danger')
+            text = f"{kind.capitalize()} of {progress['profile']} {progress['phase']}"
+            if progress['phase'] == 'complete':
+                text += f" in {format_duration(progress['elapsed'])}"
+            self.log_activity(text, status)
+
+    def apply_usage_progress(self, progress):
+        """Show disk usage progress on the Storage Used card and in Cleanup Utilities"""
+        self.usage_progress = progress if progress['finished'] is None else None
+        self.refresh_storage()
+        cleanup = self.views.get("Cleanup Utilities")
+        if cleanup is not None:
+            cleanup.apply_usage_progress(progress)
+
+    def refresh_storage(self):
+        """Show the used space of the storage filesystem, or a running analysis"""
+        dashboard = self.views.get("Dashboard")
+        if dashboard is None:
+            return
+        from core.files.disk_usage import DiskUsageAnalyzer
+
+        try:
+            used, total = DiskUsageAnalyzer.filesystem_usage(DISK_USAGE['storage_path'])
+        except OSError:
+            return
+        subtitle = f"{used / total:.0%} of {format_bytes(total)} capacity" if total else ""
+        progress = self.usage_progress
+        if progress is not None:
+            subtitle = f"Analyzing {progress['root']}: {format_bytes(progress['disk'])} so far"
+        dashboard.update_stat('storage', format_bytes(used), subtitle)
+
+    def apply_index_progress(self, progress):
+        """Show the state of the file search index in the Search Files view"""
+        search_files = self.views.get("Search Files")
+        if search_files is not None:
+            search_files.apply_progress(progress)
+        if progress['phase'] == 'failed':
+            self.log_activity(f"File search index failed: {progress['error']}", 'danger')
+
+    def apply_log_search_progress(self, progress):
+        """Stream log search hits into the Logs Viewer"""
+        logs_viewer = self.views.get("Logs Viewer")
+        if logs_viewer is not None:
+            logs_viewer.apply_search_progress(progress)
+
+    def apply_import_progress(self, progress):
+        """Show bulk import progress in the Postgres Manager and Tables & Schemas"""
+        for view_name in ("Postgres Manager", "Tables & Schemas"):
+            view = self.views.get(view_name)
+            if view is not None:
+                view.apply_import_progress(progress)
+
+        if progress['finished'] is not None:
+            status = {'complete': 'success', 'cancelled': 'warning'}.get(progress['phase'], 'danger')
+            text = (f"Import of {progress['committed']:,} rows into {progress['table']} "
+                    f"({progress['profile']}) {progress['phase']}")
+            if progress['phase'] == 'complete':
+                text += f" in {format_duration(progress['elapsed'])}"
+            if progress['rejected']:
+                text += f", {progress['rejected']:,} rejected"
+            self.log_activity(text, status)
+
+    def open_search(self):
+        """Show Search Files with the cursor in the search box"""
+        self.handle_navigation("Search Files")
+        search_files = self.views.get("Search Files")
+        if search_files is not None:
+            search_files.focus_query()
+
+    def open_folder(self, path):
+        """Show a folder in the File Explorer"""
+        self.handle_navigation("File Explorer")
+        file_explorer = self.views.get("File Explorer")
+        if file_explorer is not None:
+            file_explorer.open(path)
+
+    def handle_quick_action(self, label):
+        """Run a dashboard quick action"""
+        if label == 'Backup Database':
+            self.handle_navigation("Backups")
+            backups = self.views.get("Backups")
+            if backups is not None and not self.backups.running:
+                backups.start_backup()
+        elif label == 'View Logs':
+            self.handle_navigation("Logs Viewer")
+
+    def log_activity(self, text, status='info'):
+        """Record an activity event (safe to call from any thread)"""
+        self.activity_store.append(text, status)
+        self.scheduler.submit('recent_activity', self.refresh_activity)
+
+    def refresh_activity(self):
+        """Redraw the recent activity panel (runs on the scheduler's frame tick)"""
+        dashboard = self.views.get("Dashboard")
+        if dashboard is not None:
+            dashboard.refresh_activity()
+
+    def close(self):
+        """Stop the frame tick while the window still exists, then destroy it"""
+        self.scheduler.stop()
+        self.root.destroy()
+
+    def shutdown(self):
+        """Stop the background workers that were built (after the window is gone)"""
+        self.metrics_sampler.stop()
+        for name, stop in (
+            ('alerts', 'stop'), ('timeseries', 'close'), ('backups', 'shutdown'), ('files', 'shutdown'),
+            ('search_index', 'shutdown'), ('usage', 'shutdown'), ('log_search', 'shutdown'),
+            ('imports', 'shutdown'), ('services', 'shutdown'), ('connections', 'shutdown'),
+            ('plan_history', 'close'), ('result_cache', 'close'),
+        ):
+            engine = self.built(name)
+            if engine is not None:
+                getattr(engine, stop)()
+
+    def register_views(self):
+        """Register lazy view factories with the view cache"""
+        factories = {
+            "Dashboard": self.load_dashboard,
+            "Analytics": self.load_analytics,
+            "Settings": self.load_settings,
+            "Postgres Manager": self.load_postgres_manager,
+            "Query Builder": self.load_query_builder,
+            "Tables & Schemas": self.load_tables_schemas,
+            "Backups": self.load_backups,
+            "File Explorer": self.load_file_explorer,
+            "Organization Tools": self.load_organization_tools,
+            "Search Files": self.load_search_files,
+            "Cleanup Utilities": self.load_cleanup_utilities,
+            "Service Manager": self.load_service_manager,
+            "Monitoring": self.load_monitoring,
+            "Logs Viewer": self.load_logs_viewer,
+            "Alerts": self.load_alerts,
+        }
+        for view_name, factory in factories.items():
+            self.views.register(
+                view_name,
+                factory,
+                keep_alive=view_name in VIEW_CACHE['keep_alive']
+            )
 
     def handle_navigation(self, view_name):
         """Handle navigation between different views"""
         self.active_view = view_name
         print(f"Navigating to: {view_name}")
 
-        # Clear current content
-        for widget in self.content_container.winfo_children():
-            widget.destroy()
-
-        # Load appropriate view based on navigation
-        if view_name == "Dashboard":
-            self.load_dashboard()
-        elif view_name == "Analytics":
-            self.load_analytics()
-        elif view_name == "Settings":
-            self.load_settings()
-        elif view_name == "Postgres Manager":
-            self.load_postgres_manager()
-        elif view_name == "Query Builder":
-            self.load_query_builder()
-        elif view_name == "Tables & Schemas":
-            self.load_tables_schemas()
-        elif view_name == "Backups":
-            self.load_backups()
-        elif view_name == "File Explorer":
-            self.load_file_explorer()
-        elif view_name == "Organization Tools":
-            self.load_organization_tools()
-        elif view_name == "Search Files":
-            self.load_search_files()
-        elif view_name == "Cleanup Utilities":
-            self.load_cleanup_utilities()
-        elif view_name == "Service Manager":
-            self.load_service_manager()
-        elif view_name == "Monitoring":
-            self.load_monitoring()
-        elif view_name == "Logs Viewer":
-            self.load_logs_viewer()
-        elif view_name == "Alerts":
-            self.load_alerts()
-        else:
-            self.load_placeholder(view_name)
+        # Show the cached view, building it on first visit
+        self.views.show(view_name, fallback=self.load_placeholder)
+
+    def on_dashboard_ready(self):
+        """Called once every deferred dashboard section has been built"""
+        self.views.refresh_size("Dashboard")
+        self.refresh_storage()
+        profiler.mark('dashboard_ready')
+        profiler.report(budget_ms=STARTUP['first_paint_budget_ms'])
 
     def load_dashboard(self):
         """Load the dashboard view"""
-        dashboard = DashboardContent(self.content_container)
-        dashboard.pack(fill=BOTH, expand=YES)
+        from ui.components.dashboard import DashboardContent
+
+        return DashboardContent(
+            self.content_container,
+            self.activity_store,
+            deferred=True,
+            on_ready=self.on_dashboard_ready,
+            on_action=self.handle_quick_action
+        )
 
     def load_analytics(self):
         """Load analytics view"""
-        self.load_placeholder("Analytics")
+        from ui.components.analytics import AnalyticsView
+
+        return AnalyticsView(self.content_container, self.timeseries)
 
     def load_settings(self):
         """Load settings view"""
-        self.load_placeholder("Settings")
+        return self.load_placeholder("Settings")
 
     def load_postgres_manager(self):
         """Load Postgres Manager view"""
-        self.load_placeholder("Postgres Manager")
+        from ui.components.postgres_manager import PostgresManagerView
+
+        return PostgresManagerView(
+            self.content_container,
+            self.connections,
+            self.scheduler,
+            self.imports,
+            on_activity=self.log_activity
+        )
 
     def load_query_builder(self):
         """Load Query Builder view"""
-        self.load_placeholder("Query Builder")
+        from ui.components.query_builder import QueryBuilderView
+
+        return QueryBuilderView(
+            self.content_container,
+            self.connections,
+            self.scheduler,
+            self.plan_history,
+            self.result_cache,
+            on_activity=self.log_activity
+        )
 
     def load_tables_schemas(self):
         """Load Tables & Schemas view"""
-        self.load_placeholder("Tables & Schemas")
+        from ui.components.tables_schemas import TablesSchemasView
+
+        return TablesSchemasView(
+            self.content_container,
+            self.connections,
+            self.scheduler,
+            self.imports,
+            on_activity=self.log_activity
+        )
 
     def load_backups(self):
         """Load Backups view"""
-        self.load_placeholder("Backups")
+        from ui.components.backups import BackupsView
+
+        return BackupsView(
+            self.content_container,
+            self.backups,
+            self.scheduler,
+            on_activity=self.log_activity
+        )
 
     def load_file_explorer(self):
         """Load File Explorer view"""
-        self.load_placeholder("File Explorer")
+        from ui.components.file_explorer import FileExplorerView
+
+        return FileExplorerView(
+            self.content_container,
+            self.files,
+            self.scheduler,
+            on_activity=self.log_activity
+        )
 
     def load_organization_tools(self):
         """Load Organization Tools view"""
-        self.load_placeholder("Organization Tools")
+        from ui.components.organization_tools import OrganizationToolsView
+
+        return OrganizationToolsView(
+            self.content_container,
+            self.scheduler,
+            on_activity=self.log_activity
+        )
 
     def load_search_files(self):
         """Load Search Files view"""
-        self.load_placeholder("Search Files")
+        from ui.components.search_files import SearchFilesView
+
+        return SearchFilesView(
+            self.content_container,
+            self.search_index,
+            self.scheduler,
+            on_activity=self.log_activity,
+            on_open=self.open_folder
+        )
 
     def load_cleanup_utilities(self):
         """Load Cleanup Utilities view"""
-        self.load_placeholder("Cleanup Utilities")
+        from ui.components.cleanup_utilities import CleanupUtilitiesView
+
+        return CleanupUtilitiesView(
+            self.content_container,
+            self.usage,
+            self.scheduler,
+            on_activity=self.log_activity,
+            on_open=self.open_folder
+        )
 
     def load_service_manager(self):
         """Load Service Manager view"""
-        self.load_placeholder("Service Manager")
+        from ui.components.service_manager import ServiceManagerView
+
+        return ServiceManagerView(
+            self.content_container,
+            self.services,
+            self.scheduler,
+            on_activity=self.log_activity
+        )
 
     def load_monitoring(self):
         """Load Monitoring view"""
-        self.load_placeholder("Monitoring")
+        from ui.components.monitoring import MonitoringView
+
+        return MonitoringView(self.content_container, self.timeseries)
 
     def load_logs_viewer(self):
         """Load Logs Viewer view"""
-        self.load_placeholder("Logs Viewer")
+        from ui.components.logs_viewer import LogsViewerView
+
+        return LogsViewerView(
+            self.content_container,
+            self.log_search,
+            self.scheduler,
+            on_activity=self.log_activity
+        )
 
     def load_alerts(self):
         """Load Alerts view"""
-        self.load_placeholder("Alerts")
+        from ui.components.alerts import AlertsView
+
+        return AlertsView(self.content_container, self.alerts)
 
     def load_placeholder(self, view_name):
         """Load a placeholder view for未实现的功能"""
         placeholder_frame = ttk.Frame(self.content_container)
-        placeholder_frame.pack(fill=BOTH, expand=YES)
 
         # Center the content
         center_frame = ttk.Frame(placeholder_frame)
@@ -210,3 +715,5 @@ class DBManagerApp:
             width=20
         )
         back_btn.pack(pady=20)
+
+        return placeholder_frame
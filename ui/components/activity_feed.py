@@ -0,0 +1,76 @@
+"""
+Activity Feed Component
+Full activity history window backed by the activity store and a virtualized list
+"""
+
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from config.settings import ACTIVITY_FEED
+from ui.widgets.activity_item import ActivityItem
+from ui.widgets.virtual_list import VirtualList
+from utils.formatting import format_time_ago
+
+
+def create_activity_row(parent):
+    """Create an empty pooled activity row"""
+    return ActivityItem(parent, text="", time="", status='info', padding=(0, get_spacing('xs')))
+
+
+def update_activity_row(row, record):
+    """Bind a pooled activity row to an activity record"""
+    row.update_data(record.text, format_time_ago(time.time() - record.timestamp), record.status)
+
+
+class ActivityFeedWindow(ttk.Toplevel):
+    """Window listing every recorded activity, newest first"""
+
+    def __init__(self, parent, store, **kwargs):
+        super().__init__(parent, title="Activity Feed", **kwargs)
+        self.geometry(ACTIVITY_FEED['window_size'])
+
+        self.store = store
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup feed UI"""
+        container = ttk.Frame(self, padding=get_spacing('lg'))
+        container.pack(fill=BOTH, expand=YES)
+
+        # Title row with event count
+        header = ttk.Frame(container)
+        header.pack(fill=X, pady=(0, get_spacing('md')))
+
+        title_label = ttk.Label(
+            header,
+            text=f"{get_icon('recent')} Activity Feed",
+            font=get_font('heading_medium'),
+        )
+        title_label.pack(side=LEFT)
+
+        self.count_label = ttk.Label(
+            header,
+            text="",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.count_label.pack(side=RIGHT)
+
+        # Virtualized list of events
+        self.list = VirtualList(
+            container,
+            source=self.store.newest_first(),
+            row_factory=create_activity_row,
+            row_update=update_activity_row,
+            row_height=ACTIVITY_FEED['row_height']
+        )
+        self.list.pack(fill=BOTH, expand=YES)
+
+        self.refresh()
+
+    def refresh(self):
+        """Redraw visible rows after new events were appended"""
+        self.count_label.configure(text=f"{len(self.store):,} events")
+        self.list.refresh()
@@ -0,0 +1,138 @@
+"""
+Alerts Component
+Firing, pending and recently resolved alerts, and the rules behind them
+"""
+
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from ui.widgets.result_grid import ResultGrid
+from utils.formatting import format_duration
+
+
+ALERT_COLUMNS = ('Severity', 'Alert', 'State', 'For', 'Fired', 'Values', 'Group')
+RULE_COLUMNS = ('Rule', 'When', 'Clear', 'Hold', 'Severity', 'Group', 'State')
+
+STATE_MARKS = {
+    'firing': '● firing',
+    'resolving': '◐ resolving',
+    'pending': '○ pending',
+    'resolved': '✔ resolved',
+    'ok': 'ok',
+}
+
+
+class AlertRows:
+    """Grid source over the alerts of the latest snapshot"""
+
+    def __init__(self):
+        self.alerts = []
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def rows(self, start, stop):
+        now = time.time()
+        return [(
+            alert['severity'],
+            alert['name'],
+            STATE_MARKS[alert['state']],
+            format_duration(now - alert['since']) if alert['since'] else '',
+            f"{alert['fired']}×" if alert['fired'] > 1 else '',
+            alert['detail'],
+            alert['group'],
+        ) for alert in self.alerts[start:stop]]
+
+
+class RuleRows:
+    """Grid source over the compiled rules, with each rule's live state"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def __len__(self):
+        return len(self.engine.rules)
+
+    def rows(self, start, stop):
+        rows = []
+        for rule, alert in zip(self.engine.rules[start:stop], self.engine.states[start:stop]):
+            hold = ' / '.join(format_duration(seconds) for seconds in (rule.for_s, rule.clear_for_s)) \
+                if rule.for_s or rule.clear_for_s else ''
+            rows.append((rule.name, rule.text, rule.clear_text or '', hold, rule.severity, rule.group,
+                         STATE_MARKS[alert.state]))
+        return rows
+
+
+class AlertsView(ttk.Frame):
+    """Alerts from the app's AlertEngine
+
+    The upper grid lists what is firing or pending, then what resolved
+    recently; the lower one lists every rule with its current state.
+    Both grids are virtualized, so thousands of rules scroll freely.
+    """
+
+    def __init__(self, parent, engine, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.engine = engine
+        self.alert_rows = AlertRows()
+        self.rule_rows = RuleRows(engine)
+
+        self.setup_ui()
+        self.apply_snapshot(engine.snapshot())
+
+    def setup_ui(self):
+        """Setup Alerts UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('alert')} Alerts",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W)
+
+        self.summary_label = ttk.Label(
+            self,
+            text="",
+            font=get_font('body'),
+            bootstyle='secondary'
+        )
+        self.summary_label.pack(anchor=W, pady=(get_spacing('xs'), get_spacing('md')))
+
+        if self.engine.errors:
+            errors_label = ttk.Label(
+                self,
+                text="Rules not loaded: " + "; ".join(self.engine.errors),
+                font=get_font('body_small'),
+                bootstyle='danger',
+                wraplength=900
+            )
+            errors_label.pack(anchor=W, pady=(0, get_spacing('sm')))
+
+        panes = ttk.Panedwindow(self, orient=VERTICAL)
+        panes.pack(fill=BOTH, expand=YES)
+
+        self.alerts_grid = ResultGrid(panes)
+        self.alerts_grid.set_columns(ALERT_COLUMNS)
+        self.alerts_grid.tree.column('c5', width=320)
+        self.alerts_grid.set_source(self.alert_rows)
+        panes.add(self.alerts_grid, weight=1)
+
+        self.rules_grid = ResultGrid(panes)
+        self.rules_grid.set_columns(RULE_COLUMNS)
+        self.rules_grid.tree.column('c1', width=320)
+        self.rules_grid.tree.column('c2', width=200)
+        self.rules_grid.set_source(self.rule_rows)
+        panes.add(self.rules_grid, weight=1)
+
+    def apply_snapshot(self, snapshot):
+        """Show the latest alerts (Tk thread)"""
+        totals = snapshot['totals']
+        self.summary_label.configure(
+            text=f"{totals['firing']} firing · {totals['pending']} pending · {totals['rules']:,} rules · "
+                 f"{snapshot['eval_ms']:.2f} ms per sample"
+        )
+        self.alert_rows.alerts = snapshot['alerts']
+        self.alerts_grid.refresh()
+        self.rules_grid.refresh()
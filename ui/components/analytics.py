@@ -0,0 +1,107 @@
+"""
+Analytics Component
+Browse the history of any stored metric series over days or weeks
+"""
+
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from config.settings import MONITORING
+from ui.widgets.line_chart import LineChart
+from utils.formatting import format_duration
+
+
+class AnalyticsView(ttk.Frame):
+    """Chart of one series from the time-series store over a chosen range
+
+    The store answers with at most max_points buckets, picked from the
+    coarsest roll-up that still fills the chart, so a 30-day range loads
+    as fast as a 15-minute one.
+    """
+
+    def __init__(self, parent, store, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.store = store
+        self.series_var = ttk.StringVar()
+        self.range_var = ttk.StringVar(value=MONITORING['analytics_range'])
+
+        self.setup_ui()
+        self.load_series()
+
+    def setup_ui(self):
+        """Setup Analytics UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('analytics')} Analytics",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W)
+
+        self.summary_label = ttk.Label(
+            self,
+            text="",
+            font=get_font('body'),
+            bootstyle='secondary'
+        )
+        self.summary_label.pack(anchor=W, pady=(get_spacing('xs'), get_spacing('md')))
+
+        # Series and range
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        self.series_box = ttk.Combobox(toolbar, textvariable=self.series_var, state='readonly', width=32)
+        self.series_box.pack(side=LEFT, padx=(0, get_spacing('sm')))
+        self.series_box.bind('<<ComboboxSelected>>', lambda e: self.load())
+
+        for label in MONITORING['ranges']:
+            button = ttk.Radiobutton(
+                toolbar,
+                text=label,
+                value=label,
+                variable=self.range_var,
+                bootstyle='info-outline-toolbutton',
+                command=self.load
+            )
+            button.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        refresh_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('refresh')} Refresh",
+            bootstyle='info-outline',
+            command=self.load_series
+        )
+        refresh_btn.pack(side=RIGHT)
+
+        self.chart = LineChart(self, height=MONITORING['chart_height'] * 2)
+        self.chart.pack(fill=BOTH, expand=YES)
+
+    def load_series(self):
+        """List the stored series and show the selected one"""
+        names = self.store.series()
+        self.series_box.configure(values=names)
+        if names and self.series_var.get() not in names:
+            self.series_var.set(names[0])
+        self.load()
+
+    def load(self):
+        """Chart the selected series over the selected range"""
+        name = self.series_var.get()
+        if not name:
+            self.summary_label.configure(text="No metric history recorded yet")
+            return
+        span = MONITORING['ranges'][self.range_var.get()]
+        end = time.time()
+        started = time.perf_counter()
+        history = self.store.query(name, end - span, end, MONITORING['max_points'])
+        elapsed = time.perf_counter() - started
+        self.chart.clear()
+        self.chart.add_series(name, 'info', max_gap=history['step'] * 2)
+        self.chart.set_data(name, history['times'], history['min'], history['max'])
+        self.chart.show_range(end - span, end)
+        self.summary_label.configure(
+            text=f"{len(history['times']):,} points, {history['step']:g} s each "
+                 f"· {format_duration(span)} loaded in {elapsed * 1000:.1f} ms"
+        )
@@ -0,0 +1,320 @@
+"""
+Backups Component
+Start, monitor, resume and restore parallel compressed backups
+"""
+
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from core.backup.archive import available_codecs
+from utils.formatting import format_bytes, format_duration, format_rate
+
+
+HISTORY_COLUMNS = (
+    ('created', 'Started', 150),
+    ('profile', 'Profile', 140),
+    ('status', 'Status', 90),
+    ('tables', 'Tables', 70),
+    ('chunks', 'Chunks', 70),
+    ('rows', 'Rows', 110),
+    ('size', 'Data', 90),
+    ('stored', 'Stored', 90),
+    ('written', 'New', 90),
+    ('duration', 'Duration', 90),
+)
+
+NODE_COLUMNS = (
+    ('kind', 'Step', 90),
+    ('state', 'State', 80),
+    ('chunks', 'Chunks', 70),
+    ('rows', 'Rows', 110),
+    ('time', 'Time', 80),
+)
+
+
+def describe_progress(progress):
+    """One-line summary of a progress snapshot"""
+    text = (
+        f"{progress['phase'].capitalize()} · {progress['chunks_done']:,}/{progress['chunks_total']:,} chunks · "
+        f"{progress['rows']:,} rows · {format_rate(progress['bytes_per_second'])}"
+    )
+    if progress['eta'] is not None and progress['phase'] in ('dumping', 'loading', 'restoring'):
+        text += f" · ETA {format_duration(progress['eta'])}"
+    if progress.get('bytes_written'):
+        text += f" · {format_bytes(progress['bytes_written'])} written"
+    if progress.get('nodes_total'):
+        text += f" · {progress['nodes_done']:,}/{progress['nodes_total']:,} steps"
+    if progress.get('reused'):
+        text += f" · {progress['reused']:,} chunks unchanged"
+    if progress['error']:
+        text += f" · {progress['error']}"
+    return text
+
+
+class BackupsView(ttk.Frame):
+    """Backup controls, live progress, run history and restores"""
+
+    def __init__(self, parent, service, scheduler, on_activity=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.service = service
+        self.scheduler = scheduler
+        self.on_activity = on_activity
+        self.manifests = {}
+
+        self.setup_ui()
+        self.load_history()
+
+    def setup_ui(self):
+        """Setup Backups UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('backup')} Backups",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W)
+
+        subtitle_label = ttk.Label(
+            self,
+            text="Tables are dumped in parallel chunks; unchanged chunks are shared between backups.",
+            font=get_font('body'),
+            bootstyle='secondary'
+        )
+        subtitle_label.pack(anchor=W, pady=(get_spacing('xs'), get_spacing('lg')))
+
+        # New backup
+        backup_card = ttk.Labelframe(
+            self,
+            text=f"{get_icon('storage')} New Backup",
+            bootstyle='info',
+            padding=get_spacing('lg')
+        )
+        backup_card.pack(fill=X, pady=(0, get_spacing('md')))
+
+        options = ttk.Frame(backup_card)
+        options.pack(fill=X, pady=(0, get_spacing('md')))
+
+        profiles = list(self.service.profiles)
+        self.profile_var = ttk.StringVar(value=profiles[0] if profiles else '')
+        self.codec_var = ttk.StringVar(value=self.service.default_codec())
+        self.level_var = ttk.IntVar(value=self.service.settings['levels'][self.codec_var.get()])
+        self.workers_var = ttk.IntVar(value=self.service.settings['workers'] or 0)
+
+        for text, widget in (
+            ("Connection", ttk.Combobox(options, textvariable=self.profile_var, values=profiles,
+                                        state='readonly', width=22)),
+            ("Compression", ttk.Combobox(options, textvariable=self.codec_var, values=available_codecs(),
+                                         state='readonly', width=8)),
+            ("Level", ttk.Spinbox(options, textvariable=self.level_var, from_=1, to=19, width=4)),
+            ("Workers (0 = all cores)", ttk.Spinbox(options, textvariable=self.workers_var, from_=0, to=64, width=4)),
+        ):
+            label = ttk.Label(options, text=text, font=get_font('body'))
+            label.pack(side=LEFT, padx=(0, get_spacing('xs')))
+            widget.pack(side=LEFT, padx=(0, get_spacing('md')))
+            if text == "Compression":
+                widget.bind('<<ComboboxSelected>>', self.on_codec_selected)
+
+        actions = ttk.Frame(backup_card)
+        actions.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        self.start_btn = ttk.Button(
+            actions,
+            text=f"{get_icon('run')} Start Backup",
+            bootstyle='info',
+            command=self.start_backup,
+            width=16
+        )
+        self.start_btn.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        self.cancel_btn = ttk.Button(
+            actions,
+            text=f"{get_icon('error')} Cancel",
+            bootstyle='danger-outline',
+            command=self.service.cancel,
+            state=DISABLED,
+            width=10
+        )
+        self.cancel_btn.pack(side=LEFT)
+
+        self.progress_bar = ttk.Progressbar(backup_card, bootstyle='info', maximum=100)
+        self.progress_bar.pack(fill=X, pady=(0, get_spacing('xs')))
+
+        self.status_label = ttk.Label(
+            backup_card,
+            text="Idle",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.status_label.pack(anchor=W)
+
+        # History
+        self.history_card = ttk.Labelframe(
+            self,
+            text=f"{get_icon('recent')} Backup History",
+            bootstyle='secondary',
+            padding=get_spacing('lg')
+        )
+        self.history_card.pack(fill=BOTH, expand=YES)
+
+        self.history_actions = ttk.Frame(self.history_card)
+        self.history_actions.pack(fill=X, pady=(0, get_spacing('md')))
+
+        for text, style, command in (
+            (f"{get_icon('refresh')} Refresh", 'secondary-outline', self.load_history),
+            (f"{get_icon('run')} Resume", 'info-outline', self.resume_selected),
+            (f"{get_icon('backup')} Restore", 'success-outline', self.restore_selected),
+        ):
+            btn = ttk.Button(self.history_actions, text=text, bootstyle=style, command=command, width=12)
+            btn.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        profiles = list(self.service.profiles)
+        self.target_var = ttk.StringVar(value=profiles[0] if profiles else '')
+        ttk.Label(self.history_actions, text="into", font=get_font('body')).pack(side=LEFT, padx=(0, get_spacing('xs')))
+        ttk.Combobox(
+            self.history_actions, textvariable=self.target_var, values=profiles, state='readonly', width=22
+        ).pack(side=LEFT)
+
+        self.history = ttk.Treeview(
+            self.history_card,
+            columns=[column for column, _, _ in HISTORY_COLUMNS],
+            show='headings',
+            selectmode=BROWSE
+        )
+        for column, heading, width in HISTORY_COLUMNS:
+            self.history.heading(column, text=heading)
+            self.history.column(column, width=width, anchor=W if column in ('created', 'profile', 'status') else E)
+        self.history.pack(fill=BOTH, expand=YES)
+
+        # Restore steps, shown while a restore runs and kept after it ends
+        self.restore_card = ttk.Labelframe(
+            self,
+            text=f"{get_icon('table')} Restore Steps",
+            bootstyle='success',
+            padding=get_spacing('lg')
+        )
+
+        self.nodes = ttk.Treeview(
+            self.restore_card,
+            columns=[column for column, _, _ in NODE_COLUMNS],
+            height=10,
+            selectmode=BROWSE
+        )
+        self.nodes.heading('#0', text='Object')
+        self.nodes.column('#0', width=260)
+        for column, heading, width in NODE_COLUMNS:
+            self.nodes.heading(column, text=heading)
+            self.nodes.column(column, width=width, anchor=W if column in ('kind', 'state') else E)
+        self.nodes.pack(fill=BOTH, expand=YES)
+
+    def on_codec_selected(self, event):
+        """Reset the level to the codec's default"""
+        self.level_var.set(self.service.settings['levels'][self.codec_var.get()])
+
+    def start_backup(self, resume=None):
+        """Start a backup with the selected options"""
+        try:
+            self.service.start_backup(
+                self.profile_var.get(),
+                codec=self.codec_var.get(),
+                level=self.level_var.get(),
+                workers=self.workers_var.get() or None,
+                resume=resume
+            )
+        except (RuntimeError, KeyError, ValueError) as error:
+            self.status_label.configure(text=str(error))
+            return
+        self.start_btn.configure(state=DISABLED)
+        self.cancel_btn.configure(state=NORMAL)
+        self.progress_bar.configure(value=0)
+        self.status_label.configure(text="Starting...")
+        self.log(f"Backup of {self.profile_var.get()} {'resumed' if resume else 'started'}", 'info')
+
+    def resume_selected(self):
+        """Resume the selected unfinished backup"""
+        selection = self.history.selection()
+        manifest = self.manifests.get(selection[0]) if selection else None
+        if manifest is None or manifest.data['status'] == 'complete':
+            self.status_label.configure(text="Select an unfinished backup to resume")
+            return
+        self.profile_var.set(manifest.data['profile'])
+        self.start_backup(resume=manifest.path)
+
+    def restore_selected(self):
+        """Restore the selected complete backup into the chosen connection"""
+        selection = self.history.selection()
+        manifest = self.manifests.get(selection[0]) if selection else None
+        if manifest is None or manifest.data['status'] != 'complete':
+            self.status_label.configure(text="Select a complete backup to restore")
+            return
+        target = self.target_var.get()
+        try:
+            self.service.start_restore(manifest.path, target, workers=self.workers_var.get() or None)
+        except (RuntimeError, KeyError, ValueError) as error:
+            self.status_label.configure(text=str(error))
+            return
+        self.start_btn.configure(state=DISABLED)
+        self.cancel_btn.configure(state=NORMAL)
+        self.progress_bar.configure(value=0)
+        self.status_label.configure(text="Building restore plan...")
+        self.nodes.delete(*self.nodes.get_children())
+        self.restore_card.pack(fill=BOTH, expand=YES, pady=(get_spacing('md'), 0))
+        self.log(f"Restore of {manifest.data['profile']} backup into {target} started", 'info')
+
+    def apply_progress(self, progress):
+        """Show a progress snapshot (Tk thread)"""
+        self.progress_bar.configure(value=round(progress['fraction'] * 100))
+        self.status_label.configure(text=describe_progress(progress))
+        if progress['kind'] == 'restore':
+            self.apply_nodes(progress['nodes'])
+        if progress['finished'] is not None:
+            self.start_btn.configure(state=NORMAL)
+            self.cancel_btn.configure(state=DISABLED)
+            self.load_history()
+
+    def apply_nodes(self, nodes):
+        """Update restore steps in place, keyed by node id"""
+        for node_id, kind, label, state, rows, seconds, chunks_done, chunks in nodes:
+            values = (
+                kind,
+                state,
+                f"{chunks_done:,}/{chunks:,}" if chunks else '',
+                f"{rows:,}" if kind == 'data' else '',
+                format_duration(seconds) if seconds else '',
+            )
+            if self.nodes.exists(node_id):
+                self.nodes.item(node_id, values=values)
+            else:
+                self.nodes.insert('', END, iid=node_id, text=label, values=values)
+
+    def load_history(self):
+        """List previous backup runs"""
+        self.history.delete(*self.history.get_children())
+        self.manifests = {}
+        for manifest in self.service.history():
+            data = manifest.data
+            totals = data.get('totals') or {}
+            iid = manifest.path
+            self.manifests[iid] = manifest
+            self.history.insert('', END, iid=iid, values=(
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data['created'])),
+                data['profile'],
+                data['status'],
+                len(data['tables']),
+                f"{totals.get('chunks', 0):,}/{sum(len(table['chunks']) for table in data['tables']):,}",
+                f"{totals.get('rows', 0):,}",
+                format_bytes(totals.get('raw_bytes', 0)),
+                format_bytes(totals.get('bytes', 0)),
+                format_bytes(totals.get('written', 0)),
+                format_duration(totals.get('seconds', 0)),
+            ))
+
+    def busy(self):
+        """A running backup or restore keeps the view from being evicted"""
+        return self.service.running
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
@@ -0,0 +1,410 @@
+"""
+Cleanup Utilities Component
+Disk usage drill-down with a treemap, and duplicate file detection
+"""
+
+import os
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from config.settings import DISK_USAGE, DUPLICATE_FINDER
+from core.files.duplicates import DuplicateScan
+from ui.widgets.treemap import Treemap
+from utils.formatting import format_bytes, format_duration, format_rate
+
+
+USAGE_COLUMNS = (
+    ('size', 'Size', 100),
+    ('share', 'Share', 70),
+    ('files', 'Files', 90),
+)
+
+GROUP_COLUMNS = (
+    ('copies', 'Copies', 70),
+    ('size', 'Size', 100),
+    ('wasted', 'Reclaimable', 110),
+)
+
+
+def describe_scan(progress):
+    """One-line summary of a DuplicateScan progress snapshot"""
+    phase = progress['phase']
+    text = f"{progress['files']:,} files · {format_bytes(progress['bytes'])}"
+    if phase == 'walking':
+        return f"Listing files... {text}"
+    if phase in ('partial', 'full'):
+        stage = "Comparing first and last blocks" if phase == 'partial' else "Hashing remaining candidates"
+        text = (
+            f"{stage}... {progress['hashed']:,}/{progress['to_hash']:,} · "
+            f"{format_rate(progress['bytes_per_second'])}"
+        )
+    elif phase == 'complete':
+        text = (
+            f"{progress['groups']:,} duplicate groups · {format_bytes(progress['wasted_bytes'])} reclaimable · "
+            f"{text} scanned in {format_duration(progress['elapsed'])}"
+        )
+    elif phase == 'cancelled':
+        text = f"Cancelled after {format_duration(progress['elapsed'])} · {text}"
+    else:
+        text = f"Failed: {progress['error']}"
+    if progress['cache_hits']:
+        text += f" · {progress['cache_hits']:,} hashes cached"
+    if progress['errors']:
+        text += f" · {progress['errors']:,} unreadable"
+    return text
+
+
+def describe_usage(progress):
+    """One-line summary of a disk usage progress snapshot"""
+    phase = progress['phase']
+    text = f"{progress['files']:,} files in {progress['dirs']:,} folders · {format_bytes(progress['disk'])}"
+    if phase == 'walking':
+        return f"Analyzing... {text} · {progress['files_per_second']:,.0f} files/s"
+    if phase == 'aggregating':
+        return f"Totalling... {text}"
+    if phase == 'complete':
+        return f"{text} · analyzed in {format_duration(progress['elapsed'])}"
+    if phase == 'cancelled':
+        return f"Cancelled after {format_duration(progress['elapsed'])} · {text}"
+    return f"Failed: {progress['error']}"
+
+
+class CleanupUtilitiesView(ttk.Frame):
+    """Disk usage and duplicate files under a folder
+
+    Disk usage comes from the app's DiskUsageAnalyzer: any folder inside an
+    analyzed tree opens at once from the cached tree, and a running analysis
+    shows running totals per top-level folder. The duplicate scan belongs
+    to the view. Opening a file shows its folder in the File Explorer.
+    """
+
+    def __init__(self, parent, usage, scheduler, on_activity=None, on_open=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.usage = usage
+        self.scheduler = scheduler
+        self.on_activity = on_activity
+        self.on_open = on_open
+        self.scan = None
+        self.usage_tree = None
+        self.usage_node = None
+
+        self.setup_ui()
+        self.show_usage(DISK_USAGE['start_path'])
+
+    def setup_ui(self):
+        """Setup Cleanup Utilities UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('cleanup')} Cleanup Utilities",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W, pady=(0, get_spacing('md')))
+
+        notebook = ttk.Notebook(self, bootstyle='info')
+        notebook.pack(fill=BOTH, expand=YES)
+
+        usage_tab = ttk.Frame(notebook, padding=get_spacing('lg'))
+        notebook.add(usage_tab, text=f"{get_icon('storage')} Disk Usage")
+        self.create_usage_tab(usage_tab)
+
+        duplicates_card = ttk.Frame(notebook, padding=get_spacing('lg'))
+        notebook.add(duplicates_card, text=f"{get_icon('search')} Duplicate Files")
+        self.create_duplicates_tab(duplicates_card)
+
+    def create_usage_tab(self, parent):
+        """Folder toolbar, subfolder list and treemap"""
+        toolbar = ttk.Frame(parent)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        up_btn = ttk.Button(toolbar, text="↑", bootstyle='secondary-outline', command=self.usage_up, width=3)
+        up_btn.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        self.usage_path_var = ttk.StringVar(value=os.path.expanduser(DISK_USAGE['start_path']))
+        usage_entry = ttk.Entry(toolbar, textvariable=self.usage_path_var, font=get_font('body'))
+        usage_entry.pack(side=LEFT, fill=X, expand=YES, padx=(get_spacing('xs'), get_spacing('sm')))
+        usage_entry.bind('<Return>', lambda e: self.show_usage(self.usage_path_var.get()))
+
+        self.analyze_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('run')} Analyze",
+            bootstyle='info',
+            command=self.start_usage,
+            width=12
+        )
+        self.analyze_btn.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        self.usage_cancel_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('error')} Cancel",
+            bootstyle='danger-outline',
+            command=self.usage.cancel,
+            state=DISABLED,
+            width=10
+        )
+        self.usage_cancel_btn.pack(side=LEFT)
+
+        self.usage_label = ttk.Label(
+            parent,
+            text="",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.usage_label.pack(anchor=W, pady=(0, get_spacing('sm')))
+
+        body = ttk.Frame(parent)
+        body.pack(fill=BOTH, expand=YES)
+
+        self.folders = ttk.Treeview(
+            body,
+            columns=[column for column, _, _ in USAGE_COLUMNS],
+            selectmode=BROWSE
+        )
+        self.folders.heading('#0', text='Folder')
+        self.folders.column('#0', width=240)
+        for column, heading, width in USAGE_COLUMNS:
+            self.folders.heading(column, text=heading)
+            self.folders.column(column, width=width, anchor=E)
+        self.folders.pack(side=LEFT, fill=Y, padx=(0, get_spacing('sm')))
+        self.folders.bind('<Double-1>', lambda e: self.open_selected_folder())
+        self.folders.bind('<Return>', lambda e: self.open_selected_folder())
+
+        self.treemap = Treemap(body, on_click=self.open_node, format_value=format_bytes)
+        self.treemap.pack(side=LEFT, fill=BOTH, expand=YES)
+
+    def create_duplicates_tab(self, duplicates_card):
+        """Duplicate finder toolbar, progress and groups"""
+        toolbar = ttk.Frame(duplicates_card)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        self.path_var = ttk.StringVar(value=os.path.expanduser(DUPLICATE_FINDER['start_path']))
+        path_entry = ttk.Entry(toolbar, textvariable=self.path_var, font=get_font('body'))
+        path_entry.pack(side=LEFT, fill=X, expand=YES, padx=(0, get_spacing('sm')))
+        path_entry.bind('<Return>', lambda e: self.start_scan())
+
+        self.scan_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('run')} Find Duplicates",
+            bootstyle='info',
+            command=self.start_scan,
+            width=16
+        )
+        self.scan_btn.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        self.cancel_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('error')} Cancel",
+            bootstyle='danger-outline',
+            command=self.cancel,
+            state=DISABLED,
+            width=10
+        )
+        self.cancel_btn.pack(side=LEFT)
+
+        self.progress_bar = ttk.Progressbar(duplicates_card, bootstyle='info', maximum=100)
+        self.progress_bar.pack(fill=X, pady=(0, get_spacing('xs')))
+
+        self.status_label = ttk.Label(
+            duplicates_card,
+            text="Files are compared by size, then by their first and last blocks, then in full.",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.status_label.pack(anchor=W, pady=(0, get_spacing('sm')))
+
+        # One parent row per group, its copies below
+        self.groups = ttk.Treeview(
+            duplicates_card,
+            columns=[column for column, _, _ in GROUP_COLUMNS],
+            selectmode=BROWSE
+        )
+        self.groups.heading('#0', text='File')
+        self.groups.column('#0', width=480)
+        for column, heading, width in GROUP_COLUMNS:
+            self.groups.heading(column, text=heading)
+            self.groups.column(column, width=width, anchor=E)
+        self.groups.pack(fill=BOTH, expand=YES)
+        self.groups.bind('<Double-1>', lambda e: self.activate())
+        self.groups.bind('<Return>', lambda e: self.activate())
+
+    def start_scan(self):
+        """Scan the chosen folder for duplicates, replacing any scan in progress"""
+        path = os.path.abspath(os.path.expanduser(self.path_var.get().strip() or '~'))
+        if not os.path.isdir(path):
+            self.status_label.configure(text=f"{path} is not a folder")
+            return
+        if self.scan is not None:
+            self.scan.cancel()
+
+        self.groups.delete(*self.groups.get_children())
+        self.progress_bar.configure(value=0)
+        self.scan_btn.configure(state=DISABLED)
+        self.cancel_btn.configure(state=NORMAL)
+        self.status_label.configure(text="Listing files...")
+
+        scan = DuplicateScan(
+            [path],
+            DUPLICATE_FINDER,
+            on_progress=lambda progress: self.scheduler.submit(
+                ('duplicate_scan', id(self)), self.apply_progress, scan, progress
+            )
+        )
+        self.scan = scan.start()
+
+    def apply_progress(self, scan, progress):
+        """Show scan progress, and the groups once it completes (Tk thread)"""
+        if scan is not self.scan:
+            return
+        self.status_label.configure(text=describe_scan(progress))
+        phase = progress['phase']
+        if phase in ('partial', 'full') and progress['to_hash']:
+            # The partial pass is cheap; the full pass gets most of the bar
+            share = progress['hashed'] / progress['to_hash']
+            self.progress_bar.configure(value=share * 30 if phase == 'partial' else 30 + share * 70)
+        if progress['finished'] is None:
+            return
+
+        self.scan_btn.configure(state=NORMAL)
+        self.cancel_btn.configure(state=DISABLED)
+        self.progress_bar.configure(value=100 if phase == 'complete' else 0)
+        if phase == 'complete':
+            self.show_groups(scan.groups)
+            self.log(
+                f"Found {progress['groups']:,} duplicate groups ({format_bytes(progress['wasted_bytes'])} "
+                f"reclaimable) under {scan.roots[0]}",
+                'success'
+            )
+        elif phase == 'failed':
+            self.log(f"Duplicate scan failed: {progress['error']}", 'danger')
+
+    def show_groups(self, groups):
+        """List the largest groups, each expandable to its copies"""
+        limit = DUPLICATE_FINDER['max_groups_shown']
+        for index, (size, digest, paths) in enumerate(groups[:limit]):
+            parent = self.groups.insert(
+                '', END,
+                iid=f"group:{index}",
+                text=f"{os.path.basename(paths[0])}  ({digest[:12]})",
+                values=(len(paths), format_bytes(size), format_bytes(size * (len(paths) - 1)))
+            )
+            for position, path in enumerate(paths):
+                self.groups.insert(parent, END, iid=f"path:{index}:{position}", text=path, values=('', '', ''))
+        if len(groups) > limit:
+            self.groups.insert('', END, iid='more', text=f"… {len(groups) - limit:,} smaller groups not shown")
+
+    # Disk usage
+
+    def show_usage(self, path):
+        """Show a folder from the newest analyzed tree that contains it"""
+        path = os.path.abspath(os.path.expanduser(path.strip() or '~'))
+        self.usage_path_var.set(path)
+        tree, node = self.usage.lookup(path)
+        self.usage_tree, self.usage_node = tree, node
+        self.folders.delete(*self.folders.get_children())
+        if tree is None:
+            self.treemap.set_items([])
+            if not self.usage.running:
+                self.usage_label.configure(text="Not analyzed yet · Analyze walks it once, then every subfolder opens at once")
+            return
+
+        totals = tree.totals(node)
+        children = tree.children(node)[:DISK_USAGE['treemap_items']]
+        items = [(tree.name(child), int(tree.disk[child]), int(child)) for child in children]
+        if totals['own_disk']:
+            items.append(("(files)", totals['own_disk'], None))
+        items.sort(key=lambda item: item[1], reverse=True)
+
+        whole = totals['disk'] or 1
+        for name, disk, child in items:
+            files = totals['own_files'] if child is None else int(tree.files[child])
+            self.folders.insert(
+                '', END,
+                iid=f"node:{child}" if child is not None else 'own',
+                text=name,
+                values=(format_bytes(disk), f"{disk / whole:.1%}", f"{files:,}")
+            )
+        self.treemap.set_items(items)
+
+        age = format_duration(time.time() - tree.built_at)
+        self.usage_label.configure(
+            text=(
+                f"{format_bytes(totals['disk'])} · {totals['files']:,} files · {totals['dirs'] - 1:,} folders · "
+                f"analyzed {age} ago"
+            )
+        )
+
+    def open_node(self, node):
+        """Drill into a subfolder of the shown tree"""
+        if node is not None and self.usage_tree is not None:
+            self.show_usage(self.usage_tree.path(node))
+
+    def open_selected_folder(self):
+        selection = self.folders.selection()
+        if selection and selection[0].startswith('node:'):
+            self.open_node(int(selection[0].split(':')[1]))
+
+    def usage_up(self):
+        """Show the parent folder"""
+        self.show_usage(os.path.dirname(os.path.abspath(os.path.expanduser(self.usage_path_var.get()))))
+
+    def start_usage(self):
+        """Analyze the folder in the path box"""
+        path = self.usage_path_var.get()
+        try:
+            self.usage.analyze(path)
+        except OSError as error:
+            self.usage_label.configure(text=f"{path}: {error.strerror or error}")
+            return
+        self.analyze_btn.configure(state=DISABLED)
+        self.usage_cancel_btn.configure(state=NORMAL)
+        self.usage_label.configure(text="Analyzing...")
+
+    def apply_usage_progress(self, progress):
+        """Stream running totals while walking; show the tree once complete (Tk thread)"""
+        self.usage_label.configure(text=describe_usage(progress))
+        if progress['finished'] is None:
+            self.analyze_btn.configure(state=DISABLED)
+            self.usage_cancel_btn.configure(state=NORMAL)
+            if progress['top'] and progress['root'] == os.path.abspath(os.path.expanduser(self.usage_path_var.get())):
+                self.folders.delete(*self.folders.get_children())
+                for position, (name, disk) in enumerate(progress['top']):
+                    self.folders.insert('', END, iid=f"partial:{position}", text=name,
+                                        values=(format_bytes(disk), '', ''))
+                self.treemap.set_items([(name, disk, None) for name, disk in progress['top']])
+            return
+
+        self.analyze_btn.configure(state=NORMAL)
+        self.usage_cancel_btn.configure(state=DISABLED)
+        if progress['phase'] == 'complete':
+            self.show_usage(progress['root'])
+            self.usage_label.configure(text=describe_usage(progress))
+            self.log(f"Analyzed {progress['root']}: {format_bytes(progress['disk'])}", 'success')
+        elif progress['phase'] == 'failed':
+            self.log(f"Disk usage of {progress['root']} failed: {progress['error']}", 'danger')
+
+    # Duplicates
+
+    def activate(self):
+        """Show the selected copy in the File Explorer"""
+        selection = self.groups.selection()
+        if not selection or not selection[0].startswith('path:') or not self.on_open:
+            return
+        self.on_open(os.path.dirname(self.groups.item(selection[0], 'text')))
+
+    def cancel(self):
+        """Stop the scan in progress"""
+        if self.scan is not None:
+            self.scan.cancel()
+            self.status_label.configure(text="Cancelling...")
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
+
+    def destroy(self):
+        if self.scan is not None:
+            self.scan.cancel()
+        super().destroy()
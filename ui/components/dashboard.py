@@ -3,50 +3,96 @@ Dashboard Component
 Main dashboard content with stats, quick actions, activity, and system status
 """
 
+import time
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from ttkbootstrap.scrolled import ScrolledFrame
 from config.theme import get_font, get_spacing, get_icon, get_color
 from config.settings import (
-    DASHBOARD_STATS, QUICK_ACTIONS, RECENT_ACTIVITIES,
-    SYSTEM_METRICS, USER_INFO, FEATURES
+    DASHBOARD_STATS, QUICK_ACTIONS, SYSTEM_METRICS, USER_INFO, FEATURES, STARTUP,
+    METRICS_SAMPLER, ACTIVITY_FEED
 )
 from ui.widgets.stat_card import StatCard
 from ui.widgets.activity_item import ActivityItem
 from ui.widgets.metric_item import MetricItem
+from utils.profiling import profiler
+from utils.formatting import format_duration, format_percent, format_rate, format_time_ago
 
 
 class DashboardContent(ScrolledFrame):
     """Dashboard content area with all widgets"""
 
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, activity_store, deferred=False, on_ready=None, on_action=None, **kwargs):
         super().__init__(parent, autohide=True, **kwargs)
 
+        self.activity_store = activity_store
+        self.feed_window = None
+        self.deferred = deferred
+        self.on_ready = on_ready
+        self.on_action = on_action
+        self.pending_sections = []
+
+        # Live widgets, keyed by metric/stat key
+        self.stat_cards = {}
+        self.metric_items = {}
+        self.activity_items = []
+        self.job_items = {}
+        self.status_card = None
+
         self.setup_ui()
 
     def setup_ui(self):
         """Setup dashboard UI"""
+        sections = []
+
         # Welcome banner
         if FEATURES['show_welcome_banner']:
-            self.create_welcome_section()
+            sections.append(('welcome', self.create_welcome_section))
 
         # Statistics cards
         if FEATURES['show_stats_cards']:
-            self.create_stats_section()
+            sections.append(('stats', self.create_stats_section))
 
         # Quick actions
         if FEATURES['show_quick_actions']:
-            self.create_quick_actions()
+            sections.append(('quick actions', self.create_quick_actions))
 
         # Recent activity and system status (side by side)
-        bottom_container = ttk.Frame(self)
-        bottom_container.pack(fill=BOTH, expand=YES, pady=get_spacing('md'))
+        sections.append(('bottom container', self.create_bottom_container))
 
         if FEATURES['show_recent_activity']:
-            self.create_recent_activity(bottom_container)
+            sections.append(('recent activity', lambda: self.create_recent_activity(self.bottom_container)))
 
         if FEATURES['show_system_status']:
-            self.create_system_status(bottom_container)
+            sections.append(('system status', lambda: self.create_system_status(self.bottom_container)))
+
+        self.pending_sections = sections
+        if self.deferred:
+            # Build one section per frame so the window stays responsive
+            self.after_idle(self.build_next_section)
+        else:
+            while self.pending_sections:
+                self.build_next_section()
+
+    def build_next_section(self):
+        """Build the next pending section and schedule the one after it"""
+        if not self.winfo_exists() or not self.pending_sections:
+            return
+
+        name, create = self.pending_sections.pop(0)
+        with profiler.phase(f'dashboard: {name}'):
+            create()
+
+        if self.pending_sections:
+            if self.deferred:
+                self.after(STARTUP['section_interval_ms'], self.build_next_section)
+        elif self.on_ready:
+            self.on_ready()
+
+    def create_bottom_container(self):
+        """Create the container holding recent activity and system status"""
+        self.bottom_container = ttk.Frame(self)
+        self.bottom_container.pack(fill=BOTH, expand=YES, pady=get_spacing('md'))
 
     def create_welcome_section(self):
         """Create welcome banner"""
@@ -92,6 +138,7 @@ class DashboardContent(ScrolledFrame):
                 style=stat['style']
             )
             card.pack(side=LEFT, fill=BOTH, expand=YES, padx=get_spacing('sm'))
+            self.stat_cards[stat.get('key', stat['title'])] = card
 
     def create_quick_actions(self):
         """Create quick actions section"""
@@ -118,10 +165,16 @@ class DashboardContent(ScrolledFrame):
                 current_row,
                 text=f"{get_icon(action['icon'])} {action['label']}",
                 bootstyle=action['style'],
+                command=lambda label=action['label']: self.handle_action(label),
                 width=25
             )
             btn.pack(side=LEFT, padx=get_spacing('sm'), pady=get_spacing('xs'))
 
+    def handle_action(self, label):
+        """Forward a quick action click"""
+        if self.on_action:
+            self.on_action(label)
+
     def create_recent_activity(self, parent):
         """Create recent activity panel"""
         activity_card = ttk.Labelframe(
@@ -140,18 +193,42 @@ class DashboardContent(ScrolledFrame):
             header,
             text="View All →",
             bootstyle='link',
+            command=self.open_activity_feed
         )
         view_all.pack(side=RIGHT)
 
-        # Activity items
-        for activity in RECENT_ACTIVITIES:
-            item = ActivityItem(
-                activity_card,
-                text=activity['text'],
-                time=activity['time'],
-                status=activity['status']
-            )
-            item.pack(fill=X, pady=get_spacing('sm'))
+        # Activity items, a fixed set rebound to the newest events
+        for _ in range(ACTIVITY_FEED['recent_count']):
+            item = ActivityItem(activity_card, text="", time="", status='info')
+            self.activity_items.append(item)
+
+        self.refresh_activity()
+
+    def refresh_activity(self):
+        """Rebind the recent activity rows to the newest events"""
+        newest = self.activity_store.newest_first()
+        now = time.time()
+        for index, item in enumerate(self.activity_items):
+            if index < len(newest):
+                record = newest[index]
+                item.update_data(record.text, format_time_ago(now - record.timestamp), record.status)
+                if not item.winfo_manager():
+                    item.pack(fill=X, pady=get_spacing('sm'))
+            elif item.winfo_manager():
+                item.pack_forget()
+
+        if self.feed_window is not None and self.feed_window.winfo_exists():
+            self.feed_window.refresh()
+
+    def open_activity_feed(self):
+        """Open (or raise) the full activity feed window"""
+        if self.feed_window is not None and self.feed_window.winfo_exists():
+            self.feed_window.lift()
+            return
+
+        from ui.components.activity_feed import ActivityFeedWindow
+
+        self.feed_window = ActivityFeedWindow(self.winfo_toplevel(), self.activity_store)
 
     def create_system_status(self, parent):
         """Create system status panel"""
@@ -162,6 +239,7 @@ class DashboardContent(ScrolledFrame):
             padding=get_spacing('lg')
         )
         status_card.pack(side=LEFT, fill=BOTH, expand=YES, padx=(get_spacing('sm'), 0))
+        self.status_card = status_card
 
         # Header with refresh button
         header = ttk.Frame(status_card)
@@ -184,3 +262,44 @@ class DashboardContent(ScrolledFrame):
                 style=metric['style']
             )
             item.pack(fill=X, pady=get_spacing('md'))
+            self.metric_items[metric['key']] = item
+
+    def show_job(self, key, label, value, percent, style='info'):
+        """Show or update a progress bar for a background job in the status panel"""
+        if self.status_card is None:
+            return
+        item = self.job_items.get(key)
+        if item is None:
+            item = MetricItem(self.status_card, label=label, value=value, percent=percent, style=style)
+            item.pack(fill=X, pady=get_spacing('md'))
+            self.job_items[key] = item
+        else:
+            item.update_value(value, percent)
+
+    def hide_job(self, key):
+        """Remove a job's progress bar"""
+        item = self.job_items.pop(key, None)
+        if item is not None:
+            item.destroy()
+
+    def update_stat(self, key, value, subtitle=None):
+        """Update a stat card in place"""
+        card = self.stat_cards.get(key)
+        if card is not None:
+            card.update_value(value, subtitle)
+
+    def apply_metrics(self, sample):
+        """Update metric bars and stat cards in place from a live sample"""
+        for key in ('cpu', 'memory', 'disk'):
+            item = self.metric_items.get(key)
+            if item is not None:
+                percent = round(sample[key])
+                item.update_value(format_percent(percent), percent)
+
+        network = self.metric_items.get('network')
+        if network is not None:
+            capacity = METRICS_SAMPLER['network_capacity_mbps'] * 125000
+            percent = min(100, round(100 * sample['network_bps'] / capacity))
+            network.update_value(format_rate(sample['network_bps']), percent)
+
+        self.update_stat('uptime', format_duration(sample['uptime']))
@@ -0,0 +1,251 @@
+"""
+File Explorer Component
+Streamed, cancellable directory listings in a virtualized grid
+"""
+
+import os
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from config.settings import FILE_EXPLORER
+from core.files.listing import DIR, LINK, KIND_NAMES, SORT_KEYS
+from ui.widgets.result_grid import ResultGrid
+from utils.formatting import format_bytes
+
+
+COLUMNS = ('Name', 'Type', 'Size', 'Modified')
+
+
+class ListingRows:
+    """Grid source that formats the visible window of a DirectoryListing"""
+
+    def __init__(self, listing, max_age=None):
+        self.listing = listing
+        self.max_age = max_age
+
+    def __len__(self):
+        return len(self.listing) if self.listing is not None else 0
+
+    def rows(self, start, stop):
+        rows = []
+        for _, name, kind, size, mtime in self.listing.entries(start, stop, self.max_age):
+            icon = get_icon('file') if kind == DIR else ' '
+            rows.append((
+                f"{icon} {name}{' →' if kind == LINK else ''}",
+                KIND_NAMES[kind],
+                '' if kind == DIR else format_bytes(size),
+                time.strftime('%Y-%m-%d %H:%M', time.localtime(mtime)) if mtime == mtime else '',
+            ))
+        return rows
+
+
+class FileExplorerView(ttk.Frame):
+    """Directory browser over the app's DirectoryIndex
+
+    Entries stream in while the directory is scanned; sizes and dates fill
+    in as the stat pass catches up, and the listing is sorted folders-first
+    once complete. Listings of unchanged directories come from the cache.
+    """
+
+    def __init__(self, parent, index, scheduler, on_activity=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.index = index
+        self.scheduler = scheduler
+        self.on_activity = on_activity
+        self.scan = None
+        self.rows = ListingRows(None, FILE_EXPLORER['stat_ttl_s'])
+        self.history = []
+
+        self.setup_ui()
+        self.open(FILE_EXPLORER['start_path'])
+
+    def setup_ui(self):
+        """Setup File Explorer UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('file')} File Explorer",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W, pady=(0, get_spacing('md')))
+
+        # Toolbar: navigation and path
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        for text, style, command in (
+            ("←", 'secondary-outline', self.back),
+            ("↑", 'secondary-outline', self.up),
+            (get_icon('refresh'), 'info-outline', lambda: self.open(self.path_var.get(), refresh=True)),
+        ):
+            btn = ttk.Button(toolbar, text=text, bootstyle=style, command=command, width=3)
+            btn.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        self.path_var = ttk.StringVar()
+        path_entry = ttk.Entry(toolbar, textvariable=self.path_var, font=get_font('body'))
+        path_entry.pack(side=LEFT, fill=X, expand=YES, padx=(get_spacing('xs'), get_spacing('sm')))
+        path_entry.bind('<Return>', lambda e: self.open(self.path_var.get()))
+
+        self.cancel_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('error')} Cancel",
+            bootstyle='danger-outline',
+            command=self.cancel,
+            state=DISABLED,
+            width=10
+        )
+        self.cancel_btn.pack(side=LEFT)
+
+        # Listing
+        self.grid = ResultGrid(self, on_heading_click=self.sort_by)
+        self.grid.pack(fill=BOTH, expand=YES)
+        self.grid.set_columns(COLUMNS)
+        self.grid.set_source(self.rows)
+        self.grid.tree.bind('<Double-1>', lambda e: self.activate())
+        self.grid.tree.bind('<Return>', lambda e: self.activate())
+        self.grid.tree.bind('<BackSpace>', lambda e: self.up())
+
+        self.status_label = ttk.Label(
+            self,
+            text="",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.status_label.pack(anchor=W, pady=(get_spacing('xs'), 0))
+
+    def open(self, path, refresh=False, remember=True):
+        """List a directory, cancelling any listing in progress"""
+        path = os.path.abspath(os.path.expanduser(path.strip() or '~'))
+        if self.scan is not None:
+            self.scan.cancel()
+            if remember and self.scan.listing.path != path:
+                self.history.append(self.scan.listing.path)
+
+        try:
+            scan = self.index.open(
+                path,
+                on_batch=lambda scan: self.scheduler.submit(
+                    ('file_listing', id(self)), self.show_progress, scan
+                ),
+                on_done=lambda scan: self.scheduler.submit(
+                    ('file_listing_done', id(self)), self.show_done, scan
+                ),
+                refresh=refresh,
+            )
+        except OSError as error:
+            self.status_label.configure(text=f"{path}: {error.strerror or error}")
+            return
+
+        self.scan = scan
+        self.path_var.set(path)
+        self.rows.listing = scan.listing
+        self.show_headings()
+        self.grid.set_source(self.rows)
+        if scan.stats.done:
+            self.show_done(scan)
+        else:
+            self.cancel_btn.configure(state=NORMAL)
+            self.status_label.configure(text="Listing...")
+
+    def show_progress(self, scan):
+        """Refresh the visible rows while entries stream in (Tk thread)"""
+        if scan is not self.scan or scan.stats.done:
+            return
+        self.grid.refresh()
+        stats = scan.stats
+        text = f"{stats.entries:,} entries · {stats.entries_per_second:,.0f}/s"
+        if stats.scanned is not None:
+            text += f" · sizes {stats.stat:,}/{stats.entries:,}"
+        self.status_label.configure(text=text)
+
+    def show_done(self, scan):
+        """Show the final listing and its summary (Tk thread)"""
+        if scan is not self.scan:
+            return
+        self.cancel_btn.configure(state=DISABLED)
+        self.show_headings()
+        self.grid.refresh()
+
+        stats = scan.stats
+        if stats.error:
+            self.status_label.configure(text=f"Error: {stats.error}")
+            self.log(f"Listing {scan.listing.path} failed: {stats.error}", 'danger')
+            return
+
+        summary = scan.listing.summary()
+        text = (
+            f"{summary['folders']:,} folders · {summary['files']:,} files · "
+            f"{format_bytes(summary['bytes'])}"
+        )
+        if stats.cancelled:
+            text += f" · cancelled after {stats.entries:,} entries"
+        elif stats.cached:
+            text += " · cached"
+        else:
+            text += f" · first screen {stats.first_batch_ms:.0f} ms · listed in {stats.elapsed:.2f}s"
+        if scan.listing.truncated:
+            text += f" · truncated at {FILE_EXPLORER['max_entries']:,} entries"
+        self.status_label.configure(text=text)
+
+    def cancel(self):
+        """Stop the listing in progress, keeping what was read"""
+        if self.scan is not None:
+            self.scan.cancel()
+            self.status_label.configure(text="Cancelling...")
+
+    def show_headings(self):
+        """Mark the sorted column"""
+        listing = self.rows.listing
+        for position, heading in enumerate(COLUMNS):
+            if listing is not None and listing.sort_key == SORT_KEYS[position]:
+                heading = f"{heading} {'▼' if listing.descending else '▲'}"
+            self.grid.set_heading(position, heading)
+
+    def sort_by(self, position):
+        """Sort by a column; clicking the same heading again flips the direction"""
+        listing = self.rows.listing
+        if listing is None:
+            return
+        key = SORT_KEYS[position]
+        descending = listing.sort_key == key and not listing.descending
+        started = time.perf_counter()
+        if not listing.sort(key, descending):
+            self.status_label.configure(text="Sorting is available once the listing has finished")
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        self.show_headings()
+        self.grid.scroll_to(0)
+        self.status_label.configure(text=f"Sorted {len(listing):,} entries in {elapsed:.0f} ms")
+
+    def activate(self):
+        """Open the selected folder"""
+        position = self.grid.selected_position()
+        listing = self.rows.listing
+        if position is None or listing is None or position >= len(listing):
+            return
+        index = listing.index_at(position)
+        path = os.path.join(listing.path, listing.names[index])
+        if os.path.isdir(path):
+            self.open(path)
+
+    def up(self):
+        """Open the parent folder"""
+        if self.rows.listing is not None:
+            self.open(os.path.dirname(self.rows.listing.path))
+
+    def back(self):
+        """Return to the previously opened folder"""
+        if self.history:
+            self.open(self.history.pop(), remember=False)
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
+
+    def destroy(self):
+        if self.scan is not None:
+            self.scan.cancel()
+        super().destroy()
@@ -11,11 +11,15 @@ from config.theme import get_font, get_spacing, get_size, get_icon, get_color
 class Header(ttk.Frame):
     """Header component with title and action buttons"""
 
-    def __init__(self, parent, title="Dashboard Overview", breadcrumb="Home / Dashboard", **kwargs):
+    def __init__(self, parent, title="Dashboard Overview", breadcrumb="Home / Dashboard", on_search=None,
+                 on_alerts=None, **kwargs):
         super().__init__(parent, height=get_size('header_height'), **kwargs)
 
         self.title = title
         self.breadcrumb = breadcrumb
+        self.on_search = on_search
+        self.on_alerts = on_alerts
+        self.alert_counts = None
         self.pack_propagate(False)
 
         # Configure header background with a distinct color
@@ -66,18 +70,20 @@ class Header(ttk.Frame):
             right_frame,
             text=f"{get_icon('search')} Search",
             bootstyle='info',
-            width=12
+            width=12,
+            command=lambda: self.on_search() if self.on_search else None
         )
         search_btn.pack(side=LEFT, padx=get_spacing('xs'))
 
-        # Notifications button
-        notify_btn = ttk.Button(
+        # Notifications button, driven by the alerts engine
+        self.alerts_btn = ttk.Button(
             right_frame,
-            text=f"{get_icon('alert')} Alerts (3)",
-            bootstyle='warning',
-            width=12
+            text=f"{get_icon('alert')} Alerts (0)",
+            bootstyle='info',
+            width=12,
+            command=lambda: self.on_alerts() if self.on_alerts else None
         )
-        notify_btn.pack(side=LEFT, padx=get_spacing('xs'))
+        self.alerts_btn.pack(side=LEFT, padx=get_spacing('xs'))
 
         # Profile button
         profile_btn = ttk.Button(
@@ -88,6 +94,14 @@ class Header(ttk.Frame):
         )
         profile_btn.pack(side=LEFT, padx=get_spacing('xs'))
 
+    def set_alerts(self, count, critical=0):
+        """Show the number of firing alerts on the Alerts button"""
+        if (count, critical) == self.alert_counts:
+            return
+        self.alert_counts = (count, critical)
+        style = 'danger' if critical else 'warning' if count else 'info'
+        self.alerts_btn.configure(text=f"{get_icon('alert')} Alerts ({count})", bootstyle=style)
+
     def update_title(self, new_title, new_breadcrumb=None):
         """Update the header title and breadcrumb"""
         self.title = new_title
@@ -0,0 +1,277 @@
+"""
+Import Wizard Component
+Pick a CSV, JSONL or Parquet file, check the inferred columns, then load it into a table with live progress
+"""
+
+import os
+from tkinter import filedialog
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from core.database.importer import COLUMN_TYPES, default_table_name
+from utils.formatting import format_bytes, format_duration
+
+
+COLUMN_COLUMNS = (
+    ('name', 'Column', 200),
+    ('type', 'Type', 150),
+    ('sample', 'Sample values', 420),
+)
+
+FILE_TYPES = (
+    ('Data files', '*.csv *.tsv *.txt *.jsonl *.ndjson *.json *.parquet *.pq'),
+    ('All files', '*'),
+)
+
+SAMPLE_VALUES = 3
+
+
+def describe_progress(progress):
+    """One-line summary of an import progress snapshot"""
+    text = (
+        f"{progress['phase'].capitalize()} · {progress['rows']:,} rows · "
+        f"{progress['rows_per_second']:,.0f} rows/s · {progress['chunks_done']:,}/{progress['chunks']:,} chunks"
+    )
+    if progress['finished'] is not None:
+        text += f" in {format_duration(progress['elapsed'])}"
+        if progress['phase'] != 'complete':
+            text += f" · {progress['committed']:,} rows committed"
+    if progress['rejected']:
+        text += f" · {progress['rejected']:,} rejected"
+    if progress['error']:
+        text += f" · {progress['error']}"
+    return text
+
+
+class ImportWizard(ttk.Toplevel):
+    """Bulk import of one file into a table of a connection profile
+
+    Choosing a file samples it off the Tk thread; the preview lists each
+    column with the type it will be created with on the selected profile's
+    backend. Progress arrives through apply_progress from the view that
+    opened the window.
+    """
+
+    def __init__(self, parent, importer, profiles, scheduler, profile=None, **kwargs):
+        super().__init__(parent, title="Import Data", **kwargs)
+        self.geometry('860x620')
+
+        self.importer = importer
+        self.profiles = profiles
+        self.scheduler = scheduler
+        self.preview = None
+
+        self.setup_ui(profile)
+
+    def setup_ui(self, profile):
+        """Setup wizard UI"""
+        container = ttk.Frame(self, padding=get_spacing('lg'))
+        container.pack(fill=BOTH, expand=YES)
+
+        title_label = ttk.Label(
+            container,
+            text=f"{get_icon('import')} Import Data",
+            font=get_font('heading_medium'),
+        )
+        title_label.pack(anchor=W, pady=(0, get_spacing('md')))
+
+        # Source file
+        file_row = ttk.Frame(container)
+        file_row.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        file_label = ttk.Label(file_row, text="File", font=get_font('body'), width=11)
+        file_label.pack(side=LEFT)
+
+        self.path_var = ttk.StringVar()
+        path_entry = ttk.Entry(file_row, textvariable=self.path_var)
+        path_entry.pack(side=LEFT, fill=X, expand=YES, padx=(0, get_spacing('sm')))
+        path_entry.bind('<Return>', lambda e: self.load_preview())
+
+        browse_btn = ttk.Button(
+            file_row,
+            text=f"{get_icon('file')} Browse",
+            bootstyle='info-outline',
+            command=self.browse,
+            width=12
+        )
+        browse_btn.pack(side=LEFT, padx=(0, get_spacing('md')))
+
+        self.header_var = ttk.BooleanVar(value=True)
+        header_check = ttk.Checkbutton(
+            file_row,
+            text="Header row",
+            variable=self.header_var,
+            bootstyle='round-toggle',
+            command=self.load_preview
+        )
+        header_check.pack(side=LEFT)
+
+        # Target profile and table
+        target_row = ttk.Frame(container)
+        target_row.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        profile_label = ttk.Label(target_row, text="Connection", font=get_font('body'), width=11)
+        profile_label.pack(side=LEFT)
+
+        names = list(self.profiles)
+        self.profile_var = ttk.StringVar(value=profile if profile in self.profiles else (names[0] if names else ''))
+        profile_combo = ttk.Combobox(
+            target_row,
+            textvariable=self.profile_var,
+            values=names,
+            state='readonly',
+            width=24
+        )
+        profile_combo.pack(side=LEFT, padx=(0, get_spacing('md')))
+        profile_combo.bind('<<ComboboxSelected>>', lambda e: self.show_columns())
+
+        table_label = ttk.Label(target_row, text="Table", font=get_font('body'))
+        table_label.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        self.table_var = ttk.StringVar()
+        table_entry = ttk.Entry(target_row, textvariable=self.table_var, width=32)
+        table_entry.pack(side=LEFT)
+
+        # Inferred columns
+        self.summary_label = ttk.Label(
+            container,
+            text="Choose a CSV, JSONL or Parquet file",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.summary_label.pack(anchor=W, pady=(get_spacing('sm'), get_spacing('xs')))
+
+        self.columns = ttk.Treeview(
+            container,
+            columns=[column for column, _, _ in COLUMN_COLUMNS],
+            show='headings',
+            bootstyle='info'
+        )
+        for column, heading, width in COLUMN_COLUMNS:
+            self.columns.heading(column, text=heading)
+            self.columns.column(column, width=width, anchor=W)
+        self.columns.pack(fill=BOTH, expand=YES, pady=(0, get_spacing('md')))
+
+        # Progress and actions
+        self.progress_bar = ttk.Progressbar(container, bootstyle='success', maximum=100)
+        self.progress_bar.pack(fill=X, pady=(0, get_spacing('xs')))
+
+        self.status_label = ttk.Label(
+            container,
+            text="",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.status_label.pack(anchor=W, pady=(0, get_spacing('sm')))
+
+        actions = ttk.Frame(container)
+        actions.pack(fill=X)
+
+        self.import_btn = ttk.Button(
+            actions,
+            text=f"{get_icon('run')} Import",
+            bootstyle='success',
+            command=self.start_import,
+            state=DISABLED,
+            width=14
+        )
+        self.import_btn.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        self.cancel_btn = ttk.Button(
+            actions,
+            text="Cancel Import",
+            bootstyle='danger-outline',
+            command=self.importer.cancel,
+            state=NORMAL if self.importer.running else DISABLED,
+            width=14
+        )
+        self.cancel_btn.pack(side=LEFT)
+
+        close_btn = ttk.Button(actions, text="Close", bootstyle='secondary', command=self.destroy, width=10)
+        close_btn.pack(side=RIGHT)
+
+    def browse(self):
+        """Pick the file to import"""
+        path = filedialog.askopenfilename(parent=self, title="Import Data", filetypes=FILE_TYPES)
+        if path:
+            self.path_var.set(path)
+            self.table_var.set(default_table_name(path))
+            self.load_preview()
+
+    def load_preview(self):
+        """Sample the chosen file in the background"""
+        path = os.path.expanduser(self.path_var.get().strip())
+        if not path:
+            return
+        if not self.table_var.get().strip():
+            self.table_var.set(default_table_name(path))
+        self.preview = None
+        self.import_btn.configure(state=DISABLED)
+        self.summary_label.configure(text=f"Reading {os.path.basename(path)}...")
+        future = self.importer.inspect(path, self.header_var.get())
+        future.add_done_callback(
+            lambda completed: self.scheduler.submit(('import_preview', str(self)), self.show_preview, completed)
+        )
+
+    def show_preview(self, future):
+        """Show the sampled columns (Tk thread)"""
+        if not self.winfo_exists():
+            return
+        error = future.exception()
+        if error is not None:
+            self.summary_label.configure(text=f"Cannot read file: {error}")
+            self.columns.delete(*self.columns.get_children())
+            return
+        self.preview = future.result()
+        self.show_columns()
+        if not self.importer.running:
+            self.import_btn.configure(state=NORMAL)
+
+    def show_columns(self):
+        """List the columns with their types on the selected profile's backend"""
+        self.columns.delete(*self.columns.get_children())
+        preview = self.preview
+        if preview is None:
+            return
+        profile = self.profiles.get(self.profile_var.get())
+        types = COLUMN_TYPES.get(profile['backend'] if profile else 'postgres', COLUMN_TYPES['postgres'])
+
+        details = [preview['format'].upper(), format_bytes(preview['size']), f"{len(preview['names'])} columns",
+                   f"types from {len(preview['sample']):,} sample rows"]
+        if preview.get('delimiter') and preview['delimiter'] != ',':
+            details.append(f"delimiter {preview['delimiter']!r}")
+        if preview.get('multiline'):
+            details.append("fields span lines, parsed as one chunk")
+        self.summary_label.configure(text=' · '.join(details))
+
+        for index, (name, kind) in enumerate(zip(preview['names'], preview['kinds'])):
+            values = [fields[index] for fields in preview['sample'] if index < len(fields)]
+            sample = ', '.join(str(value) for value in values[:SAMPLE_VALUES] if value not in (None, ''))
+            self.columns.insert('', END, values=(name, types[kind], sample[:200]))
+
+    def start_import(self):
+        """Load the previewed file into the table"""
+        table = self.table_var.get().strip()
+        profile = self.profile_var.get()
+        if self.preview is None or not table or not profile:
+            return
+        try:
+            self.importer.start(profile, table, self.preview)
+        except RuntimeError as error:
+            self.status_label.configure(text=str(error))
+            return
+        self.import_btn.configure(state=DISABLED)
+        self.cancel_btn.configure(state=NORMAL)
+        self.progress_bar.configure(value=0)
+        self.status_label.configure(text=f"Importing into {table}...")
+
+    def apply_progress(self, progress):
+        """Show an import progress snapshot (Tk thread)"""
+        self.progress_bar.configure(value=round(progress['fraction'] * 100))
+        self.status_label.configure(text=describe_progress(progress))
+        if progress['finished'] is not None:
+            self.cancel_btn.configure(state=DISABLED)
+            if progress['rejects_path']:
+                self.status_label.configure(text=f"{describe_progress(progress)} · see {progress['rejects_path']}")
+            if self.preview is not None:
+                self.import_btn.configure(state=NORMAL)
@@ -0,0 +1,444 @@
+"""
+Logs Viewer Component
+Memory-mapped log viewer with instant jumps to any line or time, tail-follow and search across logs
+"""
+
+import os
+import threading
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from config.settings import LOGS_VIEWER, LOG_SEARCH
+from core.logs.log_file import LogFile, parse_time_query
+from core.logs.search import QueryError
+from ui.widgets.result_grid import ResultGrid
+from ui.widgets.virtual_text import VirtualText
+from utils.formatting import format_bytes, format_duration, format_rate
+
+
+OPEN_LOG_SCOPE = "Open log"
+
+SEARCH_HINT = 'words · "phrase" · /regex/ · -exclude · level=error status>=500 req.path~^/api'
+
+
+class SearchHits:
+    """Grid source over the hits of a LogSearch, read while it runs"""
+
+    def __init__(self):
+        self.search = None
+
+    def __len__(self):
+        return len(self.search.hits) if self.search is not None else 0
+
+    def hit(self, position):
+        """(path, 0-based line or None) of a hit"""
+        hit = self.search.hits[position]
+        return self.search.paths[hit[0]], self.search.line_number(hit)
+
+    def rows(self, start, stop):
+        rows = []
+        for hit in self.search.hits[start:stop]:
+            line = self.search.line_number(hit)
+            rows.append((
+                os.path.basename(self.search.paths[hit[0]]),
+                f"{line + 1:,}" if line is not None else "…",
+                hit[4],
+            ))
+        return rows
+
+
+class LogsViewerView(ttk.Frame):
+    """Viewer of one log file and its rotated segments
+
+    The file is opened as a LogFile, whose index is built in the
+    background; lines are readable (and the end of the live file shown)
+    long before indexing finishes. While following, a poll picks up
+    appended lines without re-reading the file; a rotated file is
+    reopened. Searches run on the app's LogSearcher and their hits stream
+    into a grid below the text; opening a hit shows it in context.
+    """
+
+    def __init__(self, parent, searcher, scheduler, on_activity=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.searcher = searcher
+        self.scheduler = scheduler
+        self.on_activity = on_activity
+        self.log_file = None
+        self.progress = None
+        self.follow_job = None
+        self.known_lines = 0
+        self.generation = 0
+        self.hits = SearchHits()
+        self.pending_hit = None
+
+        self.setup_ui()
+        default = next((path for path in LOGS_VIEWER['paths'] if os.path.isfile(path)), None)
+        if default:
+            self.open(default)
+
+    def setup_ui(self):
+        """Setup Logs Viewer UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('logs')} Logs Viewer",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W, pady=(0, get_spacing('md')))
+
+        # File
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=X, pady=(0, get_spacing('xs')))
+
+        self.path_var = ttk.StringVar()
+        path_box = ttk.Combobox(
+            toolbar,
+            textvariable=self.path_var,
+            values=LOGS_VIEWER['paths'],
+            font=get_font('body')
+        )
+        path_box.pack(side=LEFT, fill=X, expand=YES, padx=(0, get_spacing('sm')))
+        path_box.bind('<Return>', lambda e: self.open(self.path_var.get()))
+        path_box.bind('<<ComboboxSelected>>', lambda e: self.open(self.path_var.get()))
+
+        open_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('file')} Open",
+            bootstyle='primary',
+            command=lambda: self.open(self.path_var.get()),
+            width=10
+        )
+        open_btn.pack(side=LEFT)
+
+        # Navigation
+        navigation = ttk.Frame(self)
+        navigation.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        ttk.Label(navigation, text="Line", font=get_font('body_small')).pack(side=LEFT)
+        self.line_var = ttk.StringVar()
+        line_entry = ttk.Entry(navigation, textvariable=self.line_var, width=14, font=get_font('body'))
+        line_entry.pack(side=LEFT, padx=(get_spacing('xs'), get_spacing('md')))
+        line_entry.bind('<Return>', lambda e: self.go_to_line())
+
+        ttk.Label(navigation, text="Time", font=get_font('body_small')).pack(side=LEFT)
+        self.time_var = ttk.StringVar()
+        time_entry = ttk.Entry(navigation, textvariable=self.time_var, width=20, font=get_font('body'))
+        time_entry.pack(side=LEFT, padx=(get_spacing('xs'), get_spacing('md')))
+        time_entry.bind('<Return>', lambda e: self.go_to_time())
+
+        ttk.Button(
+            navigation,
+            text="Top",
+            bootstyle='secondary-outline',
+            command=lambda: self.text.scroll_to(0),
+            width=6
+        ).pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        self.follow_var = ttk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            navigation,
+            text="Follow",
+            variable=self.follow_var,
+            bootstyle='round-toggle',
+            command=self.toggle_follow
+        ).pack(side=LEFT, padx=(get_spacing('sm'), 0))
+
+        hint_label = ttk.Label(
+            navigation,
+            text="time: 2024-01-31 12:00 · 12:00 · -15m",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        hint_label.pack(side=RIGHT)
+
+        # Search
+        search_row = ttk.Frame(self)
+        search_row.pack(fill=X, pady=(0, get_spacing('xs')))
+
+        self.scope_var = ttk.StringVar(value=OPEN_LOG_SCOPE)
+        ttk.Combobox(
+            search_row,
+            textvariable=self.scope_var,
+            values=[OPEN_LOG_SCOPE] + LOG_SEARCH['scopes'],
+            width=28,
+            font=get_font('body')
+        ).pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        self.query_var = ttk.StringVar()
+        query_entry = ttk.Entry(search_row, textvariable=self.query_var, font=get_font('body'))
+        query_entry.pack(side=LEFT, fill=X, expand=YES, padx=(0, get_spacing('sm')))
+        query_entry.bind('<Return>', lambda e: self.run_search())
+
+        self.search_btn = ttk.Button(
+            search_row,
+            text=f"{get_icon('search')} Search",
+            bootstyle='info',
+            command=self.run_search,
+            width=10
+        )
+        self.search_btn.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        self.cancel_btn = ttk.Button(
+            search_row,
+            text="Cancel",
+            bootstyle='secondary-outline',
+            command=self.searcher.cancel,
+            state=DISABLED,
+            width=8
+        )
+        self.cancel_btn.pack(side=LEFT)
+
+        search_hint = ttk.Label(
+            self,
+            text=SEARCH_HINT,
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        search_hint.pack(anchor=W, pady=(0, get_spacing('sm')))
+
+        # Lines above search hits
+        panes = ttk.Panedwindow(self, orient=VERTICAL)
+        panes.pack(fill=BOTH, expand=YES)
+
+        self.text = VirtualText(panes, on_follow=self.follow_var.set)
+        panes.add(self.text, weight=3)
+
+        self.results = ResultGrid(panes)
+        self.results.set_columns(('File', 'Line', 'Text'))
+        self.results.tree.column('c2', width=900, stretch=True)
+        self.results.set_source(self.hits)
+        self.results.tree.bind('<Double-1>', lambda e: self.open_hit())
+        self.results.tree.bind('<Return>', lambda e: self.open_hit())
+        panes.add(self.results, weight=1)
+
+        status_row = ttk.Frame(self)
+        status_row.pack(fill=X, pady=(get_spacing('xs'), 0))
+
+        self.status_label = ttk.Label(
+            status_row,
+            text="No log open",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.status_label.pack(side=LEFT)
+
+        self.search_label = ttk.Label(
+            status_row,
+            text="",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.search_label.pack(side=LEFT, padx=(get_spacing('lg'), 0))
+
+        self.index_label = ttk.Label(
+            status_row,
+            text="",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.index_label.pack(side=RIGHT)
+
+    def open(self, path):
+        """Open a log file (and its rotated segments)"""
+        path = os.path.expanduser(path.strip())
+        if not path:
+            return
+        generation = self.generation + 1
+        try:
+            log_file = LogFile(
+                path,
+                LOGS_VIEWER,
+                on_progress=lambda progress: self.scheduler.submit(
+                    ('log_index', id(self)), self.apply_progress, generation, progress
+                )
+            )
+        except OSError as error:
+            self.status_label.configure(text=f"Cannot open {path}: {error.strerror or error}")
+            return
+
+        self.close_log()
+        self.generation = generation
+        self.pending_hit = None
+        self.log_file = log_file
+        self.path_var.set(log_file.path)
+        self.known_lines = len(log_file)
+        self.text.follow = self.follow_var.get()
+        self.text.set_source(log_file)
+        if self.text.follow:
+            self.text.source_grew()
+        self.update_status()
+        self.schedule_follow()
+
+    def apply_progress(self, generation, progress):
+        """Show indexing progress and newly indexed lines (Tk thread)"""
+        if generation != self.generation or self.log_file is None:
+            return
+        self.progress = progress
+        if progress['lines'] != self.known_lines:
+            self.known_lines = progress['lines']
+            self.text.source_grew()
+        if self.pending_hit is not None:
+            # Line numbers settle once older segments are counted
+            self.show_line(*self.pending_hit)
+            if not progress['indexing']:
+                self.pending_hit = None
+        self.update_status()
+
+    def update_status(self):
+        log_file = self.log_file
+        if log_file is None:
+            return
+        segments = len(log_file.segments)
+        text = f"{len(log_file):,} lines"
+        if segments > 1:
+            text += f" in {segments} segments"
+        text += f" · index {format_bytes(log_file.memory_bytes())}"
+        self.status_label.configure(text=text)
+
+        progress = self.progress
+        if progress is None:
+            self.index_label.configure(text="Indexing...")
+        elif progress['error']:
+            self.index_label.configure(text=f"Index failed: {progress['error']}")
+        elif progress['indexing']:
+            share = progress['indexed'] / progress['total'] if progress['total'] else 0
+            self.index_label.configure(
+                text=f"Indexing {min(share, 1.0):.0%} · {format_bytes(progress['bytes_per_second'])}/s"
+            )
+        else:
+            self.index_label.configure(text=f"Indexed {format_bytes(progress['indexed'])}")
+
+    def go_to_line(self):
+        """Jump to the line typed in the line box (1-based)"""
+        if self.log_file is None:
+            return
+        try:
+            line = int(self.line_var.get().replace(',', '').strip())
+        except ValueError:
+            self.status_label.configure(text="Line must be a number")
+            return
+        self.text.scroll_to(max(0, line - 1), mark=True)
+
+    def go_to_time(self):
+        """Jump to the first line at or after the time typed in the time box"""
+        if self.log_file is None:
+            return
+        when = parse_time_query(self.time_var.get())
+        if when is None:
+            self.status_label.configure(text="Time must look like 2024-01-31 12:00, 12:00 or -15m")
+            return
+        line = self.log_file.find_time(when)
+        self.text.scroll_to(line, mark=True)
+
+    def run_search(self):
+        """Search the open log or the chosen scope"""
+        scope = self.scope_var.get().strip()
+        if scope == OPEN_LOG_SCOPE:
+            if self.log_file is None:
+                self.status_label.configure(text="Open a log or pick a scope to search")
+                return
+            patterns = [self.log_file.path]
+        else:
+            patterns = [pattern for pattern in scope.split(',') if pattern.strip()]
+        try:
+            search = self.searcher.search(self.query_var.get(), patterns)
+        except QueryError as error:
+            self.search_status(str(error))
+            return
+        self.hits.search = search
+        self.results.scroll_to(0)
+        self.cancel_btn.configure(state=NORMAL)
+        self.search_status(f"Searching {len(search.paths):,} files...")
+
+    def apply_search_progress(self, progress):
+        """Show streamed hits and search progress (Tk thread)"""
+        search = self.hits.search
+        if search is None or progress['query'] != search.query.text:
+            return
+        self.results.refresh()
+        text = (
+            f"{progress['hits']:,} hits in {progress['files']:,} files · "
+            f"{format_bytes(progress['scanned'])} of {format_bytes(progress['bytes'])} · "
+            f"{format_rate(progress['bytes_per_second'])}"
+        )
+        if progress['finished'] is not None:
+            self.cancel_btn.configure(state=DISABLED)
+            if progress['phase'] == 'failed':
+                text = f"Search failed: {progress['error']}"
+            else:
+                text += f" · {progress['phase']} in {format_duration(progress['elapsed'])}"
+                if progress['truncated']:
+                    text += f" · first {LOG_SEARCH['max_results']:,} hits"
+        self.search_status(text)
+
+    def search_status(self, text):
+        self.search_label.configure(text=text)
+
+    def open_hit(self):
+        """Show the selected hit in its log"""
+        position = self.results.selected_position()
+        if position is None or position >= len(self.hits):
+            return
+        path, line = self.hits.hit(position)
+        if line is None:
+            self.search_status("Line number pending until the earlier parts of the file are searched")
+            return
+        self.follow_var.set(False)
+        self.text.follow = False
+        if self.log_file is None or self.log_file.segment_line(path, line) is None:
+            self.open(path)
+        if self.progress is None or self.progress['indexing']:
+            self.pending_hit = (path, line)
+        self.show_line(path, line)
+
+    def show_line(self, path, line):
+        """Scroll to a line of one of the open log's segment files"""
+        if self.log_file is None:
+            return
+        target = self.log_file.segment_line(path, line)
+        if target is not None:
+            self.text.scroll_to(target, mark=True)
+
+    def toggle_follow(self):
+        """Start or stop following the end of the log"""
+        self.text.follow = self.follow_var.get()
+        if self.text.follow:
+            self.text.scroll_to(self.text.total)
+
+    def schedule_follow(self):
+        if self.follow_job is None:
+            self.follow_job = self.after(LOGS_VIEWER['follow_interval_ms'], self.poll)
+
+    def poll(self):
+        """Look for appended or rotated data in the live file"""
+        self.follow_job = None
+        log_file = self.log_file
+        if log_file is None:
+            return
+        change = log_file.refresh()
+        if change == 'rotated':
+            self.log(f"Log rotated, reopening {log_file.path}", 'info')
+            self.open(log_file.path)
+            return
+        self.schedule_follow()
+
+    def close_log(self):
+        if self.log_file is not None:
+            # Unmapping waits for the index thread; keep it off the Tk thread
+            threading.Thread(target=self.log_file.close, daemon=True).start()
+            self.log_file = None
+            self.progress = None
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
+
+    def destroy(self):
+        self.searcher.cancel()
+        if self.follow_job is not None:
+            self.after_cancel(self.follow_job)
+            self.follow_job = None
+        self.close_log()
+        super().destroy()
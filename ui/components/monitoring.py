@@ -0,0 +1,105 @@
+"""
+Monitoring Component
+Live charts of the system metrics over history kept in the time-series store
+"""
+
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from config.settings import MONITORING
+from ui.widgets.line_chart import LineChart
+from utils.formatting import format_percent, format_rate
+
+
+# (series, title, style, fixed value range, value format)
+CHARTS = (
+    ('system.cpu', 'CPU', 'info', (0, 100), format_percent),
+    ('system.memory', 'Memory', 'success', (0, 100), format_percent),
+    ('system.disk', 'Disk Busy', 'warning', (0, 100), format_percent),
+    ('system.disk_bps', 'Disk I/O', 'primary', None, format_rate),
+    ('system.network_bps', 'Network I/O', 'danger', None, format_rate),
+)
+
+
+class MonitoringView(ttk.Frame):
+    """One live chart per system metric
+
+    Picking a range loads its history from the store, already bucketed to
+    about the chart width; live samples are then appended to the charts as
+    they arrive, and each chart keeps following the newest point until it
+    is panned or zoomed.
+    """
+
+    def __init__(self, parent, store, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.store = store
+        self.charts = {}
+        self.range_var = ttk.StringVar(value=MONITORING['default_range'])
+
+        self.setup_ui()
+        self.load_history()
+
+    def setup_ui(self):
+        """Setup Monitoring UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('monitor')} Monitoring",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W)
+
+        subtitle_label = ttk.Label(
+            self,
+            text="Drag to pan, scroll to zoom, double-click to follow live data",
+            font=get_font('body'),
+            bootstyle='secondary'
+        )
+        subtitle_label.pack(anchor=W, pady=(get_spacing('xs'), get_spacing('md')))
+
+        # Range
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+        for label in MONITORING['ranges']:
+            button = ttk.Radiobutton(
+                toolbar,
+                text=label,
+                value=label,
+                variable=self.range_var,
+                bootstyle='info-outline-toolbutton',
+                command=self.load_history
+            )
+            button.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        # Charts, two per row
+        grid = ttk.Frame(self)
+        grid.pack(fill=BOTH, expand=YES)
+        for index, (series, title, style, y_range, format_value) in enumerate(CHARTS):
+            card = ttk.Labelframe(grid, text=title, bootstyle=style, padding=get_spacing('sm'))
+            card.grid(row=index // 2, column=index % 2, sticky=NSEW, padx=get_spacing('xs'), pady=get_spacing('xs'))
+            chart = LineChart(card, y_range=y_range, format_value=format_value, height=MONITORING['chart_height'])
+            chart.pack(fill=BOTH, expand=YES)
+            chart.add_series(series, style, max_gap=MONITORING['max_gap_s'])
+            self.charts[series] = chart
+        for column in range(2):
+            grid.columnconfigure(column, weight=1)
+        for row in range((len(CHARTS) + 1) // 2):
+            grid.rowconfigure(row, weight=1)
+
+    def load_history(self):
+        """Load the selected range from the store and follow it"""
+        span = MONITORING['ranges'][self.range_var.get()]
+        end = time.time()
+        for series, chart in self.charts.items():
+            history = self.store.query(series, end - span, end, MONITORING['max_points'])
+            # Join the buckets of coarse ranges, but not samples missed while the app was closed
+            chart.series[series].max_gap = max(MONITORING['max_gap_s'], history['step'] * 2)
+            chart.set_data(series, history['times'], history['min'], history['max'])
+            chart.follow(span)
+
+    def apply_metrics(self, sample):
+        """Append a live sample to the charts"""
+        for series, chart in self.charts.items():
+            chart.append(series, sample['time'], sample[series.split('.', 1)[1]])
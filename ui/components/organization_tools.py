@@ -0,0 +1,357 @@
+"""
+Organization Tools Component
+Rule-based file organization with a dry-run preview, journaled runs, undo and resume
+"""
+
+import os
+import threading
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from config.settings import ORGANIZER, ORGANIZATION_RULES
+from core.files.organizer import Journal, OrganizeJob, RuleError, RuleSet, build_plan
+from ui.widgets.result_grid import ResultGrid
+from utils.formatting import format_bytes, format_duration
+
+
+PLAN_COLUMNS = ('Action', 'File', 'Destination', 'Size', 'Rule')
+
+RULE_COLUMNS = (
+    ('match', 'Matches', 340),
+    ('action', 'Action', 260),
+)
+
+RUN_COLUMNS = (
+    ('started', 'Started', 140),
+    ('files', 'Files', 110),
+    ('status', 'Status', 110),
+)
+
+
+class PlanRows:
+    """Grid source over the operations of a Plan"""
+
+    def __init__(self):
+        self.plan = None
+
+    def __len__(self):
+        return len(self.plan) if self.plan is not None else 0
+
+    def rows(self, start, stop):
+        root = self.plan.root
+        rows = []
+        for action, source, destination, size, rule, same_device in self.plan.operations[start:stop]:
+            rows.append((
+                action if same_device or action == 'archive' else f"{action} (copy)",
+                os.path.relpath(source, root),
+                os.path.relpath(destination, root) if destination.startswith(root + os.sep) else destination,
+                format_bytes(size),
+                self.plan.rules[rule],
+            ))
+        return rows
+
+
+def describe_run(progress):
+    """One-line summary of an OrganizeJob progress snapshot"""
+    text = (
+        f"{progress['done']:,}/{progress['total']:,} files · {format_bytes(progress['bytes'])} · "
+        f"{progress['files_per_second']:,.0f} files/s"
+    )
+    if progress['renamed'] or progress['copied'] or progress['archived']:
+        text += (
+            f" · {progress['renamed']:,} renamed, {progress['copied']:,} copied across devices, "
+            f"{progress['archived']:,} archived"
+        )
+    if progress['errors']:
+        text += f" · {progress['errors']:,} failed"
+    if progress['error']:
+        text += f" · {progress['error']}"
+    phase = progress['phase']
+    if phase in ('moving', 'rolling back'):
+        return f"{phase.capitalize()}... {text}"
+    return f"{phase.capitalize()} in {format_duration(progress['elapsed'])} · {text}"
+
+
+class OrganizationToolsView(ttk.Frame):
+    """Preview and apply the organization rules to a folder
+
+    Preview walks the folder once on a worker thread and lists every planned
+    operation; Apply journals that plan and executes it. Any recent run can
+    be undone, and an interrupted one resumed, from its journal.
+    """
+
+    def __init__(self, parent, scheduler, on_activity=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.scheduler = scheduler
+        self.on_activity = on_activity
+        self.rows = PlanRows()
+        self.plan_cancel = None
+        self.job = None
+        self.runs = {}
+        try:
+            self.ruleset = RuleSet(ORGANIZATION_RULES)
+            self.rule_error = None
+        except RuleError as error:
+            self.ruleset = RuleSet([])
+            self.rule_error = str(error)
+
+        self.setup_ui()
+        self.load_runs()
+
+    def setup_ui(self):
+        """Setup Organization Tools UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('organize')} Organization Tools",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W, pady=(0, get_spacing('md')))
+
+        # Folder and actions
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        self.path_var = ttk.StringVar(value=os.path.expanduser(ORGANIZER['root']))
+        path_entry = ttk.Entry(toolbar, textvariable=self.path_var, font=get_font('body'))
+        path_entry.pack(side=LEFT, fill=X, expand=YES, padx=(0, get_spacing('sm')))
+        path_entry.bind('<Return>', lambda e: self.preview())
+
+        self.recursive_var = ttk.BooleanVar(value=ORGANIZER['recursive'])
+        recursive_check = ttk.Checkbutton(
+            toolbar, text="Subfolders", variable=self.recursive_var, bootstyle='round-toggle'
+        )
+        recursive_check.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        for attribute, text, style, command in (
+            ('preview_btn', f"{get_icon('search')} Preview", 'info-outline', self.preview),
+            ('apply_btn', f"{get_icon('run')} Apply", 'success', self.apply),
+            ('cancel_btn', f"{get_icon('error')} Cancel", 'danger-outline', self.cancel),
+        ):
+            button = ttk.Button(toolbar, text=text, bootstyle=style, command=command, width=11)
+            button.pack(side=LEFT, padx=(0, get_spacing('xs')))
+            setattr(self, attribute, button)
+        self.apply_btn.configure(state=DISABLED)
+        self.cancel_btn.configure(state=DISABLED)
+
+        # Rules, in the order they are tried
+        rules_card = ttk.Labelframe(self, text="Rules (first match wins)", bootstyle='info', padding=get_spacing('sm'))
+        rules_card.pack(fill=X, pady=(0, get_spacing('sm')))
+        rules = ttk.Treeview(
+            rules_card,
+            columns=[column for column, _, _ in RULE_COLUMNS],
+            height=min(6, max(1, len(self.ruleset))),
+            selectmode=NONE
+        )
+        rules.heading('#0', text='Rule')
+        rules.column('#0', width=180)
+        for column, heading, width in RULE_COLUMNS:
+            rules.heading(column, text=heading)
+            rules.column(column, width=width, anchor=W)
+        for rule in self.ruleset.rules:
+            rules.insert('', END, text=rule.name, values=(rule.describe(), f"{rule.action} → {rule.target}"))
+        rules.pack(fill=X)
+
+        # Planned operations
+        self.grid = ResultGrid(self)
+        self.grid.pack(fill=BOTH, expand=YES)
+        self.grid.set_columns(PLAN_COLUMNS)
+        self.grid.set_source(self.rows)
+
+        self.status_label = ttk.Label(
+            self,
+            text=self.rule_error or "Preview lists what the rules would do; nothing moves until Apply.",
+            font=get_font('body_small'),
+            bootstyle='danger' if self.rule_error else 'secondary'
+        )
+        self.status_label.pack(anchor=W, pady=(get_spacing('xs'), get_spacing('sm')))
+
+        # Recent runs
+        runs_card = ttk.Labelframe(self, text="Recent Runs", bootstyle='secondary', padding=get_spacing('sm'))
+        runs_card.pack(fill=X)
+
+        self.run_list = ttk.Treeview(
+            runs_card,
+            columns=[column for column, _, _ in RUN_COLUMNS],
+            height=4,
+            selectmode=BROWSE
+        )
+        self.run_list.heading('#0', text='Folder')
+        self.run_list.column('#0', width=320)
+        for column, heading, width in RUN_COLUMNS:
+            self.run_list.heading(column, text=heading)
+            self.run_list.column(column, width=width, anchor=W)
+        self.run_list.pack(side=LEFT, fill=X, expand=YES)
+
+        run_actions = ttk.Frame(runs_card)
+        run_actions.pack(side=LEFT, padx=(get_spacing('sm'), 0))
+        for text, style, mode in (("Undo", 'warning-outline', 'rollback'), ("Resume", 'info-outline', 'resume')):
+            button = ttk.Button(run_actions, text=text, bootstyle=style, width=9,
+                                command=lambda mode=mode: self.run_selected(mode))
+            button.pack(fill=X, pady=(0, get_spacing('xs')))
+
+    # Preview
+
+    def preview(self):
+        """Plan the rules over the folder on a worker thread"""
+        root = os.path.abspath(os.path.expanduser(self.path_var.get().strip() or '~'))
+        if not os.path.isdir(root):
+            self.status_label.configure(text=f"{root} is not a folder")
+            return
+        if self.busy():
+            return
+        cancel_event = threading.Event()
+        self.plan_cancel = cancel_event
+        recursive = self.recursive_var.get()
+        self.set_busy(True)
+        self.status_label.configure(text=f"Planning {root}...")
+
+        def plan_folder():
+            try:
+                plan, error = build_plan(root, self.ruleset, recursive, ORGANIZER['exclude'], cancel_event), None
+            except Exception as failure:
+                plan, error = None, failure
+            self.scheduler.submit(('organizer_plan', id(self)), self.show_plan, cancel_event, plan, error)
+
+        threading.Thread(target=plan_folder, name='organize-plan', daemon=True).start()
+
+    def show_plan(self, cancel_event, plan, error):
+        """Show a finished dry run (Tk thread)"""
+        if cancel_event is not self.plan_cancel:
+            return
+        self.plan_cancel = None
+        self.set_busy(False)
+        if error is not None:
+            self.status_label.configure(text=f"Planning failed: {error}")
+            return
+        if cancel_event.is_set():
+            self.status_label.configure(text="Preview cancelled")
+            return
+
+        self.rows.plan = plan
+        self.grid.scroll_to(0)
+        self.grid.refresh()
+        self.apply_btn.configure(state=NORMAL if len(plan) else DISABLED)
+        parts = [f"{name}: {files:,} ({format_bytes(size)})" for name, (files, size) in plan.summary().items()]
+        text = (
+            f"{len(plan):,} of {plan.scanned:,} files would change · {format_bytes(plan.bytes)} · "
+            f"planned in {plan.elapsed * 1000:.0f} ms"
+        )
+        if parts:
+            text += " · " + " · ".join(parts)
+        if plan.renamed:
+            text += f" · {plan.renamed:,} renamed to avoid overwriting"
+        self.status_label.configure(text=text)
+
+    # Runs
+
+    def apply(self):
+        """Journal the previewed plan and execute it"""
+        plan = self.rows.plan
+        if plan is None or not len(plan) or self.busy():
+            return
+        try:
+            journal = Journal.create(os.path.expanduser(ORGANIZER['journal_dir']), plan)
+        except OSError as error:
+            self.status_label.configure(text=f"Cannot write the journal: {error}")
+            return
+        self.rows.plan = None
+        self.grid.refresh()
+        self.apply_btn.configure(state=DISABLED)
+        self.start_job(journal, 'run')
+        self.log(f"Organizing {len(plan):,} files in {plan.root}", 'info')
+
+    def run_selected(self, mode):
+        """Undo or resume the selected run"""
+        selection = self.run_list.selection()
+        if not selection or self.busy():
+            return
+        journal, status = self.runs[selection[0]]
+        if mode == 'resume' and status in ('complete', 'rolled back'):
+            self.status_label.configure(text=f"That run is already {status}")
+            return
+        if mode == 'rollback' and status == 'rolled back':
+            self.status_label.configure(text="That run was already undone")
+            return
+        self.start_job(journal, mode)
+
+    def start_job(self, journal, mode):
+        self.set_busy(True)
+        job = OrganizeJob(
+            journal,
+            ORGANIZER,
+            mode=mode,
+            on_progress=lambda progress: self.scheduler.submit(
+                ('organizer_run', id(self)), self.apply_progress, job, progress
+            )
+        )
+        self.job = job.start()
+
+    def apply_progress(self, job, progress):
+        """Show run progress (Tk thread)"""
+        if job is not self.job:
+            return
+        self.status_label.configure(text=describe_run(progress))
+        if progress['finished'] is None:
+            return
+        self.job = None
+        self.set_busy(False)
+        self.load_runs()
+        status = {'complete': 'success', 'rolled back': 'warning', 'cancelled': 'warning'}.get(progress['phase'], 'danger')
+        self.log(
+            f"Organize run {progress['phase']}: {progress['done']:,} files, "
+            f"{progress['files_per_second']:,.0f} files/s",
+            status
+        )
+
+    def load_runs(self):
+        """List recent runs from their journals"""
+        self.run_list.delete(*self.run_list.get_children())
+        self.runs = {}
+        for journal, header, done, total, status in Journal.history(
+            os.path.expanduser(ORGANIZER['journal_dir']), ORGANIZER['history']
+        ):
+            iid = self.run_list.insert(
+                '', END,
+                text=header['root'],
+                values=(
+                    time.strftime('%Y-%m-%d %H:%M', time.localtime(header['created'])),
+                    f"{done:,}/{total:,}",
+                    status or 'interrupted',
+                )
+            )
+            self.runs[iid] = (journal, status)
+
+    # Helpers
+
+    def busy(self):
+        return self.plan_cancel is not None or self.job is not None
+
+    def set_busy(self, busy):
+        self.preview_btn.configure(state=DISABLED if busy else NORMAL)
+        self.cancel_btn.configure(state=NORMAL if busy else DISABLED)
+        if busy:
+            self.apply_btn.configure(state=DISABLED)
+
+    def cancel(self):
+        """Stop planning, or stop a run after its current batch"""
+        if self.plan_cancel is not None:
+            self.plan_cancel.set()
+        if self.job is not None:
+            self.job.cancel()
+        self.status_label.configure(text="Cancelling...")
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
+
+    def destroy(self):
+        # A run keeps going to its next batch boundary; its journal allows resuming
+        if self.plan_cancel is not None:
+            self.plan_cancel.set()
+        if self.job is not None:
+            self.job.cancel()
+        super().destroy()
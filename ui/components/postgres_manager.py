@@ -0,0 +1,199 @@
+"""
+Postgres Manager Component
+Connection profiles with live connection pool status, health checks and bulk imports
+"""
+
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+
+
+POOL_COLUMNS = (
+    ('profile', 'Profile', 160),
+    ('backend', 'Backend', 90),
+    ('size', 'Open', 60),
+    ('in_use', 'In Use', 60),
+    ('idle', 'Idle', 60),
+    ('waiting', 'Waiting', 70),
+    ('checkouts', 'Checkouts', 90),
+    ('wait_p50', 'Wait p50', 90),
+    ('wait_p99', 'Wait p99', 90),
+    ('saturation', 'Saturation', 90),
+    ('status', 'Status', 220),
+)
+
+
+class PostgresManagerView(ttk.Frame):
+    """Connection profiles and pool metrics"""
+
+    def __init__(self, parent, manager, scheduler, importer, on_activity=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.manager = manager
+        self.scheduler = scheduler
+        self.importer = importer
+        self.on_activity = on_activity
+        self.status = {}
+        self.pending = []
+        self.import_window = None
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup Postgres Manager UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('database')} Postgres Manager",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W)
+
+        subtitle_label = ttk.Label(
+            self,
+            text="Pooled connections per profile, health-checked in the background.",
+            font=get_font('body'),
+            bootstyle='secondary'
+        )
+        subtitle_label.pack(anchor=W, pady=(get_spacing('xs'), get_spacing('lg')))
+
+        # Profiles and pool status
+        pools_card = ttk.Labelframe(
+            self,
+            text=f"{get_icon('connect')} Connection Pools",
+            bootstyle='success',
+            padding=get_spacing('lg')
+        )
+        pools_card.pack(fill=BOTH, expand=YES)
+
+        actions = ttk.Frame(pools_card)
+        actions.pack(fill=X, pady=(0, get_spacing('md')))
+
+        for text, style, command in (
+            (f"{get_icon('connect')} Connect", 'primary', self.connect_selected),
+            (f"{get_icon('refresh')} Health Check", 'info', self.ping_selected),
+            (f"{get_icon('exit')} Close Pool", 'secondary', self.close_selected),
+            (f"{get_icon('import')} Import Data", 'success', self.open_import),
+        ):
+            btn = ttk.Button(actions, text=text, bootstyle=style, command=command, width=16)
+            btn.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        self.tree = ttk.Treeview(
+            pools_card,
+            columns=[column for column, _, _ in POOL_COLUMNS],
+            show='headings',
+            bootstyle='success'
+        )
+        for column, heading, width in POOL_COLUMNS:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=W if column in ('profile', 'status') else E)
+        self.tree.pack(fill=BOTH, expand=YES)
+
+        for name, profile in self.manager.profiles.items():
+            self.tree.insert('', END, iid=name, values=(name, profile['backend']) + ('',) * 8 + ('Not connected',))
+
+    def selected_profile(self):
+        """Return the selected profile name, defaulting to the first one"""
+        selection = self.tree.selection()
+        if selection:
+            return selection[0]
+        children = self.tree.get_children()
+        return children[0] if children else None
+
+    def track(self, future, profile_name, describe):
+        """Marshal a manager Future's outcome back to the Tk thread"""
+        self.pending.append(future)
+        def done(completed):
+            self.scheduler.submit(('pool_status', profile_name), self.show_result, profile_name, completed, describe)
+        future.add_done_callback(done)
+
+    def show_result(self, profile_name, future, describe):
+        """Show the outcome of a pool operation (Tk thread)"""
+        error = future.exception()
+        if error is not None:
+            self.status[profile_name] = f"Error: {error}"
+            self.log(f"{profile_name}: {error}", 'danger')
+        else:
+            self.status[profile_name] = describe(future.result())
+            self.log(f"{profile_name}: {self.status[profile_name]}", 'success')
+        self.tree.set(profile_name, 'status', self.status[profile_name])
+
+    def busy(self):
+        """Pool operations still to report keep the view from being evicted"""
+        self.pending = [future for future in self.pending if not future.done()]
+        return bool(self.pending)
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
+
+    def connect_selected(self):
+        """Open the pool of the selected profile"""
+        name = self.selected_profile()
+        if name:
+            self.tree.set(name, 'status', 'Connecting...')
+            self.track(self.manager.connect(name), name, lambda pool: 'Connected')
+
+    def ping_selected(self):
+        """Health-check the selected profile"""
+        name = self.selected_profile()
+        if name:
+            self.tree.set(name, 'status', 'Pinging...')
+            self.track(self.manager.ping(name), name, lambda ms: f"Healthy ({ms:.1f} ms)")
+
+    def close_selected(self):
+        """Close the pool of the selected profile"""
+        name = self.selected_profile()
+        if name:
+            self.track(self.manager.close_pool(name), name, lambda _: 'Not connected')
+
+    def open_import(self):
+        """Open (or raise) the import wizard, targeting the selected profile"""
+        if self.import_window is not None and self.import_window.winfo_exists():
+            self.import_window.lift()
+            return
+
+        from ui.components.import_wizard import ImportWizard
+
+        self.import_window = ImportWizard(
+            self.winfo_toplevel(),
+            self.importer,
+            self.manager.profiles,
+            self.scheduler,
+            profile=self.selected_profile()
+        )
+
+    def apply_import_progress(self, progress):
+        """Show a running import in its profile's status (Tk thread)"""
+        name = progress['profile']
+        if progress['finished'] is None:
+            self.status[name] = f"Importing into {progress['table']}: {progress['fraction']:.0%}"
+        else:
+            self.status[name] = f"Import into {progress['table']} {progress['phase']}"
+        if self.tree.exists(name):
+            self.tree.set(name, 'status', self.status[name])
+        if self.import_window is not None and self.import_window.winfo_exists():
+            self.import_window.apply_progress(progress)
+
+    def apply_metrics(self, metrics):
+        """Update pool rows in place from a metrics snapshot"""
+        for name in self.tree.get_children():
+            pool = metrics['pools'].get(name)
+            if pool is None:
+                status = self.status.get(name, 'Not connected')
+                self.tree.item(name, values=(name, self.manager.profiles[name]['backend']) + ('',) * 8 + (status,))
+                continue
+            self.tree.item(name, values=(
+                name,
+                self.manager.profiles[name]['backend'],
+                pool['size'],
+                pool['in_use'],
+                pool['idle'],
+                pool['waiting'],
+                pool['checkouts'],
+                f"{pool['wait_p50_ms']:.1f} ms",
+                f"{pool['wait_p99_ms']:.1f} ms",
+                f"{pool['saturation']:.0%}",
+                pool['last_error'] or self.status.get(name, 'Connected'),
+            ))
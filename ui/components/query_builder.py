@@ -0,0 +1,661 @@
+"""
+Query Builder Component
+SQL editor with streaming, cancellable execution into a virtualized result grid, plus plan capture and run history
+"""
+
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon, get_color
+from config.settings import QUERY_BUILDER, QUERY_PLANS, RESULT_CACHE
+from core.database.query_runner import QueryExecution
+from core.database.columnar import ColumnarResult, FILTER_OPS
+from core.database.plans import capture_plan
+from ui.widgets.result_grid import ResultGrid
+from utils.formatting import format_bytes, format_rate, format_time_ago
+
+
+# (heading, width) of the plan tree columns after the node itself
+PLAN_COLUMNS = (
+    ('Est. rows', 90),
+    ('Rows', 90),
+    ('Loops', 60),
+    ('Time ms', 80),
+    ('Self ms', 80),
+    ('Buffers hit/read', 120),
+    ('Flags', 260),
+    ('Detail', 420),
+)
+
+# (heading, PlanHistory order) of the top statements report
+TOP_COLUMNS = (
+    ('Statement', None),
+    ('Calls', 'calls'),
+    ('Total ms', 'total'),
+    ('Mean ms', 'mean'),
+    ('Max ms', 'max'),
+    ('Last ms', 'last'),
+    ('Rows', 'rows'),
+    ('Hot nodes', 'hot'),
+    ('Plan changes', 'changes'),
+    ('Regressions', 'regressions'),
+    ('Last run', 'recent'),
+)
+
+
+def format_count(value):
+    return '' if value is None else f"{value:,.0f}"
+
+
+def format_ms(value):
+    return '' if value is None else f"{value:,.1f}"
+
+
+class TopRows:
+    """Grid source over the rows of the top statements report"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __len__(self):
+        return len(self.queries)
+
+    def rows(self, start, stop):
+        now = time.time()
+        return [(
+            query['sql'],
+            f"{query['calls']:,}",
+            format_ms(query['total_ms']),
+            format_ms(query['total_ms'] / query['calls'] if query['calls'] else None),
+            format_ms(query['max_ms']),
+            format_ms(query['last_ms']),
+            f"{query['rows']:,}",
+            query['hot'] or '',
+            query['plan_changes'] or '',
+            query['regressions'] or '',
+            format_time_ago(now - query['last_run']) if query['last_run'] else '',
+        ) for query in self.queries[start:stop]]
+
+
+class QueryBuilderView(ttk.Frame):
+    """SQL editor plus streamed result grid
+
+    Every finished run is recorded in the plan history under the
+    fingerprint of its SQL. With "Capture plan" on, the statement is also
+    explained on the same connection and its plan is diffed against the
+    previous plan of that statement; the Top Statements tab ranks what
+    the history holds. With "Use cache" on, repeated reads come from the
+    app's result cache and never reach the database.
+    """
+
+    def __init__(self, parent, manager, scheduler, history, cache, on_activity=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.manager = manager
+        self.scheduler = scheduler
+        self.history = history
+        self.cache = cache
+        self.on_activity = on_activity
+        self.execution = None
+        self.result = ColumnarResult()
+        self.sort_column = None
+        self.sort_descending = False
+        self.top_rows = TopRows()
+        self.top_order = 'total'
+        self.top_descending = True
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup Query Builder UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('query')} Query Builder",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W, pady=(0, get_spacing('md')))
+
+        # Toolbar: profile selector, run and cancel
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        profile_label = ttk.Label(toolbar, text="Connection", font=get_font('body'))
+        profile_label.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        profiles = list(self.manager.profiles)
+        self.profile_var = ttk.StringVar(value=profiles[0] if profiles else '')
+        profile_combo = ttk.Combobox(
+            toolbar,
+            textvariable=self.profile_var,
+            values=profiles,
+            state='readonly',
+            width=24
+        )
+        profile_combo.pack(side=LEFT, padx=(0, get_spacing('md')))
+
+        self.run_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('run')} Run",
+            bootstyle='success',
+            command=self.run_query,
+            width=10
+        )
+        self.run_btn.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        self.cancel_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('error')} Cancel",
+            bootstyle='danger-outline',
+            command=self.cancel_query,
+            state=DISABLED,
+            width=10
+        )
+        self.cancel_btn.pack(side=LEFT, padx=(0, get_spacing('md')))
+
+        self.capture_var = ttk.BooleanVar(value=QUERY_PLANS['capture'])
+        capture_check = ttk.Checkbutton(
+            toolbar,
+            text="Capture plan",
+            variable=self.capture_var,
+            bootstyle='round-toggle'
+        )
+        capture_check.pack(side=LEFT, padx=(0, get_spacing('md')))
+
+        self.cache_var = ttk.BooleanVar(value=RESULT_CACHE['enabled'])
+        cache_check = ttk.Checkbutton(
+            toolbar,
+            text="Use cache",
+            variable=self.cache_var,
+            bootstyle='round-toggle'
+        )
+        cache_check.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        clear_cache_btn = ttk.Button(
+            toolbar,
+            text="Clear Cache",
+            bootstyle='secondary-outline',
+            command=self.clear_cache
+        )
+        clear_cache_btn.pack(side=LEFT, padx=(0, get_spacing('md')))
+
+        self.cache_label = ttk.Label(toolbar, text="", font=get_font('body_small'), bootstyle='secondary')
+        self.cache_label.pack(side=LEFT)
+
+        # SQL editor
+        self.editor = ttk.Text(self, height=8, font=('Courier', 11), wrap=NONE)
+        self.editor.pack(fill=X, pady=(0, get_spacing('sm')))
+        self.editor.insert('1.0', QUERY_BUILDER['default_sql'])
+        self.editor.bind('<Control-Return>', lambda e: self.run_query() or 'break')
+
+        # Progress line
+        self.status_label = ttk.Label(
+            self,
+            text="Ready",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.status_label.pack(anchor=W, pady=(0, get_spacing('sm')))
+
+        self.notebook = ttk.Notebook(self, bootstyle='info')
+        self.notebook.pack(fill=BOTH, expand=YES)
+
+        results_tab = ttk.Frame(self.notebook, padding=get_spacing('sm'))
+        self.notebook.add(results_tab, text="Results")
+
+        # Client-side filter and column summary over the fetched result
+        self.create_filter_bar(results_tab)
+
+        # Results
+        self.grid = ResultGrid(results_tab, on_heading_click=self.sort_by)
+        self.grid.pack(fill=BOTH, expand=YES)
+        self.grid.set_source(self.result)
+
+        self.plan_tab = ttk.Frame(self.notebook, padding=get_spacing('sm'))
+        self.notebook.add(self.plan_tab, text="Plan")
+        self.create_plan_tab(self.plan_tab)
+
+        self.top_tab = ttk.Frame(self.notebook, padding=get_spacing('sm'))
+        self.notebook.add(self.top_tab, text="Top Statements")
+        self.create_top_tab(self.top_tab)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+
+    def create_filter_bar(self, parent):
+        """Create the filter / summary toolbar"""
+        bar = ttk.Frame(parent)
+        bar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        self.filter_column = ttk.Combobox(bar, state='readonly', width=20)
+        self.filter_column.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        self.filter_op = ttk.Combobox(bar, values=FILTER_OPS, state='readonly', width=10)
+        self.filter_op.set('=')
+        self.filter_op.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        self.filter_value = ttk.Entry(bar, width=24)
+        self.filter_value.pack(side=LEFT, padx=(0, get_spacing('xs')))
+        self.filter_value.bind('<Return>', lambda e: self.apply_filter())
+
+        for text, style, command in (
+            ("Filter", 'primary-outline', self.apply_filter),
+            ("Clear", 'secondary-outline', self.clear_view),
+            ("Summary", 'info-outline', self.show_summary),
+            ("Group", 'info-outline', self.show_groups),
+        ):
+            btn = ttk.Button(bar, text=text, bootstyle=style, command=command, width=8)
+            btn.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+    def create_plan_tab(self, parent):
+        """Plan summary, node tree and changes since the previous plan"""
+        self.plan_label = ttk.Label(
+            parent,
+            text="Turn on Capture plan and run a statement to see its plan",
+            font=get_font('body_small'),
+            bootstyle='secondary',
+            wraplength=1000
+        )
+        self.plan_label.pack(anchor=W, pady=(0, get_spacing('sm')))
+
+        self.plan_tree = ttk.Treeview(parent, columns=[f"p{index}" for index in range(len(PLAN_COLUMNS))])
+        self.plan_tree.heading('#0', text='Node')
+        self.plan_tree.column('#0', width=320)
+        for index, (heading, width) in enumerate(PLAN_COLUMNS):
+            self.plan_tree.heading(f"p{index}", text=heading)
+            self.plan_tree.column(f"p{index}", width=width, anchor=W if index >= 6 else E, stretch=False)
+        self.plan_tree.tag_configure('hot', foreground=get_color('danger'))
+        self.plan_tree.tag_configure('new', background=get_color('border_light'))
+        self.plan_tree.pack(fill=BOTH, expand=YES)
+
+        self.changes_label = ttk.Label(
+            parent,
+            text="",
+            font=('Courier', 10),
+            bootstyle='warning',
+            justify=LEFT
+        )
+        self.changes_label.pack(anchor=W, pady=(get_spacing('sm'), 0))
+
+    def create_top_tab(self, parent):
+        """Toolbar and sortable grid of the statements in the history"""
+        toolbar = ttk.Frame(parent)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        self.top_label = ttk.Label(toolbar, text="", font=get_font('body_small'), bootstyle='secondary')
+        self.top_label.pack(side=LEFT)
+
+        clear_btn = ttk.Button(
+            toolbar,
+            text="Clear History",
+            bootstyle='danger-outline',
+            command=self.clear_history
+        )
+        clear_btn.pack(side=RIGHT)
+
+        refresh_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('refresh')} Refresh",
+            bootstyle='info-outline',
+            command=self.load_top
+        )
+        refresh_btn.pack(side=RIGHT, padx=(0, get_spacing('sm')))
+
+        self.top_grid = ResultGrid(parent, on_heading_click=self.sort_top)
+        self.top_grid.set_columns([heading for heading, _ in TOP_COLUMNS])
+        self.top_grid.tree.column('c0', width=480)
+        self.top_grid.set_source(self.top_rows)
+        self.top_grid.pack(fill=BOTH, expand=YES)
+        self.top_grid.tree.bind('<Double-1>', lambda e: self.open_top_statement())
+        self.top_grid.tree.bind('<Return>', lambda e: self.open_top_statement())
+
+    def run_query(self):
+        """Start streaming the editor's SQL"""
+        sql = self.editor.get('1.0', END).strip()
+        if not sql or not self.profile_var.get():
+            return
+        if self.execution is not None and not self.execution.stats.done:
+            self.execution.cancel()
+
+        self.result = ColumnarResult()
+        self.sort_column = None
+        self.grid.set_source(self.result)
+        self.status_label.configure(text="Running...")
+        self.run_btn.configure(state=DISABLED)
+        self.cancel_btn.configure(state=NORMAL)
+
+        execution = QueryExecution(
+            self.manager,
+            self.profile_var.get(),
+            sql,
+            batch_size=QUERY_BUILDER['batch_size'],
+            first_batch_size=QUERY_BUILDER['first_batch_size'],
+            max_rows=QUERY_BUILDER['max_buffered_rows'],
+            cache=self.cache,
+            use_cache=self.cache_var.get(),
+            result=self.result,
+        )
+        capture = self.capture_var.get()
+        execution.explain = lambda connection, backend: self.explain_run(execution, capture, connection, backend)
+        result = self.result
+        execution.on_columns = lambda columns: self.on_columns(execution, result, columns)
+        execution.on_batch = lambda rows: self.on_batch(execution, result, rows)
+        execution.on_done = lambda stats: self.scheduler.submit(
+            ('query_done', id(self)), self.show_done, execution
+        )
+        self.execution = execution.start()
+
+    def on_columns(self, execution, result, columns):
+        """Prepare the column store before the first batch (executor thread)"""
+        result.set_columns(columns)
+        self.scheduler.submit(('query_columns', id(self)), self.show_columns, execution, columns)
+
+    def on_batch(self, execution, result, rows):
+        """Store a fetched batch and schedule a redraw (executor thread)"""
+        result.append(rows)
+        self.scheduler.submit(('query_progress', id(self)), self.show_progress, execution)
+
+    def explain_run(self, execution, capture, connection, backend):
+        """Capture the plan of a finished run and record the run in the history (executor thread)"""
+        stats = execution.stats
+        elapsed_ms = stats.elapsed * 1000
+        rows = stats.rows if stats.rowcount is None else max(stats.rowcount, 0)
+        plan = None
+        try:
+            if capture:
+                plan = capture_plan(connection, backend, execution.sql, execution.params, QUERY_PLANS)
+        finally:
+            # A run whose plan could not be captured still counts
+            diff = self.history.record(execution.profile_name, execution.sql, elapsed_ms, rows, plan)
+        return plan, diff
+
+    def cancel_query(self):
+        """Cancel the running query"""
+        if self.execution is not None:
+            self.execution.cancel()
+            self.status_label.configure(text="Cancelling...")
+
+    def show_columns(self, execution, columns):
+        """Set grid columns once the statement has executed (Tk thread)"""
+        if execution is self.execution:
+            self.grid.set_columns(columns)
+            self.filter_column.configure(values=columns)
+            if columns:
+                self.filter_column.current(0)
+
+    def show_progress(self, execution):
+        """Refresh the visible rows and throughput (Tk thread)"""
+        if execution is not self.execution:
+            return
+        self.grid.refresh()
+        self.status_label.configure(text=self.describe(execution.stats))
+
+    def show_done(self, execution):
+        """Show the final outcome of a run (Tk thread)"""
+        if execution is not self.execution:
+            return
+        self.grid.refresh()
+        self.run_btn.configure(state=NORMAL)
+        self.cancel_btn.configure(state=DISABLED)
+
+        stats = execution.stats
+        if execution.cached is not None:
+            self.show_cached(execution)
+        elif stats.error:
+            self.status_label.configure(text=f"Error: {stats.error}")
+            self.log(f"Query failed: {stats.error}", 'danger')
+        elif stats.cancelled:
+            self.status_label.configure(text=f"Cancelled - {self.describe(stats)}")
+            self.log("Query cancelled", 'warning')
+        elif stats.rowcount is not None:
+            self.status_label.configure(text=f"{stats.rowcount} rows affected in {stats.elapsed:.2f}s")
+            self.log(f"Statement affected {stats.rowcount} rows", 'success')
+        else:
+            self.status_label.configure(text=self.describe(stats))
+            self.log(f"Query returned {stats.rows:,} rows", 'success')
+
+        if execution.plan_error:
+            self.plan_label.configure(text=f"Plan not captured: {execution.plan_error}", bootstyle='danger')
+        elif execution.plan is not None:
+            plan, diff = execution.plan
+            if plan is not None:
+                self.show_plan(plan, diff)
+                if diff and diff['regression']:
+                    self.log(f"Plan regression: {diff['regression']}", 'warning')
+        if self.notebook.select() == str(self.top_tab):
+            self.load_top()
+        self.show_cache_metrics()
+
+    def show_cached(self, execution):
+        """Show a result served by the cache (Tk thread)"""
+        self.result = execution.cached
+        columns = self.result.columns
+        self.grid.set_columns(columns)
+        self.grid.set_source(self.result)
+        self.filter_column.configure(values=columns)
+        if columns:
+            self.filter_column.current(0)
+        meta = execution.stats.cached
+        self.status_label.configure(
+            text=f"{meta['rows']:,} rows from cache in {execution.stats.elapsed * 1000:.0f} ms · "
+                 f"cached {format_time_ago(time.time() - meta['created'])} · "
+                 f"saved {format_bytes(meta['raw_bytes'])} and {meta['elapsed_ms'] / 1000:.2f}s"
+        )
+        self.log(f"Query returned {meta['rows']:,} cached rows", 'success')
+
+    def show_cache_metrics(self):
+        """Cache hit rate and savings in the toolbar"""
+        metrics = self.cache.metrics()
+        if not metrics['hits'] + metrics['misses']:
+            return
+        self.cache_label.configure(
+            text=f"{metrics['hit_rate']:.0%} hits ({metrics['hits']:,}/{metrics['hits'] + metrics['misses']:,}) · "
+                 f"{format_bytes(metrics['bytes_saved'])} saved · "
+                 f"{format_bytes(metrics['memory_bytes'])} in memory · {format_bytes(metrics['disk_bytes'])} on disk"
+        )
+
+    def clear_cache(self):
+        """Drop every cached result"""
+        self.cache.clear()
+        self.show_cache_metrics()
+        self.status_label.configure(text="Result cache cleared")
+
+    def busy(self):
+        """A streaming query keeps the view from being evicted"""
+        return self.query_running()
+
+    def query_running(self):
+        """Whether rows are still streaming in"""
+        return self.execution is not None and not self.execution.stats.done
+
+    def selected_column(self):
+        """Index of the column chosen in the filter bar"""
+        index = self.filter_column.current()
+        return index if index >= 0 else None
+
+    def sort_by(self, index):
+        """Sort by a column; clicking the same heading again flips the direction"""
+        if self.query_running():
+            self.status_label.configure(text="Sorting is available once the query has finished")
+            return
+
+        if self.sort_column is not None:
+            self.grid.set_heading(self.sort_column, self.result.columns[self.sort_column])
+        self.sort_descending = self.sort_column == index and not self.sort_descending
+        self.sort_column = index
+
+        started = time.perf_counter()
+        self.result.sort(index, descending=self.sort_descending)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        marker = '▼' if self.sort_descending else '▲'
+        self.grid.set_heading(index, f"{self.result.columns[index]} {marker}")
+        self.grid.scroll_to(0)
+        self.status_label.configure(text=f"Sorted {len(self.result):,} rows in {elapsed:.0f} ms")
+
+    def apply_filter(self):
+        """Filter the current view by the filter bar condition"""
+        index = self.selected_column()
+        if index is None or self.query_running():
+            return
+        started = time.perf_counter()
+        try:
+            matched = self.result.filter(index, self.filter_op.get(), self.filter_value.get())
+        except ValueError as error:
+            self.status_label.configure(text=f"Filter error: {error}")
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        self.grid.scroll_to(0)
+        self.status_label.configure(
+            text=f"{matched:,} of {self.result.row_count:,} rows match ({elapsed:.0f} ms)"
+        )
+
+    def clear_view(self):
+        """Drop sort and filters"""
+        if self.query_running():
+            return
+        if self.sort_column is not None:
+            self.grid.set_heading(self.sort_column, self.result.columns[self.sort_column])
+            self.sort_column = None
+        self.result.reset_view()
+        self.grid.scroll_to(0)
+        self.status_label.configure(text=f"{self.result.row_count:,} rows")
+
+    def show_summary(self):
+        """Show min/max/mean/distinct for the selected column"""
+        index = self.selected_column()
+        if index is None or self.query_running():
+            return
+        summary = self.result.summary(index)
+        text = (
+            f"{summary['column']}: {summary['count']:,} values · {summary['nulls']:,} nulls · "
+            f"{summary['distinct']:,} distinct · min {summary['min']} · max {summary['max']}"
+        )
+        if summary['mean'] is not None:
+            text += f" · mean {summary['mean']:.4g}"
+        self.status_label.configure(text=text)
+
+    def show_groups(self):
+        """Show the most frequent values of the selected column"""
+        index = self.selected_column()
+        if index is None or self.query_running():
+            return
+        groups = self.result.group_by(index, limit=8)
+        text = ", ".join(f"{'NULL' if value is None else value} ({count:,})" for value, count in groups)
+        self.status_label.configure(text=f"{self.result.columns[index]}: {text}")
+
+    def describe(self, stats):
+        """Format progress counters for the status line"""
+        text = (
+            f"{stats.rows:,} rows · {stats.rows_per_second:,.0f} rows/s · "
+            f"{format_bytes(stats.bytes)} · {format_rate(stats.bytes_per_second)} · "
+            f"{stats.elapsed:.2f}s"
+        )
+        if stats.first_row_ms is not None:
+            text += f" · first row {stats.first_row_ms:.0f} ms"
+        if stats.truncated:
+            text += f" · stopped at {QUERY_BUILDER['max_buffered_rows']:,} rows"
+        text += f" · {format_bytes(self.result.memory_bytes())} in memory"
+        return text
+
+    # Plans and history
+
+    def show_plan(self, plan, diff=None, regression=None):
+        """Show a plan tree, its hot nodes and what changed since the previous plan"""
+        self.plan_tree.delete(*self.plan_tree.get_children())
+        new_nodes = set(diff['new_nodes']) if diff else set()
+        parents = {}
+        for position, (depth, node) in enumerate(plan.walk()):
+            buffers = f"{node.hit or 0:,} / {node.read or 0:,}" if node.hit is not None else ''
+            tags = ('hot',) if node.flags else ()
+            if position in new_nodes:
+                tags += ('new',)
+            item = self.plan_tree.insert(
+                parents.get(depth - 1, ''), END,
+                text=node.label(),
+                values=(format_count(node.est_rows), format_count(node.rows), format_count(node.loops),
+                        format_ms(node.total_ms), format_ms(node.self_ms), buffers,
+                        '; '.join(node.flags), node.detail),
+                tags=tags,
+                open=True
+            )
+            parents[depth] = item
+
+        parts = []
+        if plan.execution_ms is not None:
+            parts.append(f"planning {plan.planning_ms:,.1f} ms · execution {plan.execution_ms:,.1f} ms")
+        elif not plan.analyzed:
+            parts.append("estimated plan (no timings)")
+        hot = len(plan.hot_nodes())
+        parts.append(f"{hot} hot node{'s' if hot != 1 else ''}" if hot else "no hot nodes")
+        if diff is not None:
+            parts.append("plan changed since the previous run" if diff['changed'] else "same plan as the previous run")
+            regression = diff['regression']
+        if regression:
+            parts.append(f"regression: {regression}")
+        self.plan_label.configure(text=' · '.join(parts), bootstyle='danger' if regression else 'secondary')
+        changes = diff['changes'] if diff else []
+        self.changes_label.configure(text='\n'.join(changes[:12] + (['…'] if len(changes) > 12 else [])))
+
+    def on_tab_changed(self, event):
+        if self.notebook.select() == str(self.top_tab):
+            self.load_top()
+
+    def load_top(self):
+        """Reload the top statements of the selected connection"""
+        profile = self.profile_var.get()
+        if not profile:
+            return
+        self.top_rows.queries = self.history.top(profile, self.top_order, self.top_descending,
+                                                 QUERY_PLANS['top_limit'])
+        self.top_grid.refresh()
+        total = sum(query['total_ms'] for query in self.top_rows.queries)
+        self.top_label.configure(
+            text=f"{len(self.top_rows.queries):,} statements on {profile} · {total / 1000:,.1f} s in total"
+                 " · double-click a statement for its latest plan"
+        )
+
+    def sort_top(self, index):
+        """Rank the report by a column; clicking it again flips the direction"""
+        order = TOP_COLUMNS[index][1]
+        if order is None:
+            return
+        previous = [position for position, (_, key) in enumerate(TOP_COLUMNS) if key == self.top_order][0]
+        self.top_grid.set_heading(previous, TOP_COLUMNS[previous][0])
+        self.top_descending = not self.top_descending if order == self.top_order else True
+        self.top_order = order
+        self.top_grid.set_heading(index, f"{TOP_COLUMNS[index][0]} {'▼' if self.top_descending else '▲'}")
+        self.top_grid.scroll_to(0)
+        self.load_top()
+
+    def open_top_statement(self):
+        """Put a reported statement in the editor and show its latest plan"""
+        position = self.top_grid.selected_position()
+        if position is None:
+            return
+        query = self.top_rows.queries[position]
+        self.editor.delete('1.0', END)
+        self.editor.insert('1.0', query['example'])
+        plan, regression = self.history.latest_plan(self.profile_var.get(), query['fingerprint'])
+        if plan is None:
+            self.plan_label.configure(text="No plan captured for this statement yet", bootstyle='secondary')
+            self.plan_tree.delete(*self.plan_tree.get_children())
+            self.changes_label.configure(text='')
+        else:
+            self.show_plan(plan, regression=regression)
+        self.notebook.select(self.plan_tab)
+
+    def clear_history(self):
+        """Forget the recorded statements of the selected connection"""
+        profile = self.profile_var.get()
+        if profile:
+            self.history.clear(profile)
+            self.load_top()
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
+
+    def destroy(self):
+        if self.execution is not None:
+            self.execution.cancel()
+        super().destroy()
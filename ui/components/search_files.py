@@ -0,0 +1,217 @@
+"""
+Search Files Component
+Instant search over the persistent file index, as you type
+"""
+
+import os
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from config.settings import SEARCH_INDEX
+from ui.widgets.result_grid import ResultGrid
+from utils.formatting import format_bytes
+
+
+COLUMNS = ('Name', 'Folder', 'Size', 'Modified')
+
+EXAMPLES = "e.g. *.sql >100MB this week · report ext:pdf · content:invoice · folders backup"
+
+
+class SearchRows:
+    """Grid source over the (folder, name, size, mtime, is_dir) rows of a search"""
+
+    def __init__(self):
+        self.hits = []
+
+    def __len__(self):
+        return len(self.hits)
+
+    def rows(self, start, stop):
+        rows = []
+        for folder, name, size, mtime, is_dir in self.hits[start:stop]:
+            rows.append((
+                f"{get_icon('file')} {name}" if is_dir else name,
+                folder,
+                '' if is_dir else format_bytes(size),
+                time.strftime('%Y-%m-%d %H:%M', time.localtime(mtime)),
+            ))
+        return rows
+
+
+class SearchFilesView(ttk.Frame):
+    """Search box and results over the app's FileIndexer
+
+    Queries run on the indexer's search thread once typing pauses; a newer
+    query supersedes the results of an older one still in flight. Opening a
+    result shows its folder in the File Explorer.
+    """
+
+    def __init__(self, parent, indexer, scheduler, on_activity=None, on_open=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.indexer = indexer
+        self.scheduler = scheduler
+        self.on_activity = on_activity
+        self.on_open = on_open
+        self.rows = SearchRows()
+        self.search_job = None
+        self.generation = 0
+
+        self.setup_ui()
+        self.apply_progress(indexer.progress.snapshot())
+
+    def setup_ui(self):
+        """Setup Search Files UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('search')} Search Files",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W, pady=(0, get_spacing('md')))
+
+        # Query
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=X, pady=(0, get_spacing('xs')))
+
+        self.query_var = ttk.StringVar()
+        self.query_entry = ttk.Entry(toolbar, textvariable=self.query_var, font=get_font('body'))
+        self.query_entry.pack(side=LEFT, fill=X, expand=YES, padx=(0, get_spacing('sm')))
+        self.query_entry.bind('<KeyRelease>', self.on_search_key)
+        self.query_entry.bind('<Return>', lambda e: self.run_search())
+
+        rebuild_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('refresh')} Rebuild Index",
+            bootstyle='info-outline',
+            command=self.rebuild,
+            width=15
+        )
+        rebuild_btn.pack(side=LEFT)
+
+        hint_label = ttk.Label(
+            self,
+            text=EXAMPLES,
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        hint_label.pack(anchor=W, pady=(0, get_spacing('sm')))
+
+        # Results
+        self.grid = ResultGrid(self)
+        self.grid.pack(fill=BOTH, expand=YES)
+        self.grid.set_columns(COLUMNS)
+        self.grid.set_source(self.rows)
+        self.grid.tree.bind('<Double-1>', lambda e: self.activate())
+        self.grid.tree.bind('<Return>', lambda e: self.activate())
+
+        status_row = ttk.Frame(self)
+        status_row.pack(fill=X, pady=(get_spacing('xs'), 0))
+
+        self.status_label = ttk.Label(
+            status_row,
+            text="",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.status_label.pack(side=LEFT)
+
+        self.index_label = ttk.Label(
+            status_row,
+            text="",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.index_label.pack(side=RIGHT)
+
+    def focus_query(self):
+        """Put the cursor in the search box"""
+        self.query_entry.focus_set()
+        self.query_entry.select_range(0, END)
+
+    def on_search_key(self, event):
+        """Debounce search while typing"""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_INDEX['search_delay_ms'], self.run_search)
+
+    def run_search(self):
+        """Submit the current query to the indexer"""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+            self.search_job = None
+        self.generation += 1
+        generation = self.generation
+        future = self.indexer.search(self.query_var.get())
+        future.add_done_callback(
+            lambda completed: self.scheduler.submit(
+                ('file_search', id(self)), self.show_results, generation, completed
+            )
+        )
+
+    def show_results(self, generation, future):
+        """Show the results of the latest query (Tk thread)"""
+        if generation != self.generation:
+            return
+        error = future.exception()
+        if error is not None:
+            self.status_label.configure(text=f"Search failed: {error}")
+            return
+
+        query, hits, seconds = future.result()
+        self.rows.hits = hits
+        self.grid.scroll_to(0)
+        self.grid.refresh()
+        if query.empty:
+            self.status_label.configure(text="")
+            return
+        limit = SEARCH_INDEX['result_limit']
+        count = f"first {limit:,} results" if len(hits) >= limit else f"{len(hits):,} results"
+        self.status_label.configure(text=f"{count} · {query.describe()} · {seconds * 1000:.0f} ms")
+
+    def apply_progress(self, progress):
+        """Show the state of the index (Tk thread)"""
+        phase = progress['phase']
+        if phase == 'building':
+            text = (
+                f"Indexing... {progress['entries']:,} entries in {progress['dirs']:,} folders · "
+                f"{progress['entries_per_second']:,.0f}/s"
+            )
+        elif phase == 'indexing':
+            text = f"Indexing names of {progress['entries']:,} entries..."
+        elif phase == 'failed':
+            text = f"Index failed: {progress['error']}"
+        elif phase == 'watching':
+            text = f"{progress['entries']:,} entries · {progress['watched']:,} folders watched"
+            if progress['polled']:
+                text += f" · {progress['polled']:,} polled"
+        else:
+            text = "Index not started"
+        self.index_label.configure(text=text)
+
+    def rebuild(self):
+        """Rebuild the index from scratch"""
+        self.indexer.start()
+        self.indexer.rebuild()
+        self.log("Rebuilding the file search index", 'info')
+
+    def activate(self):
+        """Open the folder of the selected result"""
+        position = self.grid.selected_position()
+        if position is None or position >= len(self.rows.hits):
+            return
+        folder, name, _, _, is_dir = self.rows.hits[position]
+        path = os.path.join(folder, name) if is_dir else folder
+        if self.on_open:
+            self.on_open(path)
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
+
+    def destroy(self):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        super().destroy()
@@ -0,0 +1,191 @@
+"""
+Service Manager Component
+Live status of the configured services with non-blocking start, stop and restart
+"""
+
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from ui.widgets.result_grid import ResultGrid
+from utils.formatting import format_duration
+
+
+COLUMNS = ('Service', 'State', 'Detail', 'Check', 'Latency', 'Checked', 'Every')
+
+STATE_MARKS = {
+    'running': '● running',
+    'stopped': '○ stopped',
+    'failed': '✖ failed',
+    'degraded': '◐ degraded',
+    'unknown': '? unknown',
+}
+
+
+class ServiceRows:
+    """Grid source over the services of the latest snapshot that match the filter"""
+
+    def __init__(self):
+        self.services = []
+
+    def __len__(self):
+        return len(self.services)
+
+    def rows(self, start, stop):
+        now = time.time()
+        rows = []
+        for service in self.services[start:stop]:
+            state = STATE_MARKS.get(service['state'], service['state'])
+            if service['flapping']:
+                state += ' (flapping)'
+            detail = service['detail']
+            if service['action']:
+                detail = service['action_step']
+            elif service['action_error']:
+                detail += f" · last action failed: {service['action_error']}"
+            rows.append((
+                service['name'],
+                state,
+                detail,
+                service['target'],
+                f"{service['latency_ms']:.1f} ms" if service['latency_ms'] is not None else '',
+                f"{format_duration(now - service['checked'])} ago" if service['checked'] else 'never',
+                f"{service['interval']:.1f}s",
+            ))
+        return rows
+
+
+class ServiceManagerView(ttk.Frame):
+    """Services and their states, as polled by the app's ServiceManager
+
+    Snapshots are applied at most once per frame; the grid is virtualized,
+    so hundreds of services cost the same as ten. Actions return at once
+    and their steps show in the Detail column until they finish.
+    """
+
+    def __init__(self, parent, manager, scheduler, on_activity=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.manager = manager
+        self.scheduler = scheduler
+        self.on_activity = on_activity
+        self.snapshot = None
+        self.pending = []
+        self.rows = ServiceRows()
+
+        self.setup_ui()
+        self.apply_snapshot(manager.snapshot())
+
+    def setup_ui(self):
+        """Setup Service Manager UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('service')} Service Manager",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W)
+
+        self.summary_label = ttk.Label(
+            self,
+            text="",
+            font=get_font('body'),
+            bootstyle='secondary'
+        )
+        self.summary_label.pack(anchor=W, pady=(get_spacing('xs'), get_spacing('md')))
+
+        # Filter and actions
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        self.filter_var = ttk.StringVar()
+        filter_entry = ttk.Entry(toolbar, textvariable=self.filter_var, font=get_font('body'))
+        filter_entry.pack(side=LEFT, fill=X, expand=YES, padx=(0, get_spacing('sm')))
+        filter_entry.bind('<KeyRelease>', lambda e: self.refilter())
+
+        for text, style, command in (
+            (f"{get_icon('run')} Start", 'success', lambda: self.act('start')),
+            ("Stop", 'danger', lambda: self.act('stop')),
+            (f"{get_icon('refresh')} Restart", 'warning', lambda: self.act('restart')),
+            ("Check Now", 'info-outline', self.check_now),
+        ):
+            btn = ttk.Button(toolbar, text=text, bootstyle=style, command=command, width=11)
+            btn.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        # Services
+        self.grid = ResultGrid(self)
+        self.grid.pack(fill=BOTH, expand=YES)
+        self.grid.set_columns(COLUMNS)
+        self.grid.tree.column('c2', width=280)
+        self.grid.tree.column('c3', width=260)
+        self.grid.set_source(self.rows)
+
+    def apply_snapshot(self, snapshot):
+        """Show the latest states (Tk thread)"""
+        self.snapshot = snapshot
+        totals = snapshot['totals']
+        parts = [f"{totals['running']}/{totals['total']} running"]
+        for key in ('stopped', 'failed', 'degraded', 'unknown', 'flapping', 'busy'):
+            if totals[key]:
+                parts.append(f"{totals[key]} {key}")
+        parts.append(f"{snapshot['checks']:,} checks")
+        self.summary_label.configure(text=" · ".join(parts))
+        self.refilter()
+
+    def refilter(self):
+        """Show the services whose name, check or state contain the filter text"""
+        if self.snapshot is None:
+            return
+        text = self.filter_var.get().strip().lower()
+        services = self.snapshot['services']
+        if text:
+            services = [
+                service for service in services
+                if text in service['name'].lower() or text in service['target'].lower() or text == service['state']
+            ]
+        self.rows.services = services
+        self.grid.refresh()
+
+    def selected_service(self):
+        """Name of the selected service, or None"""
+        position = self.grid.selected_position()
+        if position is None or position >= len(self.rows.services):
+            return None
+        return self.rows.services[position]['name']
+
+    def act(self, action):
+        """Start, stop or restart the selected service"""
+        name = self.selected_service()
+        if name is None:
+            return
+        future = getattr(self.manager, f"{action}_service")(name)
+        self.pending.append(future)
+        future.add_done_callback(
+            lambda completed: self.scheduler.submit(
+                ('service_action', name), self.action_done, name, action, completed
+            )
+        )
+        self.log(f"{action.capitalize()} requested for {name}", 'info')
+
+    def action_done(self, name, action, future):
+        """Report the outcome of an action (Tk thread)"""
+        error = future.exception()
+        if error is not None:
+            self.log(f"{action.capitalize()} of {name} failed: {error}", 'danger')
+        else:
+            self.log(f"{action.capitalize()} of {name} completed", 'success')
+
+    def check_now(self):
+        """Check the selected service, or all of them, right away"""
+        name = self.selected_service()
+        self.manager.check_now([name] if name else None)
+
+    def busy(self):
+        """Service actions still to report keep the view from being evicted"""
+        self.pending = [future for future in self.pending if not future.done()]
+        return bool(self.pending)
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
@@ -0,0 +1,375 @@
+"""
+Tables & Schemas Component
+Lazy catalog tree backed by the local catalog cache, with instant table/column search and bulk imports
+"""
+
+import time
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_font, get_spacing, get_icon
+from config.settings import CATALOG_CACHE
+from core.database.catalog import CatalogCache, cache_path
+from utils.formatting import format_time_ago
+
+
+DETAIL_COLUMNS = (
+    ('name', 'Column', 220),
+    ('type', 'Type', 180),
+    ('nullable', 'Nullable', 80),
+)
+
+
+class TablesSchemasView(ttk.Frame):
+    """Schema browser over the cached catalog of the selected profile
+
+    The tree is filled from the local cache file immediately; a background
+    refresh then re-reads only relations whose catalog marker changed.
+    """
+
+    def __init__(self, parent, manager, scheduler, importer, on_activity=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.manager = manager
+        self.scheduler = scheduler
+        self.importer = importer
+        self.on_activity = on_activity
+        self.caches = {}
+        self.refreshing = set()
+        self.search_job = None
+        self.import_window = None
+
+        self.setup_ui()
+        self.load_profile()
+
+    def setup_ui(self):
+        """Setup Tables & Schemas UI"""
+        # Title
+        title_label = ttk.Label(
+            self,
+            text=f"{get_icon('table')} Tables & Schemas",
+            font=get_font('heading_large'),
+        )
+        title_label.pack(anchor=W, pady=(0, get_spacing('md')))
+
+        # Toolbar: profile selector, refresh, import and search
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=X, pady=(0, get_spacing('sm')))
+
+        profile_label = ttk.Label(toolbar, text="Connection", font=get_font('body'))
+        profile_label.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        profiles = list(self.manager.profiles)
+        self.profile_var = ttk.StringVar(value=profiles[0] if profiles else '')
+        profile_combo = ttk.Combobox(
+            toolbar,
+            textvariable=self.profile_var,
+            values=profiles,
+            state='readonly',
+            width=24
+        )
+        profile_combo.pack(side=LEFT, padx=(0, get_spacing('md')))
+        profile_combo.bind('<<ComboboxSelected>>', lambda e: self.load_profile())
+
+        refresh_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('refresh')} Refresh",
+            bootstyle='info-outline',
+            command=lambda: self.refresh(force=True),
+            width=12
+        )
+        refresh_btn.pack(side=LEFT, padx=(0, get_spacing('sm')))
+
+        import_btn = ttk.Button(
+            toolbar,
+            text=f"{get_icon('import')} Import",
+            bootstyle='success-outline',
+            command=self.open_import,
+            width=12
+        )
+        import_btn.pack(side=LEFT, padx=(0, get_spacing('md')))
+
+        search_label = ttk.Label(toolbar, text=get_icon('search'), font=get_font('body'))
+        search_label.pack(side=LEFT, padx=(0, get_spacing('xs')))
+
+        self.search_var = ttk.StringVar()
+        search_entry = ttk.Entry(toolbar, textvariable=self.search_var, width=32)
+        search_entry.pack(side=LEFT)
+        search_entry.bind('<KeyRelease>', self.on_search_key)
+        search_entry.bind('<Escape>', lambda e: self.search_var.set('') or self.run_search())
+
+        # Status line
+        self.status_label = ttk.Label(
+            self,
+            text="",
+            font=get_font('body_small'),
+            bootstyle='secondary'
+        )
+        self.status_label.pack(anchor=W, pady=(0, get_spacing('sm')))
+
+        # Catalog tree / search results on the left, columns on the right
+        panes = ttk.Panedwindow(self, orient=HORIZONTAL)
+        panes.pack(fill=BOTH, expand=YES)
+
+        self.left = ttk.Frame(panes)
+        panes.add(self.left, weight=1)
+
+        self.tree = ttk.Treeview(self.left, columns=('info',), selectmode=BROWSE)
+        self.tree.heading('#0', text='Catalog')
+        self.tree.heading('info', text='Details')
+        self.tree.column('#0', width=320)
+        self.tree.column('info', width=140, anchor=E)
+        self.tree.bind('<<TreeviewOpen>>', self.on_open)
+        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        self.tree.pack(fill=BOTH, expand=YES)
+
+        self.results = ttk.Treeview(self.left, columns=('where',), selectmode=BROWSE)
+        self.results.heading('#0', text='Match')
+        self.results.heading('where', text='In')
+        self.results.column('#0', width=240)
+        self.results.column('where', width=220)
+        self.results.bind('<<TreeviewSelect>>', self.on_result_select)
+
+        details = ttk.Frame(panes)
+        panes.add(details, weight=1)
+
+        self.detail_label = ttk.Label(details, text="Select a table", font=get_font('heading_small'))
+        self.detail_label.pack(anchor=W, padx=get_spacing('sm'), pady=(0, get_spacing('sm')))
+
+        self.details = ttk.Treeview(
+            details,
+            columns=[column for column, _, _ in DETAIL_COLUMNS],
+            show='headings'
+        )
+        for column, heading, width in DETAIL_COLUMNS:
+            self.details.heading(column, text=heading)
+            self.details.column(column, width=width, anchor=W)
+        self.details.pack(fill=BOTH, expand=YES, padx=(get_spacing('sm'), 0))
+
+    @property
+    def cache(self):
+        """Catalog cache of the selected profile, opened on first use"""
+        profile_name = self.profile_var.get()
+        cache = self.caches.get(profile_name)
+        if cache is None:
+            cache = CatalogCache(
+                cache_path(CATALOG_CACHE['directory'], profile_name),
+                column_batch=CATALOG_CACHE['column_batch']
+            )
+            self.caches[profile_name] = cache
+        return cache
+
+    def load_profile(self):
+        """Show the cached catalog at once, then refresh it in the background"""
+        if not self.profile_var.get():
+            return
+        self.reload_tree()
+        self.refresh()
+
+    def refresh(self, force=False):
+        """Start an incremental catalog refresh for the selected profile"""
+        profile_name = self.profile_var.get()
+        if not profile_name or profile_name in self.refreshing:
+            return
+        self.refreshing.add(profile_name)
+        self.status_label.configure(text=f"Refreshing catalog of {profile_name}...")
+
+        cache = self.cache
+        future = self.manager.run_with_backend(profile_name, cache.refresh, force)
+        future.add_done_callback(
+            lambda completed: self.scheduler.submit(
+                ('catalog_refresh', profile_name), self.show_refresh, profile_name, completed
+            )
+        )
+
+    def show_refresh(self, profile_name, future):
+        """Apply the outcome of a refresh (Tk thread)"""
+        self.refreshing.discard(profile_name)
+        if profile_name != self.profile_var.get():
+            return
+
+        error = future.exception()
+        if error is not None:
+            self.status_label.configure(text=f"Refresh failed: {error} · {self.describe_cache()}")
+            self.log(f"{profile_name}: catalog refresh failed: {error}", 'danger')
+            return
+
+        stats = future.result()
+        if stats['skipped']:
+            self.status_label.configure(text=f"Catalog unchanged · {self.describe_cache()}")
+            return
+
+        self.reload_tree()
+        self.status_label.configure(text=(
+            f"{stats['relations']:,} relations · {stats['added']:,} added · "
+            f"{stats['changed']:,} changed · {stats['removed']:,} removed "
+            f"in {stats['elapsed']:.2f}s"
+        ))
+        if stats['added'] or stats['changed'] or stats['removed']:
+            self.log(f"{profile_name}: catalog cache updated", 'info')
+        if self.search_var.get().strip():
+            self.run_search()
+
+    def describe_cache(self):
+        """Cache summary for the status line"""
+        refreshed = self.cache.refreshed_at()
+        if refreshed is None:
+            return "not cached yet"
+        return f"cached {format_time_ago(time.time() - refreshed)}"
+
+    # Lazy tree
+
+    def reload_tree(self):
+        """Rebuild the top level (schemas); deeper levels load on expand"""
+        self.tree.delete(*self.tree.get_children())
+        for schema, count in self.cache.schemas():
+            node = self.tree.insert('', END, iid=f"schema:{schema}", text=schema, values=(f"{count:,} relations",))
+            self.tree.insert(node, END, iid=f"stub:{node}")
+
+    def on_open(self, event):
+        """Load the children of an expanded node on first expand"""
+        node = self.tree.focus()
+        stub = f"stub:{node}"
+        if not self.tree.exists(stub):
+            return
+        self.tree.delete(stub)
+        kind, _, key = node.partition(':')
+        if kind == 'schema':
+            self.load_relations(node, key, 0)
+        elif kind == 'rel':
+            self.load_column_nodes(node, int(key))
+
+    def load_relations(self, node, schema, offset):
+        """Insert one page of relations under a schema node"""
+        page_size = CATALOG_CACHE['page_size']
+        relations = self.cache.relations(schema, offset, page_size)
+        for relation_id, name, kind, row_estimate, column_count in relations:
+            info = f"{column_count} cols" if row_estimate is None else f"~{row_estimate:,.0f} rows"
+            child = self.tree.insert(
+                node, END, iid=f"rel:{relation_id}",
+                text=f"{get_icon('table')} {name}" if kind == 'table' else f"{name} ({kind})",
+                values=(info,)
+            )
+            self.tree.insert(child, END, iid=f"stub:{child}")
+        if len(relations) == page_size:
+            self.tree.insert(
+                node, END, iid=f"more:{offset + page_size}:{schema}",
+                text=f"Load {page_size} more...", values=('',)
+            )
+
+    def load_column_nodes(self, node, relation_id):
+        """Insert the columns of a relation node"""
+        for position, (name, type_name, nullable) in enumerate(self.cache.columns(relation_id)):
+            self.tree.insert(node, END, iid=f"col:{relation_id}:{position}", text=name, values=(type_name,))
+
+    def on_tree_select(self, event):
+        """Show details of the selected relation, or load the next page"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        node = selection[0]
+        kind, _, key = node.partition(':')
+        if kind == 'more':
+            offset, _, schema = key.partition(':')
+            parent = self.tree.parent(node)
+            self.tree.delete(node)
+            self.load_relations(parent, schema, int(offset))
+        elif kind == 'rel':
+            self.show_details(int(key))
+        elif kind == 'col':
+            self.show_details(int(key.split(':')[0]))
+
+    # Search
+
+    def on_search_key(self, event):
+        """Debounce search while typing"""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(CATALOG_CACHE['search_delay_ms'], self.run_search)
+
+    def run_search(self):
+        """Search cached table and column names; an empty query shows the tree"""
+        self.search_job = None
+        text = self.search_var.get().strip()
+        if not text:
+            self.results.pack_forget()
+            self.tree.pack(fill=BOTH, expand=YES)
+            return
+
+        started = time.perf_counter()
+        hits = self.cache.search(text, CATALOG_CACHE['search_limit'])
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.tree.pack_forget()
+        self.results.pack(fill=BOTH, expand=YES)
+        self.results.delete(*self.results.get_children())
+        for index, (relation_id, schema, relation, column) in enumerate(hits):
+            if column is None:
+                text, where = f"{get_icon('table')} {relation}", schema
+            else:
+                text, where = column, f"{schema}.{relation}"
+            self.results.insert('', END, iid=f"hit:{index}:{relation_id}", text=text, values=(where,))
+
+        more = "+" if len(hits) == CATALOG_CACHE['search_limit'] else ""
+        self.status_label.configure(text=f"{len(hits):,}{more} matches in {elapsed:.1f} ms")
+
+    def on_result_select(self, event):
+        """Show details of the selected search hit"""
+        selection = self.results.selection()
+        if selection:
+            self.show_details(int(selection[0].rsplit(':', 1)[1]))
+
+    def show_details(self, relation_id):
+        """Show the columns of a relation in the details pane"""
+        relation = self.cache.relation(relation_id)
+        if relation is None:
+            return
+        schema, name, kind, row_estimate, column_count = relation
+        title = f"{schema}.{name} · {kind} · {column_count} columns"
+        if row_estimate is not None:
+            title += f" · ~{row_estimate:,.0f} rows"
+        self.detail_label.configure(text=title)
+
+        self.details.delete(*self.details.get_children())
+        for column, type_name, nullable in self.cache.columns(relation_id):
+            self.details.insert('', END, values=(column, type_name, 'yes' if nullable else 'no'))
+
+    def open_import(self):
+        """Open (or raise) the import wizard, targeting the selected profile"""
+        if self.import_window is not None and self.import_window.winfo_exists():
+            self.import_window.lift()
+            return
+
+        from ui.components.import_wizard import ImportWizard
+
+        self.import_window = ImportWizard(
+            self.winfo_toplevel(),
+            self.importer,
+            self.manager.profiles,
+            self.scheduler,
+            profile=self.profile_var.get()
+        )
+
+    def apply_import_progress(self, progress):
+        """Show a running import of the selected profile; refresh the catalog once it ends (Tk thread)"""
+        if self.import_window is not None and self.import_window.winfo_exists():
+            self.import_window.apply_progress(progress)
+        if progress['profile'] != self.profile_var.get():
+            return
+        if progress['finished'] is None:
+            self.status_label.configure(text=(
+                f"Importing into {progress['table']}: {progress['rows']:,} rows · "
+                f"{progress['rows_per_second']:,.0f} rows/s"
+            ))
+        else:
+            # The table may be new
+            self.refresh()
+
+    def log(self, text, status):
+        """Forward an activity to the app"""
+        if self.on_activity:
+            self.on_activity(text, status)
+
+    def destroy(self):
+        for cache in self.caches.values():
+            cache.close()
+        super().destroy()
@@ -0,0 +1,141 @@
+"""
+Frame Scheduler
+Collects widget updates from any thread and applies them in batches on the Tk thread
+"""
+
+import logging
+import threading
+import time
+import tkinter
+
+
+logger = logging.getLogger(__name__)
+
+
+class FrameScheduler:
+    """Coalescing update scheduler that flushes at most once per frame
+
+    Producers call submit() from any thread with a key identifying the widget
+    (or widget property) being updated. Only the newest update per key is kept;
+    the Tk thread applies the dirty set on its next frame tick.
+    """
+
+    def __init__(self, root, frame_ms=16, idle_ms=50):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.idle_ms = idle_ms
+
+        self.lock = threading.Lock()
+        self.dirty = {}
+        self.running = False
+        self.after_id = None
+
+        # Counters
+        self.submitted = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+        self.deferred = 0
+        self.frames = 0
+        self.last_frame_ms = 0.0
+        self.max_frame_ms = 0.0
+        self.total_frame_ms = 0.0
+
+    def start(self):
+        """Start the frame tick (Tk thread)"""
+        if not self.running:
+            self.running = True
+            self.after_id = self.root.after(self.idle_ms, self.flush)
+
+    def stop(self):
+        """Stop the frame tick (Tk thread)"""
+        self.running = False
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def submit(self, key, func, *args):
+        """Queue func(*args) for the next frame, replacing any pending update for key"""
+        with self.lock:
+            self.submitted += 1
+            if key in self.dirty:
+                self.coalesced += 1
+            self.dirty[key] = (func, args)
+
+    def update_widget(self, widget, method, *args):
+        """Queue a call of a widget method, keyed on the widget and method name"""
+        self.submit((str(widget), method), getattr(widget, method), *args)
+
+    def discard(self, key):
+        """Drop a pending update"""
+        with self.lock:
+            if self.dirty.pop(key, None) is not None:
+                self.dropped += 1
+
+    def flush(self):
+        """Apply pending updates within the frame budget and reschedule"""
+        self.after_id = None
+        with self.lock:
+            batch, self.dirty = self.dirty, {}
+
+        try:
+            if batch:
+                self.apply(batch)
+        finally:
+            # A failing update must not stop the tick for every other one
+            if self.running:
+                with self.lock:
+                    pending = bool(self.dirty)
+                delay = self.frame_ms if pending or batch else self.idle_ms
+                self.after_id = self.root.after(delay, self.flush)
+
+    def apply(self, batch):
+        """Run one frame's updates, requeueing what does not fit in the budget"""
+        started = time.perf_counter()
+        deadline = started + self.frame_ms / 1000
+        items = iter(batch.items())
+        for key, (func, args) in items:
+            try:
+                func(*args)
+                self.applied += 1
+            except tkinter.TclError:
+                # Target widget was destroyed before the update landed
+                self.dropped += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("UI update %r failed", key)
+            if time.perf_counter() > deadline:
+                self.requeue(items)
+                break
+
+        self.frames += 1
+        self.last_frame_ms = (time.perf_counter() - started) * 1000
+        self.max_frame_ms = max(self.max_frame_ms, self.last_frame_ms)
+        self.total_frame_ms += self.last_frame_ms
+
+    def requeue(self, items):
+        """Return updates that did not fit in the frame budget to the dirty set"""
+        with self.lock:
+            for key, update in items:
+                # A newer update submitted meanwhile supersedes the leftover
+                if key in self.dirty:
+                    self.coalesced += 1
+                else:
+                    self.dirty[key] = update
+                self.deferred += 1
+
+    def stats(self):
+        """Return scheduler counters"""
+        return {
+            'submitted': self.submitted,
+            'applied': self.applied,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'deferred': self.deferred,
+            'frames': self.frames,
+            'last_frame_ms': self.last_frame_ms,
+            'max_frame_ms': self.max_frame_ms,
+            'avg_frame_ms': self.total_frame_ms / self.frames if self.frames else 0.0,
+        }
@@ -0,0 +1,178 @@
+"""
+View Registry
+Lazy view factories with an LRU cache of built views that are hidden and shown
+instead of being destroyed and rebuilt on every navigation
+"""
+
+import time
+from collections import OrderedDict
+from ttkbootstrap.constants import *
+
+
+def count_widgets(widget):
+    """Count a widget and all of its descendants"""
+    total = 1
+    stack = list(widget.winfo_children())
+    while stack:
+        child = stack.pop()
+        total += 1
+        stack.extend(child.winfo_children())
+    return total
+
+
+class CachedView:
+    """A built view held by the registry"""
+
+    __slots__ = ('name', 'widget', 'widget_count', 'keep_alive', 'build_ms')
+
+    def __init__(self, name, widget, widget_count, keep_alive, build_ms):
+        self.name = name
+        self.widget = widget
+        self.widget_count = widget_count
+        self.keep_alive = keep_alive
+        self.build_ms = build_ms
+
+
+class ViewRegistry:
+    """Registry of lazy view factories backed by an LRU cache of built views
+
+    A view whose widget has a busy() method returning True has work in
+    flight that still reports to it (a query stream, a running backup), so
+    it is not evicted until that work ends.
+    """
+
+    def __init__(self, container, max_views=8, max_widgets=2500, pack_options=None):
+        self.container = container
+        self.max_views = max_views
+        self.max_widgets = max_widgets
+        self.pack_options = pack_options or {'fill': BOTH, 'expand': YES}
+
+        self.factories = {}
+        self.keep_alive = set()
+        self.cache = OrderedDict()
+        self.eviction_hooks = []
+        self.active = None
+
+        # Counters
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'build_ms': {},
+            'switch_ms': {},
+        }
+
+    def register(self, name, factory, keep_alive=False):
+        """Register a factory that builds a view widget inside the container"""
+        self.factories[name] = factory
+        if keep_alive:
+            self.keep_alive.add(name)
+        else:
+            self.keep_alive.discard(name)
+
+    def add_eviction_hook(self, hook):
+        """Add a callback invoked as hook(name, widget) before a view is destroyed"""
+        self.eviction_hooks.append(hook)
+
+    def has_view(self, name):
+        """Check whether a factory is registered for a view"""
+        return name in self.factories
+
+    def get(self, name):
+        """Return the built widget for a view, or None when it is not cached"""
+        view = self.cache.get(name)
+        return view.widget if view is not None else None
+
+    @property
+    def widget_total(self):
+        """Total widget count across all cached views"""
+        return sum(view.widget_count for view in self.cache.values())
+
+    def show(self, name, fallback=None):
+        """Show a view, building it on first use, and hide the current one"""
+        started = time.perf_counter()
+
+        view = self.cache.get(name)
+        if view is not None:
+            self.stats['hits'] += 1
+            self.cache.move_to_end(name)
+        else:
+            self.stats['misses'] += 1
+            view = self._build(name, fallback)
+
+        if self.active is not None and self.active is not view:
+            self.active.widget.pack_forget()
+        if self.active is not view:
+            view.widget.pack(**self.pack_options)
+        self.active = view
+
+        self._enforce_budget()
+
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stats['switch_ms'][name] = elapsed
+        return view.widget
+
+    def _build(self, name, fallback):
+        """Build a view from its factory and add it to the cache"""
+        factory = self.factories.get(name)
+        if factory is None:
+            if fallback is None:
+                raise KeyError(f"No view registered for '{name}'")
+            factory = lambda: fallback(name)
+
+        started = time.perf_counter()
+        widget = factory()
+        build_ms = (time.perf_counter() - started) * 1000
+        self.stats['build_ms'][name] = build_ms
+
+        view = CachedView(
+            name,
+            widget,
+            count_widgets(widget),
+            name in self.keep_alive,
+            build_ms
+        )
+        self.cache[name] = view
+        return view
+
+    def refresh_size(self, name):
+        """Recount the widgets of a cached view after it grew or shrank"""
+        view = self.cache.get(name)
+        if view is not None:
+            view.widget_count = count_widgets(view.widget)
+            self._enforce_budget()
+
+    def _enforce_budget(self):
+        """Evict least recently used views until the cache fits its budget"""
+        while len(self.cache) > self.max_views or self.widget_total > self.max_widgets:
+            victim = None
+            for view in self.cache.values():
+                if view is not self.active and not view.keep_alive and not self.is_busy(view):
+                    victim = view
+                    break
+            if victim is None:
+                return
+            self.evict(victim.name)
+
+    @staticmethod
+    def is_busy(view):
+        """Whether a view has work in flight that still reports to it"""
+        busy = getattr(view.widget, 'busy', None)
+        return busy is not None and busy()
+
+    def evict(self, name):
+        """Destroy a cached view and notify the eviction hooks"""
+        view = self.cache.pop(name, None)
+        if view is None:
+            return
+        for hook in self.eviction_hooks:
+            hook(name, view.widget)
+        if view is self.active:
+            self.active = None
+        view.widget.destroy()
+        self.stats['evictions'] += 1
+
+    def clear(self):
+        """Destroy every cached view"""
+        for name in list(self.cache):
+            self.evict(name)
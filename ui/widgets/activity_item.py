@@ -24,32 +24,44 @@ class ActivityItem(ttk.Frame):
     def setup_ui(self):
         """Setup the activity item UI"""
         # Status indicator (colored dot)
-        indicator = ttk.Label(
+        self.indicator = ttk.Label(
             self,
             text="●",
             font=('Segoe UI', 16),
             bootstyle=self.status,
             foreground=get_color(self.status)
         )
-        indicator.pack(side=LEFT, padx=(0, get_spacing('md')))
+        self.indicator.pack(side=LEFT, padx=(0, get_spacing('md')))
 
         # Text container
         text_frame = ttk.Frame(self)
         text_frame.pack(side=LEFT, fill=X, expand=YES)
 
         # Activity text
-        activity_label = ttk.Label(
+        self.activity_label = ttk.Label(
             text_frame,
             text=self.text,
             font=get_font('body'),
         )
-        activity_label.pack(anchor=W)
+        self.activity_label.pack(anchor=W)
 
         # Time stamp
-        time_label = ttk.Label(
+        self.time_label = ttk.Label(
             text_frame,
             text=self.time,
             font=get_font('body_small'),
             bootstyle='secondary'
         )
-        time_label.pack(anchor=W)
+        self.time_label.pack(anchor=W)
+
+    def update_data(self, text, time, status):
+        """Rebind the item to another activity without rebuilding it"""
+        if text != self.text:
+            self.text = text
+            self.activity_label.configure(text=text)
+        if time != self.time:
+            self.time = time
+            self.time_label.configure(text=time)
+        if status != self.status:
+            self.status = status
+            self.indicator.configure(bootstyle=status, foreground=get_color(status))
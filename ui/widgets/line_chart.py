@@ -0,0 +1,482 @@
+"""
+Line Chart Widget
+Canvas line chart that draws per-pixel min/max envelopes, so a million points cost no more than a screenful
+"""
+
+import math
+import time
+import tkinter as tk
+from collections import OrderedDict
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+import numpy as np
+from config.theme import get_color, get_font
+
+
+ZOOM_STEP = 2 ** 0.25      # Scale factor of one zoom level (four levels per doubling)
+MIN_LEVEL = -40            # About 1/1000 of a unit per pixel
+MAX_LEVEL = 120            # About a million units per pixel
+MARGIN_LEFT = 56
+MARGIN_BOTTOM = 20
+MARGIN_TOP = 8
+MAX_ITEMS = 48              # Appended line items kept before the series are redrawn in one piece
+
+
+def column_extremes(x, lo, hi, start, scale, columns):
+    """Min of lo and max of hi per pixel column for the points with start <= x < start + columns * scale
+
+    x must be sorted. Columns without points are NaN; the cost is one
+    pass over the points inside the range.
+    """
+    mins = np.full(columns, np.nan)
+    maxs = np.full(columns, np.nan)
+    first = np.searchsorted(x, start, 'left')
+    last = np.searchsorted(x, start + columns * scale, 'left')
+    if first >= last:
+        return mins, maxs
+    column = np.minimum(((x[first:last] - start) / scale).astype(np.int64), columns - 1)
+    starts = np.flatnonzero(np.diff(column, prepend=-1))
+    mins[column[starts]] = np.fmin.reduceat(lo[first:last], starts)
+    maxs[column[starts]] = np.fmax.reduceat(hi[first:last], starts)
+    return mins, maxs
+
+
+def nice_step(span, count):
+    """A 1/2/5 x 10^n step that splits span into about count parts"""
+    if span <= 0:
+        return 1.0
+    raw = span / count
+    power = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if factor * power >= raw:
+            return factor * power
+    return 10 * power
+
+
+TIME_STEPS = (1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 10800, 21600, 43200, 86400,
+              172800, 604800)
+
+
+def time_step(span, count):
+    """A round number of seconds that splits span into about count parts"""
+    raw = span / count
+    for step in TIME_STEPS:
+        if step >= raw:
+            return step
+    return TIME_STEPS[-1] * math.ceil(raw / TIME_STEPS[-1])
+
+
+def format_time_tick(value, step):
+    """Label of a time tick; coarser steps show the date"""
+    if step >= 86400:
+        return time.strftime('%b %d', time.localtime(value))
+    if step >= 3600:
+        return time.strftime('%d %H:%M', time.localtime(value))
+    if step >= 60:
+        return time.strftime('%H:%M', time.localtime(value))
+    return time.strftime('%H:%M:%S', time.localtime(value))
+
+
+class ChartSeries:
+    """Sorted points of one series in growable arrays
+
+    Each point has a low and a high value: equal for raw samples, the
+    bucket's min and max for pre-aggregated data.
+    """
+
+    __slots__ = ('name', 'color', 'max_gap', 'x', 'lo', 'hi', 'length', 'levels')
+
+    def __init__(self, name, color, max_gap=None):
+        self.name = name
+        self.color = color
+        self.max_gap = max_gap
+        self.x = np.empty(0)
+        self.lo = np.empty(0)
+        self.hi = np.empty(0)
+        self.length = 0
+        self.levels = set()
+
+    def set(self, x, lo, hi):
+        self.x = np.asarray(x, dtype=np.float64).copy()
+        self.lo = np.asarray(lo, dtype=np.float64).copy()
+        self.hi = np.asarray(hi, dtype=np.float64).copy()
+        self.length = len(self.x)
+
+    def append(self, x, lo, hi):
+        """Append points that are not older than the last one"""
+        needed = self.length + len(x)
+        if needed > len(self.x):
+            capacity = max(needed, len(self.x) * 2, 1024)
+            for name in ('x', 'lo', 'hi'):
+                grown = np.empty(capacity)
+                grown[:self.length] = getattr(self, name)[:self.length]
+                setattr(self, name, grown)
+        self.x[self.length:needed] = x
+        self.lo[self.length:needed] = lo
+        self.hi[self.length:needed] = hi
+        self.length = needed
+
+    def points(self):
+        return self.x[:self.length], self.lo[:self.length], self.hi[:self.length]
+
+    @property
+    def last_x(self):
+        return self.x[self.length - 1] if self.length else None
+
+
+class LineChart(ttk.Frame):
+    """Line chart of one or more series with pan, zoom and live follow
+
+    Points are reduced to the min and max of every pixel column and drawn
+    as one polyline per run, so the canvas holds a few thousand coordinates
+    however many points the series have. Column extremes are computed per
+    tile of tile_px columns at a given zoom level and kept in an LRU, so
+    panning only computes the tiles that scroll in, and appended points
+    update the cached tiles they fall in rather than invalidating them.
+    While following, the drawn lines are shifted left on the canvas and
+    only the new columns are drawn; everything is redrawn when the y-axis
+    changes or too many pieces pile up.
+
+    Drag pans, the wheel zooms around the cursor and a double-click goes
+    back to following the newest points. y_range fixes the value axis
+    (e.g. (0, 100) for percentages); otherwise it fits the visible values.
+    """
+
+    def __init__(self, parent, y_range=None, time_axis=True, format_value=str, tile_px=256, max_tiles=512,
+                 height=180, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.y_range = y_range
+        self.time_axis = time_axis
+        self.format_value = format_value
+        self.tile_px = tile_px
+        self.max_tiles = max_tiles
+        self.series = {}
+        self.tiles = OrderedDict()
+
+        # View: zoom level (scale = ZOOM_STEP ** level units per pixel) and first pixel column
+        self.level = 0
+        self.first = 0
+        self.following = True
+        self.follow_span = None
+        self.shown = None
+
+        # What is on the canvas, for incremental updates
+        self.drawn = None
+        self.items = []
+        self.render_id = None
+        self.drag_x = None
+
+        # Counters
+        self.renders = 0
+        self.incremental = 0
+        self.tiles_built = 0
+
+        self.canvas = tk.Canvas(self, height=height, highlightthickness=0, background=get_color('bg_white'))
+        self.canvas.pack(fill=BOTH, expand=YES)
+        self.canvas.bind('<Configure>', lambda e: self.resized())
+        self.canvas.bind('<ButtonPress-1>', self.drag_start)
+        self.canvas.bind('<B1-Motion>', self.drag)
+        self.canvas.bind('<Double-Button-1>', lambda e: self.follow())
+        self.canvas.bind('<MouseWheel>', lambda e: self.zoom(e.x, -1 if e.delta > 0 else 1))
+        self.canvas.bind('<Button-4>', lambda e: self.zoom(e.x, -1))
+        self.canvas.bind('<Button-5>', lambda e: self.zoom(e.x, 1))
+
+    # Data
+
+    def add_series(self, name, color='info', max_gap=None):
+        """Add an empty series; points further apart than max_gap are not joined"""
+        self.series[name] = ChartSeries(name, get_color(color), max_gap)
+
+    def clear(self):
+        """Remove every series"""
+        self.series.clear()
+        self.tiles.clear()
+        self.redraw()
+
+    def set_data(self, name, x, y, y_max=None):
+        """Replace the points of a series; y_max makes y/y_max the min/max of aggregated buckets"""
+        series = self.series[name]
+        series.set(x, y, y if y_max is None else y_max)
+        self.drop_tiles(series)
+        self.redraw()
+
+    def append(self, name, x, y, y_max=None):
+        """Append newer points to a series"""
+        series = self.series[name]
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        lo = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        hi = lo if y_max is None else np.atleast_1d(np.asarray(y_max, dtype=np.float64))
+        series.append(x, lo, hi)
+        self.extend_tiles(series, x, lo, hi)
+        self.schedule()
+
+    # Tiles
+
+    def scale(self, level=None):
+        return ZOOM_STEP ** (self.level if level is None else level)
+
+    def tile(self, series, index):
+        """Column extremes of one tile at the current zoom level"""
+        key = (series.name, self.level, index)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+        scale = self.scale()
+        x, lo, hi = series.points()
+        tile = column_extremes(x, lo, hi, index * self.tile_px * scale, scale, self.tile_px)
+        self.tiles[key] = tile
+        series.levels.add(self.level)
+        self.tiles_built += 1
+        while len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return tile
+
+    def extend_tiles(self, series, x, lo, hi):
+        """Fold appended points into the cached tiles they fall in"""
+        for level in series.levels:
+            scale = self.scale(level)
+            width = self.tile_px * scale
+            for index in range(int(x[0] // width), int(x[-1] // width) + 1):
+                tile = self.tiles.get((series.name, level, index))
+                if tile is None:
+                    continue
+                start = index * width
+                inside = (x >= start) & (x < start + width)
+                columns = np.minimum(((x[inside] - start) / scale).astype(np.int64), self.tile_px - 1)
+                np.fmin.at(tile[0], columns, lo[inside])
+                np.fmax.at(tile[1], columns, hi[inside])
+
+    def drop_tiles(self, series):
+        for key in [key for key in self.tiles if key[0] == series.name]:
+            del self.tiles[key]
+        series.levels.clear()
+
+    def extremes(self, series, first, count):
+        """Column extremes for pixel columns first .. first + count - 1 at the current zoom level"""
+        tile_px = self.tile_px
+        pieces_min, pieces_max = [], []
+        for index in range(first // tile_px, (first + count - 1) // tile_px + 1):
+            mins, maxs = self.tile(series, index)
+            start = max(first - index * tile_px, 0)
+            stop = min(first + count - index * tile_px, tile_px)
+            pieces_min.append(mins[start:stop])
+            pieces_max.append(maxs[start:stop])
+        return np.concatenate(pieces_min), np.concatenate(pieces_max)
+
+    # View
+
+    def plot_size(self):
+        width = self.canvas.winfo_width() - MARGIN_LEFT
+        height = self.canvas.winfo_height() - MARGIN_BOTTOM - MARGIN_TOP
+        return width, height
+
+    def show_range(self, start, end):
+        """Fit start .. end to the plot width and stop following"""
+        self.following = False
+        self.shown = (start, end)
+        self.fit(start, end)
+        self.redraw()
+
+    def resized(self):
+        """Refit the requested range to the new width, unless the user has moved the view since"""
+        if self.following and self.follow_span is not None:
+            end = self.latest() or time.time()
+            self.fit(end - self.follow_span, end)
+        elif self.shown is not None:
+            self.fit(*self.shown)
+        self.redraw()
+
+    def follow(self, span=None):
+        """Keep the newest points at the right edge, showing span units (default: the current span)"""
+        if span is not None:
+            self.follow_span = span
+        self.following = True
+        if self.follow_span is not None:
+            end = self.latest() or time.time()
+            self.fit(end - self.follow_span, end)
+        self.redraw()
+
+    def fit(self, start, end):
+        width, _ = self.plot_size()
+        width = max(width, 100)
+        level = math.ceil(math.log(max(end - start, 1e-9) / width, ZOOM_STEP))
+        self.level = min(max(level, MIN_LEVEL), MAX_LEVEL)
+        self.first = math.floor(start / self.scale())
+
+    def latest(self):
+        values = [series.last_x for series in self.series.values() if series.length]
+        return max(values) if values else None
+
+    def drag_start(self, event):
+        self.drag_x = event.x
+
+    def drag(self, event):
+        if self.drag_x is None:
+            return
+        self.first -= event.x - self.drag_x
+        self.drag_x = event.x
+        self.following = False
+        self.shown = None
+        self.redraw()
+
+    def zoom(self, x, steps):
+        """Zoom in (steps < 0) or out around canvas position x"""
+        column = max(x - MARGIN_LEFT, 0)
+        anchor = (self.first + column) * self.scale()
+        self.level = min(max(self.level + steps, MIN_LEVEL), MAX_LEVEL)
+        self.first = math.floor(anchor / self.scale()) - column
+        self.shown = None
+        self.redraw()
+
+    # Drawing
+
+    def schedule(self):
+        """Render once when Tk is idle, however many updates arrive before then"""
+        if self.render_id is None:
+            self.render_id = self.after_idle(self.render)
+
+    def redraw(self):
+        self.drawn = None
+        self.schedule()
+
+    def render(self):
+        self.render_id = None
+        width, height = self.plot_size()
+        if width <= 1 or height <= 1:
+            return
+        if self.following:
+            latest = self.latest()
+            if latest is not None:
+                self.first = math.floor(latest / self.scale()) - width + 1
+
+        # One column either side so lines run off the edges instead of stopping short
+        columns = {name: self.extremes(series, self.first - 1, width + 2) for name, series in self.series.items()}
+        lasts = {name: self.last_column(column) for name, column in columns.items()}
+        bounds = self.value_bounds(columns)
+
+        drawn = self.drawn
+        shift = self.first - drawn['first'] if drawn else None
+        if (drawn and drawn['level'] == self.level and drawn['bounds'] == bounds and drawn['size'] == (width, height)
+                and 0 <= shift < width // 2 and len(self.items) < MAX_ITEMS):
+            self.shift_lines(shift, columns, lasts, bounds, height)
+            self.incremental += 1
+        else:
+            self.draw_lines(columns, bounds, height)
+        self.draw_axes(bounds, width, height)
+        self.drawn = {'level': self.level, 'first': self.first, 'bounds': bounds, 'size': (width, height),
+                      'lasts': lasts}
+        self.renders += 1
+
+    def value_bounds(self, columns):
+        """Value axis range, rounded to ticks so it does not change with every point"""
+        if self.y_range is not None:
+            return tuple(self.y_range)
+        lows = [np.nanmin(mins) for mins, _ in columns.values() if not np.isnan(mins).all()]
+        highs = [np.nanmax(maxs) for _, maxs in columns.values() if not np.isnan(maxs).all()]
+        if not lows:
+            return (0.0, 1.0)
+        low, high = min(lows), max(highs)
+        if high == low:
+            high = low + 1
+        step = nice_step(high - low, 4)
+        return (math.floor(low / step) * step, math.ceil(high / step) * step)
+
+    def last_column(self, column):
+        present = np.flatnonzero(~np.isnan(column[0]))
+        return int(present[-1]) if len(present) else None
+
+    def line_coords(self, mins, maxs, max_gap, bounds, height, offset=0):
+        """Flat canvas coordinates of each run of columns, zig-zagging between min and max"""
+        present = np.flatnonzero(~np.isnan(mins))
+        if not len(present):
+            return []
+        low, high = bounds
+        ratio = height / (high - low)
+        top = MARGIN_TOP + height
+        xs = MARGIN_LEFT + (present + offset - 1).astype(np.float64)
+        y_min = top - (mins[present] - low) * ratio
+        y_max = top - (maxs[present] - low) * ratio
+        # Each column goes in at its min and out at its max
+        coords = np.empty((len(present), 4))
+        coords[:, 0] = xs
+        coords[:, 1] = y_min
+        coords[:, 2] = xs
+        coords[:, 3] = y_max
+        if max_gap is not None:
+            # Empty columns between two runs of points span more than max_gap
+            breaks = np.flatnonzero((np.diff(present) - 1) * self.scale() > max_gap) + 1
+        else:
+            breaks = []
+        return [run.ravel().tolist() for run in np.split(coords, breaks)]
+
+    def draw_lines(self, columns, bounds, height):
+        """Draw every series from scratch"""
+        canvas = self.canvas
+        canvas.delete('series')
+        self.items = []
+        for name, (mins, maxs) in columns.items():
+            series = self.series[name]
+            for coords in self.line_coords(mins, maxs, series.max_gap, bounds, height):
+                self.items.append(self.create_line(coords, series.color))
+
+    def shift_lines(self, shift, columns, lasts, bounds, height):
+        """Move what is drawn left by shift columns and draw only the columns after it"""
+        canvas = self.canvas
+        if shift:
+            canvas.move('series', -shift, 0)
+            left = MARGIN_LEFT - 2
+            kept = []
+            for item in self.items:
+                box = canvas.bbox(item)
+                if box is not None and box[2] < left:
+                    canvas.delete(item)
+                else:
+                    kept.append(item)
+            self.items = kept
+        for name, (mins, maxs) in columns.items():
+            drawn = self.drawn['lasts'].get(name)
+            start = 0 if drawn is None else max(drawn - shift, 0)
+            if lasts[name] is None or (drawn is not None and lasts[name] <= drawn - shift):
+                continue
+            # Start at the last drawn column (which may have grown since) so the pieces join
+            series = self.series[name]
+            for coords in self.line_coords(mins[start:], maxs[start:], series.max_gap, bounds, height, start):
+                self.items.append(self.create_line(coords, series.color))
+
+    def create_line(self, coords, color):
+        if len(coords) == 4 and coords[1] == coords[3]:
+            # A lone point still needs a visible length
+            coords = [coords[0], coords[1], coords[0] + 1, coords[1]]
+        return self.canvas.create_line(*coords, fill=color, width=1.5, tags='series')
+
+    def draw_axes(self, bounds, width, height):
+        canvas = self.canvas
+        canvas.delete('axis')
+        low, high = bounds
+        font = get_font('body_small')
+        muted = get_color('text_muted')
+        grid = get_color('border_light')
+        ratio = height / (high - low)
+        step = nice_step(high - low, 4)
+        value = math.ceil(low / step) * step
+        while value <= high + step / 1000:
+            y = MARGIN_TOP + height - (value - low) * ratio
+            canvas.create_line(MARGIN_LEFT, y, MARGIN_LEFT + width, y, fill=grid, tags='axis')
+            canvas.create_text(MARGIN_LEFT - 6, y, text=self.format_value(value), anchor='e', fill=muted,
+                               font=font, tags='axis')
+            value += step
+
+        scale = self.scale()
+        start = self.first * scale
+        span = width * scale
+        step = time_step(span, 6) if self.time_axis else nice_step(span, 6)
+        value = math.ceil(start / step) * step
+        while value <= start + span:
+            x = MARGIN_LEFT + (value - start) / scale
+            label = format_time_tick(value, step) if self.time_axis else self.format_value(value)
+            canvas.create_text(x, MARGIN_TOP + height + 4, text=label, anchor='n', fill=muted, font=font,
+                               tags='axis')
+            value += step
+        canvas.tag_lower('axis')
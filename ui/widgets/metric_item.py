@@ -36,25 +36,28 @@ class MetricItem(ttk.Frame):
         label_widget.pack(side=LEFT)
 
         # Metric value
-        value_widget = ttk.Label(
+        self.value_widget = ttk.Label(
             top_row,
             text=self.value,
             font=get_font('body'),
             bootstyle=self.style
         )
-        value_widget.pack(side=RIGHT)
+        self.value_widget.pack(side=RIGHT)
 
         # Progress bar
-        progress = ttk.Progressbar(
+        self.progress = ttk.Progressbar(
             self,
             bootstyle=self.style,
             value=self.percent,
             length=200
         )
-        progress.pack(fill=X)
+        self.progress.pack(fill=X)
 
     def update_value(self, new_value, new_percent):
-        """Update the metric value and progress"""
-        self.value = new_value
-        self.percent = new_percent
-        # Note: In production, keep references to widgets for live updates
+        """Update the metric value and progress in place"""
+        if new_value != self.value:
+            self.value = new_value
+            self.value_widget.configure(text=new_value)
+        if new_percent != self.percent:
+            self.percent = new_percent
+            self.progress.configure(value=new_percent)
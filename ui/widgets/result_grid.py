@@ -0,0 +1,149 @@
+"""
+Result Grid Widget
+A virtualized table that shows any row source through a fixed pool of Treeview rows
+"""
+
+import math
+import tkinter.font
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+
+class ResultGrid(ttk.Frame):
+    """Virtualized result grid
+
+    The source must support len() and rows(start, stop). Only the visible
+    window of rows is fetched and written into a pool of Treeview items, so
+    the widget cost is constant no matter how many rows the source holds.
+    """
+
+    def __init__(self, parent, on_heading_click=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.on_heading_click = on_heading_click
+        self.source = None
+        self.columns = []
+        self.first = 0
+        self.items = []
+        self.detached = set()
+        self.row_height = self.measure_row_height()
+
+        self.setup_ui()
+
+    def measure_row_height(self):
+        """Pixel height of one Treeview row"""
+        height = ttk.Style().lookup('Treeview', 'rowheight')
+        try:
+            return int(height)
+        except (TypeError, ValueError):
+            return tkinter.font.nametofont('TkDefaultFont').metrics('linespace') + 8
+
+    def setup_ui(self):
+        """Setup the grid and its scrollbars"""
+        self.vscroll = ttk.Scrollbar(self, orient=VERTICAL, command=self.on_scrollbar)
+        self.vscroll.pack(side=RIGHT, fill=Y)
+
+        self.tree = ttk.Treeview(self, show='headings', selectmode=BROWSE)
+        self.hscroll = ttk.Scrollbar(self, orient=HORIZONTAL, command=self.tree.xview)
+        self.hscroll.pack(side=BOTTOM, fill=X)
+        self.tree.configure(xscrollcommand=self.hscroll.set)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=YES)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_by(-3) or 'break')
+        self.tree.bind('<Button-5>', lambda e: self.scroll_by(3) or 'break')
+        self.tree.bind('<Prior>', lambda e: self.scroll_by(-len(self.items)) or 'break')
+        self.tree.bind('<Next>', lambda e: self.scroll_by(len(self.items)) or 'break')
+
+    def set_columns(self, columns):
+        """Replace the grid columns"""
+        self.columns = list(columns)
+        self.tree.configure(columns=[f"c{index}" for index in range(len(self.columns))])
+        for index, name in enumerate(self.columns):
+            self.tree.heading(
+                f"c{index}",
+                text=name,
+                command=lambda index=index: self.heading_clicked(index)
+            )
+            self.tree.column(f"c{index}", width=140, minwidth=60, stretch=False, anchor=W)
+        self.first = 0
+        self.refresh()
+
+    def set_heading(self, index, text):
+        """Change a column heading (e.g. to show a sort marker)"""
+        self.tree.heading(f"c{index}", text=text)
+
+    def heading_clicked(self, index):
+        """Forward heading clicks"""
+        if self.on_heading_click:
+            self.on_heading_click(index)
+
+    def set_source(self, source):
+        """Show a new row source from the top"""
+        self.source = source
+        self.first = 0
+        self.refresh()
+
+    def selected_position(self):
+        """Source row index of the selected item, or None"""
+        selection = self.tree.selection()
+        if not selection or selection[0] in self.detached:
+            return None
+        return self.first + self.items.index(selection[0])
+
+    @property
+    def total(self):
+        """Number of rows in the source"""
+        return len(self.source) if self.source is not None else 0
+
+    def on_resize(self, event):
+        """Grow the pool of Treeview items to fill the visible height"""
+        # One row is taken by the headings
+        needed = max(1, math.ceil(event.height / self.row_height) - 1)
+        while len(self.items) < needed:
+            self.items.append(self.tree.insert('', END, values=()))
+        self.refresh()
+
+    def scroll_to(self, index):
+        """Scroll so the given row is at the top"""
+        self.first = max(0, min(int(index), self.total - len(self.items)))
+        self.refresh()
+
+    def scroll_by(self, rows):
+        """Scroll by a number of rows"""
+        self.scroll_to(self.first + rows)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """Handle scrollbar drags and clicks"""
+        if action == MOVETO:
+            self.scroll_to(float(amount) * self.total)
+        elif action == SCROLL:
+            step = len(self.items) if unit == PAGES else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        """Handle mouse wheel scrolling (Windows/macOS)"""
+        self.scroll_by(-3 if event.delta > 0 else 3)
+        return 'break'
+
+    def refresh(self):
+        """Write the visible window of rows into the pooled items"""
+        total = self.total
+        self.first = max(0, min(self.first, total - len(self.items)))
+        rows = self.source.rows(self.first, self.first + len(self.items)) if total else []
+
+        for position, item in enumerate(self.items):
+            if position < len(rows):
+                self.tree.item(item, values=['NULL' if value is None else value for value in rows[position]])
+                if item in self.detached:
+                    self.tree.move(item, '', position)
+                    self.detached.discard(item)
+            elif item not in self.detached:
+                self.tree.detach(item)
+                self.detached.add(item)
+
+        if total:
+            self.vscroll.set(self.first / total, min(1.0, (self.first + len(self.items)) / total))
+        else:
+            self.vscroll.set(0.0, 1.0)
@@ -38,13 +38,13 @@ class StatCard(ttk.Frame):
         icon_label.pack(anchor=W, pady=(0, get_spacing('sm')))
 
         # Value
-        value_label = ttk.Label(
+        self.value_label = ttk.Label(
             inner,
             text=self.value,
             font=get_font('stat_value'),
             bootstyle=f"inverse-{self.style}"
         )
-        value_label.pack(anchor=W, pady=(get_spacing('xs'), get_spacing('xs')))
+        self.value_label.pack(anchor=W, pady=(get_spacing('xs'), get_spacing('xs')))
 
         # Title
         title_label = ttk.Label(
@@ -56,15 +56,19 @@ class StatCard(ttk.Frame):
         title_label.pack(anchor=W)
 
         # Subtitle
-        subtitle_label = ttk.Label(
+        self.subtitle_label = ttk.Label(
             inner,
             text=self.subtitle,
             font=get_font('body_small'),
             bootstyle=f"inverse-{self.style}"
         )
-        subtitle_label.pack(anchor=W, pady=(get_spacing('xs'), 0))
+        self.subtitle_label.pack(anchor=W, pady=(get_spacing('xs'), 0))
 
-    def update_value(self, new_value):
-        """Update the card's value"""
-        self.value = new_value
-        # Note: In a production app, you'd need to keep references to labels to update them
+    def update_value(self, new_value, new_subtitle=None):
+        """Update the card's value (and optionally subtitle) in place"""
+        if new_value != self.value:
+            self.value = new_value
+            self.value_label.configure(text=new_value)
+        if new_subtitle is not None and new_subtitle != self.subtitle:
+            self.subtitle = new_subtitle
+            self.subtitle_label.configure(text=new_subtitle)
@@ -0,0 +1,120 @@
+"""
+Treemap Widget
+Squarified treemap of (label, value, key) items on a Canvas
+"""
+
+import tkinter as tk
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_color, get_font
+
+
+PALETTE = ('info', 'success', 'warning', 'primary', 'danger', 'secondary')
+
+
+def worst_ratio(row, length):
+    """Worst aspect ratio of a row of areas laid along a side of the given length"""
+    total = sum(row)
+    return max(max(length * length * area / (total * total), (total * total) / (length * length * area))
+               for area in row)
+
+
+def squarify(values, x, y, width, height):
+    """Rectangles (x, y, width, height) for values, largest first, with near-square aspect ratios"""
+    total = sum(values)
+    if total <= 0 or width <= 0 or height <= 0:
+        return []
+    scale = width * height / total
+    areas = [value * scale for value in values]
+    rects = []
+    start = 0
+    while start < len(areas):
+        length = min(width, height)
+        row = [areas[start]]
+        stop = start + 1
+        while stop < len(areas) and worst_ratio(row + [areas[stop]], length) <= worst_ratio(row, length):
+            row.append(areas[stop])
+            stop += 1
+        row_total = sum(row)
+        if width >= height:
+            # Lay the row as a column on the left
+            column_width = row_total / height
+            offset = y
+            for area in row:
+                rects.append((x, offset, column_width, area / column_width))
+                offset += area / column_width
+            x += column_width
+            width -= column_width
+        else:
+            row_height = row_total / width
+            offset = x
+            for area in row:
+                rects.append((offset, y, area / row_height, row_height))
+                offset += area / row_height
+            y += row_height
+            height -= row_height
+        start = stop
+    return rects
+
+
+class Treemap(ttk.Frame):
+    """Treemap of the items set with set_items()
+
+    Items are (label, value, key) tuples sorted largest first; clicking a
+    tile calls on_click(key). The layout is recomputed only when the items
+    or the canvas size change.
+    """
+
+    def __init__(self, parent, on_click=None, format_value=str, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.on_click = on_click
+        self.format_value = format_value
+        self.items = []
+        self.tiles = {}
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, background=get_color('bg_light'))
+        self.canvas.pack(fill=BOTH, expand=YES)
+        self.canvas.bind('<Configure>', lambda e: self.draw())
+        self.canvas.bind('<Button-1>', self.clicked)
+
+    def set_items(self, items):
+        """Show new items, largest first"""
+        self.items = [item for item in items if item[1] > 0]
+        self.draw()
+
+    def draw(self):
+        canvas = self.canvas
+        canvas.delete('all')
+        self.tiles.clear()
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            return
+        rects = squarify([value for _, value, _ in self.items], 0, 0, width, height)
+        for index, ((label, value, key), (x, y, w, h)) in enumerate(zip(self.items, rects)):
+            tile = canvas.create_rectangle(
+                x, y, x + w, y + h,
+                fill=get_color(PALETTE[index % len(PALETTE)]),
+                outline=get_color('bg_white'),
+                width=2
+            )
+            self.tiles[tile] = key
+            # Labels only where they fit
+            if w > 60 and h > 34:
+                canvas.create_text(
+                    x + 6, y + 4,
+                    text=f"{label}\n{self.format_value(value)}",
+                    anchor='nw',
+                    width=w - 12,
+                    fill=get_color('text_light'),
+                    font=get_font('body_small'),
+                    state='disabled'
+                )
+
+    def clicked(self, event):
+        if not self.on_click:
+            return
+        for tile in self.canvas.find_overlapping(event.x, event.y, event.x, event.y):
+            if tile in self.tiles:
+                self.on_click(self.tiles[tile])
+                return
@@ -0,0 +1,114 @@
+"""
+Virtual List Widget
+A scrollable list that only materializes the rows visible in the viewport
+"""
+
+import math
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+
+class VirtualList(ttk.Frame):
+    """A list over any sized, indexable source using a fixed pool of row widgets
+
+    Rows are created by row_factory(parent) and rebound to data with
+    row_update(row, item). Scrolling only changes which items the pooled rows
+    display, so the widget count stays constant regardless of source length.
+    """
+
+    def __init__(self, parent, source, row_factory, row_update, row_height=40, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.source = source
+        self.row_factory = row_factory
+        self.row_update = row_update
+        self.row_height = row_height
+
+        self.first = 0
+        self.rows = []
+        self.scroll_tag = f"VirtualList{id(self)}"
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup the viewport and scrollbar"""
+        self.scrollbar = ttk.Scrollbar(self, orient=VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+
+        self.viewport = ttk.Frame(self)
+        self.viewport.pack(side=LEFT, fill=BOTH, expand=YES)
+        self.viewport.pack_propagate(False)
+        self.viewport.bind('<Configure>', self.on_resize)
+
+        # Mouse wheel on any pooled widget scrolls the list
+        self.bind_class(self.scroll_tag, '<MouseWheel>', self.on_mousewheel)
+        self.bind_class(self.scroll_tag, '<Button-4>', lambda e: self.scroll_by(-3))
+        self.bind_class(self.scroll_tag, '<Button-5>', lambda e: self.scroll_by(3))
+        self.add_scroll_tag(self.viewport)
+
+    def add_scroll_tag(self, widget):
+        """Route mouse wheel events of a widget and its children to the list"""
+        widget.bindtags((self.scroll_tag,) + widget.bindtags())
+        for child in widget.winfo_children():
+            self.add_scroll_tag(child)
+
+    @property
+    def visible_count(self):
+        """Number of rows that fit in the viewport"""
+        return len(self.rows)
+
+    def on_resize(self, event):
+        """Grow the row pool to fill the viewport height"""
+        needed = max(1, math.ceil(event.height / self.row_height))
+        while len(self.rows) < needed:
+            row = self.row_factory(self.viewport)
+            self.add_scroll_tag(row)
+            self.rows.append(row)
+        self.refresh()
+
+    def set_source(self, source):
+        """Replace the data source and scroll back to the top"""
+        self.source = source
+        self.first = 0
+        self.refresh()
+
+    def scroll_to(self, index):
+        """Scroll so the given item is the first visible row"""
+        last_start = max(0, len(self.source) - self.visible_count)
+        self.first = max(0, min(int(index), last_start))
+        self.refresh()
+
+    def scroll_by(self, rows):
+        """Scroll by a number of rows"""
+        self.scroll_to(self.first + rows)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """Handle scrollbar drags and clicks"""
+        if action == MOVETO:
+            self.scroll_to(float(amount) * len(self.source))
+        elif action == SCROLL:
+            step = self.visible_count if unit == PAGES else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        """Handle mouse wheel scrolling (Windows/macOS)"""
+        self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def refresh(self):
+        """Rebind pooled rows to the items at the current scroll position"""
+        total = len(self.source)
+        self.first = max(0, min(self.first, total - self.visible_count))
+
+        for offset, row in enumerate(self.rows):
+            index = self.first + offset
+            if index < total:
+                self.row_update(row, self.source[index])
+                if not row.winfo_manager():
+                    row.pack(fill=X)
+            elif row.winfo_manager():
+                row.pack_forget()
+
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible_count) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
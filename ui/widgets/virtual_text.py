@@ -0,0 +1,204 @@
+"""
+Virtual Text Widget
+A read-only text view that only holds the lines visible in the viewport
+"""
+
+import re
+import tkinter as tk
+import tkinter.font
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from config.theme import get_color
+
+
+MONO_FONT = ('Courier', 10)
+
+LEVELS = (
+    ('error', re.compile(r'\b(?:ERROR|ERR|FATAL|CRIT(?:ICAL)?|PANIC|EMERG|ALERT)\b')),
+    ('warning', re.compile(r'\b(?:WARN(?:ING)?)\b')),
+)
+
+
+class VirtualText(ttk.Frame):
+    """Virtualized, read-only text over a line source
+
+    The source must support len() and lines(start, stop). The Text widget
+    holds only the visible window of lines; the vertical scrollbar is
+    driven by the source length, so a log of a billion lines scrolls like
+    a short one. With follow set, the view sticks to the end as the source
+    grows; scrolling away from the end or back to it reports
+    on_follow(following).
+    """
+
+    def __init__(self, parent, on_follow=None, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.on_follow = on_follow
+        self.source = None
+        self.first = 0
+        self.visible = 1
+        self.marked = None
+        self.follow = False
+
+        font = tkinter.font.Font(family=MONO_FONT[0], size=MONO_FONT[1])
+        self.line_height = font.metrics('linespace')
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup the gutter, text and scrollbars"""
+        self.vscroll = ttk.Scrollbar(self, orient=VERTICAL, command=self.on_scrollbar)
+        self.vscroll.pack(side=RIGHT, fill=Y)
+
+        self.text = tk.Text(
+            self,
+            font=MONO_FONT,
+            wrap=NONE,
+            borderwidth=0,
+            highlightthickness=0,
+            padx=6,
+            background=get_color('bg_white'),
+            foreground=get_color('text_dark')
+        )
+        self.hscroll = ttk.Scrollbar(self, orient=HORIZONTAL, command=self.text.xview)
+        self.hscroll.pack(side=BOTTOM, fill=X)
+        self.text.configure(xscrollcommand=self.hscroll.set)
+
+        self.gutter = tk.Text(
+            self,
+            font=MONO_FONT,
+            width=8,
+            wrap=NONE,
+            borderwidth=0,
+            highlightthickness=0,
+            padx=4,
+            takefocus=0,
+            background=get_color('bg_light'),
+            foreground=get_color('text_muted')
+        )
+        self.gutter.tag_configure('number', justify=RIGHT)
+        self.gutter.pack(side=LEFT, fill=Y)
+        self.text.pack(side=LEFT, fill=BOTH, expand=YES)
+
+        self.text.tag_configure('error', foreground=get_color('danger'))
+        self.text.tag_configure('warning', foreground=get_color('warning'))
+        self.text.tag_configure('marked', background=get_color('border_light'))
+
+        # Read-only, but selectable and copyable
+        self.text.bind('<Key>', self.on_key)
+        for widget in (self.text, self.gutter):
+            widget.bind('<Configure>', self.on_resize)
+            widget.bind('<MouseWheel>', self.on_mousewheel)
+            widget.bind('<Button-4>', lambda e: self.scroll_by(-3) or 'break')
+            widget.bind('<Button-5>', lambda e: self.scroll_by(3) or 'break')
+
+    def set_source(self, source):
+        """Show a new line source from the top"""
+        self.source = source
+        self.first = 0
+        self.marked = None
+        self.refresh()
+
+    @property
+    def total(self):
+        """Number of lines in the source"""
+        return len(self.source) if self.source is not None else 0
+
+    @property
+    def at_end(self):
+        """Whether the last line is visible"""
+        return self.first + self.visible >= self.total
+
+    def on_resize(self, event):
+        self.visible = max(1, self.text.winfo_height() // self.line_height)
+        self.refresh()
+
+    def on_key(self, event):
+        """Navigation keys scroll the source; editing keys are swallowed"""
+        steps = {'Up': -1, 'Down': 1, 'Prior': -self.visible, 'Next': self.visible}
+        if event.keysym in steps:
+            self.scroll_by(steps[event.keysym])
+        elif event.keysym == 'Home' and event.state & 0x4:
+            self.scroll_to(0)
+        elif event.keysym == 'End' and event.state & 0x4:
+            self.scroll_to(self.total)
+        elif event.state & 0x4 and event.keysym.lower() in ('c', 'a'):
+            return None
+        return 'break'
+
+    def scroll_to(self, index, mark=False):
+        """Scroll so the given line is at the top (or as low as the end allows)"""
+        self.first = max(0, min(int(index), self.total - self.visible))
+        if mark:
+            self.marked = int(index)
+        self.refresh()
+        if self.follow != self.at_end:
+            # Scrolling to the end starts following; scrolling away stops it
+            self.follow = self.at_end
+            if self.on_follow:
+                self.on_follow(self.follow)
+
+    def scroll_by(self, lines):
+        """Scroll by a number of lines"""
+        self.scroll_to(self.first + lines)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """Handle scrollbar drags and clicks"""
+        if action == MOVETO:
+            self.scroll_to(float(amount) * self.total)
+        elif action == SCROLL:
+            step = self.visible if unit == PAGES else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        """Handle mouse wheel scrolling (Windows/macOS)"""
+        self.scroll_by(-3 if event.delta > 0 else 3)
+        return 'break'
+
+    def source_grew(self):
+        """Refresh after the source got longer, keeping to the end when following"""
+        if self.follow:
+            self.first = max(0, self.total - self.visible)
+            self.refresh()
+        elif self.first + self.visible > self.total - self.visible:
+            # Only repaint when new lines could be on screen
+            self.refresh()
+        else:
+            self.update_scrollbar()
+
+    def refresh(self):
+        """Write the visible window of lines into the text and gutter"""
+        total = self.total
+        self.first = max(0, min(self.first, total - self.visible))
+        lines = self.source.lines(self.first, self.first + self.visible) if total else []
+        xview = self.text.xview()[0]
+
+        self.text.delete('1.0', END)
+        self.text.insert('1.0', '\n'.join(lines))
+        for row, line in enumerate(lines, 1):
+            for tag, pattern in LEVELS:
+                if pattern.search(line, 0, 200):
+                    self.text.tag_add(tag, f"{row}.0", f"{row}.end")
+                    break
+        if self.marked is not None and self.first <= self.marked < self.first + len(lines):
+            row = self.marked - self.first + 1
+            self.text.tag_add('marked', f"{row}.0", f"{row + 1}.0")
+        self.text.xview_moveto(xview)
+
+        width = len(str(self.first + len(lines))) + 1
+        self.gutter.configure(state=NORMAL, width=max(6, width))
+        self.gutter.delete('1.0', END)
+        self.gutter.insert(
+            '1.0',
+            '\n'.join(str(self.first + row + 1) for row in range(len(lines))),
+            'number'
+        )
+        self.gutter.configure(state=DISABLED)
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        total = self.total
+        if total:
+            self.vscroll.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.vscroll.set(0.0, 1.0)
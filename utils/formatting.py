@@ -0,0 +1,52 @@
+"""
+Formatting Helpers
+Human-readable formatting for sizes, rates and durations
+"""
+
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
+def format_bytes(num_bytes):
+    """Format a byte count, e.g. 234 GB"""
+    value = float(num_bytes)
+    for unit in BYTE_UNITS:
+        if abs(value) < 1024 or unit == BYTE_UNITS[-1]:
+            if unit == 'B':
+                return f"{int(value)} B"
+            return f"{value:.1f} {unit}" if value < 100 else f"{value:.0f} {unit}"
+        value /= 1024
+
+
+def format_rate(bytes_per_second):
+    """Format a transfer rate, e.g. 12.3 MB/s"""
+    return f"{format_bytes(bytes_per_second)}/s"
+
+
+def format_duration(seconds):
+    """Format a duration compactly, e.g. 15d 7h or 3m 12s"""
+    seconds = int(seconds)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
+def format_percent(percent):
+    """Format a percentage without decimals, e.g. 42%"""
+    return f"{percent:.0f}%"
+
+
+def format_time_ago(seconds):
+    """Format an age in seconds, e.g. 15 minutes ago"""
+    seconds = max(0, int(seconds))
+    for unit, size in (('day', 86400), ('hour', 3600), ('minute', 60)):
+        if seconds >= size:
+            count = seconds // size
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return "just now"
@@ -0,0 +1,67 @@
+"""
+Startup Profiler
+Lightweight phase timing used to measure and report cold-start performance
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Records named startup phases relative to process start"""
+
+    def __init__(self, started=None):
+        self.enabled = False
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = []
+        self.marks = {}
+        self.reported = False
+
+    def enable(self, started=None):
+        """Enable recording, optionally resetting the reference start time"""
+        self.enabled = True
+        if started is not None:
+            self.started = started
+
+    def elapsed_ms(self):
+        """Milliseconds since the reference start time"""
+        return (time.perf_counter() - self.started) * 1000
+
+    def mark(self, name):
+        """Record a point in time (e.g. first paint)"""
+        if self.enabled and name not in self.marks:
+            self.marks[name] = self.elapsed_ms()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of startup work"""
+        if not self.enabled:
+            yield
+            return
+        begin = self.elapsed_ms()
+        try:
+            yield
+        finally:
+            self.phases.append((name, begin, self.elapsed_ms() - begin))
+
+    def report(self, budget_ms=None):
+        """Print a per-phase timing breakdown (once)"""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print("\nStartup profile")
+        print(f"{'phase':<32}{'start ms':>10}{'took ms':>10}")
+        print("-" * 52)
+        for name, begin, duration in self.phases:
+            print(f"{name:<32}{begin:>10.1f}{duration:>10.1f}")
+        print("-" * 52)
+        for name, at in self.marks.items():
+            print(f"{name:<32}{at:>10.1f}")
+
+        first_paint = self.marks.get('first_paint')
+        if budget_ms is not None and first_paint is not None and first_paint > budget_ms:
+            print(f"WARNING: first paint took {first_paint:.1f} ms (budget {budget_ms} ms)")
+
+
+# Shared profiler instance, enabled by main.py with --profile-startup
+profiler = StartupProfiler()
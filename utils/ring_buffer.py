@@ -0,0 +1,44 @@
+"""
+Ring Buffer
+Fixed-size single-producer/single-consumer buffer that needs no locks
+"""
+
+
+class RingBuffer:
+    """Fixed-capacity ring buffer for one writer thread and any number of readers
+
+    The writer stores the item before publishing the new write count, and each
+    step is a single bytecode-level assignment, so readers never see a slot that
+    has not been written yet. Old items are overwritten once the buffer is full.
+    """
+
+    __slots__ = ('capacity', 'slots', 'written')
+
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.written = 0
+
+    def push(self, item):
+        """Append an item (writer thread only)"""
+        self.slots[self.written % self.capacity] = item
+        self.written += 1
+
+    def latest(self):
+        """Return (sequence, item) for the newest item, or (0, None) when empty"""
+        written = self.written
+        if written == 0:
+            return 0, None
+        return written, self.slots[(written - 1) % self.capacity]
+
+    def since(self, sequence):
+        """Return (sequence, items) for everything written after a sequence number"""
+        written = self.written
+        start = max(sequence, written - self.capacity)
+        items = [self.slots[i % self.capacity] for i in range(start, written)]
+        return written, items
+
+    def __len__(self):
+        return min(self.written, self.capacity)
@@ -0,0 +1,45 @@
+"""
+Statistics Helpers
+Percentiles and bounded latency windows for metrics reporting
+"""
+
+import threading
+from collections import deque
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class LatencyWindow:
+    """Keeps the most recent latency samples for percentile reporting"""
+
+    def __init__(self, size=1024):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        """Record a latency sample"""
+        with self.lock:
+            self.samples.append(value)
+            self.count += 1
+            self.total += value
+
+    def summary(self):
+        """Return count, mean, p50, p99 and max over the window"""
+        with self.lock:
+            ordered = sorted(self.samples)
+            count, total = self.count, self.total
+        return {
+            'count': count,
+            'mean': total / count if count else 0.0,
+            'p50': percentile(ordered, 0.50),
+            'p99': percentile(ordered, 0.99),
+            'max': ordered[-1] if ordered else 0.0,
+        }